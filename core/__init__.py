@@ -42,6 +42,9 @@ from .node_protocol import (
     StreamMessage,
     StreamSession,
     MessageRouter,
+    Transport,
+    LoopbackTransport,
+    parse_message,
     ProtocolAdapter,
 )
 
@@ -59,8 +62,8 @@ def get_microsoft_ufo_integration():
     return UFOIntegrationService()
 
 def get_system_load_monitor():
-    from .system_load_monitor import SystemLoadMonitor
-    return SystemLoadMonitor()
+    from .system_load_monitor import get_monitor
+    return get_monitor()
 
 def get_vision_pipeline(config=None):
     from .vision_pipeline import get_vision_pipeline as _get
@@ -92,6 +95,9 @@ __all__ = [
     'StreamMessage',
     'StreamSession',
     'MessageRouter',
+    'Transport',
+    'LoopbackTransport',
+    'parse_message',
     'ProtocolAdapter',
     
     # 工厂函数
@@ -9,10 +9,15 @@ UFO Galaxy - 完整 API 路由模块
   /api/v1/devices    - 设备注册和管理
   /api/v1/nodes      - 节点查询和调用
   /api/v1/vision     - 融合视觉理解（OCR + GUI）
-  /api/v1/tasks      - 任务管理
+  /api/v1/tasks      - 任务管理（?wait= 长轮询）
+  /api/v1/command    - 统一命令（?wait= 长轮询，/events 为 SSE 完成通知）
   /api/v1/chat       - 对话接口
   /ws/device         - 设备 WebSocket 连接
   /ws/status         - 状态推送 WebSocket
+
+设备 WebSocket 的二进制帧格式（截图等大负载，免 base64）：
+  [4 字节大端头部长度 N][N 字节 UTF-8 JSON 头部][原始负载]
+  头部字段与文本消息相同（type、request_id、mode、instruction ...），负载即图片字节。
 """
 
 import asyncio
@@ -20,13 +25,15 @@ import base64
 import json
 import logging
 import os
+import struct
 import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from fastapi import APIRouter, FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # 导入鉴权模块
@@ -37,6 +44,8 @@ except ImportError:
     async def require_auth():
         return {"authenticated": True, "dev_mode": True}
 
+from .record_store import RecordStore
+
 logger = logging.getLogger("UFO-Galaxy.API")
 
 
@@ -137,11 +146,14 @@ class ConnectionManager:
     
     def __init__(self):
         self.active_devices: Dict[str, WebSocket] = {}
+        # 设备连接的发送锁：请求处理任务与服务端推送可能并发写同一连接
+        self.send_locks: Dict[str, asyncio.Lock] = {}
         self.status_subscribers: Set[WebSocket] = set()
         
     async def connect_device(self, websocket: WebSocket, device_id: str):
         await websocket.accept()
         self.active_devices[device_id] = websocket
+        self.send_locks[device_id] = asyncio.Lock()
         logger.info(f"设备已连接: {device_id}")
         await self.broadcast_status({
             "type": "device_connected",
@@ -151,13 +163,15 @@ class ConnectionManager:
         
     def disconnect_device(self, device_id: str):
         self.active_devices.pop(device_id, None)
+        self.send_locks.pop(device_id, None)
         logger.info(f"设备已断开: {device_id}")
         
     async def send_to_device(self, device_id: str, message: dict) -> bool:
         ws = self.active_devices.get(device_id)
         if ws:
             try:
-                await ws.send_json(message)
+                async with self.send_locks[device_id]:
+                    await ws.send_json(message)
                 return True
             except Exception as e:
                 logger.error(f"发送消息到设备 {device_id} 失败: {e}")
@@ -166,9 +180,10 @@ class ConnectionManager:
         
     async def broadcast_to_devices(self, message: dict):
         disconnected = []
-        for device_id, ws in self.active_devices.items():
+        for device_id, ws in list(self.active_devices.items()):
             try:
-                await ws.send_json(message)
+                async with self.send_locks[device_id]:
+                    await ws.send_json(message)
             except Exception:
                 disconnected.append(device_id)
         for d in disconnected:
@@ -201,14 +216,124 @@ connection_manager = ConnectionManager()
 # 设备注册表
 registered_devices: Dict[str, Dict[str, Any]] = {}
 
+# 任务和统一命令结果存储：TTL 淘汰、按状态/设备索引；
+# 设置 GATEWAY_STORE_DB 为 SQLite 文件路径后重启不丢失
+_STORE_DB = os.environ.get("GATEWAY_STORE_DB") or None
+_STORE_TTL = float(os.environ.get("GATEWAY_STORE_TTL", "3600"))
+_STORE_MAX_RECORDS = int(os.environ.get("GATEWAY_STORE_MAX_RECORDS", "10000"))
+
 # 任务队列
-task_queue: Dict[str, Dict[str, Any]] = {}
+task_queue = RecordStore(
+    "tasks", "task_id",
+    indexed_fields=("status", "device_id"),
+    terminal_statuses=("completed", "failed"),
+    ttl=_STORE_TTL,
+    max_records=_STORE_MAX_RECORDS,
+    db_path=_STORE_DB,
+)
 
 # 节点状态缓存
 node_status_cache: Dict[str, Dict[str, Any]] = {}
 
 # 统一命令结果存储
-command_results: Dict[str, Dict[str, Any]] = {}
+command_results = RecordStore(
+    "commands", "request_id",
+    indexed_fields=("status",),
+    terminal_statuses=(CommandStatus.DONE, CommandStatus.FAILED),
+    ttl=_STORE_TTL,
+    max_records=_STORE_MAX_RECORDS,
+    db_path=_STORE_DB,
+)
+
+# 长轮询（?wait=）单次最长挂起秒数；SSE 保活间隔
+LONG_POLL_MAX_WAIT = float(os.environ.get("GATEWAY_LONG_POLL_MAX_WAIT", "60"))
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+# 单个设备连接上同时处理的请求上限（ocr_request / chat）
+WS_MAX_INFLIGHT = int(os.environ.get("WS_MAX_INFLIGHT", "16"))
+
+
+# ============================================================================
+# 共享客户端
+# ============================================================================
+
+_http_client = None
+
+
+def get_http_client():
+    """进程内共享的 httpx.AsyncClient（连接池复用，避免每次请求重新建连）"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+def get_shared_vision_pipeline():
+    """进程内共享的 VisionPipeline（复用其 HTTP 客户端、熔断器和屏幕缓存）"""
+    from core.vision_pipeline import get_vision_pipeline
+    return get_vision_pipeline()
+
+
+async def close_shared_clients():
+    """关闭共享的 HTTP 客户端和视觉管线（应用关闭时调用）"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    try:
+        from core import vision_pipeline
+    except ImportError:
+        return
+    if vision_pipeline._pipeline_instance is not None:
+        await vision_pipeline._pipeline_instance.close()
+
+
+def _close_on_shutdown(app: FastAPI):
+    """
+    在应用 lifespan 结束时关闭共享客户端
+
+    包装现有的 lifespan_context 而不是注册 shutdown 事件：新版 Starlette
+    已移除 add_event_handler / on_event。
+    """
+    inner = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app_):
+        async with inner(app_) as state:
+            try:
+                yield state
+            finally:
+                await close_shared_clients()
+
+    app.router.lifespan_context = lifespan
+
+
+_FRAME_HEADER = struct.Struct("!I")
+
+
+def encode_binary_frame(header: Dict[str, Any], payload: bytes = b"") -> bytes:
+    """构造设备 WebSocket 二进制帧"""
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return _FRAME_HEADER.pack(len(header_bytes)) + header_bytes + payload
+
+
+def parse_binary_frame(frame: bytes) -> Tuple[Dict[str, Any], memoryview]:
+    """解析设备 WebSocket 二进制帧，返回 (头部, 负载视图)；负载不做拷贝"""
+    if len(frame) < _FRAME_HEADER.size:
+        raise ValueError("二进制帧过短")
+    (header_length,) = _FRAME_HEADER.unpack_from(frame)
+    end = _FRAME_HEADER.size + header_length
+    if end > len(frame):
+        raise ValueError("二进制帧头部长度超出帧长度")
+    view = memoryview(frame)
+    header = json.loads(bytes(view[_FRAME_HEADER.size:end]))
+    if not isinstance(header, dict):
+        raise ValueError("二进制帧头部必须是 JSON 对象")
+    return header, view[end:]
 
 
 # ============================================================================
@@ -253,9 +378,9 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             },
             "tasks": {
                 "total": len(task_queue),
-                "pending": sum(1 for t in task_queue.values() if t.get("status") == "pending"),
-                "running": sum(1 for t in task_queue.values() if t.get("status") == "running"),
-                "completed": sum(1 for t in task_queue.values() if t.get("status") == "completed")
+                "pending": task_queue.count("status", "pending"),
+                "running": task_queue.count("status", "running"),
+                "completed": task_queue.count("status", "completed")
             }
         })
     
@@ -644,24 +769,23 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             raise HTTPException(status_code=404, detail=f"节点 {req.node_id} 未找到")
         
         # 记录任务
-        task_queue[task_id] = {
+        task_queue.put({
             "task_id": task_id,
             "node_id": req.node_id,
             "action": req.action,
             "params": req.params,
             "status": "pending",
             "created_at": datetime.now().isoformat()
-        }
+        })
         
         try:
             if os.path.exists(fusion_entry):
                 node_info = _load_node(req.node_id, node_dir, fusion_entry)
                 
                 if node_info:
-                    task_queue[task_id]["status"] = "running"
+                    task_queue.update(task_id, status="running")
                     result = await _execute_node(node_info, req.action, req.params or {})
-                    task_queue[task_id]["status"] = "completed"
-                    task_queue[task_id]["result"] = result
+                    task_queue.update(task_id, status="completed", result=result)
                     return JSONResponse({
                         "success": True,
                         "task_id": task_id,
@@ -679,8 +803,7 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             })
             
         except Exception as e:
-            task_queue[task_id]["status"] = "failed"
-            task_queue[task_id]["error"] = str(e)
+            task_queue.update(task_id, status="failed", error=str(e))
             logger.error(f"节点调用失败: {req.node_id}.{req.action}: {e}")
             return JSONResponse({
                 "success": False,
@@ -716,15 +839,14 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             
             # 尝试使用 VisionPipeline
             try:
-                from core.vision_pipeline import VisionPipeline
-                pipeline = VisionPipeline()
-                result = await asyncio.get_event_loop().run_in_executor(
-                    None, pipeline.understand, image_data, req.mode, req.instruction
+                pipeline = get_shared_vision_pipeline()
+                result = await pipeline.understand(
+                    image_bytes=image_data, mode=req.mode, task_context=req.instruction
                 )
                 return JSONResponse({
-                    "success": True,
+                    "success": result.success,
                     "engine": "vision_pipeline",
-                    "result": result
+                    "result": result.to_dict()
                 })
             except ImportError:
                 pass
@@ -811,7 +933,7 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             "status": "pending",
             "created_at": datetime.now().isoformat()
         }
-        task_queue[task_id] = task
+        task_queue.put(task)
         
         # 如果指定了设备，通过 WebSocket 发送
         if req.device_id and req.device_id in connection_manager.active_devices:
@@ -821,7 +943,7 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                 "task_type": req.task_type,
                 "payload": req.payload
             })
-            task["status"] = "sent"
+            task = task_queue.update(task_id, status="sent") or task
         
         return JSONResponse({
             "success": True,
@@ -830,31 +952,37 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
         })
     
     @router.get("/api/v1/tasks/{task_id}")
-    async def get_task(task_id: str):
-        """获取任务状态"""
-        if task_id in task_queue:
-            return JSONResponse(task_queue[task_id])
+    async def get_task(task_id: str, wait: float = 0):
+        """获取任务状态；wait > 0 时长轮询，直到任务完成/失败或超时"""
+        task = await task_queue.wait(task_id, min(wait, LONG_POLL_MAX_WAIT))
+        if task is not None:
+            return JSONResponse(task)
         raise HTTPException(status_code=404, detail="任务未找到")
     
     @router.get("/api/v1/tasks")
-    async def list_tasks(status: str = None, limit: int = 50):
-        """列出任务"""
-        tasks = list(task_queue.values())
+    async def list_tasks(status: str = None, device_id: str = None, limit: int = 50, offset: int = 0):
+        """列出任务（按创建时间倒序）"""
+        filters = {}
         if status:
-            tasks = [t for t in tasks if t.get("status") == status]
-        tasks.sort(key=lambda t: t.get("created_at", ""), reverse=True)
+            filters["status"] = status
+        if device_id:
+            filters["device_id"] = device_id
+        if len(filters) == 1:
+            (field, value), = filters.items()
+            total = task_queue.count(field, value)
+        elif filters:
+            total = len(task_queue.list(limit=_STORE_MAX_RECORDS, **filters))
+        else:
+            total = len(task_queue)
         return JSONResponse({
-            "tasks": tasks[:limit],
-            "total": len(tasks)
+            "tasks": task_queue.list(limit=limit, offset=offset, **filters),
+            "total": total
         })
     
     @router.post("/api/v1/tasks/{task_id}/result")
     async def submit_task_result(task_id: str):
         """提交任务结果（设备回调）"""
-        if task_id in task_queue:
-            # 从请求体读取结果
-            task_queue[task_id]["status"] = "completed"
-            task_queue[task_id]["completed_at"] = datetime.now().isoformat()
+        if task_queue.update(task_id, status="completed", completed_at=datetime.now().isoformat()):
             return {"success": True}
         raise HTTPException(status_code=404, detail="任务未找到")
     
@@ -959,7 +1087,7 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             raise HTTPException(status_code=400, detail="Targets list cannot be empty")
         
         # 初始化命令结果
-        command_results[request_id] = {
+        command_results.put({
             "request_id": request_id,
             "command": req.command,
             "targets": req.targets,
@@ -969,11 +1097,11 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             "created_at": created_at,
             "completed_at": None,
             "results": {}
-        }
+        })
         
         if req.mode == "sync":
             # 同步模式：并行执行所有目标并等待完成
-            command_results[request_id]["status"] = CommandStatus.RUNNING
+            command_results.update(request_id, status=CommandStatus.RUNNING)
             
             # 使用 asyncio.gather 并行执行
             tasks = [
@@ -1004,11 +1132,13 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                 
                 # 更新命令结果
                 completed_at = datetime.now(timezone.utc).isoformat()
-                command_results[request_id]["status"] = CommandStatus.DONE
-                command_results[request_id]["completed_at"] = completed_at
-                command_results[request_id]["results"] = {
-                    k: v.model_dump() for k, v in results.items()
-                }
+                results = {k: v.model_dump() for k, v in results.items()}
+                command_results.update(
+                    request_id,
+                    status=CommandStatus.DONE,
+                    completed_at=completed_at,
+                    results=results
+                )
                 
                 # 返回响应
                 return JSONResponse({
@@ -1016,24 +1146,27 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                     "status": CommandStatus.DONE,
                     "created_at": created_at,
                     "completed_at": completed_at,
-                    "results": command_results[request_id]["results"]
+                    "results": results
                 })
                 
             except asyncio.TimeoutError:
                 # 超时处理
                 completed_at = datetime.now(timezone.utc).isoformat()
-                command_results[request_id]["status"] = CommandStatus.FAILED
-                command_results[request_id]["completed_at"] = completed_at
-                command_results[request_id]["results"] = {
-                    target: TargetResult(
-                        status=CommandStatus.FAILED,
-                        output=None,
-                        error="Execution timeout",
-                        started_at=created_at,
-                        completed_at=completed_at
-                    ).model_dump()
-                    for target in req.targets
-                }
+                command_results.update(
+                    request_id,
+                    status=CommandStatus.FAILED,
+                    completed_at=completed_at,
+                    results={
+                        target: TargetResult(
+                            status=CommandStatus.FAILED,
+                            output=None,
+                            error="Execution timeout",
+                            started_at=created_at,
+                            completed_at=completed_at
+                        ).model_dump()
+                        for target in req.targets
+                    }
+                )
                 
                 raise HTTPException(status_code=408, detail="Command execution timeout")
                 
@@ -1042,7 +1175,7 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
             async def execute_async():
                 """后台执行任务"""
                 try:
-                    command_results[request_id]["status"] = CommandStatus.RUNNING
+                    command_results.update(request_id, status=CommandStatus.RUNNING)
                     
                     # 并行执行所有目标
                     tasks = [
@@ -1068,11 +1201,13 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                     
                     # 更新命令结果
                     completed_at = datetime.now(timezone.utc).isoformat()
-                    command_results[request_id]["status"] = CommandStatus.DONE
-                    command_results[request_id]["completed_at"] = completed_at
-                    command_results[request_id]["results"] = {
-                        k: v.model_dump() for k, v in results.items()
-                    }
+                    results = {k: v.model_dump() for k, v in results.items()}
+                    command_results.update(
+                        request_id,
+                        status=CommandStatus.DONE,
+                        completed_at=completed_at,
+                        results=results
+                    )
                     
                     # 通过 WebSocket 推送结果
                     await connection_manager.broadcast_status({
@@ -1081,15 +1216,13 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                         "status": CommandStatus.DONE,
                         "created_at": created_at,
                         "completed_at": completed_at,
-                        "results": command_results[request_id]["results"]
+                        "results": results
                     })
                     
                 except Exception as e:
                     logger.error(f"异步命令执行失败: {e}")
                     completed_at = datetime.now(timezone.utc).isoformat()
-                    command_results[request_id]["status"] = CommandStatus.FAILED
-                    command_results[request_id]["completed_at"] = completed_at
-                    command_results[request_id]["results"] = {
+                    results = {
                         target: TargetResult(
                             status=CommandStatus.FAILED,
                             output=None,
@@ -1099,6 +1232,12 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                         ).model_dump()
                         for target in req.targets
                     }
+                    command_results.update(
+                        request_id,
+                        status=CommandStatus.FAILED,
+                        completed_at=completed_at,
+                        results=results
+                    )
                     
                     # 推送失败结果
                     await connection_manager.broadcast_status({
@@ -1107,7 +1246,7 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                         "status": CommandStatus.FAILED,
                         "created_at": created_at,
                         "completed_at": completed_at,
-                        "results": command_results[request_id]["results"]
+                        "results": results
                     })
             
             # 创建后台任务
@@ -1118,17 +1257,31 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                 "request_id": request_id,
                 "status": CommandStatus.QUEUED,
                 "created_at": created_at,
-                "message": "Command queued for async execution. Use GET /api/v1/command/{request_id}/status to check status."
+                "message": "Command queued for async execution. Use GET /api/v1/command/{request_id}/status?wait=30 "
+                           "(long-poll) or GET /api/v1/command/{request_id}/events (SSE) to receive the result."
             })
     
+    def _command_view(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "request_id": result["request_id"],
+            "status": result["status"],
+            "created_at": result["created_at"],
+            "completed_at": result["completed_at"],
+            "results": result["results"]
+        }
+    
     @router.get("/api/v1/command/{request_id}/status")
     async def get_command_status(
         request_id: str,
+        wait: float = 0,
         auth: dict = Depends(require_auth)
     ):
         """
         查询异步命令执行状态和结果
         
+        wait > 0 时长轮询：挂起直到命令完成/失败或等待 wait 秒（上限 LONG_POLL_MAX_WAIT），
+        无需客户端反复轮询。
+        
         **响应示例：**
         ```json
         {
@@ -1146,18 +1299,43 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
         }
         ```
         """
-        if request_id not in command_results:
+        result = await command_results.wait(request_id, min(wait, LONG_POLL_MAX_WAIT))
+        if result is None:
             raise HTTPException(status_code=404, detail="Command not found")
         
-        result = command_results[request_id]
+        return JSONResponse(_command_view(result))
+    
+    @router.get("/api/v1/command/{request_id}/events")
+    async def command_events(
+        request_id: str,
+        auth: dict = Depends(require_auth)
+    ):
+        """
+        以 Server-Sent Events 推送命令状态
         
-        return JSONResponse({
-            "request_id": result["request_id"],
-            "status": result["status"],
-            "created_at": result["created_at"],
-            "completed_at": result["completed_at"],
-            "results": result["results"]
-        })
+        先推送一次当前状态（event: status），命令完成/失败时推送最终结果
+        （event: result）后关闭连接；等待期间定期发送注释行保活。
+        """
+        result = command_results.get(request_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Command not found")
+        
+        def event(name: str, record: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {json.dumps(_command_view(record), ensure_ascii=False)}\n\n"
+        
+        async def stream():
+            yield event("status", result)
+            record = result
+            while not command_results.is_terminal(record):
+                latest = await command_results.wait(request_id, SSE_KEEPALIVE_INTERVAL)
+                if latest is None:
+                    return
+                if not command_results.is_terminal(latest):
+                    yield ": keep-alive\n\n"
+                record = latest
+            yield event("result", record)
+        
+        return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
     
     # ========================================================================
     # /api/v1/chat - 对话接口
@@ -1188,32 +1366,30 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
                     "reply": "抱歉，LLM 服务未配置。请在 .env 文件中设置 API Key。"
                 })
             
-            import httpx
             messages = [{"role": "system", "content": "你是 UFO Galaxy 智能助手，一个 L4 级自主性 AI 系统。"}]
             for ctx in req.context[-10:]:
                 messages.append(ctx)
             messages.append({"role": "user", "content": req.message})
             
-            async with httpx.AsyncClient(timeout=60) as client:
-                resp = await client.post(
-                    f"{api_base}/chat/completions",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                    json={
-                        "model": "gpt-4o-mini",
-                        "messages": messages,
-                        "max_tokens": 2048
-                    }
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                reply = data["choices"][0]["message"]["content"]
-                
-                return JSONResponse({
-                    "success": True,
-                    "reply": reply,
-                    "model": data.get("model", ""),
-                    "usage": data.get("usage", {})
-                })
+            resp = await get_http_client().post(
+                f"{api_base}/chat/completions",
+                headers={"Authorization": f"Bearer {api_key}"},
+                json={
+                    "model": "gpt-4o-mini",
+                    "messages": messages,
+                    "max_tokens": 2048
+                }
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            reply = data["choices"][0]["message"]["content"]
+            
+            return JSONResponse({
+                "success": True,
+                "reply": reply,
+                "model": data.get("model", ""),
+                "usage": data.get("usage", {})
+            })
                 
         except Exception as e:
             logger.error(f"对话失败: {e}")
@@ -1232,63 +1408,57 @@ def create_api_routes(service_manager=None, config=None) -> APIRouter:
 
 async def _chat_with_gemini(req: ChatRequest, api_key: str) -> JSONResponse:
     """使用 Gemini API 进行对话"""
-    import httpx
-    
     contents = []
     for ctx in req.context[-10:]:
         role = "user" if ctx.get("role") == "user" else "model"
         contents.append({"role": role, "parts": [{"text": ctx.get("content", "")}]})
     contents.append({"role": "user", "parts": [{"text": req.message}]})
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}",
-            json={
-                "contents": contents,
-                "systemInstruction": {
-                    "parts": [{"text": "你是 UFO Galaxy 智能助手，一个 L4 级自主性 AI 系统。"}]
-                }
+    resp = await get_http_client().post(
+        f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}",
+        json={
+            "contents": contents,
+            "systemInstruction": {
+                "parts": [{"text": "你是 UFO Galaxy 智能助手，一个 L4 级自主性 AI 系统。"}]
             }
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        reply = data["candidates"][0]["content"]["parts"][0]["text"]
-        
-        return JSONResponse({
-            "success": True,
-            "reply": reply,
-            "model": "gemini-2.0-flash"
-        })
+        }
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    reply = data["candidates"][0]["content"]["parts"][0]["text"]
+    
+    return JSONResponse({
+        "success": True,
+        "reply": reply,
+        "model": "gemini-2.0-flash"
+    })
 
 
 async def _chat_with_openrouter(req: ChatRequest, api_key: str) -> JSONResponse:
     """使用 OpenRouter API 进行对话"""
-    import httpx
-    
     messages = [{"role": "system", "content": "你是 UFO Galaxy 智能助手，一个 L4 级自主性 AI 系统。"}]
     for ctx in req.context[-10:]:
         messages.append(ctx)
     messages.append({"role": "user", "content": req.message})
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json={
-                "model": "google/gemini-2.0-flash-exp:free",
-                "messages": messages,
-                "max_tokens": 2048
-            }
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        reply = data["choices"][0]["message"]["content"]
-        
-        return JSONResponse({
-            "success": True,
-            "reply": reply,
-            "model": data.get("model", "openrouter")
-        })
+    resp = await get_http_client().post(
+        "https://openrouter.ai/api/v1/chat/completions",
+        headers={"Authorization": f"Bearer {api_key}"},
+        json={
+            "model": "google/gemini-2.0-flash-exp:free",
+            "messages": messages,
+            "max_tokens": 2048
+        }
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    reply = data["choices"][0]["message"]["content"]
+    
+    return JSONResponse({
+        "success": True,
+        "reply": reply,
+        "model": data.get("model", "openrouter")
+    })
 
 
 # ============================================================================
@@ -1298,9 +1468,17 @@ async def _chat_with_openrouter(req: ChatRequest, api_key: str) -> JSONResponse:
 def create_websocket_routes(app: FastAPI, service_manager=None):
     """创建 WebSocket 端点"""
     
+    _close_on_shutdown(app)
+    
     @app.websocket("/ws/device/{device_id}")
     async def device_websocket(websocket: WebSocket, device_id: str):
-        """设备 WebSocket 连接 - 双向通信"""
+        """
+        设备 WebSocket 连接 - 双向通信
+        
+        文本帧为 JSON 消息；截图可用二进制帧发送（见 parse_binary_frame）。
+        ocr_request 和 chat 在后台任务中处理，回复通过 request_id 关联，
+        慢请求不会阻塞同一连接上的心跳和状态消息。
+        """
         await connection_manager.connect_device(websocket, device_id)
         
         # 更新设备在线状态
@@ -1308,16 +1486,109 @@ def create_websocket_routes(app: FastAPI, service_manager=None):
             registered_devices[device_id]["last_seen"] = datetime.now().isoformat()
             registered_devices[device_id]["status"] = "online"
         
+        send_lock = connection_manager.send_locks[device_id]
+        inflight: Set[asyncio.Task] = set()
+        
+        async def send(message: dict):
+            # 后台任务、接收循环与服务端推送并发发送，需串行化
+            async with send_lock:
+                await websocket.send_json(message)
+        
+        async def handle_ocr(data: dict, image: Optional[memoryview]):
+            try:
+                pipeline = get_shared_vision_pipeline()
+                result = await pipeline.understand(
+                    image_base64=None if image is not None else data.get("image", ""),
+                    image_bytes=image,
+                    mode=data.get("mode", "full"),
+                    task_context=data.get("instruction", ""),
+                    device_id=device_id,
+                )
+                await send({
+                    "type": "ocr_result",
+                    "request_id": data.get("request_id", ""),
+                    "success": result.success,
+                    "result": result.to_dict()
+                })
+            except Exception as e:
+                await send({
+                    "type": "ocr_result",
+                    "request_id": data.get("request_id", ""),
+                    "success": False,
+                    "error": str(e)
+                })
+        
+        async def handle_chat(data: dict):
+            try:
+                chat_req = ChatRequest(
+                    message=data.get("message", ""),
+                    device_id=device_id,
+                    context=data.get("context", [])
+                )
+                # 复用 chat 逻辑
+                api_key = os.environ.get("OPENAI_API_KEY", "")
+                if api_key:
+                    messages = [
+                        {"role": "system", "content": "你是 UFO Galaxy 智能助手。"},
+                        {"role": "user", "content": chat_req.message}
+                    ]
+                    resp = await get_http_client().post(
+                        f"{os.environ.get('OPENAI_API_BASE', 'https://api.openai.com/v1')}/chat/completions",
+                        headers={"Authorization": f"Bearer {api_key}"},
+                        json={"model": "gpt-4o-mini", "messages": messages}
+                    )
+                    resp_data = resp.json()
+                    reply = resp_data["choices"][0]["message"]["content"]
+                else:
+                    reply = "LLM 服务未配置"
+                
+                await send({
+                    "type": "chat_reply",
+                    "request_id": data.get("request_id", ""),
+                    "reply": reply
+                })
+            except Exception as e:
+                await send({
+                    "type": "chat_reply",
+                    "request_id": data.get("request_id", ""),
+                    "reply": f"处理消息时出错: {str(e)}"
+                })
+        
+        async def spawn(coro, data: dict):
+            if len(inflight) >= WS_MAX_INFLIGHT:
+                coro.close()
+                await send({
+                    "type": "error",
+                    "request_id": data.get("request_id", ""),
+                    "message": f"并发请求过多（上限 {WS_MAX_INFLIGHT}），请稍后重试"
+                })
+                return
+            task = asyncio.ensure_future(coro)
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        
         try:
             while True:
-                data = await websocket.receive_json()
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                
+                image = None
+                if message.get("bytes") is not None:
+                    try:
+                        data, image = parse_binary_frame(message["bytes"])
+                    except ValueError as e:
+                        await send({"type": "error", "message": f"无效的二进制帧: {e}"})
+                        continue
+                else:
+                    data = json.loads(message.get("text") or "{}")
                 msg_type = data.get("type", "")
                 
                 if msg_type == "heartbeat":
                     # 心跳
                     if device_id in registered_devices:
                         registered_devices[device_id]["last_seen"] = datetime.now().isoformat()
-                    await websocket.send_json({
+                    await send({
                         "type": "heartbeat_ack",
                         "timestamp": datetime.now().isoformat()
                     })
@@ -1337,81 +1608,25 @@ def create_websocket_routes(app: FastAPI, service_manager=None):
                 elif msg_type == "task_result":
                     # 任务结果回调
                     task_id = data.get("task_id", "")
-                    if task_id in task_queue:
-                        task_queue[task_id]["status"] = "completed"
-                        task_queue[task_id]["result"] = data.get("result", {})
-                        task_queue[task_id]["completed_at"] = datetime.now().isoformat()
+                    task_queue.update(
+                        task_id,
+                        status="completed",
+                        result=data.get("result", {}),
+                        completed_at=datetime.now().isoformat()
+                    )
                     
                 elif msg_type == "ocr_request":
-                    # OCR 请求
-                    image_b64 = data.get("image", "")
-                    mode = data.get("mode", "full")
-                    instruction = data.get("instruction", "")
-                    
-                    try:
-                        image_data = base64.b64decode(image_b64)
-                        from core.vision_pipeline import VisionPipeline
-                        pipeline = VisionPipeline()
-                        result = await asyncio.get_event_loop().run_in_executor(
-                            None, pipeline.understand, image_data, mode, instruction
-                        )
-                        await websocket.send_json({
-                            "type": "ocr_result",
-                            "request_id": data.get("request_id", ""),
-                            "success": True,
-                            "result": result
-                        })
-                    except Exception as e:
-                        await websocket.send_json({
-                            "type": "ocr_result",
-                            "request_id": data.get("request_id", ""),
-                            "success": False,
-                            "error": str(e)
-                        })
+                    # OCR 请求（图片在二进制帧负载中，或文本消息的 base64 image 字段中）
+                    await spawn(handle_ocr(data, image), data)
                     
                 elif msg_type == "chat":
                     # 对话请求
-                    try:
-                        chat_req = ChatRequest(
-                            message=data.get("message", ""),
-                            device_id=device_id,
-                            context=data.get("context", [])
-                        )
-                        # 复用 chat 逻辑
-                        api_key = os.environ.get("OPENAI_API_KEY", "")
-                        if api_key:
-                            import httpx
-                            messages = [
-                                {"role": "system", "content": "你是 UFO Galaxy 智能助手。"},
-                                {"role": "user", "content": chat_req.message}
-                            ]
-                            async with httpx.AsyncClient(timeout=60) as client:
-                                resp = await client.post(
-                                    f"{os.environ.get('OPENAI_API_BASE', 'https://api.openai.com/v1')}/chat/completions",
-                                    headers={"Authorization": f"Bearer {api_key}"},
-                                    json={"model": "gpt-4o-mini", "messages": messages}
-                                )
-                                resp_data = resp.json()
-                                reply = resp_data["choices"][0]["message"]["content"]
-                        else:
-                            reply = "LLM 服务未配置"
-                        
-                        await websocket.send_json({
-                            "type": "chat_reply",
-                            "request_id": data.get("request_id", ""),
-                            "reply": reply
-                        })
-                    except Exception as e:
-                        await websocket.send_json({
-                            "type": "chat_reply",
-                            "request_id": data.get("request_id", ""),
-                            "reply": f"处理消息时出错: {str(e)}"
-                        })
+                    await spawn(handle_chat(data), data)
                 
                 else:
                     # 未知消息类型
                     logger.warning(f"未知消息类型: {msg_type} from {device_id}")
-                    await websocket.send_json({
+                    await send({
                         "type": "error",
                         "message": f"未知消息类型: {msg_type}"
                     })
@@ -1428,6 +1643,9 @@ def create_websocket_routes(app: FastAPI, service_manager=None):
         except Exception as e:
             logger.error(f"WebSocket 错误 ({device_id}): {e}")
             connection_manager.disconnect_device(device_id)
+        finally:
+            for task in inflight:
+                task.cancel()
     
     @app.websocket("/ws/status")
     async def status_websocket(websocket: WebSocket):
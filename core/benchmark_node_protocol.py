@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Node Protocol Benchmark
+
+Connects two MessageRouters with a LoopbackTransport (every message is
+serialized to JSON and parsed back) and measures:
+- request/response throughput at several concurrency levels, with many
+  requests multiplexed over the single connection
+- stream throughput with credit-based flow control, including a slow
+  consumer to show that the receive buffer stays within the window
+
+Usage:
+    python benchmark_node_protocol.py --requests 20000 --stream-mb 64
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+try:
+    from .node_protocol import LoopbackTransport, MessageRouter, Request
+except ImportError:
+    from node_protocol import LoopbackTransport, MessageRouter, Request
+
+
+def make_pair(window: int):
+    client = MessageRouter(stream_window=window)
+    server = MessageRouter(stream_window=window)
+    LoopbackTransport.pair(client, server)
+    return client, server
+
+
+async def bench_requests(total: int, concurrency: int, window: int) -> float:
+    client, server = make_pair(window)
+
+    async def echo(params):
+        await asyncio.sleep(0)  # yield like a real async handler
+        return {"n": params["n"] + 1}
+
+    server.register_handler("echo", echo)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(n: int):
+        async with semaphore:
+            response = await client.send_request(Request.create("client", "server", "echo", {"n": n}))
+            assert response.success and response.payload["n"] == n + 1, response.error
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(total)))
+    elapsed = time.perf_counter() - start
+    assert not client.pending_requests
+    return total / elapsed
+
+
+async def bench_stream(megabytes: int, chunk_kb: int, window: int, consumer_delay: float):
+    client, server = make_pair(window)
+    chunk = "x" * (chunk_kb * 1024)
+    chunks = megabytes * 1024 // chunk_kb
+    received = asyncio.get_running_loop().create_future()
+    peak = [0]
+
+    async def consume(session):
+        count = 0
+        async for data in session:
+            count += len(data)
+            peak[0] = max(peak[0], session._queue.qsize())
+            if consumer_delay:
+                await asyncio.sleep(consumer_delay)
+        received.set_result(count)
+
+    server.register_stream_handler("upload", consume)
+    start = time.perf_counter()
+    session = await client.open_stream("client", "server", action="upload")
+    for _ in range(chunks):
+        await session.write(chunk)
+    await session.close()
+    total = await received
+    elapsed = time.perf_counter() - start
+    assert total == chunks * len(chunk)
+    return total / 2 ** 20 / elapsed, peak[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MessageRouter loopback benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--stream-mb", type=int, default=64)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--window", type=int, default=64)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"{'concurrency':>12}{'requests/s':>14}")
+    for concurrency in args.concurrency:
+        rate = asyncio.run(bench_requests(args.requests, concurrency, args.window))
+        print(f"{concurrency:>12}{rate:>14.0f}")
+
+    print(f"\n{'stream':<16}{'MB/s':>10}{'peak buffered':>15}{'window':>8}")
+    rate, peak = asyncio.run(bench_stream(args.stream_mb, args.chunk_kb, args.window, 0))
+    print(f"{'fast consumer':<16}{rate:>10.1f}{peak:>15}{args.window:>8}")
+    # Slow consumer: the sender is throttled by credits instead of buffering
+    rate, peak = asyncio.run(bench_stream(max(1, args.stream_mb // 16), args.chunk_kb, args.window, 0.001))
+    print(f"{'slow consumer':<16}{rate:>10.1f}{peak:>15}{args.window:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Vision Fusion Benchmark
+
+Builds dense synthetic screens (a spreadsheet grid and an IDE with
+overlapping panels, gutter tokens and duplicate detections) and times
+VisionPipeline._fuse_ocr_and_gui against the pairwise O(n·m) fusion it
+replaces. Every run asserts that both produce identical elements.
+
+Also times VisionResult.find_element_at against a linear scan once the
+element index is built. The pairwise baseline is quadratic: 3000 cells
+already take about a minute.
+
+Usage:
+    python benchmark_vision_fusion.py --cells 200 1000 3000
+"""
+
+import argparse
+import copy
+import logging
+import random
+import time
+from typing import List, Tuple
+
+try:
+    from .vision_pipeline import (
+        BoundingBox, ElementType, GUIElement, InteractionType, OCRWord, VisionPipeline, VisionResult,
+    )
+except ImportError:
+    from vision_pipeline import (
+        BoundingBox, ElementType, GUIElement, InteractionType, OCRWord, VisionPipeline, VisionResult,
+    )
+
+
+def pairwise_fuse(result: VisionResult):
+    """Baseline: the original pairwise fusion."""
+    if not result.ocr_words or not result.gui_elements:
+        return
+
+    matched_ocr = set()
+    for elem in result.gui_elements:
+        if not elem.text:
+            best_match = None
+            best_overlap = 0
+            for i, word in enumerate(result.ocr_words):
+                if i in matched_ocr:
+                    continue
+                overlap = elem.bbox.overlap_ratio(word.bbox)
+                if overlap > best_overlap:
+                    best_overlap = overlap
+                    best_match = i
+            if best_match is not None and best_overlap > 0.3:
+                elem.text = result.ocr_words[best_match].text
+                matched_ocr.add(best_match)
+
+    for i, word in enumerate(result.ocr_words):
+        if i not in matched_ocr:
+            is_covered = False
+            for elem in result.gui_elements:
+                if elem.bbox.overlap_ratio(word.bbox) > 0.5:
+                    is_covered = True
+                    break
+            if not is_covered:
+                result.gui_elements.append(GUIElement(
+                    element_id=f"ocr_text_{i}",
+                    element_type=ElementType.TEXT,
+                    text=word.text,
+                    bbox=word.bbox,
+                    confidence=word.confidence,
+                    interactable=False,
+                ))
+
+    merged = []
+    skip = set()
+    for i, elem_a in enumerate(result.gui_elements):
+        if i in skip:
+            continue
+        for j, elem_b in enumerate(result.gui_elements):
+            if j <= i or j in skip:
+                continue
+            if elem_a.bbox.overlap_ratio(elem_b.bbox) > 0.8:
+                if len(elem_b.text) > len(elem_a.text):
+                    elem_a.text = elem_b.text
+                if elem_b.interactable and not elem_a.interactable:
+                    elem_a.interactable = True
+                    elem_a.interaction_types = elem_b.interaction_types
+                if elem_b.confidence > elem_a.confidence:
+                    elem_a.confidence = elem_b.confidence
+                skip.add(j)
+        merged.append(elem_a)
+
+    result.gui_elements = merged
+
+
+def jitter(rng: random.Random, box: BoundingBox, amount: int) -> BoundingBox:
+    return BoundingBox(
+        box.x + rng.randint(-amount, amount), box.y + rng.randint(-amount, amount),
+        max(1, box.width + rng.randint(-amount, amount)), max(1, box.height + rng.randint(-amount, amount)),
+    )
+
+
+def element(index: int, kind: ElementType, text: str, bbox: BoundingBox, rng: random.Random) -> GUIElement:
+    interactable = kind in (ElementType.BUTTON, ElementType.INPUT, ElementType.TAB)
+    return GUIElement(
+        element_id=f"e{index}",
+        element_type=kind,
+        text=text,
+        bbox=bbox,
+        confidence=round(rng.uniform(0.5, 0.99), 2),
+        interactable=interactable,
+        interaction_types=[InteractionType.CLICK] if interactable else [],
+    )
+
+
+def spreadsheet(cells: int, rng: random.Random) -> VisionResult:
+    """Grid of input cells; most OCR words sit inside one, some float free."""
+    columns = 40
+    elements, words = [], []
+    for n in range(cells):
+        row, col = divmod(n, columns)
+        box = BoundingBox(col * 64, 24 + row * 20, 64, 20)
+        text = f"R{row}C{col}" if rng.random() < 0.2 else ""
+        elements.append(element(n, ElementType.INPUT, text, box, rng))
+        if rng.random() < 0.05:  # duplicate detection from a second engine
+            elements.append(element(cells + n, ElementType.INPUT, "", jitter(rng, box, 1), rng))
+        if rng.random() < 0.7:
+            inner = BoundingBox(box.x + 4, box.y + 3, rng.randint(30, 56), 14)
+            words.append(OCRWord(f"{rng.randint(0, 99999)}", inner, round(rng.uniform(0.6, 0.99), 2)))
+    for _ in range(cells // 10):  # labels outside any cell
+        box = BoundingBox(rng.randint(0, 2560), rng.randint(0, 24), rng.randint(20, 90), 14)
+        words.append(OCRWord(f"hdr{len(words)}", box, 0.9))
+    return VisionResult(success=True, gui_elements=elements, ocr_words=words)
+
+
+def ide(cells: int, rng: random.Random) -> VisionResult:
+    """Editor lines with token-level OCR, nested panels and overlapping tabs."""
+    elements, words = [], []
+    lines = max(1, cells // 8)
+    for n in range(lines):
+        line = BoundingBox(48, n * 18, 1200, 18)
+        elements.append(element(len(elements), ElementType.TEXT, "", line, rng))
+        x = 52
+        for _ in range(rng.randint(2, 12)):
+            width = rng.randint(12, 90)
+            words.append(OCRWord(rng.choice(["def", "self", "return", "if", "x", "import"]),
+                                 BoundingBox(x, n * 18 + 2, width, 14), 0.9))
+            x += width + rng.randint(4, 12)
+        gutter = BoundingBox(0, n * 18, 40, 18)
+        words.append(OCRWord(str(n + 1), jitter(rng, gutter, 2), 0.95))
+    for _ in range(cells - lines):
+        kind = rng.choice([ElementType.BUTTON, ElementType.TAB, ElementType.ICON, ElementType.CONTAINER])
+        box = BoundingBox(rng.randint(0, 1900), rng.randint(0, lines * 18), rng.randint(16, 240), rng.randint(16, 60))
+        elements.append(element(len(elements), kind, "", box, rng))
+        if rng.random() < 0.1:
+            elements.append(element(len(elements), kind, "", jitter(rng, box, 2), rng))
+    return VisionResult(success=True, gui_elements=elements, ocr_words=words)
+
+
+def snapshot(result: VisionResult) -> List[Tuple]:
+    return [
+        (e.element_id, e.element_type, e.text, e.bbox.x, e.bbox.y, e.bbox.width, e.bbox.height,
+         e.confidence, e.interactable, tuple(e.interaction_types))
+        for e in result.gui_elements
+    ]
+
+
+def timed(fn, result: VisionResult) -> Tuple[float, VisionResult]:
+    result = copy.deepcopy(result)
+    start = time.perf_counter()
+    fn(result)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def lookup_rows(result: VisionResult, rng: random.Random, probes: int) -> Tuple[float, float]:
+    """Mean per-query time (µs) of linear find_element_at vs the element index."""
+    elements = result.gui_elements
+    points = [(rng.randint(0, 2000), rng.randint(0, 2000)) for _ in range(probes)]
+
+    def scan(x, y):
+        candidates = [e for e in elements if e.bbox.contains(x, y)]
+        return min(candidates, key=lambda e: e.bbox.area) if candidates else None
+
+    result.element_index  # build once
+    start = time.perf_counter()
+    expected = [scan(x, y) for x, y in points]
+    scan_us = (time.perf_counter() - start) * 1e6 / probes
+    start = time.perf_counter()
+    actual = [result.find_element_at(x, y) for x, y in points]
+    index_us = (time.perf_counter() - start) * 1e6 / probes
+    assert actual == expected
+    return scan_us, index_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR/GUI fusion benchmark")
+    parser.add_argument("--cells", type=int, nargs="+", default=[200, 1000, 3000])
+    parser.add_argument("--probes", type=int, default=200, help="find_element_at queries")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    pipeline = VisionPipeline()
+
+    print(f"{'layout':<12}{'elements':>9}{'words':>8}{'pairwise ms':>13}{'indexed ms':>12}{'speedup':>9}"
+          f"{'at() scan µs':>14}{'at() µs':>9}")
+    for cells in args.cells:
+        for name, build in (("spreadsheet", spreadsheet), ("ide", ide)):
+            rng = random.Random(args.seed + cells)
+            screen = build(cells, rng)
+            pairwise_ms, expected = timed(pairwise_fuse, screen)
+            indexed_ms, actual = timed(pipeline._fuse_ocr_and_gui, screen)
+            assert snapshot(actual) == snapshot(expected), f"{name} {cells}: fusion mismatch"
+            scan_us, index_us = lookup_rows(actual, rng, args.probes)
+            print(f"{name:<12}{len(screen.gui_elements):>9}{len(screen.ocr_words):>8}"
+                  f"{pairwise_ms:>13.1f}{indexed_ms:>12.1f}{pairwise_ms / indexed_ms:>8.0f}x"
+                  f"{scan_us:>14.1f}{index_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
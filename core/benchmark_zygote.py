@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Node Zygote Benchmark
+
+Starts N synthetic FastAPI nodes (pydantic models, an httpx client and
+uvicorn on their own port, like the nodes under nodes/) through
+ServiceManager twice: once as fresh `python main.py` processes and once
+forked from the pre-warmed zygote. Reports spawn-to-ready latency, total
+wall time to bring all nodes up, and memory from /proc smaps_rollup.
+Rss - Pss is the memory that the processes share with each other.
+
+Usage:
+    python benchmark_zygote.py --nodes 10 30 --base-port 19100
+"""
+
+import argparse
+import asyncio
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from unified_launcher import ServiceManager, ServiceType, SystemConfig  # noqa: E402
+
+NODE_SOURCE = '''
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+app = FastAPI(title="bench node {index}")
+client = httpx.AsyncClient()
+
+
+class Item(BaseModel):
+    name: str
+    value: int = 0
+
+
+@app.get("/health")
+async def health():
+    return {{"status": "healthy", "node": {index}}}
+
+
+@app.post("/items")
+async def create(item: Item):
+    return item
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port={port}, log_level="warning")
+'''
+
+
+def write_nodes(root: Path, count: int, base_port: int):
+    for i in range(count):
+        node_dir = root / f"Node_{i:03d}_Bench"
+        node_dir.mkdir()
+        (node_dir / "main.py").write_text(NODE_SOURCE.format(index=i, port=base_port + i))
+
+
+async def launch(root: Path, count: int, base_port: int, zygote: bool):
+    manager = ServiceManager(SystemConfig(use_zygote=zygote))
+    start = time.perf_counter()
+    if zygote and not await manager.start_zygote():
+        raise SystemExit("zygote is not supported on this platform")
+    zygote_seconds = time.perf_counter() - start
+
+    async def start_node(i: int) -> bool:
+        name = f"Node_{i:03d}_Bench"
+        main_py = root / name / "main.py"
+        manager.register_service(name, ServiceType.NODE, health_url=f"http://127.0.0.1:{base_port + i}/health")
+        started = await manager.start_service(name, [sys.executable, str(main_py)], cwd=main_py.parent,
+                                              script=main_py)
+        return started and await manager.wait_until_ready(name, timeout=120)
+
+    try:
+        results = await asyncio.gather(*(start_node(i) for i in range(count)))
+        wall = time.perf_counter() - start
+        assert all(results), [manager.get_logs(n)[-3:] for n, s in manager.services.items() if s.status != "running"]
+        latencies = sorted(s.startup_seconds for s in manager.services.values())
+        status = manager.get_launcher_status()
+        mode = status["modes"]["zygote" if zygote else "exec"]
+        zygote_memory = (status["zygote"] or {}).get("memory") or {}
+        return {
+            "wall": wall,
+            "zygote": zygote_seconds,
+            "p50": latencies[len(latencies) // 2],
+            "max": latencies[-1],
+            "rss_mb": (mode["rss_kb"] + zygote_memory.get("rss_kb", 0)) / 1024,
+            "pss_mb": (mode["pss_kb"] + zygote_memory.get("pss_kb", 0)) / 1024,
+        }
+    finally:
+        manager.stop_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Node zygote benchmark")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10, 30])
+    parser.add_argument("--base-port", type=int, default=19100)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"{'nodes':>6}{'mode':>8}{'zygote s':>10}{'wall s':>9}{'p50 s':>8}{'max s':>8}"
+          f"{'Rss MB':>9}{'Pss MB':>9}")
+    for count in args.nodes:
+        root = Path(tempfile.mkdtemp(prefix="zygote_bench_"))
+        try:
+            write_nodes(root, count, args.base_port)
+            for zygote in (False, True):
+                r = asyncio.run(launch(root, count, args.base_port, zygote))
+                print(f"{count:>6}{'zygote' if zygote else 'exec':>8}{r['zygote']:>10.2f}{r['wall']:>9.2f}"
+                      f"{r['p50']:>8.2f}{r['max']:>8.2f}{r['rss_mb']:>9.0f}{r['pss_mb']:>9.0f}")
+                time.sleep(1)  # let the ports close before the next run
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -175,6 +175,39 @@ class PendingMessage:
     send_time: float
     retry_count: int = 0
     ack_received: bool = False
+    ack_future: Optional[asyncio.Future] = None  # 收到 ACK 时完成
+
+
+class BroadcastResult(list):
+    """
+    广播结果
+
+    列表内容为各节点的非空响应（与原先的返回值兼容），另附目标数、
+    投递出错与超时的节点，以及整次广播的耗时。处理器已收到消息但没有
+    回复（返回 None）的节点算作成功。
+    """
+
+    def __init__(self, responses: List[Dict[str, Any]] = (), targets: int = 0,
+                 failed: List[str] = None, timed_out: List[str] = None, latency_ms: float = 0.0):
+        super().__init__(responses)
+        self.targets = targets
+        self.failed = failed or []
+        self.timed_out = timed_out or []
+        self.latency_ms = latency_ms
+
+    @property
+    def succeeded(self) -> int:
+        return self.targets - len(self.failed) - len(self.timed_out)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "targets": self.targets,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "latency_ms": self.latency_ms,
+            "responses": list(self)
+        }
 
 
 class RoutingTable:
@@ -423,6 +456,11 @@ class UniversalCommunicator:
         self._sequence_number = 0
         self._ack_timeout = 10.0  # ACK超时时间
         self._max_retries = 3  # 最大重试次数
+        self._broadcast_concurrency = 32  # 广播时同时发送的节点数上限
+        self._broadcast_timeout = 5.0  # 广播中每个节点的默认发送期限
+        self._route_discovery_timeout = 0.5  # 等待RREP的时间
+        self._route_discoveries: Dict[str, asyncio.Future] = {}  # target -> 进行中的路由发现
+        self._route_waiters: Dict[str, asyncio.Future] = {}  # target -> 收到RREP时完成
         
         # Register default handlers
         self._register_default_handlers()
@@ -491,12 +529,8 @@ class UniversalCommunicator:
         if route:
             return await self._send_via_route(message, route, wait_response, timeout)
         
-        # Initiate route discovery
-        await self._discover_route(target_id)
-        
-        # Retry after route discovery
-        await asyncio.sleep(0.5)
-        route = await self.routing_table.get_route(target_id)
+        # Initiate route discovery (waits for RREP, shared by concurrent senders)
+        route = await self._discover_route(target_id)
         if route:
             return await self._send_via_route(message, route, wait_response, timeout)
         
@@ -507,18 +541,30 @@ class UniversalCommunicator:
         self,
         message: Message,
         wait_response: bool,
-        timeout: float
+        timeout: float,
+        raise_errors: bool = False
     ) -> Optional[Dict[str, Any]]:
-        """直接发送消息"""
+        """
+        直接发送消息
+        
+        投递失败时返回 None；raise_errors 为 True 时改为抛出异常，
+        以便调用方区分"投递失败"和"已投递但处理器没有回复"。
+        """
         handler = self.registry.get_handler(message.target_id)
         if not handler:
             logger.warning(f"No handler for node: {message.target_id}")
+            if raise_errors:
+                raise ConnectionError(f"No handler for node: {message.target_id}")
             return None
         
         try:
-            # Track pending message if ACK required
-            if message.requires_ack:
-                pending = PendingMessage(message=message, send_time=time.time())
+            # Track pending message if ACK required (retries keep the same entry)
+            if message.requires_ack and message.message_id not in self._pending_messages:
+                pending = PendingMessage(
+                    message=message,
+                    send_time=time.time(),
+                    ack_future=asyncio.get_running_loop().create_future()
+                )
                 self._pending_messages[message.message_id] = pending
             
             # Send message
@@ -532,12 +578,16 @@ class UniversalCommunicator:
                 ack_received = await self._wait_for_ack(message.message_id, timeout)
                 if not ack_received:
                     logger.warning(f"ACK timeout for message: {message.message_id}")
+                    if raise_errors:
+                        raise ConnectionError(f"ACK timeout for message: {message.message_id}")
                     return None
             
             return response
             
         except Exception as e:
             logger.error(f"Error sending message: {e}")
+            if raise_errors:
+                raise
             return None
     
     async def _send_via_route(
@@ -572,8 +622,36 @@ class UniversalCommunicator:
         
         return None
     
-    async def _discover_route(self, target_id: str):
-        """发起路由发现 (AODV RREQ)"""
+    async def _discover_route(self, target_id: str) -> Optional[RouteEntry]:
+        """
+        发起路由发现 (AODV RREQ)，返回发现的路由
+
+        同一目标的并发发现合并为一次RREQ广播，所有等待方共享结果；不同
+        目标的发现并行进行。
+        """
+        discovery = self._route_discoveries.get(target_id)
+        if discovery is None:
+            discovery = asyncio.ensure_future(self._run_route_discovery(target_id))
+            self._route_discoveries[target_id] = discovery
+        return await asyncio.shield(discovery)
+    
+    async def _run_route_discovery(self, target_id: str) -> Optional[RouteEntry]:
+        arrived = asyncio.get_running_loop().create_future()
+        self._route_waiters[target_id] = arrived
+        try:
+            await self._send_rreq(target_id)
+            # 等待RREP（广播期间可能已到达），超时后以路由表为准
+            try:
+                await asyncio.wait_for(arrived, self._route_discovery_timeout)
+            except asyncio.TimeoutError:
+                pass
+            return await self.routing_table.get_route(target_id)
+        finally:
+            self._route_waiters.pop(target_id, None)
+            self._route_discoveries.pop(target_id, None)
+    
+    async def _send_rreq(self, target_id: str):
+        """广播RREQ"""
         self._sequence_number += 1
         rreq = Message(
             message_type=MessageType.RREQ,
@@ -657,6 +735,9 @@ class UniversalCommunicator:
             next_hop=message.get("source_id"),
             hop_count=hop_count
         )
+        waiter = self._route_waiters.get(target)
+        if waiter and not waiter.done():
+            waiter.set_result(None)
         
         # Forward to originator if needed
         originator = payload.get("originator")
@@ -678,21 +759,25 @@ class UniversalCommunicator:
     
     async def _wait_for_ack(self, message_id: str, timeout: float) -> bool:
         """等待ACK确认"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if message_id not in self._pending_messages:
-                return True  # ACK received and processed
-            await asyncio.sleep(0.1)
-        return False
+        pending = self._pending_messages.get(message_id)
+        if pending is None:
+            return True  # ACK received and processed
+        try:
+            await asyncio.wait_for(asyncio.shield(pending.ack_future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
     
     async def _handle_ack(self, message: Dict[str, Any]):
         """处理ACK消息"""
         payload = message.get("payload", {})
         acked_msg_id = payload.get("acked_message_id")
         
-        if acked_msg_id in self._pending_messages:
-            self._pending_messages[acked_msg_id].ack_received = True
-            del self._pending_messages[acked_msg_id]
+        pending = self._pending_messages.pop(acked_msg_id, None)
+        if pending:
+            pending.ack_received = True
+            if pending.ack_future and not pending.ack_future.done():
+                pending.ack_future.set_result(True)
             logger.debug(f"收到ACK: {acked_msg_id}")
     
     async def _retry_message(self, pending: PendingMessage):
@@ -719,28 +804,54 @@ class UniversalCommunicator:
         source_id: str,
         message_type: MessageType,
         payload: Dict[str, Any],
-        priority: int = 5
-    ) -> List[Dict[str, Any]]:
-        """广播消息到所有在线节点"""
-        responses = []
-        nodes = self.registry.get_online_nodes()
-        
-        for node in nodes:
-            if node.node_id != source_id:
-                try:
-                    response = await self.send_to_node(
-                        source_id=source_id,
-                        target_id=node.node_id,
-                        message_type=message_type,
-                        payload=payload,
-                        priority=priority
-                    )
-                    if response:
-                        responses.append(response)
-                except Exception as e:
-                    logger.warning(f"Broadcast to {node.node_id} failed: {e}")
+        priority: int = 5,
+        timeout: Optional[float] = None
+    ) -> BroadcastResult:
+        """
+        广播消息到所有在线节点
         
-        return responses
+        并发发送（最多 _broadcast_concurrency 个），每个节点的发送期限为
+        timeout（默认 _broadcast_timeout）；响应按节点注册顺序返回。
+        目标均为在线节点，直接投递。
+        """
+        start_time = time.time()
+        deadline = timeout if timeout is not None else self._broadcast_timeout
+        targets = [node.node_id for node in self.registry.get_online_nodes() if node.node_id != source_id]
+        semaphore = asyncio.Semaphore(self._broadcast_concurrency)
+        
+        async def send(target_id: str):
+            message = Message(
+                message_type=message_type,
+                source_id=source_id,
+                target_id=target_id,
+                payload=payload,
+                priority=priority
+            )
+            async with semaphore:
+                return await asyncio.wait_for(
+                    self._send_direct(message, False, deadline, raise_errors=True),
+                    deadline
+                )
+        
+        outcomes = await asyncio.gather(*(send(t) for t in targets), return_exceptions=True)
+        
+        result = BroadcastResult(targets=len(targets))
+        for target_id, outcome in zip(targets, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                result.timed_out.append(target_id)
+            elif isinstance(outcome, BaseException):
+                logger.warning(f"Broadcast to {target_id} failed: {outcome}")
+                result.failed.append(target_id)
+            elif outcome is not None:
+                result.append(outcome)
+        result.latency_ms = (time.time() - start_time) * 1000
+        
+        if result.failed or result.timed_out:
+            logger.debug(
+                f"广播 {message_type.value}: {result.succeeded}/{result.targets} 成功, "
+                f"{len(result.timed_out)} 超时, 耗时 {result.latency_ms:.0f}ms"
+            )
+        return result
     
     async def activate_self(
         self,
@@ -921,11 +1032,12 @@ class SecureCommunicator(UniversalCommunicator):
             self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
             self.ssl_context.load_cert_chain(ssl_cert, ssl_key)
     
-    async def _send_direct(self, message: Message, wait_response: bool, timeout: float):
+    async def _send_direct(self, message: Message, wait_response: bool, timeout: float,
+                           raise_errors: bool = False):
         """加密发送消息"""
         # 在实际实现中，这里会使用SSL包装socket
         # 简化实现，直接调用父类方法
-        return await super()._send_direct(message, wait_response, timeout)
+        return await super()._send_direct(message, wait_response, timeout, raise_errors)
 
 
 # Convenience functions
@@ -6,9 +6,9 @@
 
 定义节点间通信的标准协议：
 1. 消息格式定义
-2. 请求/响应协议
+2. 请求/响应协议（经 Transport 多路复用，按 correlation_id 关联响应）
 3. 事件广播协议
-4. 流式传输协议
+4. 流式传输协议（基于信用的流量控制，接收端缓冲有界）
 
 作者：Manus AI
 日期：2026-02-06
@@ -19,6 +19,7 @@ import uuid
 import time
 import asyncio
 import logging
+from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any, Callable, Union
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
@@ -45,6 +46,7 @@ class MessageType(Enum):
     STREAM_START = "stream_start"
     STREAM_DATA = "stream_data"
     STREAM_END = "stream_end"
+    STREAM_CREDIT = "stream_credit"  # 接收端授予发送端的信用
     
     # 控制
     PING = "ping"
@@ -253,17 +255,71 @@ class StreamMessage(Message):
         return data
 
 
+def parse_message(data: Dict[str, Any]) -> Message:
+    """按消息类型还原为对应的消息类（Message.from_dict 会丢失子类字段）"""
+    header = MessageHeader.from_dict(data.get("header", {}))
+    common = {
+        "header": header,
+        "action": data.get("action", ""),
+        "payload": data.get("payload", {}),
+        "metadata": data.get("metadata", {})
+    }
+    msg_type = header.message_type
+    if msg_type == MessageType.REQUEST:
+        return Request(**common)
+    if msg_type == MessageType.RESPONSE:
+        return Response(success=data.get("success", True), error=data.get("error"), **common)
+    if msg_type in (MessageType.EVENT, MessageType.BROADCAST) and "event_type" in data:
+        message = Event(event_type=data["event_type"], **common)
+        header.message_type = msg_type
+        return message
+    if msg_type in _STREAM_TYPES:
+        return StreamMessage(
+            stream_id=data.get("stream_id", ""),
+            sequence=data.get("sequence", 0),
+            is_final=data.get("is_final", False),
+            **common
+        )
+    return Message(**common)
+
+
+_STREAM_TYPES = (
+    MessageType.STREAM_START, MessageType.STREAM_DATA,
+    MessageType.STREAM_END, MessageType.STREAM_CREDIT
+)
+_STREAM_END = object()
+
+
 class StreamSession:
-    """流式会话"""
+    """
+    流式会话
+    
+    发送端：start/send/end 构造流消息；经 MessageRouter.open_stream 打开后，
+    write() 在信用耗尽时等待接收端授予信用。
+    接收端：数据块进入有界队列（容量为窗口大小），以 async for 逐块读取，
+    每消费半个窗口向发送端归还一次信用。
+    """
     
-    def __init__(self, stream_id: str, source: str, target: str):
+    def __init__(self, stream_id: str, source: str, target: str, window: int = 64):
         self.stream_id = stream_id
         self.source = source
         self.target = target
         self.sequence = 0
         self.started = False
         self.ended = False
-        self.data_buffer: List[Any] = []
+        self.error: Optional[str] = None
+        self.window = window
+        self.action = ""
+        
+        # 发送端
+        self.credits = window
+        self._credit_available = asyncio.Event()
+        self._credit_available.set()
+        
+        # 接收端
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._consumed = 0
+        self._router: Optional['MessageRouter'] = None
         
     def start(self) -> StreamMessage:
         """开始流"""
@@ -274,8 +330,10 @@ class StreamSession:
                 target_node=self.target,
                 message_type=MessageType.STREAM_START
             ),
+            action=self.action,
             stream_id=self.stream_id,
-            sequence=0
+            sequence=0,
+            metadata={"window": self.window}
         )
         
     def send(self, data: Any) -> StreamMessage:
@@ -307,20 +365,140 @@ class StreamSession:
             payload={"data": final_data} if final_data else {},
             is_final=True
         )
+        
+    # ---- 发送端 ----
+    
+    async def write(self, data: Any):
+        """发送一个数据块（信用耗尽时等待）"""
+        if self._router is None:
+            raise RuntimeError("流未通过 MessageRouter.open_stream 打开")
+        while self.credits <= 0 and self.error is None:
+            self._credit_available.clear()
+            await self._credit_available.wait()
+        if self.error is not None:
+            raise ConnectionResetError(f"流 {self.stream_id} 已被对端重置: {self.error}")
+        self.credits -= 1
+        await self._router._transmit(self.send(data))
+        
+    async def close(self, final_data: Any = None):
+        """结束流"""
+        if self._router is None:
+            raise RuntimeError("流未通过 MessageRouter.open_stream 打开")
+        if self.error is not None:
+            return
+        await self._router._transmit(self.end(final_data))
+        self._router._outgoing_streams.pop(self.stream_id, None)
+        
+    def add_credits(self, credits: int):
+        self.credits += credits
+        self._credit_available.set()
+        
+    def reset(self, error: str):
+        """对端拒绝或重置了流：唤醒等待信用的 write()，使其抛出 ConnectionResetError"""
+        self.ended = True
+        self.error = error
+        self._credit_available.set()
+        
+    # ---- 接收端 ----
+    
+    def feed(self, data: Any) -> bool:
+        """放入收到的数据块；超出窗口（对端未遵守信用）时丢弃并返回 False"""
+        if self._queue.qsize() >= self.window:
+            return False
+        self._queue.put_nowait(data)
+        return True
+        
+    def finish(self, final_data: Any = None):
+        """收到流结束"""
+        self.ended = True
+        if final_data is not None:
+            self._queue.put_nowait(final_data)
+        self._queue.put_nowait(_STREAM_END)
+        
+    def __aiter__(self):
+        return self
+        
+    async def __anext__(self) -> Any:
+        data = await self._queue.get()
+        if data is _STREAM_END:
+            raise StopAsyncIteration
+        self._consumed += 1
+        if self._router is not None and self._consumed >= max(1, self.window // 2):
+            credits, self._consumed = self._consumed, 0
+            await self._router._grant_credits(self, credits)
+        return data
 
 
 # ============================================================================
 # 消息路由器
 # ============================================================================
 
+class Transport(ABC):
+    """
+    消息传输层
+    
+    MessageRouter 通过 send() 发出消息；传输层收到对端消息后调用
+    MessageRouter.receive()。具体实现可基于 WebSocket、TCP 等。
+    """
+    
+    @abstractmethod
+    async def send(self, message: Message):
+        """把消息发给对端"""
+        pass
+        
+    async def close(self):
+        pass
+
+
+class LoopbackTransport(Transport):
+    """进程内回环传输：消息经 JSON 序列化后直接交给对端路由器（用于测试和基准）"""
+    
+    def __init__(self, serialize: bool = True):
+        self.serialize = serialize
+        self.peer: Optional['MessageRouter'] = None
+        
+    @classmethod
+    def pair(cls, router_a: 'MessageRouter', router_b: 'MessageRouter',
+             serialize: bool = True) -> None:
+        """把两个路由器用一对回环传输连起来"""
+        a_to_b, b_to_a = cls(serialize), cls(serialize)
+        a_to_b.peer, b_to_a.peer = router_b, router_a
+        router_a.attach(a_to_b)
+        router_b.attach(b_to_a)
+        
+    async def send(self, message: Message):
+        if self.peer is None:
+            raise ConnectionError("回环传输未连接")
+        if self.serialize:
+            message = parse_message(json.loads(message.to_json()))
+        await self.peer.receive(message)
+
+
 class MessageRouter:
-    """消息路由器"""
+    """
+    消息路由器
+    
+    route_message() 在本地处理一条消息；接入 Transport 后，receive() 处理
+    对端发来的消息：请求并发执行并把响应发回，响应按 correlation_id 唤醒
+    send_request() 的等待者，因此一条连接上可同时有任意多个请求在途。
+    """
     
-    def __init__(self):
+    def __init__(self, transport: Optional[Transport] = None,
+                 event_handler_timeout: float = 10.0, stream_window: int = 64):
         self.handlers: Dict[str, List[Callable]] = {}  # action -> handlers
         self.event_handlers: Dict[str, List[Callable]] = {}  # event_type -> handlers
+        self.stream_handlers: Dict[str, Callable] = {}  # action -> handler(session)
         self.pending_requests: Dict[str, asyncio.Future] = {}
-        self.streams: Dict[str, StreamSession] = {}
+        self.streams: Dict[str, StreamSession] = {}  # 接收中的流
+        self.transport = transport
+        self.event_handler_timeout = event_handler_timeout
+        self.stream_window = stream_window
+        self._outgoing_streams: Dict[str, StreamSession] = {}
+        self._tasks: set = set()
+        
+    def attach(self, transport: Transport):
+        """接入传输层"""
+        self.transport = transport
         
     def register_handler(self, action: str, handler: Callable):
         """注册动作处理器"""
@@ -334,6 +512,10 @@ class MessageRouter:
             self.event_handlers[event_type] = []
         self.event_handlers[event_type].append(handler)
         
+    def register_stream_handler(self, action: str, handler: Callable):
+        """注册流处理器：对端以该 action 打开流时以 StreamSession 调用"""
+        self.stream_handlers[action] = handler
+        
     async def route_message(self, message: Message) -> Optional[Response]:
         """路由消息"""
         msg_type = message.header.message_type
@@ -344,13 +526,43 @@ class MessageRouter:
             await self._handle_response(message)
         elif msg_type == MessageType.EVENT:
             await self._handle_event(message)
-        elif msg_type in [MessageType.STREAM_START, MessageType.STREAM_DATA, MessageType.STREAM_END]:
+        elif msg_type in _STREAM_TYPES:
             await self._handle_stream(message)
         elif msg_type == MessageType.PING:
             return self._handle_ping(message)
             
         return None
         
+    async def receive(self, message: Message):
+        """
+        处理传输层收到的消息
+        
+        请求、事件和 Ping 在后台任务中处理，不阻塞同一连接上的后续消息；
+        流消息按到达顺序同步处理以保持块的顺序。
+        """
+        msg_type = message.header.message_type
+        if msg_type in (MessageType.REQUEST, MessageType.PING):
+            self._spawn(self._serve(message))
+        elif msg_type == MessageType.EVENT:
+            self._spawn(self._handle_event(message))
+        else:
+            await self.route_message(message)
+            
+    async def _serve(self, message: Message):
+        response = await self.route_message(message)
+        if response is not None:
+            await self._transmit(response)
+            
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        
+    async def _transmit(self, message: Message):
+        if self.transport is None:
+            raise ConnectionError("MessageRouter 未接入传输层")
+        await self.transport.send(message)
+        
     async def _handle_request(self, request: Message) -> Response:
         """处理请求"""
         action = request.action
@@ -382,43 +594,121 @@ class MessageRouter:
         correlation_id = response.header.correlation_id
         if correlation_id and correlation_id in self.pending_requests:
             future = self.pending_requests.pop(correlation_id)
-            future.set_result(response)
+            if not future.done():
+                future.set_result(response)
             
     async def _handle_event(self, event: Message):
-        """处理事件"""
+        """处理事件：各处理器并发执行，异步处理器受 event_handler_timeout 限制"""
         if isinstance(event, Event):
             event_type = event.event_type
         else:
             event_type = event.metadata.get("event_type", "")
             
         handlers = self.event_handlers.get(event_type, [])
-        
-        for handler in handlers:
-            try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event.payload)
-                else:
-                    handler(event.payload)
-            except Exception as e:
-                logger.error(f"处理事件失败 {event_type}: {e}")
+        if handlers:
+            await asyncio.gather(*(
+                self._run_event_handler(handler, event_type, event.payload)
+                for handler in handlers
+            ))
+            
+    async def _run_event_handler(self, handler: Callable, event_type: str, payload: Dict[str, Any]):
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await asyncio.wait_for(handler(payload), timeout=self.event_handler_timeout)
+            else:
+                handler(payload)
+        except asyncio.TimeoutError:
+            logger.warning(f"事件处理器超时 {event_type}: {getattr(handler, '__name__', handler)}")
+        except Exception as e:
+            logger.error(f"处理事件失败 {event_type}: {e}")
                 
     async def _handle_stream(self, message: Message):
         """处理流式消息"""
         if isinstance(message, StreamMessage):
             stream_id = message.stream_id
+            msg_type = message.header.message_type
             
-            if message.header.message_type == MessageType.STREAM_START:
-                self.streams[stream_id] = StreamSession(
+            if msg_type == MessageType.STREAM_START:
+                handler = self.stream_handlers.get(message.action)
+                if handler is None:
+                    # 没有处理器就没人消费数据、归还信用：直接重置，发送端不会卡在信用上
+                    logger.warning(f"未找到流处理器: {message.action}，重置流 {stream_id}")
+                    await self._reset_stream(message, f"未找到流处理器: {message.action}")
+                    return
+                session = StreamSession(
                     stream_id,
                     message.header.source_node,
-                    message.header.target_node
+                    message.header.target_node,
+                    window=message.metadata.get("window", self.stream_window)
                 )
-            elif message.header.message_type == MessageType.STREAM_DATA:
-                if stream_id in self.streams:
-                    self.streams[stream_id].data_buffer.append(message.payload.get("data"))
-            elif message.header.message_type == MessageType.STREAM_END:
-                if stream_id in self.streams:
-                    del self.streams[stream_id]
+                session.action = message.action
+                session.started = True
+                session._router = self
+                self.streams[stream_id] = session
+                self._spawn(self._run_stream_handler(handler, session))
+            elif msg_type == MessageType.STREAM_DATA:
+                session = self.streams.get(stream_id)
+                if session and not session.feed(message.payload.get("data")):
+                    logger.error(f"流 {stream_id} 超出信用窗口，丢弃数据块 #{message.sequence}")
+            elif msg_type == MessageType.STREAM_END:
+                session = self.streams.pop(stream_id, None)
+                if session:
+                    session.finish(message.payload.get("data"))
+                elif "error" in message.metadata:
+                    # 对端重置了我们打开的流
+                    outgoing = self._outgoing_streams.pop(stream_id, None)
+                    if outgoing:
+                        outgoing.reset(message.metadata["error"])
+            elif msg_type == MessageType.STREAM_CREDIT:
+                session = self._outgoing_streams.get(stream_id)
+                if session:
+                    session.add_credits(message.payload.get("credits", 0))
+                    
+    async def _run_stream_handler(self, handler: Callable, session: StreamSession):
+        try:
+            result = handler(session)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"处理流失败 {session.stream_id}: {e}")
+            
+    async def _reset_stream(self, start: StreamMessage, error: str):
+        """以带 error 的 STREAM_END 回绝对端打开的流"""
+        if self.transport is None:
+            return
+        await self._transmit(StreamMessage(
+            header=MessageHeader(
+                source_node=start.header.target_node,
+                target_node=start.header.source_node,
+                message_type=MessageType.STREAM_END
+            ),
+            stream_id=start.stream_id,
+            is_final=True,
+            metadata={"error": error}
+        ))
+        
+    async def _grant_credits(self, session: StreamSession, credits: int):
+        if self.transport is None:
+            return
+        await self._transmit(StreamMessage(
+            header=MessageHeader(
+                source_node=session.target,
+                target_node=session.source,
+                message_type=MessageType.STREAM_CREDIT
+            ),
+            stream_id=session.stream_id,
+            payload={"credits": credits}
+        ))
+        
+    async def open_stream(self, source: str, target: str, action: str = "",
+                          window: Optional[int] = None) -> StreamSession:
+        """打开发往对端的流；返回的会话用 write()/close() 发送"""
+        session = StreamSession(str(uuid.uuid4()), source, target, window or self.stream_window)
+        session.action = action
+        session._router = self
+        self._outgoing_streams[session.stream_id] = session
+        await self._transmit(session.start())
+        return session
                     
     def _handle_ping(self, message: Message) -> Response:
         """处理 Ping"""
@@ -433,18 +723,42 @@ class MessageRouter:
         )
         
     async def send_request(self, request: Request, timeout: float = 30.0) -> Response:
-        """发送请求并等待响应"""
-        future = asyncio.get_event_loop().create_future()
-        self.pending_requests[request.header.message_id] = future
+        """
+        发送请求并等待响应
+        
+        接入传输层时经其发送，并按 correlation_id 等待对端响应；未接入时
+        直接在本地路由。
+        """
+        if self.transport is None:
+            try:
+                return await asyncio.wait_for(self.route_message(request), timeout=timeout)
+            except asyncio.TimeoutError:
+                return Response.from_request(request, success=False, error="请求超时")
+                
+        message_id = request.header.message_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending_requests[message_id] = future
         
         try:
-            # 这里需要实际的发送逻辑
-            # 暂时直接路由
-            response = await asyncio.wait_for(future, timeout=timeout)
-            return response
+            await self.transport.send(request)
+            return await asyncio.wait_for(future, timeout=timeout)
         except asyncio.TimeoutError:
-            self.pending_requests.pop(request.header.message_id, None)
             return Response.from_request(request, success=False, error="请求超时")
+        except Exception as e:
+            return Response.from_request(request, success=False, error=f"发送失败: {e}")
+        finally:
+            self.pending_requests.pop(message_id, None)
+            
+    async def close(self):
+        """取消在途请求和后台任务，关闭传输层"""
+        for future in self.pending_requests.values():
+            if not future.done():
+                future.cancel()
+        self.pending_requests.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        if self.transport is not None:
+            await self.transport.close()
 
 
 # ============================================================================
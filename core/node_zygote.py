@@ -0,0 +1,421 @@
+"""
+UFO Galaxy - 节点预热进程（zygote）
+====================================
+
+启动器为每个节点执行一次 `python main.py`，每个进程都要从头导入 FastAPI、
+pydantic、httpx、uvicorn。zygote 先导入这些公共依赖一次，再为每个节点
+fork 子进程运行其 main.py：
+
+1. 子进程与 zygote 写时复制共享已导入模块的内存，启动只剩节点自身的导入
+2. 导入完成后 gc.freeze()，避免子进程的垃圾回收触碰共享页
+3. 子进程的 stdout/stderr 是启动器创建的管道，写端经 SCM_RIGHTS 传给 zygote
+4. zygote 回收退出的子进程并把退出码通知启动器
+
+本文件既是 zygote 进程的入口（按路径执行，不导入 core 包），也提供启动器
+一侧的 ZygoteClient 和与 subprocess.Popen 接口一致的 ForkedProcess。
+仅支持 POSIX（需要 os.fork 和 AF_UNIX）。
+"""
+
+import gc
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("UFO-Galaxy.Zygote")
+
+DEFAULT_PRELOAD = (
+    "asyncio", "json", "logging", "sqlite3",
+    "pydantic", "httpx", "requests",
+    "starlette.applications", "starlette.responses",
+    "fastapi", "fastapi.middleware.cors", "fastapi.responses",
+    "uvicorn", "uvicorn.config", "uvicorn.server", "uvicorn.main",
+    "uvicorn.protocols.http.h11_impl", "uvicorn.lifespan.on",
+    "uvicorn.loops.asyncio",
+)
+
+MAX_MESSAGE = 65536
+SUPPORTED = hasattr(os, "fork") and hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+def process_memory(pid: int) -> Optional[Dict[str, int]]:
+    """
+    读取进程内存（KB），仅 Linux
+
+    rss 是驻留内存；pss 按共享进程数分摊共享页；rss - pss 即因共享而少占的内存。
+    """
+    fields = {"Rss": "rss_kb", "Pss": "pss_kb", "Shared_Clean": "shared_kb", "Shared_Dirty": "shared_kb"}
+    memory = {"rss_kb": 0, "pss_kb": 0, "shared_kb": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    memory[fields[key]] += int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return memory
+
+
+# ============================================================================
+# zygote 进程
+# ============================================================================
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    sock.send(json.dumps(message).encode())
+
+
+def _preload(modules) -> Dict[str, Any]:
+    start = time.perf_counter()
+    loaded, missing = [], []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            missing.append(name)
+    return {"preloaded": loaded, "missing": missing, "preload_seconds": round(time.perf_counter() - start, 3)}
+
+
+def _run_child(sock: socket.socket, request: Dict[str, Any], fds: List[int]):
+    """fork 出的子进程：接上输出管道，像 `python main.py` 一样运行节点脚本"""
+    code = 1
+    try:
+        sock.close()
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in fds:
+            os.close(fd)
+        for sig in (signal.SIGCHLD, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        import runpy
+
+        script = request["script"]
+        cwd = request.get("cwd") or os.path.dirname(script)
+        os.chdir(cwd)
+        os.environ.update(request.get("env") or {})
+        sys.argv = [script, *request.get("args", [])]
+        sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+        runpy.run_path(script, run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _reap(sock: socket.socket):
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        _send(sock, {"type": "exit", "pid": pid, "returncode": os.waitstatus_to_exitcode(status)})
+
+
+def serve(fd: int, modules) -> int:
+    """zygote 主循环：预热后等待 spawn 请求；启动器退出后随之退出"""
+    sock = socket.socket(fileno=fd)
+    parent = os.getppid()
+    # 按路径执行时 sys.path[0] 是 core/，其中的 cache.py 等会遮蔽同名模块
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+    # Ctrl+C 由启动器处理，zygote 只在启动器退出或被 terminate 时退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    info = _preload(modules)
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    _send(sock, {"type": "ready", "pid": os.getpid(), **info})
+
+    sock.settimeout(0.1)
+    while True:
+        _reap(sock)
+        if os.getppid() != parent:
+            return 0
+        try:
+            data, fds, _, _ = socket.recv_fds(sock, MAX_MESSAGE, 2)
+        except socket.timeout:
+            continue
+        except OSError:
+            return 0
+        if not data:
+            return 0
+
+        request = json.loads(data)
+        if request.get("type") != "spawn":
+            continue
+        if len(fds) != 2:
+            for descriptor in fds:
+                os.close(descriptor)
+            _send(sock, {"type": "error", "id": request.get("id"), "error": "缺少输出管道"})
+            continue
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        started = time.perf_counter()
+        try:
+            pid = os.fork()
+        except OSError as e:
+            _send(sock, {"type": "error", "id": request["id"], "error": str(e)})
+            pid = None
+        if pid == 0:
+            _run_child(sock, request, fds)
+        for descriptor in fds:
+            os.close(descriptor)
+        if pid:
+            _send(sock, {"type": "spawned", "id": request["id"], "pid": pid,
+                         "fork_seconds": round(time.perf_counter() - started, 6)})
+
+
+# ============================================================================
+# 启动器一侧
+# ============================================================================
+
+class ForkedProcess:
+    """
+    zygote fork 出的节点进程
+
+    提供 ServiceManager 用到的 subprocess.Popen 接口：pid、stdout、stderr、
+    returncode、poll、wait、terminate、kill。子进程属于 zygote，退出码由
+    zygote 通知。
+    """
+
+    def __init__(self, client: "ZygoteClient", pid: int, stdout, stderr):
+        self.client = client
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode: Optional[int] = None
+        self._exited = threading.Event()
+
+    def _set_exit(self, returncode: int):
+        self.returncode = returncode
+        self._exited.set()
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None and not self.client.alive:
+            # zygote 已退出，收不到通知：进程不存在即视为已退出（退出码未知）
+            try:
+                os.kill(self.pid, 0)
+            except ProcessLookupError:
+                self._set_exit(-1)
+            except PermissionError:
+                pass
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout)
+            self._exited.wait(0.1 if remaining is None else min(0.1, remaining))
+        return self.returncode
+
+    def send_signal(self, sig: int):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class ZygoteClient:
+    """
+    启动器与 zygote 的连接
+
+    start() 启动 zygote 并等待预热完成；spawn() 让 zygote fork 一个节点进程。
+    后台线程接收 spawn 结果和子进程退出通知。
+    """
+
+    def __init__(self, modules=DEFAULT_PRELOAD, env: Optional[Dict[str, str]] = None,
+                 start_timeout: float = 60.0):
+        self.modules = list(modules)
+        self.env = env
+        self.start_timeout = start_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.info: Dict[str, Any] = {}
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._children: Dict[int, ForkedProcess] = {}
+        self._early_exits: Dict[int, int] = {}
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._reader: Optional[threading.Thread] = None
+        self.stats = {"spawned": 0, "failed": 0, "fork_seconds": 0.0}
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> bool:
+        """启动 zygote 并阻塞到预热完成；失败返回 False"""
+        if not SUPPORTED:
+            return False
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--fd", str(theirs.fileno()),
+                 "--preload", ",".join(self.modules)],
+                pass_fds=(theirs.fileno(),),
+                env=self.env,
+            )
+        except OSError as e:
+            logger.error(f"zygote 启动失败: {e}")
+            ours.close()
+            return False
+        finally:
+            theirs.close()
+
+        ours.settimeout(self.start_timeout)
+        try:
+            message = json.loads(ours.recv(MAX_MESSAGE))
+        except (OSError, ValueError) as e:
+            logger.error(f"zygote 预热失败: {e}")
+            ours.close()
+            self.stop()
+            return False
+        ours.settimeout(None)
+        self._sock = ours
+        self.info = {k: v for k, v in message.items() if k != "type"}
+        self._reader = threading.Thread(target=self._read_loop, name="zygote-reader", daemon=True)
+        self._reader.start()
+        logger.info(f"zygote 已就绪 (pid {self.info.get('pid')})，预加载 {len(self.info.get('preloaded', []))} 个模块，"
+                    f"耗时 {self.info.get('preload_seconds')}s")
+        return True
+
+    def spawn(self, script: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+              args: Optional[List[str]] = None, timeout: float = 10.0) -> ForkedProcess:
+        """fork 一个运行 script 的节点进程，失败抛出 RuntimeError"""
+        if self._sock is None or not self.alive:
+            raise RuntimeError("zygote 未运行")
+
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        with self._cond:
+            self._next_id += 1
+            request_id = self._next_id
+        request = {"type": "spawn", "id": request_id, "script": script, "cwd": cwd,
+                   "env": env or {}, "args": args or []}
+        try:
+            with self._send_lock:
+                socket.send_fds(self._sock, [json.dumps(request).encode()], [out_w, err_w])
+        except OSError as e:
+            for fd in (out_r, err_r):
+                os.close(fd)
+            raise RuntimeError(f"zygote 请求失败: {e}") from e
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while request_id not in self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.alive:
+                    break
+                self._cond.wait(min(remaining, 0.5))
+            reply = self._pending.pop(request_id, None)
+            if reply is None or reply["type"] != "spawned":
+                for fd in (out_r, err_r):
+                    os.close(fd)
+                self.stats["failed"] += 1
+                raise RuntimeError((reply or {}).get("error", "zygote 无响应"))
+
+            child = ForkedProcess(self, reply["pid"], os.fdopen(out_r, "rb"), os.fdopen(err_r, "rb"))
+            self._children[child.pid] = child
+            if child.pid in self._early_exits:
+                child._set_exit(self._early_exits.pop(child.pid))
+        self.stats["spawned"] += 1
+        self.stats["fork_seconds"] += reply.get("fork_seconds", 0.0)
+        return child
+
+    def _read_loop(self):
+        while True:
+            try:
+                data = self._sock.recv(MAX_MESSAGE)
+            except OSError:
+                break
+            if not data:
+                break
+            message = json.loads(data)
+            with self._cond:
+                if message["type"] == "exit":
+                    child = self._children.pop(message["pid"], None)
+                    if child is not None:
+                        child._set_exit(message["returncode"])
+                    else:
+                        # 退出通知先于 spawn 结果到达
+                        self._early_exits[message["pid"]] = message["returncode"]
+                elif "id" in message:
+                    self._pending[message["id"]] = message
+                    self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            "running": self.alive,
+            "pid": self.process.pid if self.process else None,
+            "preloaded": self.info.get("preloaded", []),
+            "preload_seconds": self.info.get("preload_seconds"),
+            "spawned": self.stats["spawned"],
+            "failed": self.stats["failed"],
+            "mean_fork_ms": round(self.stats["fork_seconds"] * 1000 / self.stats["spawned"], 3)
+            if self.stats["spawned"] else None,
+        }
+        if self.alive:
+            stats["memory"] = process_memory(self.process.pid)
+        return stats
+
+    def stop(self):
+        """停止 zygote；已 fork 的节点进程不受影响，由启动器各自停止"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UFO Galaxy 节点预热进程")
+    parser.add_argument("--fd", type=int, required=True, help="与启动器通信的 socket")
+    parser.add_argument("--preload", default=",".join(DEFAULT_PRELOAD), help="逗号分隔的预加载模块")
+    args = parser.parse_args()
+    sys.exit(serve(args.fd, [m for m in args.preload.split(",") if m]))
@@ -0,0 +1,369 @@
+"""
+UFO Galaxy - 网关记录存储
+==========================
+
+API 网关的任务 / 命令记录存储，替代无限增长的模块级 dict。
+
+功能:
+1. TTL 淘汰：终态记录在 ttl 秒后过期，未完成的记录在 active_ttl 秒后过期，
+   过期时间放在最小堆里，每次写入/查询时惰性清理；另有 max_records 上限
+2. 二级索引：按 status、device_id 等字段分桶，计数 O(1)
+3. 按创建顺序列出：分页只走 limit 条（加上少量尚未压缩的过期索引项）
+4. 完成通知：wait() 挂起直到记录进入终态，供长轮询和 SSE 使用
+5. 可选 SQLite 持久化（写穿），重启后恢复未过期的记录
+
+存储只在事件循环线程中使用，不加锁。
+"""
+
+import asyncio
+import bisect
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import time
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("UFO-Galaxy.RecordStore")
+
+
+def _index_key(value: Any) -> Any:
+    # CommandStatus 等枚举统一成取值，与持久化后读回的记录对齐
+    return value.value if isinstance(value, Enum) else value
+
+
+def _resolve(future: asyncio.Future, record: Dict[str, Any]):
+    if not future.done():
+        future.set_result(record)
+
+
+class _IndexBucket:
+    """
+    单个索引值下的记录
+
+    order 按创建序号排序；记录离开该桶时只从 members 删除，order 中的旧项
+    在列出时跳过，累积过多时整体压缩。listed 记下每个 ID 在 order 中的序号：
+    记录以同一序号重新回到该桶时旧项恰好仍在正确位置，直接复用；ID 被删除
+    后重新创建（序号变了）时插入新项，旧项因序号不符在列出时跳过。
+    """
+
+    __slots__ = ("members", "order", "listed")
+
+    def __init__(self):
+        self.members: Set[str] = set()
+        self.order: List[Tuple[int, str]] = []
+        self.listed: Dict[str, int] = {}
+
+    def add(self, record_id: str, seq: int):
+        self.members.add(record_id)
+        if self.listed.get(record_id) != seq:
+            entry = (seq, record_id)
+            if not self.order or self.order[-1] < entry:
+                self.order.append(entry)
+            else:
+                bisect.insort(self.order, entry)
+            self.listed[record_id] = seq
+
+    def remove(self, record_id: str):
+        self.members.discard(record_id)
+        if len(self.order) > 2 * len(self.members) + 64:
+            self.order = [entry for entry in self.order if self._live(entry)]
+            self.listed = {record_id: seq for seq, record_id in self.order}
+
+    def _live(self, entry: Tuple[int, str]) -> bool:
+        seq, record_id = entry
+        return record_id in self.members and self.listed.get(record_id) == seq
+
+    def newest(self) -> Iterator[str]:
+        for entry in reversed(self.order):
+            if self._live(entry):
+                yield entry[1]
+
+
+class RecordStore:
+    """
+    有界、带索引的记录存储
+
+    记录是普通 dict，必须通过 put() / update() 修改，以便维护索引、过期时间
+    和通知；get() 返回的 dict 视为只读。
+
+    Args:
+        name: 存储名称（SQLite 表名）
+        id_field: 记录中的主键字段
+        indexed_fields: 建立二级索引的字段
+        terminal_statuses: 终态取值，进入终态后按 ttl 过期并唤醒等待者
+        ttl: 终态记录保留秒数
+        active_ttl: 未进入终态的记录保留秒数
+        max_records: 记录数上限，超出时淘汰最早创建的记录
+        db_path: SQLite 文件路径，None 表示仅内存
+    """
+
+    def __init__(
+        self,
+        name: str,
+        id_field: str,
+        indexed_fields: Iterable[str] = ("status", "device_id"),
+        terminal_statuses: Iterable[str] = ("completed", "failed"),
+        ttl: float = 3600,
+        active_ttl: float = 86400,
+        max_records: int = 10000,
+        db_path: Optional[str] = None,
+    ):
+        self.name = name
+        self.id_field = id_field
+        self.indexed_fields = tuple(indexed_fields)
+        self.terminal_statuses = {_index_key(s) for s in terminal_statuses}
+        self.ttl = ttl
+        self.active_ttl = active_ttl
+        self.max_records = max_records
+
+        # 记录按创建顺序插入，dict 保序即全局的时间顺序
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._indexes: Dict[str, Dict[Any, _IndexBucket]] = {f: {} for f in self.indexed_fields}
+
+        # 过期堆：(过期时间, 记录 ID)，与 _expires_at 不一致的项为旧项
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expires_at: Dict[str, float] = {}
+
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._stats = {"evicted_expired": 0, "evicted_capacity": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._open_db(db_path)
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+
+    def put(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """插入或整体替换一条记录"""
+        record_id = record[self.id_field]
+        self._evict_expired()
+        old = self._records.get(record_id)
+        if old is None:
+            self._seq[record_id] = self._next_seq
+            self._next_seq += 1
+        self._records[record_id] = record
+        self._reindex(record_id, old, record)
+        self._touch(record_id, record)
+        self._persist(record_id, record)
+        self._evict_capacity()
+        return record
+
+    def update(self, record_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """更新记录字段；记录不存在（或已过期）时返回 None"""
+        old = self.get(record_id)
+        if old is None:
+            return None
+        record = {**old, **fields}
+        self._records[record_id] = record
+        self._reindex(record_id, old, record)
+        self._touch(record_id, record)
+        self._persist(record_id, record)
+        return record
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        self._evict_expired()
+        return self._records.get(record_id)
+
+    def __contains__(self, record_id: str) -> bool:
+        return self.get(record_id) is not None
+
+    def __len__(self) -> int:
+        self._evict_expired()
+        return len(self._records)
+
+    def delete(self, record_id: str) -> bool:
+        record = self._records.pop(record_id, None)
+        if record is None:
+            return False
+        self._reindex(record_id, record, None)
+        self._seq.pop(record_id, None)
+        self._expires_at.pop(record_id, None)
+        if self._db is not None:
+            self._db.execute(f"DELETE FROM {self._table} WHERE id = ?", (record_id,))
+            self._db.commit()
+        return True
+
+    def count(self, field: Optional[str] = None, value: Any = None) -> int:
+        """记录数；指定索引字段时为该取值下的记录数"""
+        self._evict_expired()
+        if field is None:
+            return len(self._records)
+        bucket = self._indexes[field].get(_index_key(value))
+        return len(bucket.members) if bucket else 0
+
+    def list(self, limit: int = 50, offset: int = 0, **filters) -> List[Dict[str, Any]]:
+        """
+        按创建时间倒序列出记录
+
+        filters 中的字段必须是索引字段；多个条件时从最小的桶出发逐条校验其余条件。
+        """
+        self._evict_expired()
+        if not filters:
+            ids: Iterable[str] = reversed(self._records)
+            checks: List[Tuple[str, Any]] = []
+        else:
+            buckets = []
+            for field, value in filters.items():
+                if field not in self._indexes:
+                    raise ValueError(f"字段 {field} 没有索引")
+                bucket = self._indexes[field].get(_index_key(value))
+                if bucket is None:
+                    return []
+                buckets.append((len(bucket.members), field, value, bucket))
+            buckets.sort(key=lambda b: b[0])
+            ids = buckets[0][3].newest()
+            checks = [(field, _index_key(value)) for _, field, value, _ in buckets[1:]]
+
+        results = []
+        skipped = 0
+        for record_id in ids:
+            record = self._records[record_id]
+            if any(_index_key(record.get(field)) != value for field, value in checks):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            results.append(record)
+            if len(results) >= limit:
+                break
+        return results
+
+    def is_terminal(self, record: Dict[str, Any]) -> bool:
+        return _index_key(record.get("status")) in self.terminal_statuses
+
+    async def wait(self, record_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        等待记录进入终态，最多 timeout 秒
+
+        返回最新的记录（超时则为当时的状态）；记录不存在时返回 None。
+        """
+        record = self.get(record_id)
+        if record is None or self.is_terminal(record) or timeout <= 0:
+            return record
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(record_id, []).append(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return self.get(record_id)
+        finally:
+            waiters = self._waiters.get(record_id)
+            if waiters is not None:
+                if future in waiters:
+                    waiters.remove(future)
+                if not waiters:
+                    del self._waiters[record_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._evict_expired()
+        stats = dict(self._stats)
+        stats["records"] = len(self._records)
+        stats["waiters"] = sum(len(w) for w in self._waiters.values())
+        stats["persistent"] = self._db is not None
+        return stats
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+    # 内部
+    # ------------------------------------------------------------------
+
+    def _reindex(self, record_id: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        seq = self._seq[record_id]
+        for field, index in self._indexes.items():
+            old_key = _index_key(old.get(field)) if old is not None else None
+            new_key = _index_key(new.get(field)) if new is not None else None
+            if old is not None and (new is None or old_key != new_key):
+                bucket = index.get(old_key)
+                if bucket is not None:
+                    bucket.remove(record_id)
+                    if not bucket.members:
+                        del index[old_key]
+            if new is not None and (old is None or old_key != new_key):
+                index.setdefault(new_key, _IndexBucket()).add(record_id, seq)
+
+    def _touch(self, record_id: str, record: Dict[str, Any]):
+        """刷新过期时间；进入终态时唤醒等待者"""
+        terminal = self.is_terminal(record)
+        expires_at = time.time() + (self.ttl if terminal else self.active_ttl)
+        self._expires_at[record_id] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, record_id))
+        if terminal:
+            for future in self._waiters.pop(record_id, []):
+                future.get_loop().call_soon_threadsafe(_resolve, future, record)
+
+    def _evict_expired(self):
+        now = time.time()
+        heap = self._expiry_heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            expires_at, record_id = heapq.heappop(heap)
+            if self._expires_at.get(record_id) == expires_at:
+                expired.append(record_id)
+        for record_id in expired:
+            self.delete(record_id)
+            self._stats["evicted_expired"] += 1
+        # 旧项过多时重建堆，避免频繁更新的记录撑大堆
+        if len(heap) > 4 * len(self._records) + 64:
+            self._expiry_heap = [e for e in heap if self._expires_at.get(e[1]) == e[0]]
+            heapq.heapify(self._expiry_heap)
+
+    def _evict_capacity(self):
+        while len(self._records) > self.max_records:
+            oldest = next(iter(self._records))
+            self.delete(oldest)
+            self._stats["evicted_capacity"] += 1
+
+    # ------------------------------------------------------------------
+    # SQLite 持久化
+    # ------------------------------------------------------------------
+
+    @property
+    def _table(self) -> str:
+        return f"records_{self.name}"
+
+    def _open_db(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} ("
+            "id TEXT PRIMARY KEY, seq INTEGER NOT NULL, expires_at REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        self._db.execute(f"DELETE FROM {self._table} WHERE expires_at <= ?", (time.time(),))
+        self._db.commit()
+
+        rows = self._db.execute(f"SELECT id, expires_at, data FROM {self._table} ORDER BY seq").fetchall()
+        for record_id, expires_at, data in rows:
+            record = json.loads(data)
+            self._seq[record_id] = self._next_seq
+            self._next_seq += 1
+            self._records[record_id] = record
+            self._reindex(record_id, None, record)
+            self._expires_at[record_id] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, record_id))
+        if rows:
+            logger.info(f"从 {db_path} 恢复 {len(rows)} 条 {self.name} 记录")
+
+    def _persist(self, record_id: str, record: Dict[str, Any]):
+        if self._db is None:
+            return
+        self._db.execute(
+            f"INSERT OR REPLACE INTO {self._table} (id, seq, expires_at, data) VALUES (?, ?, ?, ?)",
+            (record_id, self._seq[record_id], self._expires_at[record_id],
+             json.dumps(record, ensure_ascii=False, default=str)),
+        )
+        self._db.commit()
@@ -9,17 +9,22 @@ UFO Galaxy - 系统负载监控器
 2. 内存使用率监控
 3. 磁盘使用率监控
 4. 网络流量监控
-5. 进程监控
+5. 进程监控（按需开启，低频采样）
+
+采样在后台线程中进行，每轮发布一个不可变的 LoadSnapshot。
+get_load_score / get_average_load 只读取最新快照和定长历史数组，
+可以在心跳、负载均衡等热路径上直接调用，不会阻塞事件循环。
 """
 
 import os
 import time
 import asyncio
 import logging
+import threading
+from array import array
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
-from collections import deque
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -142,40 +147,134 @@ class SystemLoad:
         return round(total_score, 4)
 
 
+@dataclass(frozen=True)
+class LoadSnapshot:
+    """
+    一次采样的不可变快照
+
+    由采样线程整体替换发布，读者拿到的引用不会再被修改（load 及其
+    子结构同样视为只读）。未开启进程采样时 top_processes 为空；开启后
+    沿用最近一次进程采样的结果，采样时间见 processes_sampled_at。
+    """
+    load: SystemLoad
+    score: float
+    sequence: int
+    sampled_at: float  # time.monotonic()
+    processes_sampled_at: Optional[float] = None
+
+    @property
+    def age(self) -> float:
+        """快照距今的秒数"""
+        return time.monotonic() - self.sampled_at
+
+
+class _RollingSeries:
+    """
+    定长环形历史
+
+    数值以定点整数保存在 array 中，并维护长度为 size + 1 的累计和环，
+    任意窗口（不超过 size）的均值只需两次读取。整数累加没有浮点漂移。
+    """
+
+    SCALE = 1_000_000
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.count = 0
+        self._values = array('q', [0]) * self.size
+        self._cumsum = array('q', [0]) * (self.size + 1)
+
+    def append(self, value: float):
+        fixed = int(round(value * self.SCALE))
+        total = self._cumsum[self.count % (self.size + 1)] + fixed
+        self._values[self.count % self.size] = fixed
+        self.count += 1
+        self._cumsum[self.count % (self.size + 1)] = total
+
+    def mean(self, samples: int) -> float:
+        n = min(samples, self.count, self.size)
+        if n <= 0:
+            return 0.0
+        end = self._cumsum[self.count % (self.size + 1)]
+        start = self._cumsum[(self.count - n) % (self.size + 1)]
+        return (end - start) / n / self.SCALE
+
+    def latest(self, samples: int) -> List[float]:
+        """最近 samples 个值，按时间先后排列"""
+        n = min(samples, self.count, self.size)
+        return [self._values[i % self.size] / self.SCALE
+                for i in range(self.count - n, self.count)]
+
+
 class SystemLoadMonitor:
-    """系统负载监控器"""
-    
+    """
+    系统负载监控器
+
+    Args:
+        history_size: 历史数组长度（采样次数）
+        sample_interval: 后台采样间隔（秒）
+        process_sample_interval: 进程 Top-N 采样间隔（秒），None 表示不采样。
+            遍历全部进程开销较大，应明显低于 sample_interval 的频率
+        top_n: 进程采样保留的进程数
+        auto_start: 首次读取负载时自动启动后台采样线程
+        max_age: 采样线程未运行时，快照超过该秒数则同步重新采样
+    """
+
+    METRICS = ('score', 'cpu', 'memory')
+
     def __init__(
         self,
         history_size: int = 100,
-        sample_interval: float = 1.0
+        sample_interval: float = 1.0,
+        process_sample_interval: Optional[float] = None,
+        top_n: int = 5,
+        auto_start: bool = True,
+        max_age: Optional[float] = None
     ):
         self.history_size = history_size
         self.sample_interval = sample_interval
-        
-        # 历史记录
-        self._cpu_history: deque = deque(maxlen=history_size)
-        self._memory_history: deque = deque(maxlen=history_size)
-        self._load_history: deque = deque(maxlen=history_size)
+        self.process_sample_interval = process_sample_interval
+        self.top_n = top_n
+        self.auto_start = auto_start
+        self.max_age = max_age if max_age is not None else 2 * sample_interval
+        
+        # 定长历史：负载分数、CPU 与内存使用率
+        self._history: Dict[str, _RollingSeries] = {
+            metric: _RollingSeries(history_size) for metric in self.METRICS
+        }
         
         # 上次采样数据（用于计算增量）
         self._last_cpu_times: Optional[Tuple] = None
-        self._last_disk_io: Optional[Dict] = None
-        self._last_net_io: Optional[Dict] = None
         self._last_sample_time: float = 0
         
+        # 最新快照与进程采样结果
+        self._snapshot: Optional[LoadSnapshot] = None
+        self._top_processes: List[ProcessStats] = []
+        self._processes_sampled_at: Optional[float] = None
+        self._sequence = 0
+        # _collect_lock 串行化采样（psutil / /proc 读取）；_sample_lock 只在
+        # 发布快照和历史数组时持有，读取方不会等待采样
+        self._collect_lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        
         # 运行状态
         self._running = False
-        self._monitor_task: Optional[asyncio.Task] = None
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
     
-    def get_cpu_stats(self) -> CPUStats:
-        """获取 CPU 统计"""
+    def get_cpu_stats(self, interval: Optional[float] = 0.1) -> CPUStats:
+        """
+        获取 CPU 统计
+
+        interval 为 None 时不阻塞，返回与本线程上次调用之间的使用率
+        （后台采样线程使用该方式）。
+        """
         stats = CPUStats()
         
         if HAS_PSUTIL:
             # 使用 psutil
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            cpu_times = psutil.cpu_times_percent(interval=0.1)
+            cpu_percent = psutil.cpu_percent(interval=interval)
+            cpu_times = psutil.cpu_times_percent(interval=interval)
             load_avg = psutil.getloadavg()
             
             stats.usage_percent = cpu_percent
@@ -400,7 +499,7 @@ class SystemLoadMonitor:
         
         return stats
     
-    def get_top_processes(self, n: int = 5) -> List[ProcessStats]:
+    def get_top_processes(self, n: Optional[int] = None) -> List[ProcessStats]:
         """获取 CPU 使用率最高的进程"""
         processes = []
         
@@ -423,72 +522,156 @@ class SystemLoadMonitor:
             # 按 CPU 使用率排序
             processes.sort(key=lambda p: p.cpu_percent, reverse=True)
         
-        return processes[:n]
+        return processes[:self.top_n if n is None else n]
+    
+    def sample(
+        self,
+        include_processes: bool = False,
+        cpu_interval: Optional[float] = None
+    ) -> LoadSnapshot:
+        """
+        采样一次并发布新快照
+
+        Args:
+            include_processes: 是否同时遍历进程；否则沿用上次的进程采样结果
+            cpu_interval: 传给 get_cpu_stats；None 为非阻塞增量
+        """
+        with self._collect_lock:
+            load = SystemLoad(
+                timestamp=datetime.now(),
+                cpu=self.get_cpu_stats(interval=cpu_interval),
+                memory=self.get_memory_stats(),
+                disk=self.get_disk_stats(),
+                network=self.get_network_stats()
+            )
+            top_processes = self.get_top_processes() if include_processes else None
+            now = time.monotonic()
+            score = load.overall_load_score()
+            
+            with self._sample_lock:
+                if top_processes is not None:
+                    self._top_processes = top_processes
+                    self._processes_sampled_at = now
+                load.top_processes = list(self._top_processes)
+                
+                self._history['score'].append(score)
+                self._history['cpu'].append(load.cpu.usage_percent)
+                self._history['memory'].append(load.memory.usage_percent)
+                
+                self._sequence += 1
+                self._last_sample_time = now
+                snapshot = LoadSnapshot(
+                    load=load,
+                    score=score,
+                    sequence=self._sequence,
+                    sampled_at=now,
+                    processes_sampled_at=self._processes_sampled_at
+                )
+                self._snapshot = snapshot
+        return snapshot
+    
+    def get_snapshot(self) -> LoadSnapshot:
+        """
+        获取最新快照
+
+        采样线程运行时只是一次属性读取。尚无快照（首次调用）或采样线程
+        未运行且快照已过期时，在调用方线程以非阻塞方式采样一次：首个快照
+        的 CPU 使用率没有基准，可能为 0，直到采样线程发布下一个快照。
+        """
+        snapshot = self._snapshot
+        if snapshot is None or (not self.is_sampling and snapshot.age > self.max_age):
+            snapshot = self.sample(cpu_interval=None)
+        if self.auto_start and not self.is_sampling:
+            self.start_sampler()
+        return snapshot
     
     def get_system_load(self) -> SystemLoad:
-        """获取完整的系统负载信息"""
-        load = SystemLoad(
-            timestamp=datetime.now(),
-            cpu=self.get_cpu_stats(),
-            memory=self.get_memory_stats(),
-            disk=self.get_disk_stats(),
-            network=self.get_network_stats(),
-            top_processes=self.get_top_processes()
-        )
-        
-        # 保存到历史
-        self._load_history.append(load)
-        
-        return load
+        """立即同步采样完整的系统负载信息（含进程），热路径请使用 get_snapshot"""
+        return self.sample(include_processes=True, cpu_interval=0.1).load
     
     def get_load_score(self) -> float:
         """获取当前负载分数 (0-1)"""
-        load = self.get_system_load()
-        return load.overall_load_score()
+        return self.get_snapshot().score
     
     def get_average_load(self, samples: int = 10) -> float:
-        """获取平均负载分数"""
-        if not self._load_history:
-            return self.get_load_score()
-        
-        recent = list(self._load_history)[-samples:]
-        return sum(l.overall_load_score() for l in recent) / len(recent)
+        """获取最近 samples 次采样的平均负载分数"""
+        return self.get_average('score', samples)
+    
+    def get_average(self, metric: str = 'score', samples: int = 10) -> float:
+        """获取最近 samples 次采样的均值，metric 为 score / cpu / memory"""
+        if self._history[metric].count == 0:
+            self.get_snapshot()
+        with self._sample_lock:
+            return self._history[metric].mean(samples)
+    
+    def get_history(self, metric: str = 'score', samples: Optional[int] = None) -> List[float]:
+        """获取最近的历史值（按时间先后）"""
+        with self._sample_lock:
+            return self._history[metric].latest(samples or self.history_size)
+    
+    @property
+    def is_sampling(self) -> bool:
+        return self._sampler is not None and self._sampler.is_alive()
+    
+    def start_sampler(self):
+        """启动后台采样线程（幂等）"""
+        with self._sample_lock:
+            if self.is_sampling:
+                return
+            self._stop_event.clear()
+            self._running = True
+            self._sampler = threading.Thread(
+                target=self._sampler_loop, name="system-load-sampler", daemon=True
+            )
+            self._sampler.start()
+        logger.info("System load sampler started")
+    
+    def stop_sampler(self, timeout: Optional[float] = None):
+        """停止后台采样线程；之后的读取不再自动重启采样（需显式 start_sampler）"""
+        self.auto_start = False
+        self._running = False
+        self._stop_event.set()
+        sampler = self._sampler
+        if sampler is not None and sampler is not threading.current_thread():
+            sampler.join(timeout)
+        self._sampler = None
+        logger.info("System load sampler stopped")
+    
+    def _sampler_loop(self):
+        """采样循环：首轮阻塞采样以建立 CPU 基准，之后均为非阻塞增量"""
+        cpu_interval: Optional[float] = 0.1
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                include_processes = (
+                    self.process_sample_interval is not None and (
+                        self._processes_sampled_at is None or
+                        started - self._processes_sampled_at >= self.process_sample_interval
+                    )
+                )
+                self.sample(include_processes=include_processes, cpu_interval=cpu_interval)
+                cpu_interval = None
+            except Exception as e:
+                logger.error(f"Load sampler error: {e}")
+            self._stop_event.wait(max(0.0, self.sample_interval - (time.monotonic() - started)))
     
     async def start_monitoring(self):
         """启动监控"""
-        self._running = True
-        self._monitor_task = asyncio.create_task(self._monitor_loop())
-        logger.info("System load monitoring started")
+        self.start_sampler()
     
     async def stop_monitoring(self):
         """停止监控"""
-        self._running = False
-        if self._monitor_task:
-            self._monitor_task.cancel()
-            try:
-                await self._monitor_task
-            except asyncio.CancelledError:
-                pass
-        logger.info("System load monitoring stopped")
-    
-    async def _monitor_loop(self):
-        """监控循环"""
-        while self._running:
-            try:
-                self.get_system_load()
-                await asyncio.sleep(self.sample_interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Monitor loop error: {e}")
-                await asyncio.sleep(self.sample_interval)
+        await asyncio.get_event_loop().run_in_executor(None, self.stop_sampler)
     
     def export_stats(self) -> Dict[str, Any]:
-        """导出统计信息"""
-        load = self.get_system_load()
+        """导出统计信息（基于最新快照）"""
+        snapshot = self.get_snapshot()
+        load = snapshot.load
         return {
             'timestamp': load.timestamp.isoformat(),
-            'overall_load_score': load.overall_load_score(),
+            'overall_load_score': snapshot.score,
+            'sample_age_seconds': round(snapshot.age, 3),
+            'average_load_score': round(self.get_average_load(), 4),
             'cpu': {
                 'usage_percent': load.cpu.usage_percent,
                 'load_avg_1m': load.cpu.load_avg_1m,
@@ -508,7 +691,12 @@ class SystemLoadMonitor:
                 'connections': load.network.connections_count,
                 'bytes_sent': load.network.bytes_sent,
                 'bytes_recv': load.network.bytes_recv
-            }
+            },
+            'top_processes': [
+                {'pid': p.pid, 'name': p.name, 'cpu_percent': p.cpu_percent,
+                 'memory_percent': p.memory_percent}
+                for p in load.top_processes
+            ]
         }
 
 
@@ -566,9 +754,17 @@ async def test_system_load_monitor():
     load = monitor.get_system_load()
     print(f"Load Score: {load.overall_load_score():.4f}")
     
+    print("\n--- Background Sampler ---")
+    await monitor.start_monitoring()
+    await asyncio.sleep(monitor.sample_interval * 3)
+    snapshot = monitor.get_snapshot()
+    print(f"Snapshot #{snapshot.sequence}: score={snapshot.score:.4f}, age={snapshot.age:.2f}s")
+    print(f"Average (10): {monitor.get_average_load():.4f}")
+    
     print("\n--- Export Stats ---")
     import json
     print(json.dumps(monitor.export_stats(), indent=2))
+    await monitor.stop_monitoring()
     
     print("\n✅ 测试完成")
 
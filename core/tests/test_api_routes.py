@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the gateway WebSocket route setup
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import api_routes
+
+
+class TestWebSocketRoutes(unittest.TestCase):
+    """Test create_websocket_routes on the installed FastAPI."""
+
+    def test_routes_registered(self):
+        app = FastAPI()
+        api_routes.create_websocket_routes(app)
+        paths = {route.path for route in app.routes}
+        self.assertIn("/ws/device/{device_id}", paths)
+
+    def test_shared_clients_closed_on_shutdown(self):
+        app = FastAPI()
+        api_routes.create_websocket_routes(app)
+        with TestClient(app):
+            client = api_routes.get_http_client()
+            self.assertFalse(client.is_closed)
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(api_routes._http_client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit tests for UniversalCommunicator broadcasts
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.node_communication import (
+    MessageType,
+    NodeIdentity,
+    NodeRegistry,
+    NodeType,
+    UniversalCommunicator,
+)
+
+
+class TestBroadcast(unittest.TestCase):
+    """Test how broadcast outcomes are classified."""
+
+    def test_outcome_buckets(self):
+        async def reply(message):
+            return {"from": message["target_id"]}
+
+        async def silent(message):
+            return None
+
+        async def broken(message):
+            raise RuntimeError("boom")
+
+        async def hung(message):
+            await asyncio.sleep(1.0)
+
+        async def scenario():
+            registry = NodeRegistry()
+            for node_id, handler in (("reply", reply), ("silent", silent),
+                                     ("broken", broken), ("hung", hung)):
+                await registry.register_node(NodeIdentity(node_id, NodeType.SERVER, node_id), handler)
+            comm = UniversalCommunicator(registry, node_id="origin")
+            return await comm._broadcast("origin", MessageType.EVENT_BROADCAST, {}, timeout=0.1)
+
+        result = asyncio.run(scenario())
+        self.assertEqual(result.targets, 4)
+        self.assertEqual(list(result), [{"from": "reply"}])
+        self.assertEqual(result.failed, ["broken"])
+        self.assertEqual(result.timed_out, ["hung"])
+        # silent 已投递，只是没有回复
+        self.assertEqual(result.succeeded, 2)
+
+    def test_send_to_node_still_swallows_errors(self):
+        async def broken(message):
+            raise RuntimeError("boom")
+
+        async def scenario():
+            registry = NodeRegistry()
+            await registry.register_node(NodeIdentity("broken", NodeType.SERVER, "broken"), broken)
+            comm = UniversalCommunicator(registry, node_id="origin")
+            return await comm.send_to_node("origin", "broken", MessageType.EVENT_BROADCAST, {})
+
+        self.assertIsNone(asyncio.run(scenario()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for MessageRouter streams over a Transport
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.node_protocol import LoopbackTransport, MessageRouter, Transport
+
+
+def _pair(window=4):
+    a = MessageRouter(stream_window=window)
+    b = MessageRouter(stream_window=window)
+    LoopbackTransport.pair(a, b)
+    return a, b
+
+
+class TestTransport(unittest.TestCase):
+    """Test the transport interface."""
+
+    def test_send_is_abstract(self):
+        class Incomplete(Transport):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class TestStreams(unittest.TestCase):
+    """Test stream delivery and rejection of unhandled streams."""
+
+    def test_handled_stream_delivers_all_chunks(self):
+        async def scenario():
+            a, b = _pair(window=4)
+            received = []
+            done = asyncio.Event()
+
+            async def consume(session):
+                async for chunk in session:
+                    received.append(chunk)
+                done.set()
+
+            b.register_stream_handler("upload", consume)
+            session = await a.open_stream("a", "b", action="upload")
+            # 超过窗口的块数，依赖接收端归还信用
+            for i in range(20):
+                await asyncio.wait_for(session.write(i), timeout=1.0)
+            await session.close()
+            await asyncio.wait_for(done.wait(), timeout=1.0)
+            return received, a._outgoing_streams, b.streams
+
+        received, outgoing, incoming = asyncio.run(scenario())
+        self.assertEqual(received, list(range(20)))
+        self.assertEqual(outgoing, {})
+        self.assertEqual(incoming, {})
+
+    def test_unhandled_stream_is_reset(self):
+        async def scenario():
+            a, b = _pair(window=4)
+            session = await a.open_stream("a", "b", action="missing")
+            with self.assertRaises(ConnectionResetError):
+                # 窗口之外的写入不得卡住
+                for i in range(10):
+                    await asyncio.wait_for(session.write(i), timeout=1.0)
+            await session.close()
+            return session, a._outgoing_streams, b.streams
+
+        session, outgoing, incoming = asyncio.run(scenario())
+        self.assertTrue(session.ended)
+        self.assertIn("missing", session.error)
+        self.assertEqual(outgoing, {})
+        self.assertEqual(incoming, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
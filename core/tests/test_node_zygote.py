@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the node zygote (fork server)
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.node_zygote import SUPPORTED, ZygoteClient
+
+
+@unittest.skipUnless(SUPPORTED, "zygote needs os.fork and AF_UNIX fd passing")
+class TestZygoteSpawn(unittest.TestCase):
+    """Test spawning scripts through a running zygote."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = ZygoteClient(modules=("json",), start_timeout=30)
+        if not cls.client.start():
+            raise unittest.SkipTest("zygote failed to start")
+        cls.tmpdir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.stop()
+        cls.tmpdir.cleanup()
+
+    def _script(self, name, source):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(source))
+        return path
+
+    def _spawn(self, script, **kwargs):
+        child = self.client.spawn(script, **kwargs)
+        self.addCleanup(child.stdout.close)
+        self.addCleanup(child.stderr.close)
+        self.addCleanup(child.kill)
+        return child
+
+    def test_output_and_exit_code(self):
+        script = self._script("exit3.py", """
+            import os, sys
+            print("out", sys.argv[1:], os.environ["ZYGOTE_TEST"], os.getcwd())
+            print("err", file=sys.stderr)
+            sys.exit(3)
+        """)
+        child = self._spawn(script, env={"ZYGOTE_TEST": "yes"}, args=["a", "b"])
+        self.assertEqual(child.wait(timeout=10), 3)
+        self.assertEqual(child.poll(), 3)
+        self.assertEqual(child.stdout.read().decode().split(),
+                         ["out", "['a',", "'b']", "yes", os.path.realpath(self.tmpdir.name)])
+        self.assertEqual(child.stderr.read().decode(), "err\n")
+
+    def test_uncaught_exception_exits_1(self):
+        script = self._script("boom.py", """
+            raise ValueError("boom")
+        """)
+        child = self._spawn(script)
+        self.assertEqual(child.wait(timeout=10), 1)
+        self.assertIn("ValueError: boom", child.stderr.read().decode())
+
+    def test_terminate_delivers_sigterm(self):
+        script = self._script("sleeper.py", """
+            import time
+            print("ready", flush=True)
+            time.sleep(60)
+        """)
+        child = self._spawn(script)
+        self.assertEqual(child.stdout.readline(), b"ready\n")
+        with self.assertRaises(subprocess.TimeoutExpired):
+            child.wait(timeout=0.2)
+        child.terminate()
+        self.assertEqual(child.wait(timeout=10), -signal.SIGTERM)
+
+    def test_stats_count_spawns(self):
+        before = self.client.get_stats()["spawned"]
+        script = self._script("ok.py", "pass\n")
+        self.assertEqual(self._spawn(script).wait(timeout=10), 0)
+        self.assertEqual(self.client.get_stats()["spawned"], before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
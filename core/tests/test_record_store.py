@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the gateway RecordStore
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.record_store import RecordStore
+
+
+def _record(record_id, device_id="d", status="pending"):
+    return {"id": record_id, "device_id": device_id, "status": status}
+
+
+class TestRecordStoreIndexes(unittest.TestCase):
+    """Test that filtered listings follow the same order as unfiltered ones."""
+
+    def setUp(self):
+        self.store = RecordStore("test", "id")
+
+    def _ids(self, **filters):
+        return [r["id"] for r in self.store.list(**filters)]
+
+    def test_filtered_order(self):
+        for record_id in ("a", "b", "c"):
+            self.store.put(_record(record_id))
+        self.store.update("b", status="completed")
+        self.store.update("b", status="pending")
+        self.assertEqual(self._ids(), ["c", "b", "a"])
+        self.assertEqual(self._ids(status="pending"), ["c", "b", "a"])
+
+    def test_id_reuse_after_delete(self):
+        """A re-created id moves to the newest position in every index."""
+        self.store.put(_record("a"))
+        self.store.put(_record("b"))
+        self.store.delete("a")
+        self.store.put(_record("a"))
+        self.assertEqual(self._ids(), ["a", "b"])
+        self.assertEqual(self._ids(device_id="d"), ["a", "b"])
+        self.assertEqual(self._ids(status="pending"), ["a", "b"])
+
+    def test_id_reuse_with_capacity_eviction(self):
+        """Filtered pages return the records that survived eviction, newest first."""
+        store = RecordStore("test", "id", max_records=3)
+        for record_id in ("a", "b", "c"):
+            store.put(_record(record_id))
+        store.delete("a")
+        store.put(_record("a"))
+        store.put(_record("d"))
+        self.assertEqual([r["id"] for r in store.list()], ["d", "a", "c"])
+        self.assertEqual([r["id"] for r in store.list(device_id="d")], ["d", "a", "c"])
+        self.assertEqual([r["id"] for r in store.list(device_id="d", limit=2, offset=1)], ["a", "c"])
+        self.assertEqual(store.count("device_id", "d"), 3)
+
+    def test_id_reuse_survives_compaction(self):
+        """Stale index entries are dropped when a bucket is compacted."""
+        for i in range(100):
+            self.store.put(_record(f"r{i}"))
+        for i in range(90):
+            self.store.delete(f"r{i}")
+        self.store.put(_record("r0"))
+        expected = ["r0"] + [f"r{i}" for i in range(99, 89, -1)]
+        self.assertEqual(self._ids(limit=20), expected)
+        self.assertEqual(self._ids(device_id="d", limit=20), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
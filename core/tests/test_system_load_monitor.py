@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Unit tests for SystemLoadMonitor snapshot sampling
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.system_load_monitor import NetworkStats, SystemLoadMonitor
+
+
+class SlowMonitor(SystemLoadMonitor):
+    """Blocks inside collection until released."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.collecting = threading.Event()
+        self.release = threading.Event()
+        self.block = False
+        self.cpu_intervals = []
+
+    def get_cpu_stats(self, interval=0.1):
+        self.cpu_intervals.append(interval)
+        return super().get_cpu_stats(interval=interval)
+
+    def get_network_stats(self):
+        if self.block:
+            self.collecting.set()
+            self.release.wait(5)
+        return NetworkStats()
+
+
+class TestSystemLoadMonitor(unittest.TestCase):
+
+    def test_readers_do_not_wait_for_collection(self):
+        monitor = SlowMonitor(auto_start=False)
+        monitor.sample(cpu_interval=None)
+        monitor.block = True
+        sampler = threading.Thread(target=monitor.sample)
+        sampler.start()
+        self.assertTrue(monitor.collecting.wait(5))
+        try:
+            start = time.monotonic()
+            monitor.get_history('score')
+            monitor.get_average('cpu')
+            monitor.get_snapshot()
+            self.assertLess(time.monotonic() - start, 0.05)
+        finally:
+            monitor.release.set()
+            sampler.join()
+        self.assertEqual(len(monitor.get_history('score')), 2)
+
+    def test_reads_are_non_blocking(self):
+        monitor = SlowMonitor(auto_start=False)
+        snapshot = monitor.get_snapshot()
+        self.assertEqual(snapshot.sequence, 1)
+        self.assertEqual(monitor.cpu_intervals, [None])
+
+    def test_stop_sampler_is_not_undone_by_reads(self):
+        monitor = SystemLoadMonitor(sample_interval=0.05)
+        monitor.get_snapshot()
+        self.assertTrue(monitor.is_sampling)
+        monitor.stop_sampler(timeout=2)
+        monitor.get_snapshot()
+        monitor.get_load_score()
+        self.assertFalse(monitor.is_sampling)
+
+        monitor.start_sampler()
+        self.assertTrue(monitor.is_sampling)
+        monitor.stop_sampler(timeout=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the unified launcher's node startup planning and readiness checks
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from unified_launcher import NodeSystemLauncher, ServiceManager, ServiceType, SystemConfig
+
+
+class FakeLauncher(NodeSystemLauncher):
+    """依赖取自给定的表，start_node 按 outcomes 返回结果而不创建进程"""
+
+    def __init__(self, graph, outcomes=None):
+        config = SystemConfig(use_zygote=False)
+        super().__init__(ServiceManager(config), config)
+        self.graph = graph
+        self.outcomes = outcomes or {}
+        self.started = []
+
+    def get_dependencies(self, node_name):
+        return list(self.graph.get(node_name, []))
+
+    async def start_node(self, node_name):
+        self.started.append(node_name)
+        await asyncio.sleep(0)
+        ok = self.outcomes.get(node_name, True)
+        self.service_manager.register_service(node_name, ServiceType.NODE)
+        self.service_manager.services[node_name].status = "running" if ok else "error"
+        return ok
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestPlanStartup(unittest.TestCase):
+    """Test dependency levels and cycle detection."""
+
+    def test_levels_follow_dependencies(self):
+        launcher = FakeLauncher({"api": ["db", "cache"], "cache": ["db"], "ui": ["api"], "log": []})
+        levels, deps, cyclic = launcher.plan_startup(["ui", "log"])
+        self.assertEqual(levels, [["log", "db"], ["cache"], ["api"], ["ui"]])
+        self.assertEqual(deps["api"], ["db", "cache"])
+        self.assertEqual(cyclic, [])
+
+    def test_transitive_dependencies_added(self):
+        launcher = FakeLauncher({"c": ["b"], "b": ["a"]})
+        levels, deps, _ = launcher.plan_startup(["c"])
+        self.assertEqual(levels, [["a"], ["b"], ["c"]])
+        self.assertEqual(set(deps), {"a", "b", "c"})
+
+    def test_cycle_and_its_dependents_reported(self):
+        launcher = FakeLauncher({"a": ["b"], "b": ["a"], "c": ["a"], "d": []})
+        levels, _, cyclic = launcher.plan_startup(["c", "d"])
+        self.assertEqual(levels, [["d"]])
+        self.assertEqual(cyclic, ["a", "b", "c"])
+
+
+class TestStartNodes(unittest.TestCase):
+    """Test that failures block dependents instead of starting them."""
+
+    def _run(self, launcher, nodes, parallel):
+        return asyncio.run(launcher.start_nodes(nodes, parallel=parallel))
+
+    def test_failed_dependency_blocks_dependents(self):
+        for parallel in (True, False):
+            with self.subTest(parallel=parallel):
+                launcher = FakeLauncher(
+                    {"api": ["db"], "ui": ["api"], "log": []}, outcomes={"db": False}
+                )
+                results = self._run(launcher, ["ui", "log"], parallel)
+                self.assertEqual(results, {"ui": False, "log": True, "api": False, "db": False})
+                self.assertEqual(sorted(launcher.started), ["db", "log"])
+                services = launcher.service_manager.services
+                self.assertEqual(services["api"].status, "blocked")
+                self.assertIn("db", services["api"].error)
+                self.assertEqual(services["ui"].status, "blocked")
+                self.assertIn("api", services["ui"].error)
+                self.assertEqual(services["db"].status, "error")
+
+    def test_cyclic_nodes_blocked_without_starting(self):
+        launcher = FakeLauncher({"a": ["b"], "b": ["a"], "c": []})
+        results = self._run(launcher, ["a", "c"], True)
+        self.assertEqual(results, {"a": False, "c": True, "b": False})
+        self.assertEqual(launcher.started, ["c"])
+        for node in ("a", "b"):
+            self.assertEqual(launcher.service_manager.services[node].status, "blocked")
+            self.assertEqual(launcher.service_manager.services[node].error, "依赖成环")
+
+    def test_timeline_records_critical_path(self):
+        launcher = FakeLauncher({"b": ["a"], "c": []})
+        self._run(launcher, ["b", "c"], True)
+        timeline = launcher.service_manager.startup_timeline
+        self.assertEqual(timeline["levels"], 2)
+        self.assertEqual([entry["node"] for entry in timeline["nodes"]], ["c", "a", "b"])
+
+
+class TestWaitUntilReady(unittest.TestCase):
+    """Test readiness probing of spawned services."""
+
+    def setUp(self):
+        self.manager = ServiceManager(SystemConfig(use_zygote=False))
+        self.manager.ready_grace = 0.1
+
+    def _wait(self, name, code, health_url=None, timeout=5.0):
+        async def scenario():
+            self.manager.register_service(name, ServiceType.NODE, health_url=health_url)
+            self.assertTrue(await self.manager.start_service(name, [sys.executable, "-c", code]))
+            self.addCleanup(self.manager.stop_service, name)
+            return await self.manager.wait_until_ready(name, timeout)
+
+        return asyncio.run(scenario()), self.manager.services[name]
+
+    def test_ready_after_grace_period(self):
+        ready, service = self._wait("alive", "import time; time.sleep(30)")
+        self.assertTrue(ready)
+        self.assertEqual(service.status, "running")
+        self.assertGreaterEqual(service.startup_seconds, 0.1)
+
+    def test_early_exit_fails(self):
+        ready, service = self._wait("crash", "import sys; print('bad config', file=sys.stderr); sys.exit(4)")
+        self.assertFalse(ready)
+        self.assertEqual(service.status, "error")
+        self.assertIn("code 4", service.error)
+        self.assertIsNone(service.ready_at)
+
+    def test_health_probe_timeout(self):
+        url = f"http://127.0.0.1:{_closed_port()}/health"
+        ready, service = self._wait("deaf", "import time; time.sleep(30)", health_url=url, timeout=0.3)
+        self.assertFalse(ready)
+        self.assertEqual(service.status, "error")
+        self.assertIn("超时", service.error)
+
+    def test_unknown_service_not_ready(self):
+        self.assertFalse(asyncio.run(self.manager.wait_until_ready("missing", 0.1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Unit tests for VisionPipeline engine hedging and circuit breakers
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.vision_pipeline import CircuitBreaker, LatencyHistogram, VisionPipeline
+
+
+RESULT = {"elements": [], "full_text": "ok"}
+
+
+def _pipeline(gemini=False, **config):
+    pipeline = VisionPipeline({
+        "deepseek_ocr2_api_key": "key",
+        "gemini_api_key": "key" if gemini else "",
+        "openrouter_api_key": "",
+        "local_vllm_url": "",
+        "screen_cache_enabled": False,
+        **config,
+    })
+    pipeline.calls = []
+    return pipeline
+
+
+def _engine(pipeline, name, delay=0.0, result=RESULT):
+    async def call(*args):
+        pipeline.calls.append(name)
+        await asyncio.sleep(delay)
+        return result
+    return call
+
+
+class TestHedging(unittest.TestCase):
+    """Test hedged fan-out across engines."""
+
+    def test_disabled_by_default(self):
+        os.environ.pop("VISION_HEDGE_ENABLED", None)
+        self.assertFalse(_pipeline().hedge_enabled)
+
+    def test_hedges_to_next_remote_engine(self):
+        """A slow primary is hedged by the next remote engine and recorded as a censored sample."""
+        pipeline = _pipeline(gemini=True, hedge_enabled=True, hedge_default_delay_ms=30)
+        pipeline._call_deepseek_ocr2 = _engine(pipeline, "deepseek_ocr2", delay=1.0)
+        pipeline._call_gemini = _engine(pipeline, "gemini")
+        pipeline._call_tesseract_fallback = _engine(pipeline, "tesseract")
+
+        result, engine = asyncio.run(pipeline._run_engines("img", "prompt"))
+        self.assertEqual(engine, "gemini")
+        self.assertEqual(pipeline.calls, ["deepseek_ocr2", "gemini"])
+        self.assertEqual(pipeline._stats["hedged_launches"], 1)
+        self.assertEqual(pipeline._engine_stats["deepseek_ocr2"]["cancelled"], 1)
+        # The cancelled primary still contributes its elapsed time
+        self.assertEqual(pipeline._latency["deepseek_ocr2"].count, 1)
+        self.assertGreaterEqual(pipeline._latency["deepseek_ocr2"].total_ms, 25)
+
+    def test_never_hedges_into_local_fallback(self):
+        """Tesseract is only used after the remote engines fail, never as a hedge."""
+        pipeline = _pipeline(hedge_enabled=True, hedge_default_delay_ms=20)
+        pipeline._call_deepseek_ocr2 = _engine(pipeline, "deepseek_ocr2", delay=0.1)
+        pipeline._call_tesseract_fallback = _engine(pipeline, "tesseract")
+
+        result, engine = asyncio.run(pipeline._run_engines("img", "prompt"))
+        self.assertEqual(engine, "deepseek_ocr2")
+        self.assertEqual(pipeline.calls, ["deepseek_ocr2"])
+        self.assertEqual(pipeline._stats["hedged_launches"], 0)
+
+    def test_fallback_after_failure(self):
+        pipeline = _pipeline()
+        pipeline._call_deepseek_ocr2 = _engine(pipeline, "deepseek_ocr2", result=None)
+        pipeline._call_tesseract_fallback = _engine(pipeline, "tesseract")
+
+        result, engine = asyncio.run(pipeline._run_engines("img", "prompt"))
+        self.assertEqual(engine, "tesseract")
+        self.assertEqual(pipeline.calls, ["deepseek_ocr2", "tesseract"])
+
+    def test_budget_is_finite(self):
+        """The overflow bucket's infinite quantile does not leak into the hedge delay."""
+        pipeline = _pipeline(hedge_min_samples=1)
+        pipeline._latency["deepseek_ocr2"].record(10 ** 9)
+        self.assertEqual(pipeline._hedge_delay_ms("deepseek_ocr2"), LatencyHistogram.BOUNDS_MS[-1])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test the per-engine circuit breaker."""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_single_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_release_returns_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.release()
+        self.assertTrue(breaker.allow())
+
+    def test_open_engine_skipped(self):
+        """An engine whose breaker is open is skipped in favour of the next one."""
+        pipeline = _pipeline(gemini=True, breaker_failure_threshold=2, breaker_reset_seconds=60)
+        pipeline._call_deepseek_ocr2 = _engine(pipeline, "deepseek_ocr2", result=None)
+        pipeline._call_gemini = _engine(pipeline, "gemini")
+
+        for _ in range(3):
+            result, engine = asyncio.run(pipeline._run_engines("img", "prompt"))
+            self.assertEqual(engine, "gemini")
+        self.assertEqual(pipeline.calls.count("deepseek_ocr2"), 2)
+        self.assertEqual(pipeline._engine_stats["deepseek_ocr2"]["skipped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for VisionPipeline screen-region cache and incremental re-analysis
+"""
+
+import asyncio
+import base64
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from PIL import Image, ImageDraw
+
+from core.vision_pipeline import (
+    ActionHint,
+    BoundingBox,
+    ElementType,
+    GUIElement,
+    VisionPipeline,
+    VisionResult,
+)
+
+
+def _element(element_id, x, y=40, size=20):
+    return {"id": element_id, "type": "button", "text": element_id,
+            "bbox": [x, y, size, size], "interactable": True}
+
+
+class FakeEngines:
+    """Replaces VisionPipeline._run_engines with queued raw results.
+
+    A queued response is a raw dict (served by deepseek_ocr2) or a
+    (raw, engine) pair.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.calls = []
+
+    async def __call__(self, image_base64, prompt):
+        self.calls.append(image_base64)
+        response = self.responses.pop(0)
+        if isinstance(response, tuple):
+            return response
+        return response, "deepseek_ocr2"
+
+
+class TestScreenCacheIncremental(unittest.TestCase):
+    """Test full hits, partial splices and element ID uniqueness."""
+
+    def setUp(self):
+        self.pipeline = VisionPipeline({"screen_cache_enabled": True, "screen_cache_tile_size": 64})
+        self.engines = FakeEngines()
+        self.pipeline._run_engines = self.engines
+        self.image = Image.new("RGB", (2048, 128), "white")
+
+    def _mark(self, x, y=50):
+        ImageDraw.Draw(self.image).rectangle((x, y, x + 10, y + 10), fill="black")
+
+    def _understand(self):
+        buffer = io.BytesIO()
+        self.image.save(buffer, format="PNG")
+        image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        return asyncio.run(self.pipeline.understand(image_base64=image_base64, device_id="dev"))
+
+    def _initial(self):
+        self.engines.responses.append({"elements": [_element("e1", 90), _element("e2", 490)]})
+        return self._understand()
+
+    def test_full_hit(self):
+        """An identical frame is served from the cache without engine calls."""
+        first = self._initial()
+        second = self._understand()
+        self.assertEqual(len(self.engines.calls), 1)
+        self.assertEqual(second.engine_used, "cache")
+        self.assertEqual([e.element_id for e in second.gui_elements],
+                         [e.element_id for e in first.gui_elements])
+        self.assertEqual(self.pipeline.screen_cache.get_stats()["hits"], 1)
+
+    def test_partial_splice(self):
+        """Only the changed region is re-analysed and spliced into the cached tree."""
+        self._initial()
+        self._mark(500)
+        # Crop starts at x=384; the re-detected button sits at x≈494
+        self.engines.responses.append({"elements": [_element("e1", 110)]})
+        result = self._understand()
+
+        self.assertEqual(result.engine_used, "deepseek_ocr2+cache")
+        self.assertEqual(self.pipeline.screen_cache.get_stats()["partial_hits"], 1)
+        by_x = {e.bbox.x: e.element_id for e in result.gui_elements}
+        self.assertEqual(by_x[90], "e1")
+        self.assertIn(494, by_x)
+        self.assertNotEqual(by_x[494], "e1")
+        self.assertNotIn(490, by_x)
+
+    def test_engine_calls_counted_once_per_call(self):
+        """Re-analysing several regions counts as one engine call."""
+        self._initial()
+        self._mark(100)
+        self._mark(800)
+        self.engines.responses.extend([{"elements": []}, {"elements": []}])
+        self._understand()
+        self.assertEqual(len(self.engines.calls), 3)
+        self.assertEqual(self.pipeline.get_stats()["deepseek_calls"], 2)
+
+    def test_ids_unique_across_splices(self):
+        """Successive partial hits never produce duplicate element IDs."""
+        self._initial()
+        self._mark(500)
+        self.engines.responses.append({"elements": [_element("e1", 110)]})
+        self._understand()
+        self._mark(800)
+        self.engines.responses.append({"elements": [_element("e1", 100)]})
+        result = self._understand()
+
+        ids = [e.element_id for e in result.gui_elements]
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), len(ids))
+
+        # A change near x≈100 must keep the elements spliced in elsewhere
+        self._mark(100)
+        self.engines.responses.append({"elements": [_element("e1", 90)]})
+        result = self._understand()
+        xs = sorted(e.bbox.x for e in result.gui_elements)
+        self.assertEqual(xs, [90, 494, 804])
+        ids = [e.element_id for e in result.gui_elements]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_fallback_result_not_cached(self):
+        """A degraded Tesseract result is returned but never reused."""
+        self.engines.responses.append(({"texts": [{"text": "ok", "bbox": [0, 0, 10, 10]}]}, "tesseract"))
+        first = self._understand()
+        self.assertEqual(first.engine_used, "tesseract")
+        self.assertEqual(self.pipeline.screen_cache.get_stats()["entries"], 0)
+
+        self.engines.responses.append({"elements": [_element("e1", 90)]})
+        second = self._understand()
+        self.assertEqual(second.engine_used, "deepseek_ocr2")
+        self.assertEqual(len(self.engines.calls), 2)
+
+    def test_fallback_partial_not_cached(self):
+        """A splice that used the fallback engine leaves the cached entry intact."""
+        self._initial()
+        self._mark(500)
+        self.engines.responses.append(({"texts": []}, "tesseract"))
+        degraded = self._understand()
+        self.assertEqual(degraded.engine_used, "tesseract+cache")
+
+        # The same changed frame must be re-analysed against the primary result
+        self.engines.responses.append({"elements": [_element("e1", 110)]})
+        result = self._understand()
+        self.assertEqual(result.engine_used, "deepseek_ocr2+cache")
+        self.assertEqual(len(self.engines.calls), 3)
+
+    def test_splice_removes_by_position(self):
+        """Elements outside the region survive even if they share an ID with one inside."""
+        def button(x):
+            return GUIElement(element_id="dup", element_type=ElementType.BUTTON, text="",
+                              bbox=BoundingBox(x, 40, 20, 20), confidence=1.0, interactable=True)
+
+        result = VisionResult(success=True, gui_elements=[button(100), button(500)],
+                              action_hints=[ActionHint("tap", "dup", "", 0.5)])
+        VisionPipeline._splice_region(result, BoundingBox(0, 0, 192, 128),
+                                      VisionResult(success=True), prefix="r9_")
+        self.assertEqual([e.bbox.x for e in result.gui_elements], [500])
+        self.assertEqual(len(result.action_hints), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
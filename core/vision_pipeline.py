@@ -19,20 +19,40 @@ UFO Galaxy - 融合视觉理解管线 (Vision Pipeline)
   Level 2: Gemini 2.0 Flash — 复杂场景理解
   Level 3: Qwen3-VL — 备选 VLM
   Level 4: Tesseract + 规则引擎 — 完全离线
+
+对冲执行（默认关闭，VISION_HEDGE_ENABLED=true 开启）：当前引擎超过其 p95
+延迟预算仍未返回时，并行启动下一级远程引擎，取第一个有效结果并取消其余
+请求；Tesseract 只作最终降级，不参与对冲。连续失败的引擎由熔断器跳过。
+
+屏幕区域缓存（默认开启）：相同截图直接返回缓存结果；与同一设备上一帧
+（或感知哈希相近的缓存帧）只有少量分块不同时，仅上传变化区域重新分析。
+降级引擎（Tesseract）的结果不写入缓存，远程引擎恢复后不会继续复用。
 """
 
 import asyncio
 import base64
+import bisect
+import copy
+import hashlib
+import io
+import itertools
 import json
 import logging
 import os
 import time
+import zlib
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
+try:
+    import numpy as np
+except ImportError:  # 无 NumPy 时空间索引退化为纯 Python 网格
+    np = None
+
 logger = logging.getLogger("VisionPipeline")
 
 
@@ -214,6 +234,25 @@ class VisionResult:
     engine_used: str = ""
     processing_time_ms: float = 0
     error: str = ""
+    _index: Optional['ElementIndex'] = field(default=None, init=False, repr=False, compare=False)
+    _index_key: Tuple[int, int] = field(default=(0, -1), init=False, repr=False, compare=False)
+
+    @property
+    def element_index(self) -> 'ElementIndex':
+        """
+        gui_elements 的查询索引（惰性构建）
+
+        替换或增删 gui_elements 后自动重建；原地修改元素的文本或坐标后
+        需调用 invalidate_index()。
+        """
+        key = (id(self.gui_elements), len(self.gui_elements))
+        if self._index is None or self._index_key != key:
+            self._index = ElementIndex(self.gui_elements)
+            self._index_key = key
+        return self._index
+
+    def invalidate_index(self):
+        self._index = None
 
     @property
     def full_text(self) -> str:
@@ -229,27 +268,15 @@ class VisionResult:
 
     def find_element_by_text(self, text: str, fuzzy: bool = True) -> Optional[GUIElement]:
         """通过文本查找 GUI 元素"""
-        text_lower = text.lower()
-        for elem in self.gui_elements:
-            if fuzzy:
-                if text_lower in elem.text.lower():
-                    return elem
-            else:
-                if text_lower == elem.text.lower():
-                    return elem
-        return None
+        return self.element_index.by_text(text, fuzzy)
 
     def find_elements_by_type(self, element_type: ElementType) -> List[GUIElement]:
         """通过类型查找 GUI 元素"""
         return [e for e in self.gui_elements if e.element_type == element_type]
 
     def find_element_at(self, x: int, y: int) -> Optional[GUIElement]:
-        """通过坐标查找 GUI 元素"""
-        candidates = [e for e in self.gui_elements if e.bbox.contains(x, y)]
-        if not candidates:
-            return None
-        # 返回面积最小的（最精确的）
-        return min(candidates, key=lambda e: e.bbox.area)
+        """通过坐标查找 GUI 元素（返回面积最小的，即最精确的）"""
+        return self.element_index.at(x, y)
 
     def to_dict(self) -> Dict:
         return {
@@ -267,6 +294,525 @@ class VisionResult:
         }
 
 
+# =============================================================================
+# 空间索引：网格分桶 + 向量化 IoU
+# =============================================================================
+
+def _grid_cell_size(boxes: List[BoundingBox]) -> int:
+    """网格边长取框尺寸中位数的两倍，使大多数框只落入 1~4 个格子"""
+    if not boxes:
+        return 64
+    sizes = sorted(max(b.width, b.height) for b in boxes)
+    return max(16, 2 * sizes[len(sizes) // 2])
+
+
+def _overlap_pairs_numpy(
+    boxes_a: List[BoundingBox],
+    boxes_b: List[BoundingBox],
+    self_join: bool,
+    min_ratio: float,
+    cell: int,
+) -> List[Tuple[int, int, float]]:
+    a = np.array([(b.x, b.y, b.x + b.width, b.y + b.height) for b in boxes_a], dtype=np.int64)
+    b = a if self_join else np.array(
+        [(b.x, b.y, b.x + b.width, b.y + b.height) for b in boxes_b], dtype=np.int64)
+    origin_x = min(a[:, 0].min(), b[:, 0].min())
+    origin_y = min(a[:, 1].min(), b[:, 1].min())
+    rows = (max(a[:, 3].max(), b[:, 3].max()) - origin_y) // cell + 1
+
+    def cell_keys(boxes):
+        # 将每个框展开为 (框序号, 格子键) 行
+        cx1 = (boxes[:, 0] - origin_x) // cell
+        cy1 = (boxes[:, 1] - origin_y) // cell
+        nx = np.maximum((boxes[:, 2] - origin_x) // cell - cx1 + 1, 1)
+        ny = np.maximum((boxes[:, 3] - origin_y) // cell - cy1 + 1, 1)
+        counts = nx * ny
+        box = np.repeat(np.arange(len(boxes)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        nx_rep = np.repeat(nx, counts)
+        cx = np.repeat(cx1, counts) + offset % nx_rep
+        cy = np.repeat(cy1, counts) + offset // nx_rep
+        return box, cx * rows + cy
+
+    box_a, key_a = cell_keys(a)
+    box_b, key_b = cell_keys(b)
+    order = np.argsort(key_b, kind="stable")
+    key_b, box_b = key_b[order], box_b[order]
+    lo = np.searchsorted(key_b, key_a, side="left")
+    hi = np.searchsorted(key_b, key_a, side="right")
+    counts = hi - lo
+    pair_a = np.repeat(box_a, counts)
+    pair_b = box_b[np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())]
+    if self_join:
+        keep = pair_a < pair_b
+        pair_a, pair_b = pair_a[keep], pair_b[keep]
+    pair_keys = np.unique(pair_a * len(b) + pair_b)
+    pair_a, pair_b = np.divmod(pair_keys, len(b))
+
+    # 与 BoundingBox.overlap_ratio 相同的 IoU 计算
+    ba, bb = a[pair_a], b[pair_b]
+    iw = np.minimum(ba[:, 2], bb[:, 2]) - np.maximum(ba[:, 0], bb[:, 0])
+    ih = np.minimum(ba[:, 3], bb[:, 3]) - np.maximum(ba[:, 1], bb[:, 1])
+    positive = (iw > 0) & (ih > 0)
+    intersection = np.where(positive, iw * ih, 0)
+    area_a = (ba[:, 2] - ba[:, 0]) * (ba[:, 3] - ba[:, 1])
+    area_b = (bb[:, 2] - bb[:, 0]) * (bb[:, 3] - bb[:, 1])
+    union = area_a + area_b - intersection
+    ratio = np.divide(intersection, union, out=np.zeros(len(union)), where=positive & (union > 0))
+    keep = ratio > min_ratio
+    return list(zip(pair_a[keep].tolist(), pair_b[keep].tolist(), ratio[keep].tolist()))
+
+
+def _overlap_pairs_python(
+    boxes_a: List[BoundingBox],
+    boxes_b: List[BoundingBox],
+    self_join: bool,
+    min_ratio: float,
+    cell: int,
+) -> List[Tuple[int, int, float]]:
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for j, box in enumerate(boxes_b):
+        for cx in range(box.x // cell, (box.x + box.width) // cell + 1):
+            for cy in range(box.y // cell, (box.y + box.height) // cell + 1):
+                grid.setdefault((cx, cy), []).append(j)
+    pairs = []
+    for i, box in enumerate(boxes_a):
+        seen = set()
+        for cx in range(box.x // cell, (box.x + box.width) // cell + 1):
+            for cy in range(box.y // cell, (box.y + box.height) // cell + 1):
+                seen.update(grid.get((cx, cy), ()))
+        for j in sorted(seen):
+            if self_join and j <= i:
+                continue
+            ratio = box.overlap_ratio(boxes_b[j])
+            if ratio > min_ratio:
+                pairs.append((i, j, ratio))
+    return pairs
+
+
+def overlap_pairs(
+    boxes_a: List[BoundingBox],
+    boxes_b: Optional[List[BoundingBox]] = None,
+    min_ratio: float = 0.0,
+) -> List[Tuple[int, int, float]]:
+    """
+    找出重叠比例大于 min_ratio 的框对
+
+    先用均匀网格筛选共享格子的候选对，再（NumPy 可用时向量化地）计算
+    IoU。boxes_b 为 None 时在 boxes_a 内部配对（仅 i < j）。
+    返回按 (i, j) 升序排列的 (i, j, ratio) 列表。
+    """
+    self_join = boxes_b is None
+    boxes_b = boxes_a if self_join else boxes_b
+    if not boxes_a or not boxes_b:
+        return []
+    cell = _grid_cell_size(boxes_a if self_join else boxes_a + boxes_b)
+    if np is not None:
+        return _overlap_pairs_numpy(boxes_a, boxes_b, self_join, min_ratio, cell)
+    return _overlap_pairs_python(boxes_a, boxes_b, self_join, min_ratio, cell)
+
+
+class ElementIndex:
+    """
+    GUI 元素查询索引
+
+    - 网格空间索引：按坐标查找元素只检查所在格子内的候选
+    - 文本索引：小写文本的精确匹配字典，以及用分隔符拼接的全文，
+      模糊匹配用一次 str.find 定位到第一个包含目标文本的元素
+    """
+
+    _SEPARATOR = "\x00"
+
+    def __init__(self, elements: List[GUIElement]):
+        self.elements = elements
+        self.cell = _grid_cell_size([e.bbox for e in elements])
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for i, elem in enumerate(elements):
+            box = elem.bbox
+            for cx in range(box.x // self.cell, (box.x + box.width) // self.cell + 1):
+                for cy in range(box.y // self.cell, (box.y + box.height) // self.cell + 1):
+                    self._grid.setdefault((cx, cy), []).append(i)
+
+        texts = [e.text.lower() for e in elements]
+        self._exact: Dict[str, int] = {}
+        for i, text in enumerate(texts):
+            self._exact.setdefault(text, i)
+        self._starts: List[int] = []
+        offset = 0
+        for text in texts:
+            self._starts.append(offset)
+            offset += len(text) + 1
+        self._haystack = self._SEPARATOR.join(texts)
+
+    def at(self, x: int, y: int) -> Optional[GUIElement]:
+        """包含该点的面积最小的元素（面积相同取靠前者）"""
+        best = None
+        for i in self._grid.get((x // self.cell, y // self.cell), ()):
+            elem = self.elements[i]
+            if elem.bbox.contains(x, y) and (best is None or elem.bbox.area < best.bbox.area):
+                best = elem
+        return best
+
+    def by_text(self, text: str, fuzzy: bool = True) -> Optional[GUIElement]:
+        """第一个文本匹配的元素（与逐个比较小写文本的结果一致）"""
+        text_lower = text.lower()
+        if not fuzzy:
+            i = self._exact.get(text_lower)
+            return None if i is None else self.elements[i]
+        if not self.elements:
+            return None
+        if self._SEPARATOR in text_lower:
+            return next((e for e in self.elements if text_lower in e.text.lower()), None)
+        pos = self._haystack.find(text_lower)
+        if pos < 0:
+            return None
+        return self.elements[bisect.bisect_right(self._starts, pos) - 1]
+
+
+# =============================================================================
+# 屏幕区域缓存：感知哈希 + 分块差异
+# =============================================================================
+
+@dataclass
+class ScreenFrame:
+    """
+    截图指纹
+
+    digest 标识像素内容；phash 为 64 位 dHash，用于查找相似帧；tiles 为
+    按行优先排列的分块 CRC32。无法解码像素（未安装 Pillow）时只有 digest。
+    """
+    digest: str
+    size: Tuple[int, int] = (0, 0)
+    phash: int = 0
+    tiles: List[int] = field(default_factory=list)
+
+
+def _offset_bbox(bbox: BoundingBox, dx: int, dy: int) -> BoundingBox:
+    return BoundingBox(bbox.x + dx, bbox.y + dy, bbox.width, bbox.height)
+
+
+class ScreenCache:
+    """
+    屏幕区域结果缓存
+
+    以截图指纹为键缓存 VisionResult，并记录每台设备上一次分析的帧。
+    新截图先查完全相同的帧；否则与该设备上一帧、以及感知哈希最接近的
+    缓存帧逐块比较，变化区域足够小时只需重新分析这些区域，再合并回
+    缓存的元素树（见 VisionPipeline._reanalyze_regions）。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        tile_size: int = 64,
+        max_distance: int = 6,
+        max_changed_ratio: float = 0.3,
+    ):
+        self.max_entries = max_entries
+        self.tile_size = tile_size
+        self.max_distance = max_distance
+        self.max_changed_ratio = max_changed_ratio
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[ScreenFrame, VisionResult]]" = OrderedDict()
+        self._last_by_device: Dict[str, Tuple[str, str, str]] = {}
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "partial_hits": 0,
+            "misses": 0,
+            "bytes_uploaded": 0,
+            "bytes_not_uploaded": 0,
+        }
+
+    def fingerprint(self, image_base64: str, data: Optional[bytes] = None) -> Tuple[ScreenFrame, Any]:
+        """计算截图指纹，返回 (指纹, 解码后的 RGB 图像或 None)；已有原始字节时可直接传入 data"""
+        if data is None:
+            data = base64.b64decode(image_base64)
+        try:
+            from PIL import Image
+
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+        except Exception:
+            return ScreenFrame(digest=hashlib.blake2b(data, digest_size=16).hexdigest()), None
+
+        width, height = image.size
+        tile = self.tile_size
+        tiles = [
+            zlib.crc32(image.crop((x, y, min(x + tile, width), min(y + tile, height))).tobytes())
+            for y in range(0, height, tile)
+            for x in range(0, width, tile)
+        ]
+        # dHash：9x8 灰度缩略图中相邻像素的明暗关系
+        pixels = list(image.convert("L").resize((9, 8)).getdata())
+        phash = 0
+        for row in range(8):
+            for col in range(8):
+                phash = (phash << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+        digest = hashlib.blake2b(
+            b"".join(t.to_bytes(4, "little") for t in tiles), digest_size=16
+        ).hexdigest()
+        return ScreenFrame(digest=f"{width}x{height}:{digest}", size=(width, height),
+                           phash=phash, tiles=tiles), image
+
+    def lookup(
+        self,
+        mode: str,
+        task_context: str,
+        frame: ScreenFrame,
+        image_bytes: int,
+        device_id: Optional[str] = None,
+        incremental: bool = True,
+    ) -> Tuple[Optional[VisionResult], List[BoundingBox]]:
+        """
+        查找可复用的结果
+
+        Returns:
+            (结果副本, [])：完全命中
+            (基准结果副本, 变化区域)：只需重新分析变化区域，结果由
+                record_partial 记录
+            (None, [])：未命中
+        """
+        self._stats["lookups"] += 1
+        key = (mode, task_context, frame.digest)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            self._stats["bytes_not_uploaded"] += image_bytes
+            if device_id is not None:
+                self._last_by_device[device_id] = key
+            return copy.deepcopy(self._entries[key][1]), []
+
+        if incremental and frame.tiles:
+            best = None
+            for candidate in self._candidates(mode, task_context, frame, device_id):
+                base, result = self._entries[candidate]
+                changed = [i for i, (a, b) in enumerate(zip(base.tiles, frame.tiles)) if a != b]
+                if best is None or len(changed) < len(best[1]):
+                    best = (candidate, changed, result)
+            if best is not None:
+                regions = self._regions(frame, best[1])
+                width, height = frame.size
+                if sum(r.area for r in regions) <= self.max_changed_ratio * width * height:
+                    self._entries.move_to_end(best[0])
+                    return copy.deepcopy(best[2]), regions
+
+        self._stats["misses"] += 1
+        return None, []
+
+    def store(
+        self,
+        mode: str,
+        task_context: str,
+        frame: ScreenFrame,
+        result: VisionResult,
+        device_id: Optional[str] = None,
+    ):
+        key = (mode, task_context, frame.digest)
+        self._entries[key] = (frame, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if device_id is not None:
+            self._last_by_device[device_id] = key
+
+    def record_partial(self, success: bool, uploaded: int, image_bytes: int):
+        """记录增量分析结果；失败时计为未命中（随后的整图上传另行记录）"""
+        if success:
+            self._stats["partial_hits"] += 1
+            self._stats["bytes_uploaded"] += uploaded
+            self._stats["bytes_not_uploaded"] += image_bytes - uploaded
+        else:
+            self._stats["misses"] += 1
+            self._stats["bytes_uploaded"] += uploaded
+
+    def record_upload(self, image_bytes: int):
+        self._stats["bytes_uploaded"] += image_bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._last_by_device.clear()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        lookups = stats["lookups"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["partial_hit_rate"] = round(stats["partial_hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = len(self._entries)
+        stats["devices"] = len(self._last_by_device)
+        return stats
+
+    def _candidates(self, mode: str, task_context: str, frame: ScreenFrame,
+                    device_id: Optional[str]) -> List[Tuple[str, str, str]]:
+        """设备上一帧 + 感知哈希最接近的缓存帧（尺寸、模式和上下文需一致）"""
+        def comparable(key) -> bool:
+            return (key in self._entries and key[:2] == (mode, task_context)
+                    and self._entries[key][0].size == frame.size)
+
+        candidates = []
+        last = self._last_by_device.get(device_id) if device_id is not None else None
+        if last is not None and comparable(last):
+            candidates.append(last)
+        nearest, nearest_distance = None, self.max_distance + 1
+        for key, (base, _) in self._entries.items():
+            if key != last and comparable(key):
+                distance = bin(base.phash ^ frame.phash).count("1")
+                if distance < nearest_distance:
+                    nearest, nearest_distance = key, distance
+        if nearest is not None:
+            candidates.append(nearest)
+        return candidates
+
+    def _regions(self, frame: ScreenFrame, changed: List[int]) -> List[BoundingBox]:
+        """把变化的分块聚成连通区域，外扩一圈分块作为上下文，合并相交的区域"""
+        width, height = frame.size
+        tile = self.tile_size
+        cols = (width + tile - 1) // tile
+        rows = (height + tile - 1) // tile
+        remaining = set(changed)
+        rects = []
+        while remaining:
+            stack = [remaining.pop()]
+            col_min = row_min = float("inf")
+            col_max = row_max = -1
+            while stack:
+                index = stack.pop()
+                row, col = divmod(index, cols)
+                col_min, col_max = min(col_min, col), max(col_max, col)
+                row_min, row_max = min(row_min, row), max(row_max, row)
+                for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                    neighbor = r * cols + c
+                    if 0 <= r < rows and 0 <= c < cols and neighbor in remaining:
+                        remaining.remove(neighbor)
+                        stack.append(neighbor)
+            rects.append([max(0, col_min - 1), max(0, row_min - 1),
+                          min(cols - 1, col_max + 1), min(rows - 1, row_max + 1)])
+
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    a, b = rects[i], rects[j]
+                    if a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]:
+                        rects[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                        del rects[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        return [
+            BoundingBox(c1 * tile, r1 * tile,
+                        min(width, (c2 + 1) * tile) - c1 * tile,
+                        min(height, (r2 + 1) * tile) - r1 * tile)
+            for c1, r1, c2, r2 in sorted(rects, key=lambda r: (r[1], r[0]))
+        ]
+
+
+# =============================================================================
+# 引擎健康度：延迟直方图 + 熔断器
+# =============================================================================
+
+class LatencyHistogram:
+    """
+    对数分桶的延迟直方图（桶宽 ×1.25，10ms ~ 120s）
+
+    用于 get_stats() 展示以及对冲延迟（p95）估计；分位数取桶上界，
+    最多高估 25%。
+    """
+
+    BOUNDS_MS: List[float] = []
+    _bound = 10.0
+    while _bound < 120_000:
+        BOUNDS_MS.append(round(_bound, 1))
+        _bound *= 1.25
+    del _bound
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def record(self, latency_ms: float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                (f"<={self.BOUNDS_MS[i]}" if i < len(self.BOUNDS_MS) else "inf"): n
+                for i, n in enumerate(self.counts) if n
+            },
+        }
+
+
+class CircuitBreaker:
+    """
+    引擎熔断器
+
+    连续失败 failure_threshold 次后断开（OPEN），reset_seconds 后进入
+    HALF_OPEN，只放行一个探测请求；探测成功则闭合，失败则重新断开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """请求被取消（未得出结论）时归还探测名额"""
+        self._probe_in_flight = False
+
+    def to_dict(self) -> Dict:
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures}
+
+
 # =============================================================================
 # 融合视觉引擎
 # =============================================================================
@@ -386,8 +932,45 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
             "tesseract_calls": 0,
             "avg_time_ms": 0,
             "errors": 0,
+            "hedged_launches": 0,
         }
 
+        # 对冲执行配置
+        self.hedge_enabled = self.config.get("hedge_enabled",
+            os.getenv("VISION_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"))
+        self.hedge_default_delay_ms = float(self.config.get("hedge_default_delay_ms",
+            os.getenv("VISION_HEDGE_DELAY_MS", "3000")))
+        self.hedge_percentile = float(self.config.get("hedge_percentile", 0.95))
+        self.hedge_min_samples = int(self.config.get("hedge_min_samples", 20))
+        self.hedge_min_delay_ms = float(self.config.get("hedge_min_delay_ms", 200))
+
+        # 每个引擎的延迟直方图和熔断器
+        self._engine_order = ["deepseek_ocr2", "gemini", "qwen3_vl", "tesseract"]
+        self._latency = {name: LatencyHistogram() for name in self._engine_order}
+        self._breakers = {
+            name: CircuitBreaker(
+                failure_threshold=int(self.config.get("breaker_failure_threshold", 3)),
+                reset_seconds=float(self.config.get("breaker_reset_seconds", 30.0)),
+            )
+            for name in self._engine_order
+        }
+        self._engine_stats = {
+            name: {"success": 0, "failure": 0, "cancelled": 0, "skipped": 0}
+            for name in self._engine_order
+        }
+
+        # 屏幕区域缓存
+        self.screen_cache: Optional[ScreenCache] = None
+        self._splice_seq = itertools.count()
+        if self.config.get("screen_cache_enabled",
+                os.getenv("VISION_SCREEN_CACHE", "true").lower() in ("1", "true", "yes")):
+            self.screen_cache = ScreenCache(
+                max_entries=int(self.config.get("screen_cache_size", 64)),
+                tile_size=int(self.config.get("screen_cache_tile_size", 64)),
+                max_distance=int(self.config.get("screen_cache_hash_distance", 6)),
+                max_changed_ratio=float(self.config.get("screen_cache_max_changed_ratio", 0.3)),
+            )
+
         # HTTP 客户端
         self._client: Optional[httpx.AsyncClient] = None
 
@@ -416,6 +999,8 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
         image_path: Optional[str] = None,
         mode: str = "full",
         task_context: str = "",
+        device_id: Optional[str] = None,
+        image_bytes: Optional[bytes] = None,
     ) -> VisionResult:
         """
         统一视觉理解入口
@@ -429,6 +1014,8 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
                 - "gui_only": 仅 GUI 元素分析
                 - "find_element": 查找特定元素（需要 task_context 描述）
             task_context: 任务上下文（用于 find_element 模式或增强理解）
+            device_id: 截图来源设备，用于与该设备上一帧做增量分析
+            image_bytes: 图片原始字节（如 WebSocket 二进制帧），免去调用方的 base64 往返
 
         Returns:
             VisionResult: 统一的视觉理解结果
@@ -437,7 +1024,9 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
         self._stats["total_calls"] += 1
 
         # 准备图片
-        if image_path and not image_base64:
+        if image_bytes is not None and not image_base64:
+            image_base64 = base64.b64encode(image_bytes).decode()
+        elif image_path and not image_base64:
             try:
                 with open(image_path, "rb") as f:
                     image_base64 = base64.b64encode(f.read()).decode()
@@ -457,51 +1046,54 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
             if task_context:
                 prompt += f"\n\nAdditional context: {task_context}"
 
-        # 按降级策略尝试各引擎
-        result = None
-        engine_used = ""
-
-        # Level 1: DeepSeek OCR 2
-        if self.deepseek_api_key or self.local_vllm_url:
-            result = await self._call_deepseek_ocr2(image_base64, prompt)
+        # 屏幕区域缓存：完全命中直接返回，局部变化只重新分析变化区域
+        vision_result = None
+        frame = None
+        if self.screen_cache is not None:
+            try:
+                frame, image = await asyncio.to_thread(
+                    self.screen_cache.fingerprint, image_base64, image_bytes
+                )
+            except Exception as e:
+                logger.debug(f"截图指纹计算失败，跳过缓存: {e}")
+        if frame is not None:
+            cached, regions = self.screen_cache.lookup(
+                mode, task_context, frame, len(image_base64), device_id,
+                incremental=mode in self._INCREMENTAL_MODES,
+            )
+            if cached is not None and not regions:
+                vision_result, engine_used = cached, "cache"
+            elif cached is not None:
+                vision_result, engine_used, uploaded = await self._reanalyze_regions(
+                    cached, image, regions, prompt, mode
+                )
+                self.screen_cache.record_partial(vision_result is not None, uploaded, len(image_base64))
+
+        if vision_result is None:
+            # 按降级策略尝试各引擎（对冲模式下超出延迟预算即并行启动下一级）
+            result, engine_used = await self._run_engines(image_base64, prompt)
             if result:
-                engine_used = "deepseek_ocr2"
-                self._stats["deepseek_calls"] += 1
+                self._stats[self._ENGINE_STAT_KEYS[engine_used]] += 1
 
-        # Level 2: Gemini
-        if not result and self.gemini_api_key:
-            result = await self._call_gemini(image_base64, prompt)
-            if result:
-                engine_used = "gemini"
-                self._stats["gemini_calls"] += 1
+            if not result:
+                self._stats["errors"] += 1
+                return VisionResult(success=False, error="所有视觉引擎均不可用")
 
-        # Level 3: Qwen3-VL via OpenRouter
-        if not result and self.openrouter_api_key:
-            result = await self._call_qwen_vl(image_base64, prompt)
-            if result:
-                engine_used = "qwen3_vl"
-                self._stats["qwen_calls"] += 1
+            if frame is not None:
+                self.screen_cache.record_upload(len(image_base64))
 
-        # Level 4: Tesseract 离线降级
-        if not result:
-            result = await self._call_tesseract_fallback(image_base64)
-            if result:
-                engine_used = "tesseract"
-                self._stats["tesseract_calls"] += 1
+            # 解析结果
+            vision_result = self._parse_result(result, mode, engine_used)
 
-        if not result:
-            self._stats["errors"] += 1
-            return VisionResult(success=False, error="所有视觉引擎均不可用")
+            # 融合：将 OCR 文本与 GUI 元素关联
+            if mode == "full":
+                self._fuse_ocr_and_gui(vision_result)
 
-        # 解析结果
         processing_time = (time.time() - start_time) * 1000
-        vision_result = self._parse_result(result, mode, engine_used)
         vision_result.processing_time_ms = processing_time
         vision_result.engine_used = engine_used
-
-        # 融合：将 OCR 文本与 GUI 元素关联
-        if mode == "full":
-            self._fuse_ocr_and_gui(vision_result)
+        if frame is not None and engine_used != "cache" and not self._is_degraded(engine_used):
+            self.screen_cache.store(mode, task_context, frame, vision_result, device_id)
 
         # 更新统计
         total = self._stats["total_calls"]
@@ -516,6 +1108,7 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
         description: str,
         image_base64: Optional[str] = None,
         image_path: Optional[str] = None,
+        device_id: Optional[str] = None,
     ) -> Optional[GUIElement]:
         """
         查找特定 GUI 元素
@@ -524,6 +1117,7 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
             description: 元素描述（如 "登录按钮"、"搜索输入框"）
             image_base64: Base64 编码的图片
             image_path: 图片文件路径
+            device_id: 截图来源设备
 
         Returns:
             找到的 GUIElement 或 None
@@ -533,6 +1127,7 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
             image_path=image_path,
             mode="find_element",
             task_context=description,
+            device_id=device_id,
         )
 
         if not result.success:
@@ -549,6 +1144,7 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
         self,
         image_base64: Optional[str] = None,
         image_path: Optional[str] = None,
+        device_id: Optional[str] = None,
     ) -> str:
         """
         提取图片中的所有文本
@@ -556,6 +1152,7 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
         Args:
             image_base64: Base64 编码的图片
             image_path: 图片文件路径
+            device_id: 截图来源设备
 
         Returns:
             提取的文本
@@ -564,12 +1161,249 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
             image_base64=image_base64,
             image_path=image_path,
             mode="ocr_only",
+            device_id=device_id,
         )
         return result.full_text if result.success else ""
 
     def get_stats(self) -> Dict:
         """获取统计信息"""
-        return dict(self._stats)
+        stats = dict(self._stats)
+        stats["engines"] = {
+            name: {
+                **self._engine_stats[name],
+                "circuit": self._breakers[name].to_dict(),
+                "latency": self._latency[name].to_dict(),
+                "hedge_delay_ms": self._hedge_delay_ms(name),
+            }
+            for name in self._engine_order
+        }
+        if self.screen_cache is not None:
+            stats["screen_cache"] = self.screen_cache.get_stats()
+        return stats
+
+    # =========================================================================
+    # 引擎调度：降级 + 对冲
+    # =========================================================================
+
+    _ENGINE_STAT_KEYS = {
+        "deepseek_ocr2": "deepseek_calls",
+        "gemini": "gemini_calls",
+        "qwen3_vl": "qwen_calls",
+        "tesseract": "tesseract_calls",
+    }
+
+    def _engine_calls(self, image_base64: str, prompt: str) -> List[Tuple[str, Any]]:
+        """按优先级返回已配置的引擎及其调用（协程工厂）"""
+        engines = []
+        if self.deepseek_api_key or self.local_vllm_url:
+            engines.append(("deepseek_ocr2", lambda: self._call_deepseek_ocr2(image_base64, prompt)))
+        if self.gemini_api_key:
+            engines.append(("gemini", lambda: self._call_gemini(image_base64, prompt)))
+        if self.openrouter_api_key:
+            engines.append(("qwen3_vl", lambda: self._call_qwen_vl(image_base64, prompt)))
+        engines.append(("tesseract", lambda: self._call_tesseract_fallback(image_base64)))
+        return engines
+
+    # 本地降级引擎只输出 OCR 文本，不参与对冲，只在远程引擎全部失败后启动
+    _FALLBACK_ENGINES = ("tesseract",)
+
+    def _is_degraded(self, engine_used: str) -> bool:
+        """结果（含局部重分析拼接的结果）是否来自降级引擎"""
+        return any(name in self._FALLBACK_ENGINES for name in engine_used.split("+"))
+
+    def _hedge_delay_ms(self, engine: str) -> float:
+        """引擎的对冲延迟预算：样本足够时取延迟的 p95，否则用默认值"""
+        histogram = self._latency[engine]
+        if histogram.count < self.hedge_min_samples:
+            return self.hedge_default_delay_ms
+        # 溢出桶的分位数为 inf，按直方图上界截断
+        budget = min(histogram.quantile(self.hedge_percentile), LatencyHistogram.BOUNDS_MS[-1])
+        return max(self.hedge_min_delay_ms, budget)
+
+    async def _timed_call(self, engine: str, call) -> Optional[Dict]:
+        """
+        执行一次引擎调用并记录延迟与熔断状态
+
+        被取消的调用按已耗时记为删失样本（真实延迟至少这么长），否则慢引擎
+        每次都被对冲取消、永远攒不够样本，延迟预算也就不会随之调整。
+        """
+        breaker = self._breakers[engine]
+        start = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.release()
+            self._latency[engine].record((time.monotonic() - start) * 1000)
+            self._engine_stats[engine]["cancelled"] += 1
+            raise
+        except Exception as e:
+            logger.warning(f"{engine} 调用异常: {e}")
+            result = None
+        if result:
+            self._latency[engine].record((time.monotonic() - start) * 1000)
+            self._engine_stats[engine]["success"] += 1
+            breaker.record_success()
+        else:
+            self._engine_stats[engine]["failure"] += 1
+            breaker.record_failure()
+        return result
+
+    async def _run_engines(self, image_base64: str, prompt: str) -> Tuple[Optional[Dict], str]:
+        """
+        依次（或对冲地）调用各引擎，返回第一个有效结果及引擎名
+
+        非对冲模式下等待每个引擎完成后才尝试下一级；对冲模式下，若最近
+        启动的引擎超过其延迟预算仍未返回，则并行启动下一级远程引擎（本地
+        降级引擎不参与对冲）。任一引擎返回有效结果后取消其余请求。熔断中
+        的引擎直接跳过。
+        """
+        queue = self._engine_calls(image_base64, prompt)
+        pending: Dict[asyncio.Task, str] = {}
+        last_started = ""
+
+        def can_hedge() -> bool:
+            return self.hedge_enabled and any(n not in self._FALLBACK_ENGINES for n, _ in queue)
+
+        def launch_next(hedging: bool = False) -> bool:
+            nonlocal last_started
+            while queue:
+                name, call = queue[0]
+                if hedging and name in self._FALLBACK_ENGINES:
+                    return False
+                queue.pop(0)
+                if not self._breakers[name].allow():
+                    self._engine_stats[name]["skipped"] += 1
+                    continue
+                pending[asyncio.ensure_future(self._timed_call(name, call))] = name
+                last_started = name
+                return True
+            return False
+
+        try:
+            launch_next()
+            while pending:
+                timeout = None
+                if can_hedge():
+                    timeout = self._hedge_delay_ms(last_started) / 1000
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 超出延迟预算：对冲启动下一级引擎
+                    previous = last_started
+                    if launch_next(hedging=True):
+                        logger.info(f"{previous} 超过 {timeout * 1000:.0f}ms 未返回，对冲启动 {last_started}")
+                        self._stats["hedged_launches"] += 1
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    result = task.result()
+                    if result:
+                        return result, name
+
+                if not pending:
+                    # 在途请求均已失败：立即降级
+                    launch_next()
+            return None, ""
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    # =========================================================================
+    # 增量分析：只重新分析变化区域
+    # =========================================================================
+
+    # find_element 的结果是单个元素，无法按区域拼接，只复用完全命中
+    _INCREMENTAL_MODES = ("full", "ocr_only", "gui_only")
+
+    async def _reanalyze_regions(
+        self,
+        base: VisionResult,
+        image: Any,
+        regions: List[BoundingBox],
+        prompt: str,
+        mode: str,
+    ) -> Tuple[Optional[VisionResult], str, int]:
+        """
+        并行分析各变化区域的裁剪图并合并进缓存结果
+
+        返回 (合并后的结果, 引擎名, 上传字节数)；任一区域分析失败时结果为
+        None，由调用方改为整图分析。
+        """
+        crops = await asyncio.to_thread(self._encode_regions, image, regions)
+        uploaded = sum(len(crop) for crop in crops)
+        outcomes = await asyncio.gather(*(self._run_engines(crop, prompt) for crop in crops))
+        if not all(raw for raw, _ in outcomes):
+            return None, "", uploaded
+
+        engines = []
+        for region, (raw, engine) in zip(regions, outcomes):
+            partial = self._parse_result(raw, mode, engine)
+            if mode == "full":
+                self._fuse_ocr_and_gui(partial)
+            # 前缀全局递增，多次拼接后的元素 ID 也不会重复
+            self._splice_region(base, region, partial, prefix=f"r{next(self._splice_seq)}_")
+            if engine not in engines:
+                engines.append(engine)
+        # 引擎调用次数按 understand 调用计，而不是按区域计
+        for engine in engines:
+            self._stats[self._ENGINE_STAT_KEYS[engine]] += 1
+        return base, "+".join(engines) + "+cache", uploaded
+
+    @staticmethod
+    def _encode_regions(image: Any, regions: List[BoundingBox]) -> List[str]:
+        crops = []
+        for region in regions:
+            buffer = io.BytesIO()
+            image.crop((region.x, region.y, region.x + region.width, region.y + region.height)).save(
+                buffer, format="PNG"
+            )
+            crops.append(base64.b64encode(buffer.getvalue()).decode())
+        return crops
+
+    @staticmethod
+    def _splice_region(result: VisionResult, region: BoundingBox, partial: VisionResult, prefix: str):
+        """
+        用区域分析结果替换缓存结果中中心点落在区域内的文本、元素和动作建议
+
+        区域结果的坐标相对于裁剪图，需平移回整图坐标；元素 ID 加前缀以免
+        与缓存结果冲突。场景语义沿用缓存结果。
+        """
+        def inside(bbox: BoundingBox) -> bool:
+            cx, cy = bbox.center
+            return region.x <= cx < region.x + region.width and region.y <= cy < region.y + region.height
+
+        # 按元素自身位置决定去留；区域外同 ID 的元素及其动作建议保留
+        kept = [e for e in result.gui_elements if not inside(e.bbox)]
+        removed = {e.element_id for e in result.gui_elements if inside(e.bbox)}
+        removed -= {e.element_id for e in kept}
+        result.gui_elements = kept
+        result.ocr_words = [w for w in result.ocr_words if not inside(w.bbox)]
+        result.action_hints = [h for h in result.action_hints if h.target_element_id not in removed]
+
+        for word in partial.ocr_words:
+            word.bbox = _offset_bbox(word.bbox, region.x, region.y)
+            if inside(word.bbox):
+                result.ocr_words.append(word)
+        added = set()
+        for elem in partial.gui_elements:
+            elem.bbox = _offset_bbox(elem.bbox, region.x, region.y)
+            if inside(elem.bbox):
+                added.add(elem.element_id)
+                elem.element_id = prefix + elem.element_id
+                result.gui_elements.append(elem)
+        for hint in partial.action_hints:
+            if hint.target_element_id in added:
+                hint.target_element_id = prefix + hint.target_element_id
+                result.action_hints.append(hint)
+
+        # 整图的 full_text 已过期，改由按阅读顺序排列的 OCR 文本拼接
+        result.ocr_words.sort(key=lambda w: (w.bbox.y, w.bbox.x))
+        result.raw_text = ""
 
     # =========================================================================
     # 引擎调用
@@ -693,7 +1527,10 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
             return None
 
     async def _call_tesseract_fallback(self, image_base64: str) -> Optional[Dict]:
-        """Tesseract 离线降级"""
+        """Tesseract 离线降级（CPU 密集，放到线程中执行以免阻塞事件循环）"""
+        return await asyncio.to_thread(self._run_tesseract, image_base64)
+
+    def _run_tesseract(self, image_base64: str) -> Optional[Dict]:
         try:
             import pytesseract
             from PIL import Image
@@ -882,68 +1719,82 @@ If not found, return: {{"found": false, "reason": "why not found"}}"""
         2. 为没有文本的 GUI 元素补充 OCR 文本
         3. 为没有对应 GUI 元素的 OCR 文本创建 TEXT 类型元素
         4. 合并重叠的元素
+
+        重叠关系由 overlap_pairs 通过网格索引批量求出，之后按原先的
+        顺序做贪心匹配，结果与两两比较完全一致。
         """
         if not result.ocr_words or not result.gui_elements:
             return
 
+        elements = result.gui_elements
+        words = result.ocr_words
+        word_boxes = [w.bbox for w in words]
+
         # Step 1: 关联 OCR 文本到 GUI 元素
         matched_ocr = set()
-        for elem in result.gui_elements:
-            if not elem.text:
-                # 查找与该元素重叠的 OCR 文本
-                best_match = None
-                best_overlap = 0
-                for i, word in enumerate(result.ocr_words):
-                    if i in matched_ocr:
-                        continue
-                    overlap = elem.bbox.overlap_ratio(word.bbox)
-                    if overlap > best_overlap:
-                        best_overlap = overlap
-                        best_match = i
-
-                if best_match is not None and best_overlap > 0.3:
-                    elem.text = result.ocr_words[best_match].text
-                    matched_ocr.add(best_match)
+        textless = [elem for elem in elements if not elem.text]
+        candidates: Dict[int, List[Tuple[int, float]]] = {}
+        for k, i, overlap in overlap_pairs([e.bbox for e in textless], word_boxes):
+            candidates.setdefault(k, []).append((i, overlap))
+        for k, elem in enumerate(textless):
+            # 查找与该元素重叠的 OCR 文本
+            best_match = None
+            best_overlap = 0
+            for i, overlap in candidates.get(k, ()):
+                if i not in matched_ocr and overlap > best_overlap:
+                    best_overlap = overlap
+                    best_match = i
+
+            if best_match is not None and best_overlap > 0.3:
+                elem.text = words[best_match].text
+                matched_ocr.add(best_match)
 
         # Step 2: 为未匹配的 OCR 文本创建 TEXT 元素
-        for i, word in enumerate(result.ocr_words):
-            if i not in matched_ocr:
-                # 检查是否与任何现有元素高度重叠
-                is_covered = False
-                for elem in result.gui_elements:
-                    if elem.bbox.overlap_ratio(word.bbox) > 0.5:
-                        is_covered = True
-                        break
-
-                if not is_covered:
-                    result.gui_elements.append(GUIElement(
-                        element_id=f"ocr_text_{i}",
-                        element_type=ElementType.TEXT,
-                        text=word.text,
-                        bbox=word.bbox,
-                        confidence=word.confidence,
-                        interactable=False,
-                    ))
+        unmatched = [i for i in range(len(words)) if i not in matched_ocr]
+        unmatched_boxes = [word_boxes[i] for i in unmatched]
+        # 被现有元素高度重叠覆盖的文本
+        covered = {k for k, _, _ in overlap_pairs(unmatched_boxes, [e.bbox for e in elements], 0.5)}
+        # 也会被先前新建的 TEXT 元素（即更早的未匹配文本）覆盖
+        earlier: Dict[int, List[int]] = {}
+        for k, later, _ in overlap_pairs(unmatched_boxes, None, 0.5):
+            earlier.setdefault(later, []).append(k)
+        added = set()
+        for k, i in enumerate(unmatched):
+            if k in covered or any(j in added for j in earlier.get(k, ())):
+                continue
+            word = words[i]
+            elements.append(GUIElement(
+                element_id=f"ocr_text_{i}",
+                element_type=ElementType.TEXT,
+                text=word.text,
+                bbox=word.bbox,
+                confidence=word.confidence,
+                interactable=False,
+            ))
+            added.add(k)
 
         # Step 3: 合并高度重叠的元素
+        neighbors: Dict[int, List[int]] = {}
+        for i, j, _ in overlap_pairs([e.bbox for e in elements], None, 0.8):
+            neighbors.setdefault(i, []).append(j)
         merged = []
         skip = set()
-        for i, elem_a in enumerate(result.gui_elements):
+        for i, elem_a in enumerate(elements):
             if i in skip:
                 continue
-            for j, elem_b in enumerate(result.gui_elements):
-                if j <= i or j in skip:
+            for j in neighbors.get(i, ()):
+                if j in skip:
                     continue
-                if elem_a.bbox.overlap_ratio(elem_b.bbox) > 0.8:
-                    # 保留信息更丰富的那个
-                    if len(elem_b.text) > len(elem_a.text):
-                        elem_a.text = elem_b.text
-                    if elem_b.interactable and not elem_a.interactable:
-                        elem_a.interactable = True
-                        elem_a.interaction_types = elem_b.interaction_types
-                    if elem_b.confidence > elem_a.confidence:
-                        elem_a.confidence = elem_b.confidence
-                    skip.add(j)
+                elem_b = elements[j]
+                # 保留信息更丰富的那个
+                if len(elem_b.text) > len(elem_a.text):
+                    elem_a.text = elem_b.text
+                if elem_b.interactable and not elem_a.interactable:
+                    elem_a.interactable = True
+                    elem_a.interaction_types = elem_b.interaction_types
+                if elem_b.confidence > elem_a.confidence:
+                    elem_a.confidence = elem_b.confidence
+                skip.add(j)
             merged.append(elem_a)
 
         result.gui_elements = merged
@@ -969,26 +1820,29 @@ async def understand_screen(
     image_path: Optional[str] = None,
     mode: str = "full",
     task_context: str = "",
+    device_id: Optional[str] = None,
 ) -> VisionResult:
     """便捷函数：理解屏幕"""
     pipeline = get_vision_pipeline()
-    return await pipeline.understand(image_base64, image_path, mode, task_context)
+    return await pipeline.understand(image_base64, image_path, mode, task_context, device_id)
 
 
 async def find_element(
     description: str,
     image_base64: Optional[str] = None,
     image_path: Optional[str] = None,
+    device_id: Optional[str] = None,
 ) -> Optional[GUIElement]:
     """便捷函数：查找元素"""
     pipeline = get_vision_pipeline()
-    return await pipeline.find_element(description, image_base64, image_path)
+    return await pipeline.find_element(description, image_base64, image_path, device_id)
 
 
 async def extract_text(
     image_base64: Optional[str] = None,
     image_path: Optional[str] = None,
+    device_id: Optional[str] = None,
 ) -> str:
     """便捷函数：提取文本"""
     pipeline = get_vision_pipeline()
-    return await pipeline.extract_text(image_base64, image_path)
+    return await pipeline.extract_text(image_base64, image_path, device_id)
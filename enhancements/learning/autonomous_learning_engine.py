@@ -16,15 +16,20 @@ import asyncio
 import json
 import logging
 import hashlib
+import heapq
+import uuid
+import zlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable, Set, Tuple, AsyncIterator
 from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
 from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import DBSCAN
-from sklearn.decomposition import PCA
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.cluster import DBSCAN, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
 import aiohttp
 
 # Configure logging
@@ -112,22 +117,196 @@ class LearningCycle:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class _OnlineSemanticState:
+    """Streaming clustering state; lives in the worker process."""
+    n_features: int
+    n_components: int
+    n_clusters: int
+    pca: Optional[IncrementalPCA] = None
+    kmeans: Optional[MiniBatchKMeans] = None
+    counts: Optional[np.ndarray] = None
+    pending: List[str] = field(default_factory=list)
+
+
+def _hashing_vectorizer(n_features: int) -> HashingVectorizer:
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words='english',
+        alternate_sign=False,
+        norm='l2'
+    )
+
+
+# Online states of the recognizers served by this process, keyed by
+# recognizer. Kept resident so each call ships only the new texts.
+_ONLINE_SEMANTIC_STATES: Dict[str, _OnlineSemanticState] = {}
+
+
+def _online_semantic_step(
+    key: str,
+    n_features: int,
+    n_components: int,
+    n_clusters: int,
+    texts: List[str]
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Fold a batch into the incremental PCA / mini-batch k-means models.
+
+    Runs in the worker process, which keeps the state between calls.
+    Texts are buffered until there are enough samples for an
+    IncrementalPCA update; until the models are warm no labels are
+    returned. Returns (labels, running cluster sizes).
+    """
+    state = _ONLINE_SEMANTIC_STATES.get(key)
+    if state is None:
+        state = _OnlineSemanticState(n_features, n_components, n_clusters)
+        _ONLINE_SEMANTIC_STATES[key] = state
+    vectorizer = _hashing_vectorizer(state.n_features)
+    state.pending.extend(texts)
+
+    warmed = False
+    if len(state.pending) >= max(state.n_components, state.n_clusters):
+        pending = vectorizer.transform(state.pending).toarray()
+        state.pending = []
+        if state.pca is None:
+            state.pca = IncrementalPCA(n_components=state.n_components)
+        state.pca.partial_fit(pending)
+        if state.kmeans is None:
+            # The warm-up fit already covers this batch
+            state.kmeans = MiniBatchKMeans(
+                n_clusters=state.n_clusters, random_state=0, n_init=3
+            )
+            state.kmeans.partial_fit(state.pca.transform(pending))
+            state.counts = np.zeros(state.n_clusters, dtype=np.int64)
+            warmed = True
+
+    if state.kmeans is None:
+        return None, None
+
+    reduced = state.pca.transform(vectorizer.transform(texts).toarray())
+    if not warmed and len(texts) >= state.n_clusters:
+        state.kmeans.partial_fit(reduced)
+    labels = state.kmeans.predict(reduced)
+    state.counts += np.bincount(labels, minlength=state.n_clusters)
+    return labels, state.counts.copy()
+
+
+def _drop_online_semantic_state(key: str):
+    _ONLINE_SEMANTIC_STATES.pop(key, None)
+
+
+def _batch_semantic_labels(
+    vectorizer: TfidfVectorizer,
+    pca: PCA,
+    clusterer: DBSCAN,
+    texts: List[str]
+) -> np.ndarray:
+    """Refit TF-IDF, PCA and DBSCAN over one batch (non-online mode)."""
+    vectors = vectorizer.fit_transform(texts).toarray()
+    if vectors.shape[1] > 50:
+        vectors = pca.fit_transform(vectors)
+    return clusterer.fit_predict(vectors)
+
+
+def _centroid_outliers(
+    vectorizer: Any,
+    texts: List[str]
+) -> Tuple[List[int], float, float]:
+    """Indices of texts more than 2 std from the batch centroid."""
+    vectors = vectorizer.fit_transform(texts).toarray()
+    centroid = np.mean(vectors, axis=0)
+    distances = np.linalg.norm(vectors - centroid, axis=1)
+    threshold = float(np.mean(distances) + 2 * np.std(distances))
+    outlier_indices = [i for i, d in enumerate(distances) if d > threshold]
+    return outlier_indices, threshold, float(np.mean(distances))
+
+
 class PatternRecognizer:
     """
     Pattern recognition engine using ML techniques.
     
     Supports multiple pattern types including behavioral, temporal,
     semantic, and anomaly detection.
+
+    In online mode (opt-in) semantic patterns come from a hashing
+    vectorizer feeding IncrementalPCA and MiniBatchKMeans, so each batch
+    is assigned to persistent clusters instead of refitting everything,
+    and temporal periodicity comes from running interval statistics.
+    Semantic patterns only appear once max(n_components, n_clusters)
+    texts have been seen. The clustering state stays in the single
+    worker process; an injected executor must therefore have one worker.
+    The CPU-heavy steps run in a process pool off the event loop.
     """
     
-    def __init__(self, min_confidence: float = 0.6):
+    def __init__(
+        self,
+        min_confidence: float = 0.6,
+        online: bool = False,
+        n_features: int = 2 ** 12,
+        n_components: int = 50,
+        n_clusters: int = 8,
+        interval_window: int = 100,
+        executor: Optional[Executor] = None
+    ):
         self.min_confidence = min_confidence
+        self.online = online
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
         self.pca = PCA(n_components=50)
         self.clusterer = DBSCAN(eps=0.5, min_samples=3)
         self._patterns: Dict[str, DiscoveredPattern] = {}
         self._observation_buffer: deque = deque(maxlen=10000)
+
+        # Online semantic models live in the worker under this key; only the
+        # running cluster sizes are mirrored here
+        self._semantic_key = uuid.uuid4().hex
+        self.n_features = n_features
+        self.n_components = min(n_components, n_features)
+        self.n_clusters = n_clusters
+        self._cluster_counts: Optional[np.ndarray] = None
+        self._semantic_lock: Optional[asyncio.Lock] = None
+
+        # Running inter-arrival statistics (cumulative, then exponential
+        # once interval_window intervals have been seen)
+        self.interval_window = interval_window
+        self._interval_count = 0
+        self._interval_mean = 0.0
+        self._interval_var = 0.0
+        self._last_timestamp: Optional[datetime] = None
+
+        self._executor = executor
+        self._owns_executor = executor is None
         logger.info("PatternRecognizer initialized")
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None and self._owns_executor:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable, using threads: {e}")
+                self._owns_executor = False
+        return self._executor
+
+    async def _run_cpu(self, fn: Callable, *args):
+        """Run a CPU-bound function in the worker pool."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool as e:
+            logger.warning(f"Process pool broken, using threads: {e}")
+            if self.online:
+                logger.warning("Online semantic clusters were lost with the worker; relearning")
+            self._executor = None
+            self._owns_executor = False
+            return await loop.run_in_executor(None, fn, *args)
+
+    def shutdown(self):
+        """Shut down the worker pool owned by this recognizer."""
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        # Thread-pool fallback keeps the state in this process
+        _drop_online_semantic_state(self._semantic_key)
     
     async def recognize_patterns(
         self,
@@ -187,15 +366,23 @@ class PatternRecognizer:
             # Extract text content
             texts = [obs.content for obs in observations]
             
-            # Vectorize
-            vectors = self.vectorizer.fit_transform(texts).toarray()
-            
-            # Reduce dimensions
-            if vectors.shape[1] > 50:
-                vectors = self.pca.fit_transform(vectors)
-            
-            # Cluster
-            labels = self.clusterer.fit_predict(vectors)
+            if self.online:
+                # Serialize updates so concurrent calls don't drop state
+                if self._semantic_lock is None:
+                    self._semantic_lock = asyncio.Lock()
+                async with self._semantic_lock:
+                    labels, counts = await self._run_cpu(
+                        _online_semantic_step, self._semantic_key,
+                        self.n_features, self.n_components, self.n_clusters, texts
+                    )
+                if labels is None:
+                    return []
+                self._cluster_counts = counts
+            else:
+                labels = await self._run_cpu(
+                    _batch_semantic_labels,
+                    self.vectorizer, self.pca, self.clusterer, texts
+                )
             
             patterns = []
             unique_labels = set(labels) - {-1}  # Exclude noise
@@ -205,6 +392,12 @@ class PatternRecognizer:
                 cluster_obs = [observations[i] for i in cluster_indices]
                 
                 if len(cluster_obs) >= 3:
+                    metadata = {}
+                    if self.online:
+                        metadata = {
+                            'cluster': int(label),
+                            'cluster_size': int(self._cluster_counts[label])
+                        }
                     pattern = DiscoveredPattern(
                         id=f"semantic_{label}_{datetime.now().timestamp()}",
                         pattern_type=PatternType.SEMANTIC,
@@ -214,7 +407,8 @@ class PatternRecognizer:
                         created_at=datetime.now(),
                         last_updated=datetime.now(),
                         frequency=len(cluster_obs),
-                        examples=[obs.content[:200] for obs in cluster_obs[:3]]
+                        examples=[obs.content[:200] for obs in cluster_obs[:3]],
+                        metadata=metadata
                     )
                     patterns.append(pattern)
             
@@ -223,6 +417,15 @@ class PatternRecognizer:
         except Exception as e:
             logger.error(f"Error in semantic pattern recognition: {e}")
             return []
+
+    def _observe_interval(self, interval: float):
+        """Fold one inter-arrival interval into the running statistics."""
+        self._interval_count += 1
+        alpha = max(1.0 / self._interval_count, 1.0 / self.interval_window)
+        diff = interval - self._interval_mean
+        increment = alpha * diff
+        self._interval_mean += increment
+        self._interval_var = (1 - alpha) * (self._interval_var + diff * increment)
     
     async def _recognize_temporal_patterns(
         self,
@@ -233,26 +436,43 @@ class PatternRecognizer:
             return []
         
         try:
-            # Sort by timestamp
-            sorted_obs = sorted(observations, key=lambda x: x.timestamp)
-            timestamps = [obs.timestamp for obs in sorted_obs]
-            
-            # Calculate time differences in seconds
-            time_diffs = []
-            for i in range(1, len(timestamps)):
-                diff = (timestamps[i] - timestamps[i-1]).total_seconds()
-                time_diffs.append(diff)
-            
-            if not time_diffs:
-                return []
+            if self.online:
+                # Only the new batch is ordered; intervals continue from the
+                # last timestamp seen, and late arrivals are skipped
+                for timestamp in sorted(obs.timestamp for obs in observations):
+                    if self._last_timestamp is not None:
+                        if timestamp < self._last_timestamp:
+                            continue
+                        self._observe_interval(
+                            (timestamp - self._last_timestamp).total_seconds()
+                        )
+                    self._last_timestamp = timestamp
+                if self._interval_count < 4:
+                    return []
+                mean_diff = self._interval_mean
+                std_diff = float(np.sqrt(self._interval_var))
+            else:
+                # Sort by timestamp
+                sorted_obs = sorted(observations, key=lambda x: x.timestamp)
+                timestamps = [obs.timestamp for obs in sorted_obs]
+                
+                # Calculate time differences in seconds
+                time_diffs = []
+                for i in range(1, len(timestamps)):
+                    diff = (timestamps[i] - timestamps[i-1]).total_seconds()
+                    time_diffs.append(diff)
+                
+                if not time_diffs:
+                    return []
+                
+                mean_diff = np.mean(time_diffs)
+                std_diff = np.std(time_diffs)
             
             # Look for periodic patterns
             patterns = []
-            mean_diff = np.mean(time_diffs)
-            std_diff = np.std(time_diffs)
             
             # If low variance, might be periodic
-            if std_diff / mean_diff < 0.3 and mean_diff > 0:
+            if mean_diff > 0 and std_diff / mean_diff < 0.3:
                 pattern = DiscoveredPattern(
                     id=f"temporal_periodic_{datetime.now().timestamp()}",
                     pattern_type=PatternType.TEMPORAL,
@@ -285,17 +505,15 @@ class PatternRecognizer:
             return []
         
         try:
-            # Simple statistical anomaly detection
+            # Simple statistical anomaly detection: distance to centroid
             texts = [obs.content for obs in observations]
-            vectors = self.vectorizer.fit_transform(texts).toarray()
-            
-            # Calculate distances to centroid
-            centroid = np.mean(vectors, axis=0)
-            distances = np.linalg.norm(vectors - centroid, axis=1)
-            
-            # Find outliers (beyond 2 std)
-            threshold = np.mean(distances) + 2 * np.std(distances)
-            outlier_indices = [i for i, d in enumerate(distances) if d > threshold]
+            if self.online:
+                vectorizer = _hashing_vectorizer(self.n_features)
+            else:
+                vectorizer = self.vectorizer
+            outlier_indices, threshold, mean_distance = await self._run_cpu(
+                _centroid_outliers, vectorizer, texts
+            )
             
             patterns = []
             if outlier_indices:
@@ -313,7 +531,7 @@ class PatternRecognizer:
                     metadata={
                         'outlier_count': len(outlier_indices),
                         'threshold': threshold,
-                        'mean_distance': np.mean(distances)
+                        'mean_distance': mean_distance
                     }
                 )
                 patterns.append(pattern)
@@ -341,6 +559,71 @@ class PatternRecognizer:
         return sorted(patterns, key=lambda x: x.confidence, reverse=True)
 
 
+class _MinHashLSH:
+    """
+    MinHash signatures banded into LSH buckets over word sets.
+
+    With the default 16 bands of 4 rows, sets with Jaccard similarity 0.8
+    share at least one bucket with probability > 0.999, so querying the
+    buckets yields the merge candidates without scanning every item.
+    """
+
+    _PRIME = np.uint64((1 << 61) - 1)
+    _MASK = np.uint64(0xFFFFFFFF)
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._band_keys: Dict[str, List[bytes]] = {}
+
+    def _signature_bands(self, words: Set[str]) -> List[bytes]:
+        hashes = np.fromiter(
+            (zlib.crc32(word.encode()) for word in words),
+            dtype=np.uint64, count=len(words)
+        )
+        permuted = ((hashes[:, None] * self._a + self._b) % self._PRIME) & self._MASK
+        signature = permuted.min(axis=0).astype(np.uint32)
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, words: Set[str]):
+        if key in self._band_keys:
+            self.remove(key)
+        if not words:
+            return
+        band_keys = self._signature_bands(words)
+        self._band_keys[key] = band_keys
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str):
+        for buckets, band_key in zip(self._buckets, self._band_keys.pop(key, ())):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def candidates(self, words: Set[str]) -> Set[str]:
+        if not words:
+            return set()
+        found: Set[str] = set()
+        for buckets, band_key in zip(self._buckets, self._signature_bands(words)):
+            found.update(buckets.get(band_key, ()))
+        return found
+
+    def __len__(self) -> int:
+        return len(self._band_keys)
+
+
 class KnowledgeAccumulator:
     """
     Accumulates and refines knowledge over time.
@@ -354,6 +637,15 @@ class KnowledgeAccumulator:
         self._knowledge: Dict[str, Dict[str, Any]] = {}
         self._knowledge_history: deque = deque(maxlen=1000)
         self._confidence_threshold = 0.5
+        self._merge_threshold = 0.8
+        # Near-duplicate index over descriptions; _order records each
+        # item's position in _knowledge so merges keep first-match order
+        self._lsh = _MinHashLSH()
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        # Lazily invalidated min-heap of (score, -order, key) for eviction;
+        # scores (confidence * frequency) only ever grow
+        self._score_heap: List[Tuple[float, int, str]] = []
         logger.info("KnowledgeAccumulator initialized")
     
     async def accumulate(
@@ -393,6 +685,7 @@ class KnowledgeAccumulator:
                 existing['sources'].add(source)
                 existing['last_updated'] = datetime.now().isoformat()
                 existing['pattern_ids'].add(pattern.id)
+                self._push_score(knowledge_key)
                 stats['updated'] += 1
             else:
                 # Check for similar knowledge to merge
@@ -414,6 +707,7 @@ class KnowledgeAccumulator:
                         'examples': pattern.examples,
                         'metadata': pattern.metadata
                     }
+                    self._index_knowledge(knowledge_key, pattern.description)
                     stats['added'] += 1
         
         # Manage capacity
@@ -427,27 +721,62 @@ class KnowledgeAccumulator:
         content = f"{pattern.pattern_type.value}:{pattern.description}"
         return hashlib.md5(content.encode()).hexdigest()[:16]
     
+    @staticmethod
+    def _words(description: str) -> Set[str]:
+        return set(description.lower().split())
+
+    def _index_knowledge(self, key: str, description: str):
+        """Register a new knowledge item with the near-duplicate index."""
+        self._lsh.add(key, self._words(description))
+        self._order[key] = self._next_order
+        self._next_order += 1
+        self._push_score(key)
+
+    def _push_score(self, key: str):
+        knowledge = self._knowledge[key]
+        heapq.heappush(self._score_heap, (
+            knowledge['confidence'] * knowledge['frequency'], -self._order[key], key
+        ))
+
     async def _try_merge(
         self,
         pattern: DiscoveredPattern,
         source: str
     ) -> bool:
         """Try to merge pattern with existing similar knowledge."""
-        for key, knowledge in self._knowledge.items():
-            similarity = self._calculate_similarity(pattern, knowledge)
-            if similarity > 0.8:
-                # Merge
-                knowledge['confidence'] = max(
-                    knowledge['confidence'],
-                    pattern.confidence
-                )
-                knowledge['frequency'] += pattern.frequency
-                knowledge['sources'].add(source)
-                knowledge['pattern_ids'].add(pattern.id)
-                knowledge['examples'].extend(pattern.examples)
-                knowledge['examples'] = knowledge['examples'][:5]  # Keep top 5
-                return True
-        return False
+        pattern_words = self._words(pattern.description)
+        # Jaccard > threshold bounds the size ratio of the two sets
+        low = len(pattern_words) * self._merge_threshold
+        high = len(pattern_words) / self._merge_threshold
+        best_key = None
+        for key in self._lsh.candidates(pattern_words):
+            knowledge = self._knowledge[key]
+            knowledge_size = len(self._words(knowledge['description']))
+            if not low < knowledge_size < high:
+                continue
+            if best_key is not None and self._order[key] > self._order[best_key]:
+                continue
+            if self._calculate_similarity(pattern, knowledge) > self._merge_threshold:
+                best_key = key
+
+        if best_key is None:
+            return False
+        self._merge_into(best_key, pattern, source)
+        return True
+
+    def _merge_into(self, key: str, pattern: DiscoveredPattern, source: str):
+        """Fold a pattern into an existing knowledge item."""
+        knowledge = self._knowledge[key]
+        knowledge['confidence'] = max(
+            knowledge['confidence'],
+            pattern.confidence
+        )
+        knowledge['frequency'] += pattern.frequency
+        knowledge['sources'].add(source)
+        knowledge['pattern_ids'].add(pattern.id)
+        knowledge['examples'].extend(pattern.examples)
+        knowledge['examples'] = knowledge['examples'][:5]  # Keep top 5
+        self._push_score(key)
     
     def _calculate_similarity(
         self,
@@ -469,25 +798,37 @@ class KnowledgeAccumulator:
     
     async def _consolidate_if_needed(self):
         """Consolidate knowledge if capacity exceeded."""
-        if len(self._knowledge) > self.max_knowledge_items:
-            # Sort by confidence * frequency
-            sorted_items = sorted(
-                self._knowledge.items(),
-                key=lambda x: x[1]['confidence'] * x[1]['frequency'],
-                reverse=True
-            )
-            
-            # Keep top items
-            self._knowledge = dict(sorted_items[:self.max_knowledge_items])
+        excess = len(self._knowledge) - self.max_knowledge_items
+        if excess > 0:
+            # Evict the lowest confidence * frequency items (latest first
+            # among ties), skipping heap entries made stale by updates
+            removed = 0
+            while removed < excess:
+                score, negative_order, key = heapq.heappop(self._score_heap)
+                knowledge = self._knowledge.get(key)
+                if (knowledge is None or -negative_order != self._order[key] or
+                        knowledge['confidence'] * knowledge['frequency'] != score):
+                    continue
+                del self._knowledge[key]
+                del self._order[key]
+                self._lsh.remove(key)
+                removed += 1
+
+            if len(self._score_heap) > 2 * len(self._knowledge) + 64:
+                self._score_heap = [
+                    (k['confidence'] * k['frequency'], -self._order[key], key)
+                    for key, k in self._knowledge.items()
+                ]
+                heapq.heapify(self._score_heap)
             
             # Record history
             self._knowledge_history.append({
                 'timestamp': datetime.now().isoformat(),
                 'action': 'consolidation',
-                'items_removed': len(sorted_items) - self.max_knowledge_items
+                'items_removed': excess
             })
             
-            logger.info(f"Knowledge consolidated, removed {len(sorted_items) - self.max_knowledge_items} items")
+            logger.info(f"Knowledge consolidated, removed {excess} items")
     
     def get_knowledge(
         self,
@@ -595,6 +936,7 @@ class AutonomousLearningEngine:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        self.pattern_recognizer.shutdown()
         logger.info("Autonomous learning engine stopped")
     
     async def _learning_loop(self):
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Knowledge Accumulator Benchmark
+
+Fills a KnowledgeAccumulator to capacity and times accumulation cycles
+(a mix of near-duplicate and novel patterns) with the MinHash/LSH merge
+index against the linear Jaccard scan it replaces. Both sides share the
+same capacity eviction, so every cycle also consolidates.
+
+Usage:
+    python benchmark_knowledge_accumulator.py --items 10000 100000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Dict, List
+
+try:
+    from .autonomous_learning_engine import DiscoveredPattern, KnowledgeAccumulator, PatternType
+except ImportError:
+    from autonomous_learning_engine import DiscoveredPattern, KnowledgeAccumulator, PatternType
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Pronounceable pseudo-words so descriptions resemble real text."""
+    consonants = "bcdfghklmnprstvz"
+    vowels = "aeiou"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(2, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length)))
+    return sorted(words)
+
+
+def make_pattern(description: str, index: int) -> DiscoveredPattern:
+    now = datetime.now()
+    return DiscoveredPattern(
+        id=f"p{index}",
+        pattern_type=PatternType.SEMANTIC,
+        description=description,
+        observations=[],
+        confidence=0.6 + (index % 7) * 0.05,
+        created_at=now,
+        last_updated=now,
+        frequency=1 + index % 5
+    )
+
+
+class ScanAccumulator(KnowledgeAccumulator):
+    """Baseline: compare each pattern against every stored item."""
+
+    async def _try_merge(self, pattern: DiscoveredPattern, source: str) -> bool:
+        for key, knowledge in self._knowledge.items():
+            if self._calculate_similarity(pattern, knowledge) > 0.8:
+                self._merge_into(key, pattern, source)
+                return True
+        return False
+
+
+def copy_knowledge(knowledge: Dict[str, Dict]) -> Dict[str, Dict]:
+    return {
+        key: dict(
+            item,
+            sources=set(item['sources']),
+            pattern_ids=set(item['pattern_ids']),
+            examples=list(item['examples'])
+        )
+        for key, item in knowledge.items()
+    }
+
+
+async def run(items: int, cycle: int, repeat: int, words: int, vocabulary: List[str], seed: int):
+    rng = random.Random(seed)
+    descriptions = [" ".join(rng.sample(vocabulary, words)) for _ in range(items)]
+
+    indexed = KnowledgeAccumulator(max_knowledge_items=items)
+    start = time.perf_counter()
+    await indexed.accumulate(
+        [make_pattern(d, i) for i, d in enumerate(descriptions)], "fill"
+    )
+    fill = time.perf_counter() - start
+
+    scan = ScanAccumulator(max_knowledge_items=items)
+    scan._knowledge = copy_knowledge(indexed._knowledge)
+    scan._order = dict(indexed._order)
+    scan._next_order = indexed._next_order
+    scan._score_heap = list(indexed._score_heap)
+
+    index_ms = scan_ms = 0.0
+    merged = 0
+    for round_ in range(repeat):
+        batch = []
+        for i in range(cycle):
+            n = items + round_ * cycle + i
+            if i % 2:
+                batch.append(make_pattern(" ".join(rng.sample(vocabulary, words)), n))
+            else:
+                # Swap one word of a stored description (Jaccard > 0.8)
+                base = rng.choice(descriptions).split()
+                base[rng.randrange(words)] = rng.choice(vocabulary)
+                batch.append(make_pattern(" ".join(base), n))
+
+        start = time.perf_counter()
+        stats = await indexed.accumulate(batch, "cycle")
+        index_ms += (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        expected = await scan.accumulate(batch, "cycle")
+        scan_ms += (time.perf_counter() - start) * 1000
+        assert stats == expected, (stats, expected)
+        merged += stats['merged']
+
+    assert indexed._knowledge.keys() == scan._knowledge.keys()
+    assert all(
+        indexed._knowledge[k]['frequency'] == scan._knowledge[k]['frequency']
+        for k in indexed._knowledge
+    )
+    return fill, scan_ms / repeat, index_ms / repeat, merged / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KnowledgeAccumulator benchmark")
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--cycle", type=int, default=100, help="patterns per cycle")
+    parser.add_argument("--words", type=int, default=12, help="words per description")
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    vocabulary = make_vocabulary(args.vocabulary, random.Random(args.seed))
+
+    print(f"{'items':>8}{'fill s':>10}{'merged':>8}{'scan ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    for items in args.items:
+        fill, scan_ms, index_ms, merged = asyncio.run(
+            run(items, args.cycle, args.repeat, args.words, vocabulary, args.seed)
+        )
+        print(f"{items:>8}{fill:>10.1f}{merged:>8.0f}{scan_ms:>12.1f}{index_ms:>12.2f}"
+              f"{scan_ms / index_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Knowledge Graph Benchmark
+
+Builds a synthetic graph and compares the indexed query paths of
+KnowledgeGraph against the linear scans they replace:
+- search (trigram inverted index vs substring scan)
+- find_similar_entities (sparse adjacency product vs per-node neighbor sets)
+- query_by_properties (property hash index vs scan)
+- calculate_centrality (maintained degree heap vs NetworkX recompute)
+- detect_communities (incremental label propagation vs greedy modularity;
+  the greedy baseline is skipped above --greedy-limit entities)
+- persistence (columnar mmap snapshot vs JSON save/load)
+
+Usage:
+    python benchmark_knowledge_graph.py --entities 1000000
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import networkx as nx
+from networkx.algorithms import community
+from typing import Callable, List, Tuple
+
+try:
+    from .knowledge_graph import Entity, EntityType, KnowledgeGraph, Relationship, RelationshipType
+except ImportError:
+    from knowledge_graph import Entity, EntityType, KnowledgeGraph, Relationship, RelationshipType
+
+
+DOMAINS = ["vision", "nlp", "control", "systems", "data"]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Pronounceable pseudo-words so trigram selectivity resembles real text."""
+    consonants = "bcdfghklmnprstvz"
+    vowels = "aeiou"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(2, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length)))
+    return sorted(words)
+
+
+def build_graph(
+    entity_count: int,
+    degree: int,
+    vocabulary_size: int,
+    seed: int
+) -> Tuple[KnowledgeGraph, List[str]]:
+    """Build a graph of random entities with ~degree out-edges each."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    kg = KnowledgeGraph("benchmark")
+    entity_types = list(EntityType)
+    relationship_types = list(RelationshipType)
+
+    for i in range(entity_count):
+        name = " ".join(rng.sample(vocabulary, 2)) + f" {i}"
+        description = " ".join(rng.choices(vocabulary, k=6))
+        kg.add_entity(Entity(
+            id=f"e{i}",
+            entity_type=entity_types[i % len(entity_types)],
+            name=name,
+            description=description,
+            properties={"domain": rng.choice(DOMAINS), "bucket": i % 1000}
+        ))
+
+    for i in range(entity_count):
+        for _ in range(degree):
+            kg.add_relationship(Relationship(
+                id=f"r{i}_{_}",
+                source_id=f"e{i}",
+                target_id=f"e{rng.randrange(entity_count)}",
+                relationship_type=rng.choice(relationship_types)
+            ))
+    return kg, vocabulary
+
+
+def scan_search(kg: KnowledgeGraph, query: str, limit: int = 10) -> List[Entity]:
+    """Baseline: substring scan over every entity."""
+    query_lower = query.lower()
+    results = []
+    for entity in kg._entity_index.values():
+        score = 0
+        if query_lower in entity.name.lower():
+            score += 2
+        if query_lower in entity.description.lower():
+            score += 1
+        if score > 0:
+            results.append((entity, score))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return [entity for entity, _ in results[:limit]]
+
+
+def scan_similar(kg: KnowledgeGraph, entity_id: str, min_common: int = 1) -> List[Tuple[str, int]]:
+    """Baseline: neighbor-set intersection against every node."""
+    graph = kg._graph
+    entity_neighbors = set(graph.neighbors(entity_id))
+    similarities = []
+    for other_id in graph.nodes():
+        if other_id == entity_id:
+            continue
+        common = entity_neighbors & set(graph.neighbors(other_id))
+        if len(common) >= min_common:
+            similarities.append((other_id, len(common)))
+    return sorted(similarities, key=lambda x: x[1], reverse=True)
+
+
+def scan_properties(kg: KnowledgeGraph, filters: dict) -> List[Entity]:
+    """Baseline: property scan over every entity."""
+    return [
+        entity for entity in kg._entity_index.values()
+        if all(entity.properties.get(k, object()) == v for k, v in filters.items())
+    ]
+
+
+def timed(fn: Callable, repeat: int) -> float:
+    """Mean wall time of fn() in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def persistence_rows(kg: KnowledgeGraph, directory: str, trace_memory: bool) -> List[Tuple[str, float, float]]:
+    """Time JSON vs snapshot persistence (and optionally peak allocation)."""
+    json_path = os.path.join(directory, "graph.json")
+    snapshot_path = os.path.join(directory, "graph.kgs")
+    probe = next(iter(kg._entity_index))
+
+    def measure(fn):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        peak = 0.0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        return result, elapsed, peak
+
+    _, json_save, _ = measure(lambda: kg.save(json_path))
+    _, snapshot_save, _ = measure(lambda: kg.save_snapshot(snapshot_path, delta_log=False))
+    json_graph, json_load, json_peak = measure(lambda: KnowledgeGraph.load(json_path))
+    lazy_graph, lazy_load, lazy_peak = measure(
+        lambda: KnowledgeGraph.load_snapshot(snapshot_path, delta_log=False)
+    )
+    _, first_search, _ = measure(lambda: lazy_graph.search("zzzz"))
+    _, eager_load, eager_peak = measure(
+        lambda: KnowledgeGraph.load_snapshot(snapshot_path, lazy=False, delta_log=False)
+    )
+    assert lazy_graph.get_entity(probe).to_dict() == json_graph.get_entity(probe).to_dict()
+
+    print(f"\nJSON {os.path.getsize(json_path) / 2 ** 20:.1f} MiB, "
+          f"snapshot {os.path.getsize(snapshot_path) / 2 ** 20:.1f} MiB")
+    if trace_memory:
+        print(f"Peak allocation during load: JSON {json_peak:.0f} MiB, "
+              f"snapshot lazy {lazy_peak:.0f} MiB, eager {eager_peak:.0f} MiB")
+    return [
+        ("save", json_save, snapshot_save),
+        ("load (lazy)", json_load, lazy_load),
+        ("load (lazy) + first search", json_load, lazy_load + first_search),
+        ("load (eager)", json_load, eager_load),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KnowledgeGraph benchmark")
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    parser.add_argument("--degree", type=int, default=4)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--greedy-limit", type=int, default=20000)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="report peak allocation during loads (slow)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    start = time.perf_counter()
+    kg, vocabulary = build_graph(args.entities, args.degree, args.vocabulary, args.seed)
+    print(f"Built {args.entities} entities / {len(kg._relationship_index)} relationships "
+          f"in {time.perf_counter() - start:.1f}s "
+          f"({len(kg._text_postings)} trigrams indexed)")
+
+    rows = []
+
+    queries = (
+        f"{vocabulary[1]} {vocabulary[2]}",      # phrase
+        f"{vocabulary[3]} {args.entities // 2}",  # rare name suffix
+        vocabulary[4],                            # single word
+        vocabulary[5][:3],                        # common prefix
+    )
+    for query in queries:
+        assert [e.id for e in kg.search(query)] == [e.id for e in scan_search(kg, query)]
+        rows.append((f"search {query!r}",
+                     timed(lambda: scan_search(kg, query), args.repeat),
+                     timed(lambda: kg.search(query), args.repeat)))
+
+    probe = "e0"
+    kg.find_similar_entities(probe, 1)  # build adjacency
+    assert sorted(kg.find_similar_entities(probe, 1)) == sorted(scan_similar(kg, probe))
+    rows.append(("find_similar_entities",
+                 timed(lambda: scan_similar(kg, probe), 1),
+                 timed(lambda: kg.find_similar_entities(probe, 1), args.repeat)))
+
+    filters = {"bucket": 42, "domain": "vision"}
+    kg.create_property_index("bucket")
+    for _ in range(kg.property_index_threshold):
+        kg.query_by_properties(filters)  # let "domain" auto-index
+    assert len(kg.query_by_properties(filters)) == len(scan_properties(kg, filters))
+    rows.append(("query_by_properties",
+                 timed(lambda: scan_properties(kg, filters), args.repeat),
+                 timed(lambda: kg.query_by_properties(filters), args.repeat)))
+
+    def scan_centrality():
+        centrality = nx.degree_centrality(kg._graph)
+        return dict(sorted(centrality.items(), key=lambda x: x[1], reverse=True)[:10])
+
+    def mutate_and_detect():
+        source, target = f"e{rng.randrange(args.entities)}", f"e{rng.randrange(args.entities)}"
+        kg.add_relationship(Relationship(
+            id="", source_id=source, target_id=target,
+            relationship_type=RelationshipType.RELATED_TO
+        ))
+        return kg.detect_communities()
+
+    rng = random.Random(args.seed)
+    assert kg.calculate_centrality(10) == scan_centrality()
+    rows.append(("calculate_centrality",
+                 timed(scan_centrality, args.repeat),
+                 timed(lambda: kg.calculate_centrality(10), args.repeat)))
+
+    start = time.perf_counter()
+    kg.detect_communities()
+    initial = (time.perf_counter() - start) * 1000
+    greedy = float("nan")
+    if args.entities <= args.greedy_limit:
+        greedy = timed(
+            lambda: community.greedy_modularity_communities(kg._graph.to_undirected()), 1
+        )
+    rows.append(("detect_communities (full)", greedy, initial))
+    rows.append(("detect_communities (+1 edge)", greedy, timed(mutate_and_detect, args.repeat)))
+
+    print(f"\n{'operation':<28}{'scan ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    for name, baseline, indexed in rows:
+        if baseline != baseline:  # skipped baseline
+            print(f"{name:<28}{'-':>12}{indexed:>12.3f}{'-':>10}")
+        else:
+            print(f"{name:<28}{baseline:>12.2f}{indexed:>12.3f}{baseline / indexed:>9.0f}x")
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows = persistence_rows(kg, directory, args.trace_memory)
+    print(f"\n{'persistence':<28}{'JSON ms':>12}{'snapshot ms':>12}{'speedup':>10}")
+    for name, baseline, snapshot in rows:
+        print(f"{name:<28}{baseline:>12.1f}{snapshot:>12.1f}{baseline / snapshot:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,17 @@ Version: 5.0.0
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+import math
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterable, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, auto
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,6 +102,11 @@ class FeedbackRecord:
         )
 
 
+def _tail(entries: deque, limit: int) -> list:
+    """Last `limit` items of a deque, oldest first, in O(limit)."""
+    return list(islice(reversed(entries), limit))[::-1]
+
+
 class FeedbackLoop:
     """
     Manages feedback loops in the learning system.
@@ -105,17 +116,25 @@ class FeedbackLoop:
     
     def __init__(self, max_history: int = 1000):
         self.max_history = max_history
-        self._feedback_history: List[FeedbackEntry] = []
+        self._feedback_history: deque = deque()
         self._feedback_handlers: Dict[FeedbackType, List] = {
             ft: [] for ft in FeedbackType
         }
+        # Rollups over the retained history, maintained on add/evict
+        self._by_type: Dict[FeedbackType, deque] = {ft: deque() for ft in FeedbackType}
+        self._confidence_sum = 0.0
         logger.info("FeedbackLoop initialized")
     
     def add_feedback(self, feedback: FeedbackEntry) -> None:
         """Add feedback entry."""
         self._feedback_history.append(feedback)
-        if len(self._feedback_history) > self.max_history:
-            self._feedback_history = self._feedback_history[-self.max_history:]
+        self._by_type[feedback.feedback_type].append(feedback)
+        self._confidence_sum += feedback.confidence
+        while len(self._feedback_history) > self.max_history:
+            # The globally oldest entry is also the oldest of its type
+            evicted = self._feedback_history.popleft()
+            self._by_type[evicted.feedback_type].popleft()
+            self._confidence_sum -= evicted.confidence
         
         # Notify handlers
         for handler in self._feedback_handlers.get(feedback.feedback_type, []):
@@ -134,26 +153,27 @@ class FeedbackLoop:
         limit: int = 100
     ) -> List[FeedbackEntry]:
         """Get recent feedback entries."""
-        entries = self._feedback_history
-        if feedback_type:
-            entries = [e for e in entries if e.feedback_type == feedback_type]
-        return entries[-limit:]
+        entries = self._by_type[feedback_type] if feedback_type else self._feedback_history
+        return _tail(entries, limit)
     
     def get_feedback_stats(self) -> Dict[str, Any]:
         """Get feedback statistics."""
-        type_counts = {}
-        for entry in self._feedback_history:
-            type_name = entry.feedback_type.name
-            type_counts[type_name] = type_counts.get(type_name, 0) + 1
-        
+        total = len(self._feedback_history)
         return {
-            'total_feedback': len(self._feedback_history),
-            'by_type': type_counts
+            'total_feedback': total,
+            'by_type': {
+                ft.name: len(entries)
+                for ft, entries in self._by_type.items() if entries
+            },
+            'average_confidence': self._confidence_sum / total if total else 0.0
         }
     
     def clear_history(self) -> None:
         """Clear feedback history."""
         self._feedback_history.clear()
+        for entries in self._by_type.values():
+            entries.clear()
+        self._confidence_sum = 0.0
 
 
 @dataclass
@@ -175,57 +195,244 @@ class PerformanceMetric:
         }
 
 
+class _WindowAggregate:
+    """
+    Count/sum/sumsq/min/max over the last `size` values.
+
+    Values live in a ring buffer; the evicted value is subtracted from the
+    running sums, and min/max come from monotonic deques, so each push is
+    amortized O(1). Sums are recomputed exactly once per lap of the ring
+    to keep floating-point drift bounded.
+    """
+    
+    __slots__ = ('size', 'count', 'total', 'total_sq', '_values', '_next', '_seq', '_min', '_max')
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._values = array('d', bytes(8 * size))
+        self._next = 0
+        self._seq = 0
+        self._min: deque = deque()
+        self._max: deque = deque()
+    
+    def push(self, value: float) -> None:
+        if self.count == self.size:
+            old = self._values[self._next]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self._values[self._next] = value
+        self.total += value
+        self.total_sq += value * value
+        
+        seq = self._seq
+        self._seq += 1
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+        if self._min[0][0] <= seq - self.size:
+            self._min.popleft()
+        if self._max[0][0] <= seq - self.size:
+            self._max.popleft()
+        
+        self._next += 1
+        if self._next == self.size:
+            self._next = 0
+            self.total = math.fsum(self._values)
+            self.total_sq = math.fsum(v * v for v in self._values)
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+    
+    def to_dict(self) -> Dict[str, Any]:
+        mean = self.mean
+        variance = max(0.0, self.total_sq / self.count - mean * mean)
+        return {
+            'window': self.size,
+            'count': self.count,
+            'sum': self.total,
+            'sumsq': self.total_sq,
+            'mean': mean,
+            'std': math.sqrt(variance),
+            'min': self._min[0][1],
+            'max': self._max[0][1]
+        }
+
+
+class _MetricRollup:
+    """Sliding windows plus a time-decayed average for one metric."""
+    
+    __slots__ = ('windows', 'decayed_sum', 'decayed_weight', 'last_timestamp')
+    
+    def __init__(self, window_sizes: Iterable[int]):
+        self.windows = {size: _WindowAggregate(size) for size in window_sizes}
+        self.decayed_sum = 0.0
+        self.decayed_weight = 0.0
+        self.last_timestamp: Optional[datetime] = None
+    
+    def push(self, value: float, timestamp: datetime, half_life_seconds: float) -> None:
+        for window in self.windows.values():
+            window.push(value)
+        if self.last_timestamp is not None:
+            elapsed = max(0.0, (timestamp - self.last_timestamp).total_seconds())
+            decay = 0.5 ** (elapsed / half_life_seconds)
+            self.decayed_sum *= decay
+            self.decayed_weight *= decay
+        self.decayed_sum += value
+        self.decayed_weight += 1.0
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+
 class MetricsTracker:
-    """Tracks performance metrics over time."""
+    """
+    Tracks performance metrics over time.
     
-    def __init__(self, max_history: int = 10000):
+    Besides the bounded history, each metric keeps O(1) rollups over
+    the last N values for every size in `windows`, and an exponentially
+    time-decayed average with the given half-life.
+    """
+    
+    def __init__(
+        self,
+        max_history: int = 10000,
+        windows: Sequence[int] = (10, 100, 1000),
+        half_life_seconds: float = 300.0
+    ):
         self.max_history = max_history
-        self._metrics: Dict[str, List[PerformanceMetric]] = {}
+        self.windows = sorted({min(w, max_history) for w in windows})
+        self.half_life_seconds = half_life_seconds
+        self._metrics: Dict[str, deque] = {}
+        self._rollups: Dict[str, _MetricRollup] = {}
         logger.info("MetricsTracker initialized")
     
     def record_metric(self, metric: PerformanceMetric) -> None:
         """Record a performance metric."""
         if metric.metric_name not in self._metrics:
-            self._metrics[metric.metric_name] = []
+            self._metrics[metric.metric_name] = deque(maxlen=self.max_history)
+            self._rollups[metric.metric_name] = _MetricRollup(self.windows)
         
         self._metrics[metric.metric_name].append(metric)
-        
-        # Trim history
-        if len(self._metrics[metric.metric_name]) > self.max_history:
-            self._metrics[metric.metric_name] = self._metrics[metric.metric_name][-self.max_history:]
+        self._rollups[metric.metric_name].push(
+            metric.value, metric.timestamp, self.half_life_seconds
+        )
     
     def get_metrics(self, metric_name: str, limit: int = 100) -> List[PerformanceMetric]:
         """Get recent metrics by name."""
-        return self._metrics.get(metric_name, [])[-limit:]
+        return _tail(self._metrics.get(metric_name, deque()), limit)
     
     def get_average(self, metric_name: str, window: int = 100) -> Optional[float]:
         """Get average value of a metric over a window."""
-        metrics = self.get_metrics(metric_name, window)
-        if not metrics:
+        rollup = self._rollups.get(metric_name)
+        if rollup is None:
             return None
+        aggregate = rollup.windows.get(min(window, self.max_history))
+        if aggregate is not None:
+            return aggregate.mean
+        metrics = self.get_metrics(metric_name, window)
         return sum(m.value for m in metrics) / len(metrics)
     
+    def get_rollup(self, metric_name: str, window: int = 100) -> Optional[Dict[str, Any]]:
+        """Get count/sum/sumsq/mean/std/min/max over one of the tracked windows."""
+        rollup = self._rollups.get(metric_name)
+        if rollup is None:
+            return None
+        aggregate = rollup.windows.get(min(window, self.max_history))
+        if aggregate is None:
+            raise ValueError(f"Window {window} is not tracked; choose from {self.windows}")
+        return aggregate.to_dict()
+    
+    def get_decayed_average(self, metric_name: str) -> Optional[float]:
+        """Get the exponentially time-decayed average of a metric."""
+        rollup = self._rollups.get(metric_name)
+        if rollup is None:
+            return None
+        return rollup.decayed_sum / rollup.decayed_weight
+    
     def clear_metrics(self, metric_name: Optional[str] = None) -> None:
         """Clear metrics history."""
         if metric_name:
             self._metrics.pop(metric_name, None)
+            self._rollups.pop(metric_name, None)
         else:
             self._metrics.clear()
+            self._rollups.clear()
 
 
 class ReinforcementLearner:
-    """Implements reinforcement learning for system improvement."""
+    """
+    Implements reinforcement learning for system improvement.
+    
+    The Q-table is a dense array indexed by interned state and action
+    ids; a parallel mask records which pairs have been learned so that
+    unvisited actions don't count towards a state's max Q-value, and each
+    state's max over learned actions is cached (-inf when it has none).
+    """
     
     def __init__(self, learning_rate: float = 0.1, discount_factor: float = 0.9):
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
-        self._q_table: Dict[str, Dict[str, float]] = {}
-        self._state_visits: Dict[str, int] = {}
+        self._state_ids: Dict[str, int] = {}
+        self._action_ids: Dict[str, int] = {}
+        self._actions: List[str] = []
+        self._q = np.zeros((64, 16))
+        self._learned = np.zeros((64, 16), dtype=bool)
+        self._state_visits = np.zeros(64, dtype=np.int64)
+        self._row_max = np.full(64, -np.inf)
         logger.info("ReinforcementLearner initialized")
     
+    def _intern(self, ids: Dict[str, int], name: str) -> int:
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(ids)
+            if ids is self._action_ids:
+                self._actions.append(name)
+            self._reserve(len(self._state_ids), len(self._action_ids))
+        return index
+    
+    def _reserve(self, states: int, actions: int) -> None:
+        rows, cols = self._q.shape
+        if states <= rows and actions <= cols:
+            return
+        while rows < states:
+            rows *= 2
+        while cols < actions:
+            cols *= 2
+        q = np.zeros((rows, cols))
+        learned = np.zeros((rows, cols), dtype=bool)
+        old_rows, old_cols = self._q.shape
+        q[:old_rows, :old_cols] = self._q
+        learned[:old_rows, :old_cols] = self._learned
+        self._q, self._learned = q, learned
+        visits = np.zeros(rows, dtype=np.int64)
+        visits[:old_rows] = self._state_visits
+        self._state_visits = visits
+        row_max = np.full(rows, -np.inf)
+        row_max[:old_rows] = self._row_max
+        self._row_max = row_max
+    
+    def _recompute_row_max(self, state_ids: np.ndarray) -> None:
+        actions = len(self._actions)
+        masked = np.where(
+            self._learned[state_ids, :actions], self._q[state_ids, :actions], -np.inf
+        )
+        self._row_max[state_ids] = masked.max(axis=1)
+    
     def get_q_value(self, state: str, action: str) -> float:
         """Get Q-value for state-action pair."""
-        return self._q_table.get(state, {}).get(action, 0.0)
+        s = self._state_ids.get(state)
+        a = self._action_ids.get(action)
+        if s is None or a is None:
+            return 0.0
+        return float(self._q[s, a])
     
     def update_q_value(
         self,
@@ -235,22 +442,67 @@ class ReinforcementLearner:
         next_state: str
     ) -> None:
         """Update Q-value using Q-learning algorithm."""
-        if state not in self._q_table:
-            self._q_table[state] = {}
-        
-        current_q = self.get_q_value(state, action)
+        s = self._intern(self._state_ids, state)
+        a = self._intern(self._action_ids, action)
         
         # Get max Q-value for next state
-        next_q_values = self._q_table.get(next_state, {}).values()
-        max_next_q = max(next_q_values) if next_q_values else 0.0
+        n = self._state_ids.get(next_state)
+        max_next_q = -math.inf if n is None else self._row_max[n]
+        if max_next_q == -math.inf:
+            max_next_q = 0.0
         
         # Q-learning update
+        current_q = self._q[s, a]
         new_q = current_q + self.learning_rate * (
             reward + self.discount_factor * max_next_q - current_q
         )
+        self._q[s, a] = new_q
+        row_max = self._row_max[s]
+        if new_q >= row_max:
+            self._row_max[s] = new_q
+        elif current_q == row_max and self._learned[s, a]:
+            # The max went down; rescan this state's learned actions
+            self._recompute_row_max(np.array([s]))
+        self._learned[s, a] = True
+        self._state_visits[s] += 1
+    
+    def update_q_values(self, transitions: Sequence[Tuple[str, str, float, str]]) -> None:
+        """
+        Apply a batch of (state, action, reward, next_state) updates at once.
+        
+        Targets are computed against the table as it was before the batch.
+        A pair seen k times moves towards its mean target by
+        1 - (1 - learning_rate) ** k, which is what k sequential updates
+        with that target would do.
+        """
+        if not transitions:
+            return
+        states = np.fromiter(
+            (self._intern(self._state_ids, t[0]) for t in transitions), dtype=np.int64
+        )
+        actions = np.fromiter(
+            (self._intern(self._action_ids, t[1]) for t in transitions), dtype=np.int64
+        )
+        rewards = np.fromiter((t[2] for t in transitions), dtype=float)
+        next_states = np.fromiter(
+            (self._intern(self._state_ids, t[3]) for t in transitions), dtype=np.int64
+        )
         
-        self._q_table[state][action] = new_q
-        self._state_visits[state] = self._state_visits.get(state, 0) + 1
+        max_next_q = self._row_max[next_states]
+        max_next_q[np.isneginf(max_next_q)] = 0.0
+        targets = rewards + self.discount_factor * max_next_q
+        width = self._q.shape[1]
+        pairs, inverse, counts = np.unique(
+            states * width + actions, return_inverse=True, return_counts=True
+        )
+        mean_targets = np.bincount(inverse, weights=targets) / counts
+        rows, cols = np.divmod(pairs, width)
+        current = self._q[rows, cols]
+        step = 1.0 - (1.0 - self.learning_rate) ** counts
+        self._q[rows, cols] = current + step * (mean_targets - current)
+        self._learned[rows, cols] = True
+        self._recompute_row_max(np.unique(rows))
+        self._state_visits += np.bincount(states, minlength=len(self._state_visits))
     
     def choose_action(
         self,
@@ -271,4 +523,8 @@ class ReinforcementLearner:
     
     def get_policy(self, state: str) -> Dict[str, float]:
         """Get policy (Q-values) for a state."""
-        return self._q_table.get(state, {}).copy()
+        s = self._state_ids.get(state)
+        if s is None:
+            return {}
+        learned = np.flatnonzero(self._learned[s, :len(self._actions)])
+        return {self._actions[a]: float(self._q[s, a]) for a in learned}
@@ -7,6 +7,9 @@ Implements a NetworkX-based knowledge graph with:
 - 38 relationship types
 - Graph visualization export
 - Advanced graph queries
+- Trigram text index, property hash indexes and sparse-matrix similarity
+- Incrementally maintained degree centrality and communities
+- Columnar mmap snapshots with append-only delta logs
 
 The knowledge graph serves as the central repository for all learned
 knowledge, enabling complex reasoning and inference.
@@ -17,17 +20,24 @@ Version: 5.0.0
 
 import json
 import logging
+import mmap
+import os
+import bisect
 import hashlib
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Set, Tuple, Union
+import heapq
+import itertools
+import random
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Any, Set, TextIO, Tuple, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 import asyncio
 
 import networkx as nx
 import numpy as np
-from networkx.algorithms import community
+from scipy import sparse
 from networkx.readwrite import json_graph
 
 # Configure logging
@@ -193,6 +203,333 @@ class Relationship:
             'confidence': self.confidence,
             'created_at': self.created_at.isoformat()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Relationship':
+        """Create relationship from dictionary."""
+        return cls(
+            id=data['id'],
+            source_id=data['source_id'],
+            target_id=data['target_id'],
+            relationship_type=RelationshipType(data['relationship_type']),
+            properties=data.get('properties', {}),
+            confidence=data.get('confidence', 1.0),
+            created_at=datetime.fromisoformat(data['created_at'])
+        )
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Return the set of character trigrams of an already lowercased string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Columnar snapshot format
+#
+#   magic (8) | header length (uint64 LE) | JSON header | 8-byte aligned columns
+#
+# The header maps column names to (offset, dtype, count). Strings (ids,
+# names, descriptions, sources) are interned into one UTF-8 blob indexed by
+# ``str_offsets``; entity and relationship rows reference them by index,
+# relationships reference entities by row, and non-empty properties are JSON
+# slices of ``prop_data``. The trigram index is stored as CSR postings of
+# entity rows. Timestamps are naive microseconds since the epoch.
+
+SNAPSHOT_MAGIC = b"UFOKGS01"
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class _StringTable:
+    """Interns strings into a single UTF-8 blob."""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._encoded: List[bytes] = []
+
+    def intern(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self._encoded)
+            self._encoded.append(value.encode('utf-8', 'surrogatepass'))
+        return index
+
+    def columns(self) -> Tuple[np.ndarray, bytes]:
+        offsets = np.zeros(len(self._encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(b) for b in self._encoded], out=offsets[1:])
+        return offsets, b"".join(self._encoded)
+
+
+class _ColumnarSnapshot:
+    """Read-only view over a memory-mapped snapshot file."""
+
+    def __init__(self, filepath: str):
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a knowledge graph snapshot: {filepath}")
+        header_length = int.from_bytes(self._mmap[8:16], 'little')
+        self.header = json.loads(self._mmap[16:16 + header_length])
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+            for name, (offset, dtype, count) in self.header['columns'].items()
+        }
+        self._str_offsets = self.columns['str_offsets']
+        self._str_base = self.header['columns']['str_data'][0]
+        self._prop_base = self.header['columns']['prop_data'][0]
+        self.entity_types = [EntityType(v) for v in self.header['entity_types']]
+        self.relationship_types = [RelationshipType(v) for v in self.header['relationship_types']]
+
+    def string(self, index: int) -> str:
+        start = self._str_base + int(self._str_offsets[index])
+        end = self._str_base + int(self._str_offsets[index + 1])
+        return self._mmap[start:end].decode('utf-8', 'surrogatepass')
+
+    def strings(self, indices: np.ndarray) -> List[str]:
+        return [self.string(i) for i in indices.tolist()]
+
+    def text_postings(self) -> Dict[str, np.ndarray]:
+        """Trigram -> entity rows, as zero-copy views of the mapping."""
+        offsets = self.columns['gram_offsets'].tolist()
+        postings = self.columns['gram_postings']
+        return {
+            gram: postings[offsets[i]:offsets[i + 1]]
+            for i, gram in enumerate(self.strings(self.columns['gram_str']))
+        }
+
+    def _properties(self, offsets: np.ndarray, row: int) -> Dict[str, Any]:
+        start, end = int(offsets[row]), int(offsets[row + 1])
+        if start == end:
+            return {}
+        return json.loads(self._mmap[self._prop_base + start:self._prop_base + end])
+
+    def entity(self, row: int) -> Entity:
+        c = self.columns
+        return Entity(
+            id=self.string(c['ent_id'][row]),
+            entity_type=self.entity_types[c['ent_type'][row]],
+            name=self.string(c['ent_name'][row]),
+            description=self.string(c['ent_desc'][row]),
+            properties=self._properties(c['ent_props'], row),
+            confidence=float(c['ent_conf'][row]),
+            created_at=_from_micros(int(c['ent_created'][row])),
+            updated_at=_from_micros(int(c['ent_updated'][row])),
+            source=self.string(c['ent_source'][row])
+        )
+
+    def relationship(self, row: int, entity_ids: List[str]) -> Relationship:
+        c = self.columns
+        return Relationship(
+            id=self.string(c['rel_id'][row]),
+            source_id=entity_ids[c['rel_source'][row]],
+            target_id=entity_ids[c['rel_target'][row]],
+            relationship_type=self.relationship_types[c['rel_type'][row]],
+            properties=self._properties(c['rel_props'], row),
+            confidence=float(c['rel_conf'][row]),
+            created_at=_from_micros(int(c['rel_created'][row]))
+        )
+
+
+def _write_snapshot(
+    filepath: str,
+    header: Dict[str, Any],
+    entities: List[Entity],
+    relationships: List[Relationship],
+    text_postings: Dict[str, np.ndarray]
+):
+    """Write entities, relationships and the text index as a columnar snapshot."""
+    strings = _StringTable()
+    entity_types = list(EntityType)
+    relationship_types = list(RelationshipType)
+    entity_type_codes = {t: i for i, t in enumerate(entity_types)}
+    relationship_type_codes = {t: i for i, t in enumerate(relationship_types)}
+    rows = {entity.id: row for row, entity in enumerate(entities)}
+    prop_chunks: List[bytes] = []
+    prop_size = 0
+
+    def prop_offsets(records) -> np.ndarray:
+        nonlocal prop_size
+        offsets = np.empty(len(records) + 1, dtype=np.uint64)
+        offsets[0] = prop_size
+        for i, record in enumerate(records):
+            if record.properties:
+                chunk = json.dumps(record.properties, default=str).encode('utf-8')
+                prop_chunks.append(chunk)
+                prop_size += len(chunk)
+            offsets[i + 1] = prop_size
+        return offsets
+
+    columns: Dict[str, Any] = {
+        'ent_id': np.array([strings.intern(e.id) for e in entities], dtype=np.uint32),
+        'ent_type': np.array([entity_type_codes[e.entity_type] for e in entities], dtype=np.uint8),
+        'ent_name': np.array([strings.intern(e.name) for e in entities], dtype=np.uint32),
+        'ent_desc': np.array([strings.intern(e.description) for e in entities], dtype=np.uint32),
+        'ent_source': np.array([strings.intern(e.source) for e in entities], dtype=np.uint32),
+        'ent_conf': np.array([e.confidence for e in entities], dtype=np.float64),
+        'ent_created': np.array([_to_micros(e.created_at) for e in entities], dtype=np.int64),
+        'ent_updated': np.array([_to_micros(e.updated_at) for e in entities], dtype=np.int64),
+        'ent_props': prop_offsets(entities),
+        'rel_id': np.array([strings.intern(r.id) for r in relationships], dtype=np.uint32),
+        'rel_source': np.array([rows[r.source_id] for r in relationships], dtype=np.uint32),
+        'rel_target': np.array([rows[r.target_id] for r in relationships], dtype=np.uint32),
+        'rel_type': np.array(
+            [relationship_type_codes[r.relationship_type] for r in relationships], dtype=np.uint8
+        ),
+        'rel_conf': np.array([r.confidence for r in relationships], dtype=np.float64),
+        'rel_created': np.array([_to_micros(r.created_at) for r in relationships], dtype=np.int64),
+        'rel_props': prop_offsets(relationships),
+        'gram_str': np.array([strings.intern(g) for g in text_postings], dtype=np.uint32),
+        'gram_offsets': np.zeros(len(text_postings) + 1, dtype=np.uint64),
+        'gram_postings': np.concatenate(
+            [np.zeros(0, dtype=np.int64)] + list(text_postings.values())
+        ).astype(np.int64),
+    }
+    np.cumsum([len(p) for p in text_postings.values()], out=columns['gram_offsets'][1:])
+    columns['str_offsets'], columns['str_data'] = strings.columns()
+    columns['prop_data'] = b"".join(prop_chunks)
+
+    header = dict(
+        header,
+        entity_types=[t.value for t in entity_types],
+        relationship_types=[t.value for t in relationship_types],
+        entity_count=len(entities),
+        relationship_count=len(relationships),
+        columns={}
+    )
+    # Column offsets depend on the header length; reserve slack and pad
+    # the header with whitespace once the layout fits
+    header_size = 0
+    while True:
+        offset = 16 + header_size
+        layout = {}
+        for name, data in columns.items():
+            offset = (offset + 7) & ~7
+            if isinstance(data, bytes):
+                layout[name] = [offset, 'u1', len(data)]
+                offset += len(data)
+            else:
+                layout[name] = [offset, data.dtype.str, len(data)]
+                offset += data.nbytes
+        header['columns'] = layout
+        encoded_header = json.dumps(header, default=str).encode('utf-8')
+        if len(encoded_header) <= header_size:
+            encoded_header = encoded_header.ljust(header_size)
+            break
+        header_size = len(encoded_header) + 64
+
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(encoded_header).to_bytes(8, 'little'))
+        f.write(encoded_header)
+        for name, data in columns.items():
+            f.write(b"\0" * (header['columns'][name][0] - f.tell()))
+            f.write(data if isinstance(data, bytes) else data.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+class _LazyRecords(dict):
+    """
+    Dict of id -> record that materializes snapshot rows on first access.
+    
+    Iteration materializes the remaining rows and restores snapshot order,
+    after which the mapping behaves as a plain dict.
+    """
+
+    def __init__(self, loader: Callable[[int], Any], keys: List[str]):
+        super().__init__()
+        self._loader = loader
+        self._rows: Dict[str, int] = dict(zip(keys, range(len(keys))))
+        self._order: Optional[List[str]] = keys
+        self._detached: Set[str] = set()
+
+    def __missing__(self, key):
+        row = self._rows.pop(key)
+        value = self._loader(row)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._rows
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._rows)
+
+    def __setitem__(self, key, value):
+        self._rows.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if key in self._rows:
+            del self._rows[key]
+        else:
+            dict.__delitem__(self, key)
+        if self._order is not None:
+            self._detached.add(key)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if key in self._rows:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def materialize(self):
+        """Load every remaining row, restoring snapshot order."""
+        if self._order is None:
+            return
+        ordered = {}
+        for key in self._order:
+            if key in self._detached:
+                continue
+            if key in self._rows:
+                ordered[key] = self._loader(self._rows[key])
+            elif dict.__contains__(self, key):
+                ordered[key] = dict.__getitem__(self, key)
+        extra = [(k, v) for k, v in dict.items(self) if k not in ordered]
+        dict.clear(self)
+        dict.update(self, ordered)
+        dict.update(self, extra)
+        self._rows.clear()
+        self._order = None
+        self._detached = set()
+        self._loader = None
+
+    def __iter__(self):
+        self.materialize()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self.materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self.materialize()
+        return dict.values(self)
+
+    def items(self):
+        self.materialize()
+        return dict.items(self)
 
 
 class KnowledgeGraph:
@@ -205,16 +542,75 @@ class KnowledgeGraph:
     - Graph algorithms for inference
     - Visualization export
     - Async operations support
+
+    Lookups are served from indices maintained on every mutation:
+    a trigram inverted index for ``search``, hash indexes for frequently
+    filtered property keys, and a CSR adjacency matrix (rebuilt lazily per
+    graph version) for ``find_similar_entities``. Entity properties should
+    therefore be changed through ``update_entity`` rather than in place.
+
+    Degree counts and community labels are likewise updated per edge
+    mutation, so ``calculate_centrality`` and ``detect_communities`` only
+    touch the region changed since their last call.
     """
-    
-    def __init__(self, name: str = "ufo_knowledge_graph"):
+
+    def __init__(
+        self,
+        name: str = "ufo_knowledge_graph",
+        property_index_threshold: int = 3
+    ):
         self.name = name
         self._graph = nx.DiGraph()
         self._entity_index: Dict[str, Entity] = {}
         self._relationship_index: Dict[str, Relationship] = {}
         self._entity_type_index: Dict[EntityType, Set[str]] = defaultdict(set)
         self._relationship_type_index: Dict[RelationshipType, Set[str]] = defaultdict(set)
-        
+        # Incident relationship ids per entity (None until first needed
+        # after a lazy snapshot load)
+        self._entity_relationships: Optional[Dict[str, Set[str]]] = defaultdict(set)
+
+        # Graph mutation counter; derived caches are keyed by it
+        self._version = 0
+
+        # Stable entity ordinals (never reused) for postings and matrix rows
+        self._ordinals: Dict[str, int] = {}
+        self._ordinal_ids: List[Optional[str]] = []
+
+        # Trigram inverted index over lowercased name + description.
+        # Postings are append-only; stale entries are filtered on lookup
+        # and purged by a rebuild once they outnumber live entities.
+        self._text_postings: Dict[str, array] = {}
+        self._text_garbage = 0
+
+        # Property hash indexes: key -> value -> entity ids
+        self._property_indexes: Dict[str, Dict[Any, Set[str]]] = {}
+        self._indexed_properties: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        self._property_filter_counts: Dict[str, int] = defaultdict(int)
+        self.property_index_threshold = property_index_threshold
+
+        # (version, adjacency, out_degree)
+        self._adjacency_cache: Optional[Tuple[int, sparse.csr_matrix, np.ndarray]] = None
+
+        # Degree counters with a lazily invalidated max-heap of
+        # (-degree, ordinal, entity_id); stale entries are skipped on read
+        self._degrees: Dict[str, int] = {}
+        self._degree_heap: List[Tuple[int, int, str]] = []
+        self._centrality_cache: Optional[Tuple[int, int, Dict[str, float]]] = None
+
+        # Label-propagation communities, maintained once first requested.
+        # Mutations mark nodes dirty; removals mark labels that may split.
+        self._community_labels: Optional[Dict[str, int]] = None
+        self._community_members: Dict[int, Set[str]] = defaultdict(set)
+        self._community_dirty: Set[str] = set()
+        self._community_split: Set[int] = set()
+        self._community_views: Dict[int, List[str]] = {}
+        self._community_changed: Set[int] = set()
+        self._community_ranking: List[Tuple[int, int, int]] = []
+        self._community_keys: Dict[int, Tuple[int, int, int]] = {}
+        self._community_label_ids = itertools.count()
+        self._community_rng = random.Random(0)
+        self._communities_cache: Optional[Tuple[int, List[List[str]]]] = None
+
         # Statistics
         self._stats = {
             'entities_added': 0,
@@ -224,8 +620,147 @@ class KnowledgeGraph:
             'last_updated': None
         }
         
+        # Snapshot persistence: mmap'd source of lazily loaded records,
+        # graph attributes still to be filled from it, and the delta log
+        self._snapshot: Optional[_ColumnarSnapshot] = None
+        self._graph_attributes_pending = False
+        self._delta_log: Optional[TextIO] = None
+        
         logger.info(f"KnowledgeGraph '{name}' initialized")
-    
+
+    @property
+    def version(self) -> int:
+        """Mutation counter, incremented on every entity/relationship change."""
+        return self._version
+
+    # Index Maintenance
+
+    @staticmethod
+    def _text_grams(name: str, description: str) -> Set[str]:
+        return _trigrams(name.lower()) | _trigrams(description.lower())
+
+    def _index_text(self, entity: Entity, previous: Optional[Tuple[str, str]] = None):
+        """Post the entity's trigrams, skipping those posted for ``previous`` text."""
+        grams = self._text_grams(entity.name, entity.description)
+        if previous is not None:
+            old_grams = self._text_grams(*previous)
+            if not grams >= old_grams:
+                self._text_garbage += 1
+            grams -= old_grams
+
+        ordinal = self._ordinals[entity.id]
+        postings = self._text_postings
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('q')
+            elif not isinstance(posting, array):
+                # Read-only snapshot view; copy on first write
+                posting = postings[gram] = array('q', posting.tolist())
+            posting.append(ordinal)
+
+    def _maybe_rebuild_text_index(self):
+        """Drop stale postings once they outnumber live entities."""
+        if self._text_garbage <= max(1024, len(self._entity_index)):
+            return
+        self._text_postings = {}
+        self._text_garbage = 0
+        for entity in self._entity_index.values():
+            self._index_text(entity)
+        logger.debug(f"Rebuilt text index: {len(self._text_postings)} trigrams")
+
+    def _index_properties(self, entity: Entity):
+        """Add the entity to every property index whose key it carries."""
+        for key, index in self._property_indexes.items():
+            if key not in entity.properties:
+                continue
+            value = entity.properties[key]
+            try:
+                bucket = index.get(value)
+            except TypeError:
+                continue  # unhashable values are left to the scan path
+            if bucket is None:
+                bucket = index[value] = set()
+            bucket.add(entity.id)
+            self._indexed_properties[entity.id][key] = value
+
+    def _unindex_properties(self, entity_id: str):
+        """Remove the entity using the values it was indexed under."""
+        for key, value in self._indexed_properties.pop(entity_id, {}).items():
+            index = self._property_indexes.get(key)
+            if index is None:
+                continue
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.discard(entity_id)
+                if not bucket:
+                    del index[value]
+
+    def create_property_index(self, key: str):
+        """Build a hash index for a property key."""
+        if key in self._property_indexes:
+            return
+        self._property_indexes[key] = {}
+        for entity in self._entity_index.values():
+            if key in entity.properties:
+                value = entity.properties[key]
+                try:
+                    self._property_indexes[key].setdefault(value, set()).add(entity.id)
+                except TypeError:
+                    continue
+                self._indexed_properties[entity.id][key] = value
+        logger.debug(f"Created property index on '{key}'")
+
+    def drop_property_index(self, key: str) -> bool:
+        """Remove a property index."""
+        if self._property_indexes.pop(key, None) is None:
+            return False
+        for values in self._indexed_properties.values():
+            values.pop(key, None)
+        self._property_filter_counts.pop(key, None)
+        return True
+
+    def get_property_indexes(self) -> List[str]:
+        """List indexed property keys."""
+        return list(self._property_indexes)
+
+    def _push_degree(self, entity_id: str):
+        heapq.heappush(
+            self._degree_heap,
+            (-self._degrees[entity_id], self._ordinals[entity_id], entity_id)
+        )
+        if len(self._degree_heap) > 2 * len(self._degrees) + 64:
+            self._degree_heap = [
+                (-degree, self._ordinals[eid], eid)
+                for eid, degree in self._degrees.items()
+            ]
+            heapq.heapify(self._degree_heap)
+
+    def _on_node_added(self, entity_id: str):
+        self._degrees[entity_id] = 0
+        self._push_degree(entity_id)
+        if self._community_labels is not None:
+            self._join_community(entity_id, next(self._community_label_ids))
+
+    def _on_node_removed(self, entity_id: str):
+        # Incident edges are removed (and accounted) before the node
+        self._degrees.pop(entity_id, None)
+        if self._community_labels is not None:
+            self._leave_community(entity_id)
+            del self._community_labels[entity_id]
+            self._community_dirty.discard(entity_id)
+
+    def _on_edge_changed(self, source_id: str, target_id: str, delta: int):
+        for entity_id in (source_id, target_id):
+            self._degrees[entity_id] += delta
+            self._push_degree(entity_id)
+        if self._community_labels is not None:
+            self._community_dirty.add(source_id)
+            self._community_dirty.add(target_id)
+            label = self._community_labels[source_id]
+            if delta < 0 and self._community_labels[target_id] == label:
+                self._community_split.add(label)
+
     # Entity Management
     
     def add_entity(self, entity: Entity) -> str:
@@ -238,6 +773,8 @@ class KnowledgeGraph:
         Returns:
             Entity ID
         """
+        existing = self._entity_index.get(entity.id)
+
         # Add to graph
         self._graph.add_node(
             entity.id,
@@ -245,8 +782,22 @@ class KnowledgeGraph:
         )
         
         # Update indices
+        if existing is not None:
+            self._entity_type_index[existing.entity_type].discard(entity.id)
+            self._unindex_properties(entity.id)
+        else:
+            self._ordinals[entity.id] = len(self._ordinal_ids)
+            self._ordinal_ids.append(entity.id)
+            self._on_node_added(entity.id)
         self._entity_index[entity.id] = entity
         self._entity_type_index[entity.entity_type].add(entity.id)
+        self._index_text(
+            entity,
+            (existing.name, existing.description) if existing is not None else None
+        )
+        self._index_properties(entity)
+        self._version += 1
+        self._log_delta('entity', entity.to_dict())
         
         # Update stats
         self._stats['entities_added'] += 1
@@ -290,6 +841,10 @@ class KnowledgeGraph:
         if not entity:
             return None
         
+        previous_type = entity.entity_type
+        previous_text = (entity.name, entity.description)
+        self._unindex_properties(entity_id)
+        
         # Update fields
         for key, value in updates.items():
             if hasattr(entity, key):
@@ -300,6 +855,17 @@ class KnowledgeGraph:
         # Update graph node
         self._graph.nodes[entity_id].update(entity.to_dict())
         
+        # Update indices
+        if entity.entity_type != previous_type:
+            self._entity_type_index[previous_type].discard(entity_id)
+            self._entity_type_index[entity.entity_type].add(entity_id)
+        if (entity.name, entity.description) != previous_text:
+            self._index_text(entity, previous_text)
+            self._maybe_rebuild_text_index()
+        self._index_properties(entity)
+        self._version += 1
+        self._log_delta('entity', entity.to_dict())
+        
         return entity
     
     def remove_entity(self, entity_id: str) -> bool:
@@ -309,20 +875,25 @@ class KnowledgeGraph:
         
         entity = self._entity_index[entity_id]
         
+        # Remove related relationships
+        incident = self._incident_relationships()
+        for rid in list(incident.get(entity_id, ())):
+            self.remove_relationship(rid)
+        incident.pop(entity_id, None)
+        
         # Remove from graph
         self._graph.remove_node(entity_id)
         
         # Update indices
         del self._entity_index[entity_id]
         self._entity_type_index[entity.entity_type].discard(entity_id)
-        
-        # Remove related relationships
-        rels_to_remove = [
-            rid for rid, rel in self._relationship_index.items()
-            if rel.source_id == entity_id or rel.target_id == entity_id
-        ]
-        for rid in rels_to_remove:
-            self.remove_relationship(rid)
+        self._on_node_removed(entity_id)
+        self._ordinal_ids[self._ordinals.pop(entity_id)] = None
+        self._text_garbage += 1
+        self._unindex_properties(entity_id)
+        self._maybe_rebuild_text_index()
+        self._version += 1
+        self._log_delta('remove_entity', entity_id)
         
         # Update stats
         self._stats['entities_removed'] += 1
@@ -330,6 +901,16 @@ class KnowledgeGraph:
         logger.debug(f"Removed entity: {entity_id}")
         return True
     
+    def _incident_relationships(self) -> Dict[str, Set[str]]:
+        """Entity -> relationship ids, built on demand after a lazy load."""
+        if self._entity_relationships is None:
+            incident: Dict[str, Set[str]] = defaultdict(set)
+            for rel in self._relationship_index.values():
+                incident[rel.source_id].add(rel.id)
+                incident[rel.target_id].add(rel.id)
+            self._entity_relationships = incident
+        return self._entity_relationships
+    
     # Relationship Management
     
     def add_relationship(self, relationship: Relationship) -> str:
@@ -348,7 +929,9 @@ class KnowledgeGraph:
         if relationship.target_id not in self._entity_index:
             raise ValueError(f"Target entity not found: {relationship.target_id}")
         
-        # Add edge to graph
+        # Add edge to graph (parallel relationships share one edge)
+        if not self._graph.has_edge(relationship.source_id, relationship.target_id):
+            self._on_edge_changed(relationship.source_id, relationship.target_id, 1)
         self._graph.add_edge(
             relationship.source_id,
             relationship.target_id,
@@ -358,6 +941,11 @@ class KnowledgeGraph:
         # Update indices
         self._relationship_index[relationship.id] = relationship
         self._relationship_type_index[relationship.relationship_type].add(relationship.id)
+        if self._entity_relationships is not None:
+            self._entity_relationships[relationship.source_id].add(relationship.id)
+            self._entity_relationships[relationship.target_id].add(relationship.id)
+        self._version += 1
+        self._log_delta('relationship', relationship.to_dict())
         
         # Update stats
         self._stats['relationships_added'] += 1
@@ -427,15 +1015,22 @@ class KnowledgeGraph:
         
         relationship = self._relationship_index[relationship_id]
         
-        # Remove from graph
-        self._graph.remove_edge(
-            relationship.source_id,
-            relationship.target_id
-        )
+        # Remove from graph (parallel relationships share one edge)
+        if self._graph.has_edge(relationship.source_id, relationship.target_id):
+            self._graph.remove_edge(
+                relationship.source_id,
+                relationship.target_id
+            )
+            self._on_edge_changed(relationship.source_id, relationship.target_id, -1)
         
         # Update indices
         del self._relationship_index[relationship_id]
         self._relationship_type_index[relationship.relationship_type].discard(relationship_id)
+        if self._entity_relationships is not None:
+            self._entity_relationships[relationship.source_id].discard(relationship_id)
+            self._entity_relationships[relationship.target_id].discard(relationship_id)
+        self._version += 1
+        self._log_delta('remove_relationship', relationship_id)
         
         # Update stats
         self._stats['relationships_removed'] += 1
@@ -500,54 +1095,285 @@ class KnowledgeGraph:
                     collected.add(neighbor)
                     queue.append((neighbor, depth + 1))
     
+    def _adjacency(self) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """Binary out-edge adjacency over entity ordinals, cached per version."""
+        cache = self._adjacency_cache
+        if cache is not None and cache[0] == self._version:
+            return cache[1], cache[2]
+        
+        size = len(self._ordinal_ids)
+        edge_count = self._graph.number_of_edges()
+        ordinals = self._ordinals
+        rows = np.empty(edge_count, dtype=np.int64)
+        cols = np.empty(edge_count, dtype=np.int64)
+        for i, (source, target) in enumerate(self._graph.edges()):
+            rows[i] = ordinals[source]
+            cols[i] = ordinals[target]
+        
+        adjacency = sparse.csr_matrix(
+            (np.ones(edge_count, dtype=np.int32), (rows, cols)),
+            shape=(size, size)
+        )
+        out_degree = np.diff(adjacency.indptr)
+        self._adjacency_cache = (self._version, adjacency, out_degree)
+        return adjacency, out_degree
+    
     def find_similar_entities(
         self,
         entity_id: str,
-        min_common_neighbors: int = 2
-    ) -> List[Tuple[str, int]]:
-        """Find entities with similar connection patterns."""
-        if entity_id not in self._graph:
+        min_common_neighbors: int = 2,
+        metric: str = "common",
+        top_k: Optional[int] = None
+    ) -> List[Tuple[str, Union[int, float]]]:
+        """
+        Find entities with similar connection patterns.
+        
+        Similarity is computed over out-neighbors for all entities at once
+        with a single sparse product of the adjacency matrix and the query
+        row.
+        
+        Args:
+            entity_id: Entity to compare against
+            min_common_neighbors: Minimum shared neighbors to report
+            metric: "common" (shared neighbor count) or "jaccard"
+            top_k: Return at most this many results
+            
+        Returns:
+            (entity_id, score) pairs sorted by score descending
+        """
+        if metric not in ("common", "jaccard"):
+            raise ValueError(f"Unknown similarity metric: {metric}")
+        if entity_id not in self._ordinals:
             return []
         
-        entity_neighbors = set(self._graph.neighbors(entity_id))
-        similarities = []
+        adjacency, out_degree = self._adjacency()
+        index = self._ordinals[entity_id]
+        common = np.asarray(
+            (adjacency @ adjacency[index].T).todense()
+        ).ravel()
+        
+        if min_common_neighbors > 0:
+            candidates = np.flatnonzero(common >= min_common_neighbors)
+        else:
+            candidates = np.fromiter(self._ordinals.values(), dtype=np.int64)
+        candidates = candidates[candidates != index]
+        
+        if metric == "jaccard":
+            union = out_degree[index] + out_degree[candidates] - common[candidates]
+            scores = np.divide(
+                common[candidates], union,
+                out=np.zeros(len(candidates)), where=union > 0
+            )
+        else:
+            scores = common[candidates]
+        
+        # Score descending, insertion order among ties
+        order = np.lexsort((candidates, -scores))
+        if top_k is not None:
+            order = order[:top_k]
+        
+        ordinal_ids = self._ordinal_ids
+        return [
+            (ordinal_ids[candidates[i]], scores[i].item())
+            for i in order
+        ]
+    
+    def _undirected_neighbors(self, entity_id: str) -> Set[str]:
+        neighbors = set(self._graph.successors(entity_id))
+        neighbors.update(self._graph.predecessors(entity_id))
+        neighbors.discard(entity_id)
+        return neighbors
+
+    def _join_community(self, entity_id: str, label: int):
+        self._community_labels[entity_id] = label
+        self._community_members[label].add(entity_id)
+        self._community_changed.add(label)
+
+    def _leave_community(self, entity_id: str):
+        label = self._community_labels[entity_id]
+        members = self._community_members[label]
+        members.discard(entity_id)
+        if not members:
+            del self._community_members[label]
+        self._community_changed.add(label)
+
+    def _set_community(self, entity_id: str, label: int):
+        self._leave_community(entity_id)
+        self._join_community(entity_id, label)
+
+    def _propagate_labels(self, region: Set[str], max_rounds: int = 20):
+        """
+        Asynchronous label propagation seeded from ``region``.
         
-        for other_id in self._graph.nodes():
-            if other_id == entity_id:
+        A node adopts the most frequent label among its neighbors (keeping
+        its own on ties, else a seeded random pick); neighbors of changed
+        nodes are revisited, so work stays proportional to the affected area.
+        """
+        labels = self._community_labels
+        rng = self._community_rng
+        order = sorted(region, key=self._ordinals.__getitem__)
+        rng.shuffle(order)
+        queue = deque(order)
+        queued = set(queue)
+        budget = max_rounds * (len(queue) + 1)
+        
+        while queue and budget > 0:
+            budget -= 1
+            entity_id = queue.popleft()
+            queued.discard(entity_id)
+            neighbors = self._undirected_neighbors(entity_id)
+            if not neighbors:
                 continue
             
-            other_neighbors = set(self._graph.neighbors(other_id))
-            common = entity_neighbors & other_neighbors
-            
-            if len(common) >= min_common_neighbors:
-                similarities.append((other_id, len(common)))
+            counts = Counter(labels[n] for n in neighbors)
+            best = max(counts.values())
+            if counts.get(labels[entity_id], 0) == best:
+                continue
+            # The community being left may no longer be connected
+            self._community_split.add(labels[entity_id])
+            self._set_community(
+                entity_id,
+                rng.choice(sorted(label for label, count in counts.items() if count == best))
+            )
+            for neighbor in neighbors:
+                if neighbor not in queued:
+                    queued.add(neighbor)
+                    queue.append(neighbor)
+
+    def _split_disconnected(self, label: int):
+        """Give each extra connected component of a community its own label."""
+        members = self._community_members.get(label)
+        if not members:
+            return
+        labels = self._community_labels
+        unvisited = set(members)
+        first = True
+        while unvisited:
+            start = min(unvisited, key=self._ordinals.__getitem__)
+            component = {start}
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                for neighbor in self._undirected_neighbors(node):
+                    if neighbor not in component and labels.get(neighbor) == label:
+                        component.add(neighbor)
+                        stack.append(neighbor)
+            unvisited -= component
+            if first:
+                first = False
+                continue
+            new_label = next(self._community_label_ids)
+            for node in component:
+                self._set_community(node, new_label)
+
+    def _refresh_communities(self):
+        if self._community_labels is None:
+            self._community_labels = {}
+            for entity_id in self._graph.nodes():
+                self._join_community(entity_id, next(self._community_label_ids))
+            self._community_dirty = set(self._community_labels)
         
-        return sorted(similarities, key=lambda x: x[1], reverse=True)
-    
+        if self._community_dirty:
+            self._propagate_labels(self._community_dirty)
+            self._community_dirty = set()
+        for label in self._community_split:
+            self._split_disconnected(label)
+        self._community_split = set()
+
+    def _rank_communities(self):
+        """Re-sort changed communities and reposition them in the ranking."""
+        ordinals = self._ordinals
+        views = self._community_views
+        keys = self._community_keys
+        ranking = self._community_ranking
+        changed = self._community_changed
+        rebuild = len(changed) > len(ranking) // 4
+        
+        for label in changed:
+            old_key = keys.pop(label, None)
+            if old_key is not None and not rebuild:
+                del ranking[bisect.bisect_left(ranking, old_key)]
+            members = self._community_members.get(label)
+            if not members:
+                views.pop(label, None)
+                continue
+            view = views[label] = sorted(members, key=ordinals.__getitem__)
+            key = keys[label] = (-len(view), ordinals[view[0]], label)
+            if not rebuild:
+                bisect.insort(ranking, key)
+        
+        if rebuild:
+            self._community_ranking = sorted(keys.values())
+        self._community_changed = set()
+
     def detect_communities(self) -> List[List[str]]:
-        """Detect communities in the knowledge graph."""
+        """
+        Detect communities in the knowledge graph.
+        
+        Communities come from label propagation over the undirected view.
+        The first call labels the whole graph; later calls only re-propagate
+        from nodes touched by mutations since, and results are cached per
+        graph version.
+        
+        Returns:
+            Communities (largest first), members in insertion order
+        """
+        cache = self._communities_cache
+        if cache is not None and cache[0] == self._version:
+            return [list(c) for c in cache[1]]
+        
         try:
-            # Convert to undirected for community detection
-            undirected = self._graph.to_undirected()
-            communities_list = community.greedy_modularity_communities(undirected)
-            return [list(c) for c in communities_list]
+            self._refresh_communities()
         except Exception as e:
             logger.error(f"Community detection failed: {e}")
+            self._community_labels = None
+            self._community_members = defaultdict(set)
+            self._community_views = {}
+            self._community_changed = set()
+            self._community_ranking = []
+            self._community_keys = {}
             return []
+        
+        self._rank_communities()
+        views = self._community_views
+        communities = [views[label] for _, _, label in self._community_ranking]
+        self._communities_cache = (self._version, communities)
+        return [list(c) for c in communities]
     
     def calculate_centrality(self, top_n: int = 10) -> Dict[str, float]:
-        """Calculate centrality scores for entities."""
-        try:
-            centrality = nx.degree_centrality(self._graph)
-            sorted_centrality = sorted(
-                centrality.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            return dict(sorted_centrality[:top_n])
-        except Exception as e:
-            logger.error(f"Centrality calculation failed: {e}")
-            return {}
+        """
+        Calculate degree centrality for the top entities.
+        
+        Degrees are maintained per edge mutation; the top entries are read
+        from a max-heap and cached per graph version.
+        """
+        cache = self._centrality_cache
+        if cache is not None and cache[0] == self._version and cache[1] == top_n:
+            return dict(cache[2])
+        
+        node_count = len(self._degrees)
+        if node_count <= 1:
+            result = {eid: 1.0 for eid in list(self._degrees)[:top_n]}
+        else:
+            scale = 1.0 / (node_count - 1)
+            degrees = self._degree_heap
+            top: List[Tuple[int, int, str]] = []
+            seen: Set[str] = set()
+            while degrees and len(top) < top_n:
+                entry = heapq.heappop(degrees)
+                negative_degree, ordinal, entity_id = entry
+                if (entity_id in seen
+                        or self._degrees.get(entity_id) != -negative_degree
+                        or self._ordinals.get(entity_id) != ordinal):
+                    continue
+                seen.add(entity_id)
+                top.append(entry)
+            for entry in top:
+                heapq.heappush(degrees, entry)
+            result = {eid: -degree * scale for degree, _, eid in top}
+        
+        self._centrality_cache = (self._version, top_n, result)
+        return dict(result)
     
     def infer_relationship(
         self,
@@ -579,13 +1405,53 @@ class KnowledgeGraph:
         entity_types: Optional[List[EntityType]] = None,
         limit: int = 10
     ) -> List[Entity]:
-        """Search entities by name or description."""
+        """
+        Search entities by name or description.
+        
+        Queries of three or more characters are answered from the trigram
+        index: only entities posted under all of the query's trigrams are
+        scored. Shorter queries, and queries whose rarest trigram appears in
+        most entities, fall back to a full scan.
+        """
         query_lower = query.lower()
-        results = []
+        grams = _trigrams(query_lower)
+        type_filter = set(entity_types) if entity_types else None
         
-        for entity in self._entity_index.values():
+        if grams:
+            postings = []
+            for gram in grams:
+                posting = self._text_postings.get(gram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+        
+        if grams and len(postings[0]) <= len(self._entity_index) // 2:
+            # Intersect postings rarest-first until the candidate set is small
+            candidates = np.unique(np.frombuffer(postings[0], dtype=np.int64))
+            for posting in postings[1:]:
+                if len(candidates) <= 256:
+                    break
+                candidates = np.intersect1d(
+                    candidates, np.frombuffer(posting, dtype=np.int64)
+                )
+            ordinal_ids = self._ordinal_ids
+            entity_index = self._entity_index
+            entities = (
+                entity_index[ordinal_ids[ordinal]]
+                for ordinal in candidates.tolist()
+                if ordinal_ids[ordinal] is not None
+            )
+        else:
+            # Short or unselective queries: a scan is cheaper
+            entities = self._entity_index.values()
+        
+        # Both paths iterate in insertion order, so bucketing by score
+        # reproduces a stable sort; stop once the top bucket is full.
+        buckets: Dict[int, List[Entity]] = {3: [], 2: [], 1: []}
+        for entity in entities:
             # Filter by type if specified
-            if entity_types and entity.entity_type not in entity_types:
+            if type_filter and entity.entity_type not in type_filter:
                 continue
             
             # Search in name and description
@@ -596,26 +1462,52 @@ class KnowledgeGraph:
                 score += 1
             
             if score > 0:
-                results.append((entity, score))
-        
-        # Sort by score
-        results.sort(key=lambda x: x[1], reverse=True)
+                buckets[score].append(entity)
+                if score == 3 and limit > 0 and len(buckets[3]) >= limit:
+                    break
         
-        return [entity for entity, _ in results[:limit]]
+        return (buckets[3] + buckets[2] + buckets[1])[:limit]
     
     def query_by_properties(
         self,
         property_filters: Dict[str, Any],
         entity_type: Optional[EntityType] = None
     ) -> List[Entity]:
-        """Query entities by property values."""
-        results = []
+        """
+        Query entities by property values.
         
-        entities = self._entity_index.values()
-        if entity_type:
+        Keys filtered on ``property_index_threshold`` times are indexed
+        automatically; the smallest matching index bucket then bounds the
+        candidates, which are verified against all filters.
+        """
+        candidate_ids: Optional[Set[str]] = None
+        for key, value in property_filters.items():
+            if key not in self._property_indexes:
+                self._property_filter_counts[key] += 1
+                if self._property_filter_counts[key] < self.property_index_threshold:
+                    continue
+                self.create_property_index(key)
+            try:
+                bucket = self._property_indexes[key].get(value, set())
+            except TypeError:
+                continue
+            if candidate_ids is None or len(bucket) < len(candidate_ids):
+                candidate_ids = bucket
+        
+        if candidate_ids is not None:
+            entities = [
+                self._entity_index[eid]
+                for eid in sorted(candidate_ids, key=self._ordinals.__getitem__)
+            ]
+            if entity_type:
+                entities = [e for e in entities if e.entity_type == entity_type]
+        elif entity_type:
             entity_ids = self._entity_type_index[entity_type]
             entities = [self._entity_index[eid] for eid in entity_ids]
+        else:
+            entities = self._entity_index.values()
         
+        results = []
         for entity in entities:
             match = True
             for key, value in property_filters.items():
@@ -647,16 +1539,19 @@ class KnowledgeGraph:
     
     def export_to_graphml(self, filepath: str):
         """Export graph to GraphML format for visualization."""
+        self._ensure_graph_attributes()
         nx.write_graphml(self._graph, filepath)
         logger.info(f"Exported graph to GraphML: {filepath}")
     
     def export_to_gexf(self, filepath: str):
         """Export graph to GEXF format for Gephi."""
+        self._ensure_graph_attributes()
         nx.write_gexf(self._graph, filepath)
         logger.info(f"Exported graph to GEXF: {filepath}")
     
     def export_to_cytoscape(self) -> Dict[str, Any]:
         """Export graph to Cytoscape.js format."""
+        self._ensure_graph_attributes()
         cyto_data = json_graph.cytoscape_data(self._graph)
         return cyto_data
     
@@ -749,15 +1644,7 @@ class KnowledgeGraph:
         
         # Load relationships
         for rel_data in data.get('relationships', []):
-            relationship = Relationship(
-                id=rel_data['id'],
-                source_id=rel_data['source_id'],
-                target_id=rel_data['target_id'],
-                relationship_type=RelationshipType(rel_data['relationship_type']),
-                properties=rel_data.get('properties', {}),
-                confidence=rel_data.get('confidence', 1.0),
-                created_at=datetime.fromisoformat(rel_data['created_at'])
-            )
+            relationship = Relationship.from_dict(rel_data)
             try:
                 kg.add_relationship(relationship)
             except ValueError:
@@ -767,6 +1654,216 @@ class KnowledgeGraph:
         
         logger.info(f"Loaded knowledge graph from {filepath}")
         return kg
+    
+    def save_snapshot(self, filepath: str, delta_log: bool = True):
+        """
+        Save knowledge graph as a columnar snapshot.
+        
+        The file is written atomically. With ``delta_log``, subsequent
+        mutations are appended to ``<filepath>.delta`` until the next
+        snapshot, so the snapshot itself is only rewritten on compaction.
+        
+        Args:
+            filepath: Snapshot path
+            delta_log: Log later mutations next to the snapshot
+        """
+        header = {
+            'format': 1,
+            'name': self.name,
+            'stats': self._stats,
+            'saved_at': datetime.now().isoformat()
+        }
+        entities = list(self._entity_index.values())
+        
+        # Postings are stored as snapshot rows; drop removed entities
+        row_of = np.full(len(self._ordinal_ids) + 1, -1, dtype=np.int64)
+        row_of[[self._ordinals[e.id] for e in entities]] = np.arange(len(entities))
+        text_postings = {}
+        for gram, posting in self._text_postings.items():
+            rows = row_of[np.frombuffer(posting, dtype=np.int64)]
+            rows = np.unique(rows[rows >= 0])
+            if len(rows):
+                text_postings[gram] = rows
+        
+        _write_snapshot(
+            filepath,
+            header,
+            entities,
+            list(self._relationship_index.values()),
+            text_postings
+        )
+        
+        # The snapshot now covers every logged mutation
+        self.close_delta_log()
+        delta_path = f"{filepath}.delta"
+        if delta_log:
+            self._delta_log = open(delta_path, 'w', encoding='utf-8')
+        elif os.path.exists(delta_path):
+            os.remove(delta_path)
+        
+        logger.info(f"Saved knowledge graph snapshot to {filepath}")
+    
+    @classmethod
+    def load_snapshot(
+        cls,
+        filepath: str,
+        lazy: bool = True,
+        delta_log: bool = True
+    ) -> 'KnowledgeGraph':
+        """
+        Load knowledge graph from a columnar snapshot.
+        
+        The file is memory-mapped and the graph structure is built in bulk
+        from its columns; the text index is used in place. With ``lazy``,
+        Entity and Relationship objects are decoded on first access and
+        graph attributes are filled in on first export.
+        ``<filepath>.delta`` is replayed if present.
+        
+        Args:
+            filepath: Snapshot path
+            lazy: Defer decoding records until they are accessed
+            delta_log: Keep appending mutations to the delta log
+            
+        Returns:
+            Loaded knowledge graph
+        """
+        snapshot = _ColumnarSnapshot(filepath)
+        kg = cls(name=snapshot.header.get('name', 'loaded_graph'))
+        kg._load_columns(snapshot)
+        kg._stats = snapshot.header.get('stats', kg._stats)
+        
+        delta_path = f"{filepath}.delta"
+        replayed = 0
+        if os.path.exists(delta_path):
+            replayed = kg._replay_delta_log(delta_path)
+        if not lazy:
+            kg._materialize()
+        if delta_log:
+            kg._delta_log = open(delta_path, 'a', encoding='utf-8')
+        
+        logger.info(
+            f"Loaded knowledge graph snapshot from {filepath} "
+            f"({len(kg._ordinals)} entities, {replayed} delta entries)"
+        )
+        return kg
+    
+    def close_delta_log(self):
+        """Stop logging mutations to the delta log."""
+        if self._delta_log is not None:
+            self._delta_log.close()
+            self._delta_log = None
+    
+    def _log_delta(self, op: str, data: Any):
+        if self._delta_log is not None:
+            self._delta_log.write(json.dumps({'op': op, 'data': data}, default=str) + "\n")
+            self._delta_log.flush()
+    
+    def _replay_delta_log(self, delta_path: str) -> int:
+        """Apply logged mutations; a torn final entry is truncated away."""
+        applied = 0
+        valid_size = 0
+        with open(delta_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Truncating torn delta log entry in {delta_path}")
+                    break
+                valid_size += len(line)
+                
+                op, data = record['op'], record['data']
+                if op == 'entity':
+                    self.add_entity(Entity.from_dict(data))
+                elif op == 'remove_entity':
+                    self.remove_entity(data)
+                elif op == 'relationship':
+                    try:
+                        self.add_relationship(Relationship.from_dict(data))
+                    except ValueError as e:
+                        logger.warning(f"Skipping invalid relationship: {e}")
+                elif op == 'remove_relationship':
+                    self.remove_relationship(data)
+                applied += 1
+        
+        if valid_size < os.path.getsize(delta_path):
+            os.truncate(delta_path, valid_size)
+        return applied
+    
+    def _load_columns(self, snapshot: _ColumnarSnapshot):
+        """Bulk-build structure and indices from snapshot columns."""
+        columns = snapshot.columns
+        entity_ids = snapshot.strings(columns['ent_id'])
+        relationship_ids = snapshot.strings(columns['rel_id'])
+        
+        self._snapshot = snapshot
+        self._entity_index = _LazyRecords(snapshot.entity, entity_ids)
+        self._relationship_index = _LazyRecords(
+            lambda row: snapshot.relationship(row, entity_ids),
+            relationship_ids
+        )
+        self._ordinal_ids = list(entity_ids)
+        self._ordinals = dict(zip(entity_ids, range(len(entity_ids))))
+        
+        id_array = np.array(entity_ids, dtype=object)
+        types = columns['ent_type']
+        for code in np.unique(types).tolist():
+            self._entity_type_index[snapshot.entity_types[code]] = set(
+                id_array[types == code].tolist()
+            )
+        relationship_array = np.array(relationship_ids, dtype=object)
+        relationship_types = columns['rel_type']
+        for code in np.unique(relationship_types).tolist():
+            self._relationship_type_index[snapshot.relationship_types[code]] = set(
+                relationship_array[relationship_types == code].tolist()
+            )
+        
+        # Edges carry only what queries read; full attributes are filled in
+        # by _ensure_graph_attributes before exports
+        type_values = [t.value for t in snapshot.relationship_types]
+        self._graph.add_nodes_from(entity_ids)
+        self._graph.add_edges_from(
+            (source, target, {'id': rid, 'relationship_type': type_values[code]})
+            for source, target, rid, code in zip(
+                id_array[columns['rel_source']].tolist(),
+                id_array[columns['rel_target']].tolist(),
+                relationship_ids,
+                relationship_types.tolist()
+            )
+        )
+        self._graph_attributes_pending = True
+        
+        self._degrees = dict(self._graph.degree())
+        self._degree_heap = [
+            (-degree, self._ordinals[eid], eid) for eid, degree in self._degrees.items()
+        ]
+        heapq.heapify(self._degree_heap)
+        
+        self._text_postings = snapshot.text_postings()
+        self._entity_relationships = None
+    
+    def _ensure_graph_attributes(self):
+        """Copy record attributes onto nodes and edges loaded without them."""
+        if not self._graph_attributes_pending:
+            return
+        self._graph_attributes_pending = False
+        nodes = self._graph.nodes
+        for entity_id, entity in self._entity_index.items():
+            if 'name' not in nodes[entity_id]:
+                nodes[entity_id].update(entity.to_dict())
+        for rel in self._relationship_index.values():
+            data = self._graph.get_edge_data(rel.source_id, rel.target_id)
+            if data is not None and data.get('id') == rel.id and 'source_id' not in data:
+                data.update(rel.to_dict())
+    
+    def _materialize(self):
+        """Decode every lazily loaded record and build deferred indices."""
+        if isinstance(self._entity_index, _LazyRecords):
+            self._entity_index = dict(self._entity_index.items())
+        if isinstance(self._relationship_index, _LazyRecords):
+            self._relationship_index = dict(self._relationship_index.items())
+        self._incident_relationships()
+        self._ensure_graph_attributes()
+        self._snapshot = None
 
 
 # Example usage
@@ -17,6 +17,7 @@ Version: 5.0.0
 import asyncio
 import json
 import logging
+import os
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Set
 from contextlib import asynccontextmanager
@@ -130,6 +131,8 @@ class LearningNodeState:
         self.feedback_loop: Optional[FeedbackLoop] = None
         self.started_at: Optional[datetime] = None
         self.active_connections: Set[WebSocket] = set()
+        self.snapshot_path: Optional[str] = os.getenv("KNOWLEDGE_GRAPH_SNAPSHOT")
+        self.search_cache_path: Optional[str] = os.getenv("SEARCH_CACHE_PATH")
         self._initialized = False
     
     async def initialize(self):
@@ -139,8 +142,13 @@ class LearningNodeState:
         
         logger.info("Initializing Learning Node...")
         
-        # Initialize knowledge graph
-        self.knowledge_graph = KnowledgeGraph("ufo_learning_graph")
+        # Initialize knowledge graph, restoring snapshot + delta log if configured
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.knowledge_graph = KnowledgeGraph.load_snapshot(self.snapshot_path)
+        else:
+            self.knowledge_graph = KnowledgeGraph("ufo_learning_graph")
+            if self.snapshot_path:
+                self.knowledge_graph.save_snapshot(self.snapshot_path)
         
         # Initialize pattern recognizer and knowledge accumulator
         pattern_recognizer = PatternRecognizer()
@@ -157,7 +165,7 @@ class LearningNodeState:
         self.emergence_detector = EmergenceDetector()
         
         # Initialize search integrator
-        self.search_integrator = SearchIntegrator()
+        self.search_integrator = SearchIntegrator(cache_path=self.search_cache_path)
         
         # Initialize feedback loop
         self.feedback_loop = FeedbackLoop()
@@ -278,6 +286,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     await state.engine.stop()
+    if state.snapshot_path:
+        # Compact the delta log into a fresh snapshot
+        state.knowledge_graph.save_snapshot(state.snapshot_path)
+        state.knowledge_graph.close_delta_log()
+    await state.search_integrator.close()
     logger.info("Learning Node service stopped")
 
 
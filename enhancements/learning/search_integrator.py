@@ -11,7 +11,7 @@ Features:
 - Unified search interface
 - Result aggregation and ranking
 - Async operations for performance
-- Caching and rate limiting
+- Bounded TTL caching with request coalescing, and rate limiting
 
 Author: UFO Galaxy Team
 Version: 5.0.0
@@ -21,11 +21,12 @@ import asyncio
 import json
 import logging
 import hashlib
+import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set, Callable
+from typing import Dict, List, Optional, Any, Set, Callable, Awaitable
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 import time
 
 try:
@@ -86,6 +87,25 @@ class SearchResult:
             'relevance_score': self.relevance_score,
             'fetched_at': self.fetched_at.isoformat()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SearchResult':
+        """Create from dictionary."""
+        return cls(
+            id=data['id'],
+            source=SearchSource(data['source']),
+            title=data['title'],
+            content=data['content'],
+            url=data['url'],
+            author=data.get('author'),
+            published_date=(
+                datetime.fromisoformat(data['published_date'])
+                if data.get('published_date') else None
+            ),
+            metadata=data.get('metadata', {}),
+            relevance_score=data.get('relevance_score', 0.0),
+            fetched_at=datetime.fromisoformat(data['fetched_at'])
+        )
 
 
 @dataclass
@@ -121,43 +141,223 @@ class RateLimiter:
 
 
 class ResultCache:
-    """Simple cache for search results."""
+    """
+    Size-bounded TTL cache for search results.
+
+    Entries are kept in LRU order and evicted beyond max_entries; expired
+    entries are dropped on read and by a background sweep. Identical
+    in-flight fetches are coalesced so only one reaches the upstream
+    source, and the cache can be persisted to a JSON file across restarts.
+    """
     
-    def __init__(self, ttl_seconds: int = 3600):
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        max_entries: int = 1024,
+        persist_path: Optional[str] = None
+    ):
         self.ttl_seconds = ttl_seconds
-        self._cache: Dict[str, Dict] = {}
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._cache: OrderedDict = OrderedDict()
+        # (expires_at, key) in insertion order; the TTL is uniform so this
+        # is also expiry order. Entries for overwritten keys go stale.
+        self._expiry: deque = deque()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+        if persist_path:
+            self.load()
     
-    def _make_key(self, query: str, source: str) -> str:
-        """Create cache key."""
-        return hashlib.md5(f"{source}:{query}".encode()).hexdigest()
+    def _make_key(
+        self,
+        query: str,
+        source: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Create cache key; params are the request options that shape the results."""
+        raw = f"{source}:{query}"
+        if params:
+            raw += ":" + json.dumps(params, sort_keys=True, default=str)
+        return hashlib.md5(raw.encode()).hexdigest()
     
-    def get(self, query: str, source: str) -> Optional[List[SearchResult]]:
+    def get(
+        self,
+        query: str,
+        source: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Optional[List[SearchResult]]:
         """Get cached results if valid."""
-        key = self._make_key(query, source)
+        key = self._make_key(query, source, params)
         
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
+            self._stats['misses'] += 1
             return None
         
-        entry = self._cache[key]
-        age = (datetime.now() - entry['timestamp']).total_seconds()
-        
-        if age > self.ttl_seconds:
+        if time.time() >= entry['expires_at']:
             del self._cache[key]
+            self._stats['expirations'] += 1
+            self._stats['misses'] += 1
             return None
         
+        self._cache.move_to_end(key)
+        self._stats['hits'] += 1
         return entry['results']
     
-    def set(self, query: str, source: str, results: List[SearchResult]):
+    def set(
+        self,
+        query: str,
+        source: str,
+        results: List[SearchResult],
+        params: Optional[Dict[str, Any]] = None
+    ):
         """Cache search results."""
-        key = self._make_key(query, source)
+        key = self._make_key(query, source, params)
+        self._store(key, results, time.time() + self.ttl_seconds)
+    
+    def _store(self, key: str, results: List[SearchResult], expires_at: float):
         self._cache[key] = {
-            'timestamp': datetime.now(),
+            'expires_at': expires_at,
             'results': results
         }
+        self._cache.move_to_end(key)
+        self._expiry.append((expires_at, key))
+        
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self._stats['evictions'] += 1
+        
+        if len(self._expiry) > 2 * self.max_entries + 64:
+            self._expiry = deque(sorted(
+                (entry['expires_at'], k) for k, entry in self._cache.items()
+            ))
+    
+    def purge_expired(self) -> int:
+        """Drop all expired entries; returns how many were removed."""
+        now = time.time()
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = self._expiry.popleft()
+            entry = self._cache.get(key)
+            if entry is not None and entry['expires_at'] == expires_at:
+                del self._cache[key]
+                removed += 1
+        self._stats['expirations'] += removed
+        return removed
+    
+    def start_expiry(self, interval: float = 60.0):
+        """Start the background expiry sweep on the running loop."""
+        if self._expiry_task is None or self._expiry_task.done():
+            self._expiry_task = asyncio.create_task(self._expiry_loop(interval))
+    
+    async def _expiry_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.purge_expired()
+            if removed:
+                logger.debug(f"Expired {removed} cached search results")
+    
+    def stop_expiry(self):
+        """Stop the background expiry sweep."""
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+    
+    async def single_flight(
+        self,
+        query: str,
+        source: str,
+        fetch: Callable[[], Awaitable[List[SearchResult]]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        """
+        Run fetch() unless an identical fetch is already in flight, in
+        which case wait for and share its results.
+        
+        The fetch runs as its own task, so a caller that is cancelled only
+        stops waiting; the fetch carries on for the remaining callers.
+        """
+        key = self._make_key(query, source, params)
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats['coalesced'] += 1
+        else:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return await asyncio.shield(task)
+    
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark exceptions retrieved when every caller had already gone
+        if not task.cancelled():
+            task.exception()
+    
+    def save(self, filepath: Optional[str] = None):
+        """Write unexpired entries to a JSON file."""
+        filepath = filepath or self.persist_path
+        if not filepath:
+            return
+        self.purge_expired()
+        entries = [
+            {
+                'key': key,
+                'expires_at': entry['expires_at'],
+                'results': [
+                    {**result.to_dict(), 'content': result.content}
+                    for result in entry['results']
+                ]
+            }
+            for key, entry in self._cache.items()
+        ]
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'entries': entries}, f)
+        os.replace(tmp_path, filepath)
+        logger.info(f"Saved {len(entries)} cached searches to {filepath}")
+    
+    def load(self, filepath: Optional[str] = None):
+        """Load unexpired entries written by save()."""
+        filepath = filepath or self.persist_path
+        if not filepath or not os.path.exists(filepath):
+            return
+        try:
+            with open(filepath) as f:
+                data = json.load(f)
+            now = time.time()
+            for entry in data.get('entries', []):
+                if entry['expires_at'] > now:
+                    self._store(
+                        entry['key'],
+                        [SearchResult.from_dict(r) for r in entry['results']],
+                        entry['expires_at']
+                    )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable search cache {filepath}: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            'size': len(self._cache),
+            'max_entries': self.max_entries,
+            **self._stats,
+            'hit_rate': self._stats['hits'] / lookups if lookups else 0,
+            'upstream_calls_avoided': self._stats['hits'] + self._stats['coalesced']
+        }
     
     def clear(self):
         """Clear all cached results."""
         self._cache.clear()
+        self._expiry.clear()
 
 
 class SearchIntegrator:
@@ -175,9 +375,15 @@ class SearchIntegrator:
     def __init__(
         self,
         cache_ttl: int = 3600,
-        rate_limit_per_minute: int = 60
+        rate_limit_per_minute: int = 60,
+        cache_max_entries: int = 1024,
+        cache_path: Optional[str] = None
     ):
-        self.cache = ResultCache(ttl_seconds=cache_ttl)
+        self.cache = ResultCache(
+            ttl_seconds=cache_ttl,
+            max_entries=cache_max_entries,
+            persist_path=cache_path
+        )
         self.rate_limiter = RateLimiter(calls_per_minute=rate_limit_per_minute)
         
         # API configurations
@@ -205,10 +411,30 @@ class SearchIntegrator:
         return self._session
     
     async def close(self):
-        """Close HTTP session."""
+        """Close HTTP session and persist the cache."""
+        self.cache.stop_expiry()
+        if self.cache.persist_path:
+            self.cache.save()
         if self._session and not self._session.closed:
             await self._session.close()
     
+    async def _cached_search(
+        self,
+        source: str,
+        query: str,
+        fetch: Callable[[], Awaitable[List[SearchResult]]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        """Serve from cache, else fetch once for all concurrent callers."""
+        self.cache.start_expiry()
+        
+        cached = self.cache.get(query, source, params)
+        if cached is not None:
+            self._stats['cache_hits'] += 1
+            return cached
+        
+        return await self.cache.single_flight(query, source, fetch, params)
+    
     async def search_web(
         self,
         query: str,
@@ -221,12 +447,12 @@ class SearchIntegrator:
         In production, integrate with actual search APIs
         (Google Custom Search, Bing API, etc.)
         """
-        # Check cache
-        cached = self.cache.get(query, "web")
-        if cached:
-            self._stats['cache_hits'] += 1
-            return cached
-        
+        return await self._cached_search(
+            "web", query, lambda: self._fetch_web(query, max_results),
+            {'max_results': max_results}
+        )
+    
+    async def _fetch_web(self, query: str, max_results: int) -> List[SearchResult]:
         await self.rate_limiter.acquire("web")
         
         try:
@@ -234,7 +460,7 @@ class SearchIntegrator:
             # In production, replace with actual API call
             results = self._simulate_web_search(query, max_results)
             
-            self.cache.set(query, "web", results)
+            self.cache.set(query, "web", results, {'max_results': max_results})
             self._stats['api_calls']['web'] += 1
             
             return results
@@ -288,12 +514,17 @@ class SearchIntegrator:
         
         Uses the ArXiv API to search for papers.
         """
-        # Check cache
-        cached = self.cache.get(query, "arxiv")
-        if cached:
-            self._stats['cache_hits'] += 1
-            return cached
-        
+        return await self._cached_search(
+            "arxiv", query, lambda: self._fetch_arxiv(query, max_results, sort_by),
+            {'max_results': max_results, 'sort_by': sort_by}
+        )
+    
+    async def _fetch_arxiv(
+        self,
+        query: str,
+        max_results: int,
+        sort_by: str
+    ) -> List[SearchResult]:
         await self.rate_limiter.acquire("arxiv")
         
         try:
@@ -318,7 +549,8 @@ class SearchIntegrator:
                 xml_content = await response.text()
                 results = self._parse_arxiv_response(xml_content)
                 
-                self.cache.set(query, "arxiv", results)
+                self.cache.set(query, "arxiv", results,
+                               {'max_results': max_results, 'sort_by': sort_by})
                 self._stats['api_calls']['arxiv'] += 1
                 
                 return results
@@ -382,12 +614,17 @@ class SearchIntegrator:
         
         Uses the GitHub Search API.
         """
-        # Check cache
-        cached = self.cache.get(query, "github")
-        if cached:
-            self._stats['cache_hits'] += 1
-            return cached
-        
+        return await self._cached_search(
+            "github", query, lambda: self._fetch_github(query, max_results, search_type),
+            {'max_results': max_results, 'search_type': search_type}
+        )
+    
+    async def _fetch_github(
+        self,
+        query: str,
+        max_results: int,
+        search_type: str
+    ) -> List[SearchResult]:
         await self.rate_limiter.acquire("github")
         
         try:
@@ -414,7 +651,8 @@ class SearchIntegrator:
                 data = await response.json()
                 results = self._parse_github_response(data, search_type)
                 
-                self.cache.set(query, "github", results)
+                self.cache.set(query, "github", results,
+                               {'max_results': max_results, 'search_type': search_type})
                 self._stats['api_calls']['github'] += 1
                 
                 return results
@@ -577,7 +815,8 @@ class SearchIntegrator:
                 if self._stats['total_searches'] > 0 else 0
             ),
             'api_calls': dict(self._stats['api_calls']),
-            'errors': dict(self._stats['errors'])
+            'errors': dict(self._stats['errors']),
+            'cache': self.cache.get_stats()
         }
     
     def clear_cache(self):
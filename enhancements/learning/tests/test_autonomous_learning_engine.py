@@ -5,7 +5,7 @@ Unit tests for Autonomous Learning Engine
 
 import asyncio
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List
 
 import sys
@@ -19,7 +19,10 @@ from autonomous_learning_engine import (
     LearningExperiment,
     PatternRecognizer,
     KnowledgeAccumulator,
-    AutonomousLearningEngine
+    AutonomousLearningEngine,
+    _ONLINE_SEMANTIC_STATES,
+    _drop_online_semantic_state,
+    _online_semantic_step
 )
 
 
@@ -116,6 +119,71 @@ class TestPatternRecognizer(unittest.TestCase):
         
         asyncio.run(test())
     
+    def test_online_semantic_clusters_persist(self):
+        """Test that online clustering assigns later batches to existing clusters."""
+        recognizer = PatternRecognizer(online=True, n_components=5, n_clusters=2)
+        topics = ["machine learning model training", "network packet router latency"]
+        
+        def batch(offset):
+            return [
+                LearningObservation(id="", source="s", content=f"{topics[i % 2]} {offset + i}",
+                                    timestamp=datetime.now())
+                for i in range(10)
+            ]
+        
+        async def test():
+            first = await recognizer.recognize_patterns(batch(0), pattern_type=PatternType.SEMANTIC)
+            second = await recognizer.recognize_patterns(batch(10), pattern_type=PatternType.SEMANTIC)
+            recognizer.shutdown()
+            self.assertEqual(len(first), 2)
+            self.assertEqual(len(second), 2)
+            self.assertEqual(sorted(p.metadata['cluster_size'] for p in second), [10, 10])
+        
+        asyncio.run(test())
+    
+    def test_online_temporal_statistics(self):
+        """Test that periodicity is tracked across batches."""
+        start = datetime(2026, 1, 1)
+        
+        def batch(offset):
+            return [
+                LearningObservation(id="", source="s", content=f"tick {i}",
+                                    timestamp=start + timedelta(seconds=30 * (offset + i)))
+                for i in range(5)
+            ]
+        
+        recognizer = PatternRecognizer(online=True)
+        
+        async def test():
+            await recognizer.recognize_patterns(batch(0), pattern_type=PatternType.TEMPORAL)
+            patterns = await recognizer.recognize_patterns(batch(5), pattern_type=PatternType.TEMPORAL)
+            self.assertEqual(len(patterns), 1)
+            self.assertAlmostEqual(patterns[0].metadata['mean_interval'], 30.0)
+            self.assertAlmostEqual(patterns[0].metadata['std_interval'], 0.0)
+        
+        asyncio.run(test())
+    
+    def test_batch_mode_by_default(self):
+        """Test that online clustering is opt-in."""
+        self.assertFalse(self.recognizer.online)
+    
+    def test_online_warm_batch_fit_once(self):
+        """Test that the warm-up batch is fitted once and the state stays in the worker."""
+        key = "test-warm"
+        texts = [f"topic {i % 2} words {i}" for i in range(10)]
+        try:
+            labels, counts = _online_semantic_step(key, 2 ** 12, 5, 2, texts)
+            state = _ONLINE_SEMANTIC_STATES[key]
+            self.assertEqual(state.kmeans.n_steps_, 1)
+            self.assertEqual(int(counts.sum()), 10)
+            
+            labels, counts = _online_semantic_step(key, 2 ** 12, 5, 2, texts[:4])
+            self.assertIs(_ONLINE_SEMANTIC_STATES[key], state)
+            self.assertEqual(state.kmeans.n_steps_, 2)
+            self.assertEqual(int(counts.sum()), 14)
+        finally:
+            _drop_online_semantic_state(key)
+    
     def test_get_patterns_filtering(self):
         """Test pattern retrieval with filtering."""
         patterns = self.recognizer.get_patterns(
@@ -173,6 +241,55 @@ class TestKnowledgeAccumulator(unittest.TestCase):
         
         asyncio.run(test())
     
+    def _pattern(self, pattern_id, description, frequency=1):
+        return DiscoveredPattern(
+            id=pattern_id,
+            pattern_type=PatternType.SEMANTIC,
+            description=description,
+            observations=[],
+            confidence=0.8,
+            created_at=datetime.now(),
+            last_updated=datetime.now(),
+            frequency=frequency
+        )
+    
+    def test_near_duplicate_merge(self):
+        """Test that near-duplicate descriptions merge and distinct ones don't."""
+        base = "alpha beta gamma delta epsilon zeta eta theta iota kappa"
+        
+        async def test():
+            await self.accumulator.accumulate([self._pattern("p1", base)], "s")
+            near = await self.accumulator.accumulate(
+                [self._pattern("p2", base + " lambda")], "s"
+            )
+            far = await self.accumulator.accumulate(
+                [self._pattern("p3", "alpha beta gamma delta epsilon omega")], "s"
+            )
+            self.assertEqual(near['merged'], 1)
+            self.assertEqual(far['added'], 1)
+            self.assertEqual(len(self.accumulator._knowledge), 2)
+        
+        asyncio.run(test())
+    
+    def test_consolidation_evicts_lowest_scores(self):
+        """Test that consolidation keeps the highest confidence * frequency items."""
+        accumulator = KnowledgeAccumulator(max_knowledge_items=3)
+        patterns = [
+            self._pattern(f"p{i}", f"pattern number {i} unique{i}", frequency=i + 1)
+            for i in range(5)
+        ]
+        
+        async def test():
+            await accumulator.accumulate(patterns, "s")
+            kept = sorted(item['frequency'] for item in accumulator._knowledge.values())
+            self.assertEqual(kept, [3, 4, 5])
+            self.assertEqual(len(accumulator._lsh), 3)
+            # Evicted descriptions are gone from the merge index
+            stats = await accumulator.accumulate([patterns[0]], "s")
+            self.assertEqual(stats['added'], 1)
+        
+        asyncio.run(test())
+    
     def test_get_knowledge(self):
         """Test knowledge retrieval."""
         knowledge = self.accumulator.get_knowledge(query="test", limit=10)
@@ -12,6 +12,7 @@ sys.path.insert(0, '/mnt/okcomputer/output/ufo-galaxy-v5/enhancements/learning')
 from feedback_loop import (
     FeedbackType,
     FeedbackTarget,
+    FeedbackEntry,
     FeedbackRecord,
     PerformanceMetric,
     MetricsTracker,
@@ -271,6 +272,69 @@ class TestMetricsTracker(unittest.TestCase):
         self.assertIn("metric_c", all_metrics)
 
 
+class TestMetricRollups(unittest.TestCase):
+    """Test sliding-window rollups and the array-backed Q-table."""
+    
+    def test_window_rollup_matches_history(self):
+        """Test window aggregates agree with the retained history."""
+        tracker = MetricsTracker(max_history=50, windows=(10, 50))
+        start = datetime(2026, 1, 1)
+        values = [float((i * 37) % 23) for i in range(200)]
+        for i, value in enumerate(values):
+            tracker.record_metric(PerformanceMetric(
+                metric_name="latency", value=value,
+                timestamp=start + timedelta(seconds=i)
+            ))
+        
+        rollup = tracker.get_rollup("latency", window=10)
+        self.assertEqual(rollup['count'], 10)
+        self.assertAlmostEqual(rollup['sum'], sum(values[-10:]))
+        self.assertEqual(rollup['min'], min(values[-10:]))
+        self.assertEqual(rollup['max'], max(values[-10:]))
+        self.assertAlmostEqual(tracker.get_average("latency", 100), sum(values[-50:]) / 50)
+        self.assertAlmostEqual(tracker.get_average("latency", 5), sum(values[-5:]) / 5)
+    
+    def test_decayed_average(self):
+        """Test the decayed average favours recent values."""
+        tracker = MetricsTracker(half_life_seconds=1.0)
+        start = datetime(2026, 1, 1)
+        tracker.record_metric(PerformanceMetric("m", 0.0, timestamp=start))
+        tracker.record_metric(PerformanceMetric("m", 10.0, timestamp=start + timedelta(seconds=10)))
+        
+        self.assertGreater(tracker.get_decayed_average("m"), 9.9)
+        self.assertIsNone(tracker.get_decayed_average("missing"))
+    
+    def test_feedback_stats_after_eviction(self):
+        """Test feedback counts track the bounded history."""
+        loop = FeedbackLoop(max_history=3)
+        for i, feedback_type in enumerate([FeedbackType.POSITIVE] * 2 + [FeedbackType.NEGATIVE] * 2):
+            loop.add_feedback(FeedbackEntry(str(i), feedback_type, "s", "t", "c", confidence=1.0))
+        
+        stats = loop.get_feedback_stats()
+        self.assertEqual(stats['total_feedback'], 3)
+        self.assertEqual(stats['by_type'], {'POSITIVE': 1, 'NEGATIVE': 2})
+        self.assertEqual(
+            [e.feedback_id for e in loop.get_recent_feedback(FeedbackType.POSITIVE)], ["1"]
+        )
+    
+    def test_batch_q_update_matches_sequential(self):
+        """Test batch updates equal sequential ones for independent pairs."""
+        batch = [(f"s{i}", f"a{i % 3}", float(i), "end") for i in range(1, 20)]
+        batch += [("s0", "a0", 1.0, "end")] * 3
+        sequential = ReinforcementLearner()
+        for transition in batch:
+            sequential.update_q_value(*transition)
+        batched = ReinforcementLearner()
+        batched.update_q_values(batch)
+        
+        for i in range(20):
+            self.assertAlmostEqual(
+                batched.get_q_value(f"s{i}", f"a{i % 3}"),
+                sequential.get_q_value(f"s{i}", f"a{i % 3}")
+            )
+        self.assertEqual(batched.get_policy("end"), {})
+
+
 class TestReinforcementLearner(unittest.TestCase):
     """Test ReinforcementLearner class."""
     
@@ -534,6 +598,7 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestFeedbackRecord))
     suite.addTests(loader.loadTestsFromTestCase(TestPerformanceMetric))
     suite.addTests(loader.loadTestsFromTestCase(TestMetricsTracker))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetricRollups))
     suite.addTests(loader.loadTestsFromTestCase(TestReinforcementLearner))
     suite.addTests(loader.loadTestsFromTestCase(TestFeedbackLoop))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Knowledge Graph
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import networkx as nx
+
+import sys
+sys.path.insert(0, '/mnt/okcomputer/output/ufo-galaxy-v5/enhancements/learning')
+
+from knowledge_graph import (
+    EntityType,
+    RelationshipType,
+    Entity,
+    Relationship,
+    KnowledgeGraph
+)
+
+
+def make_entity(entity_id, name, description="", entity_type=EntityType.CONCEPT, **properties):
+    return Entity(
+        id=entity_id,
+        entity_type=entity_type,
+        name=name,
+        description=description,
+        properties=properties
+    )
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test trigram-indexed search."""
+
+    def setUp(self):
+        self.kg = KnowledgeGraph("test")
+        self.kg.add_entities([
+            make_entity("ml", "Machine Learning", "Learning from data"),
+            make_entity("dl", "Deep Learning", "Neural networks"),
+            make_entity("tf", "TensorFlow", "Framework for deep learning",
+                        entity_type=EntityType.TECHNOLOGY),
+            make_entity("gh", "Geoffrey Hinton", "Researcher",
+                        entity_type=EntityType.PERSON),
+        ])
+
+    def test_search_scores_name_over_description(self):
+        """Name matches rank above description-only matches."""
+        results = [e.id for e in self.kg.search("learning")]
+        self.assertEqual(results, ["ml", "dl", "tf"])
+
+    def test_search_type_filter(self):
+        """Type filter restricts candidates."""
+        results = self.kg.search("learning", entity_types=[EntityType.TECHNOLOGY])
+        self.assertEqual([e.id for e in results], ["tf"])
+
+    def test_short_query_scan(self):
+        """Queries shorter than a trigram still match."""
+        results = [e.id for e in self.kg.search("ge")]
+        self.assertIn("gh", results)
+
+    def test_search_no_match(self):
+        """Unknown trigrams return nothing."""
+        self.assertEqual(self.kg.search("quantum"), [])
+
+    def test_search_follows_update(self):
+        """Updated text is searchable and old text is not."""
+        self.kg.update_entity("gh", {"name": "Yann LeCun"})
+        self.assertEqual(self.kg.search("hinton"), [])
+        self.assertEqual([e.id for e in self.kg.search("lecun")], ["gh"])
+
+    def test_search_follows_removal(self):
+        """Removed entities are not returned."""
+        self.kg.remove_entity("dl")
+        self.assertEqual([e.id for e in self.kg.search("learning")], ["ml", "tf"])
+
+    def test_search_after_rebuild(self):
+        """Index rebuild preserves results."""
+        for i in range(1100):
+            self.kg.add_entity(make_entity(f"tmp{i}", f"Temporary {i}"))
+            self.kg.remove_entity(f"tmp{i}")
+        self.assertEqual([e.id for e in self.kg.search("learning")], ["ml", "dl", "tf"])
+        self.assertLess(self.kg._text_garbage, 1100)
+
+
+class TestSimilarity(unittest.TestCase):
+    """Test sparse common-neighbor similarity."""
+
+    def setUp(self):
+        self.kg = KnowledgeGraph("test")
+        for eid in "abcxyz":
+            self.kg.add_entity(make_entity(eid, eid))
+        for source, target in [("a", "x"), ("a", "y"), ("a", "z"),
+                               ("b", "x"), ("b", "y"), ("c", "x")]:
+            self.kg.add_relationship(Relationship(
+                id="", source_id=source, target_id=target,
+                relationship_type=RelationshipType.RELATED_TO
+            ))
+
+    def test_common_neighbors(self):
+        """Counts shared out-neighbors."""
+        self.assertEqual(self.kg.find_similar_entities("a"), [("b", 2)])
+        self.assertEqual(
+            self.kg.find_similar_entities("a", min_common_neighbors=1),
+            [("b", 2), ("c", 1)]
+        )
+
+    def test_jaccard(self):
+        """Jaccard normalises by neighborhood union."""
+        results = dict(self.kg.find_similar_entities(
+            "a", min_common_neighbors=1, metric="jaccard"
+        ))
+        self.assertAlmostEqual(results["b"], 2 / 3)
+        self.assertAlmostEqual(results["c"], 1 / 3)
+
+    def test_top_k(self):
+        """top_k truncates results."""
+        results = self.kg.find_similar_entities("a", min_common_neighbors=1, top_k=1)
+        self.assertEqual(results, [("b", 2)])
+
+    def test_cache_invalidated_by_mutation(self):
+        """Adjacency reflects relationship changes."""
+        self.kg.find_similar_entities("a")
+        self.kg.add_relationship(Relationship(
+            id="", source_id="c", target_id="y",
+            relationship_type=RelationshipType.RELATED_TO
+        ))
+        self.assertEqual(self.kg.find_similar_entities("a"), [("b", 2), ("c", 2)])
+        self.kg.remove_entity("b")
+        self.assertEqual(self.kg.find_similar_entities("a"), [("c", 2)])
+
+    def test_unknown_entity(self):
+        """Unknown entities have no similar entities."""
+        self.assertEqual(self.kg.find_similar_entities("missing"), [])
+
+    def test_invalid_metric(self):
+        """Unknown metrics are rejected."""
+        with self.assertRaises(ValueError):
+            self.kg.find_similar_entities("a", metric="cosine")
+
+
+class TestPropertyIndex(unittest.TestCase):
+    """Test property hash indexes."""
+
+    def setUp(self):
+        self.kg = KnowledgeGraph("test", property_index_threshold=2)
+        for i in range(10):
+            self.kg.add_entity(make_entity(
+                f"e{i}", f"Entity {i}", domain="vision" if i % 2 else "nlp", rank=i
+            ))
+
+    def test_auto_index(self):
+        """Repeatedly filtered keys get indexed."""
+        self.kg.query_by_properties({"domain": "nlp"})
+        self.assertEqual(self.kg.get_property_indexes(), [])
+        results = self.kg.query_by_properties({"domain": "nlp"})
+        self.assertEqual(self.kg.get_property_indexes(), ["domain"])
+        self.assertEqual([e.id for e in results], ["e0", "e2", "e4", "e6", "e8"])
+
+    def test_index_maintained(self):
+        """Index follows updates, removals and additions."""
+        self.kg.create_property_index("domain")
+        self.kg.update_entity("e0", {"properties": {"domain": "vision"}})
+        self.kg.remove_entity("e2")
+        self.kg.add_entity(make_entity("e10", "Entity 10", domain="nlp"))
+        results = self.kg.query_by_properties({"domain": "nlp"})
+        self.assertEqual([e.id for e in results], ["e4", "e6", "e8", "e10"])
+
+    def test_index_with_multiple_filters(self):
+        """All filters are verified against indexed candidates."""
+        self.kg.create_property_index("domain")
+        results = self.kg.query_by_properties({"domain": "vision", "rank": 3})
+        self.assertEqual([e.id for e in results], ["e3"])
+
+    def test_unhashable_values(self):
+        """Unhashable values fall back to a scan."""
+        self.kg.create_property_index("tags")
+        self.kg.add_entity(make_entity("t", "Tagged", tags=["a", "b"]))
+        results = self.kg.query_by_properties({"tags": ["a", "b"]})
+        self.assertEqual([e.id for e in results], ["t"])
+
+    def test_drop_index(self):
+        """Dropped indexes are no longer used."""
+        self.kg.create_property_index("domain")
+        self.assertTrue(self.kg.drop_property_index("domain"))
+        self.assertFalse(self.kg.drop_property_index("domain"))
+        self.assertEqual(len(self.kg.query_by_properties({"domain": "nlp"})), 5)
+
+
+class TestCentrality(unittest.TestCase):
+    """Test maintained degree centrality."""
+
+    def setUp(self):
+        self.kg = KnowledgeGraph("test")
+        for eid in "abcde":
+            self.kg.add_entity(make_entity(eid, eid))
+        for source, target in [("a", "b"), ("a", "c"), ("a", "d"), ("b", "c")]:
+            self.kg.add_relationship(Relationship(
+                id="", source_id=source, target_id=target,
+                relationship_type=RelationshipType.USES
+            ))
+
+    def test_matches_networkx(self):
+        """Scores and order match NetworkX degree centrality."""
+        expected = sorted(
+            nx.degree_centrality(self.kg._graph).items(),
+            key=lambda x: x[1], reverse=True
+        )[:3]
+        self.assertEqual(list(self.kg.calculate_centrality(3).items()), expected)
+
+    def test_follows_mutations(self):
+        """Top entities reflect edge and node removal."""
+        self.assertEqual(next(iter(self.kg.calculate_centrality(1))), "a")
+        self.kg.remove_entity("a")
+        self.assertEqual(self.kg.calculate_centrality(2), {"b": 1 / 3, "c": 1 / 3})
+
+    def test_cached_per_version(self):
+        """Results are reused until the graph changes."""
+        first = self.kg.calculate_centrality(2)
+        self.assertEqual(self.kg.calculate_centrality(2), first)
+        self.kg.add_relationship(Relationship(
+            id="", source_id="e", target_id="d",
+            relationship_type=RelationshipType.USES
+        ))
+        self.assertEqual(self.kg.calculate_centrality(5)["e"], 1 / 4)
+
+
+class TestCommunities(unittest.TestCase):
+    """Test incremental community detection."""
+
+    def setUp(self):
+        self.kg = KnowledgeGraph("test")
+        self.groups = [[f"g{g}_{i}" for i in range(6)] for g in range(3)]
+        for group in self.groups:
+            for eid in group:
+                self.kg.add_entity(make_entity(eid, eid))
+            for i, source in enumerate(group):
+                for target in group[i + 1:]:
+                    self.add_edge(source, target)
+        self.add_edge("g0_0", "g1_0")
+        self.add_edge("g1_1", "g2_0")
+
+    def add_edge(self, source, target):
+        return self.kg.add_relationship(Relationship(
+            id="", source_id=source, target_id=target,
+            relationship_type=RelationshipType.RELATED_TO
+        ))
+
+    def test_detects_cliques(self):
+        """Densely connected groups form communities."""
+        communities = self.kg.detect_communities()
+        self.assertEqual(sorted(map(sorted, communities)), sorted(self.groups))
+
+    def test_new_node_joins_neighbors(self):
+        """A node attached to one group joins that community."""
+        self.kg.detect_communities()
+        self.kg.add_entity(make_entity("new", "new"))
+        self.add_edge("new", "g2_3")
+        self.add_edge("g2_4", "new")
+        community_of = {
+            eid: i for i, c in enumerate(self.kg.detect_communities()) for eid in c
+        }
+        self.assertEqual(community_of["new"], community_of["g2_3"])
+
+    def test_split_on_removal(self):
+        """Disconnected parts of a community are separated."""
+        self.kg.add_entity(make_entity("x", "x"))
+        self.kg.add_entity(make_entity("y", "y"))
+        rel_id = self.add_edge("x", "y")
+        self.assertIn(["x", "y"], self.kg.detect_communities())
+        self.kg.remove_relationship(rel_id)
+        communities = self.kg.detect_communities()
+        self.assertIn(["x"], communities)
+        self.assertIn(["y"], communities)
+
+    def test_partition_after_removal(self):
+        """Every remaining entity belongs to exactly one community."""
+        self.kg.detect_communities()
+        self.kg.remove_entity("g1_0")
+        members = [eid for c in self.kg.detect_communities() for eid in c]
+        self.assertEqual(sorted(members), sorted(self.kg._entity_index))
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test columnar snapshots and delta logs."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "graph.kgs")
+        self.kg = KnowledgeGraph("snapshot_test")
+        self.kg.add_entities([
+            make_entity("ml", "Machine Learning", "Learning from data", field="ai"),
+            make_entity("dl", "Deep Learning", "Neural networks", layers=[1, 2]),
+            make_entity("tf", "TensorFlow", "Framework", entity_type=EntityType.TECHNOLOGY),
+        ])
+        self.kg.add_relationships([
+            Relationship(id="r1", source_id="dl", target_id="ml",
+                         relationship_type=RelationshipType.IS_A),
+            Relationship(id="r2", source_id="tf", target_id="dl",
+                         relationship_type=RelationshipType.IMPLEMENTS,
+                         properties={"weight": 0.5}),
+        ])
+
+    def tearDown(self):
+        self.kg.close_delta_log()
+        shutil.rmtree(self.directory)
+
+    def snapshot_state(self, kg):
+        return (
+            [e.to_dict() for e in kg._entity_index.values()],
+            [r.to_dict() for r in kg._relationship_index.values()],
+            sorted(kg._graph.edges())
+        )
+
+    def test_roundtrip(self):
+        """Lazy and eager loads reproduce the graph."""
+        self.kg.save_snapshot(self.path, delta_log=False)
+        for lazy in (True, False):
+            loaded = KnowledgeGraph.load_snapshot(self.path, lazy=lazy, delta_log=False)
+            self.assertEqual(loaded.name, "snapshot_test")
+            self.assertEqual(self.snapshot_state(loaded), self.snapshot_state(self.kg))
+
+    def test_lazy_queries(self):
+        """Queries work before records are decoded."""
+        self.kg.save_snapshot(self.path, delta_log=False)
+        loaded = KnowledgeGraph.load_snapshot(self.path, delta_log=False)
+        self.assertEqual([e.id for e in loaded.search("learning")], ["ml", "dl"])
+        self.assertEqual(loaded.get_entity("dl").properties, {"layers": [1, 2]})
+        self.assertEqual(
+            [r.id for r in loaded.get_entity_relationships("dl")], ["r1", "r2"]
+        )
+        self.assertEqual(loaded.calculate_centrality(1), {"dl": 1.0})
+        self.assertTrue(loaded.remove_entity("dl"))
+        self.assertIsNone(loaded.get_relationship("r2"))
+
+    def test_delta_log_replay(self):
+        """Mutations after a snapshot are replayed from the delta log."""
+        self.kg.save_snapshot(self.path)
+        self.kg.update_entity("tf", {"name": "PyTorch"})
+        self.kg.remove_relationship("r1")
+        self.kg.add_entity(make_entity("new", "New Entity"))
+        self.kg.close_delta_log()
+
+        loaded = KnowledgeGraph.load_snapshot(self.path, delta_log=False)
+        self.assertEqual(self.snapshot_state(loaded), self.snapshot_state(self.kg))
+        self.assertEqual([e.id for e in loaded.search("pytorch")], ["tf"])
+
+    def test_torn_delta_entry(self):
+        """A partially written final entry is discarded."""
+        self.kg.save_snapshot(self.path)
+        self.kg.add_entity(make_entity("new", "New Entity"))
+        self.kg.close_delta_log()
+        with open(self.path + ".delta", "a") as f:
+            f.write('{"op": "entity", "da')
+
+        loaded = KnowledgeGraph.load_snapshot(self.path)
+        loaded.add_entity(make_entity("newer", "Newer Entity"))
+        loaded.close_delta_log()
+        reloaded = KnowledgeGraph.load_snapshot(self.path, delta_log=False)
+        self.assertIsNotNone(reloaded.get_entity("new"))
+        self.assertIsNotNone(reloaded.get_entity("newer"))
+
+    def test_compaction_truncates_delta(self):
+        """Saving a snapshot folds in and resets the delta log."""
+        self.kg.save_snapshot(self.path)
+        self.kg.add_entity(make_entity("new", "New Entity"))
+        self.kg.save_snapshot(self.path)
+        self.assertEqual(os.path.getsize(self.path + ".delta"), 0)
+        loaded = KnowledgeGraph.load_snapshot(self.path, delta_log=False)
+        self.assertIsNotNone(loaded.get_entity("new"))
+
+    def test_rejects_other_files(self):
+        """Non-snapshot files are rejected."""
+        self.kg.save(self.path)
+        with self.assertRaises(ValueError):
+            KnowledgeGraph.load_snapshot(self.path)
+
+
+class TestMutations(unittest.TestCase):
+    """Test index bookkeeping on mutation."""
+
+    def test_remove_entity_with_relationships(self):
+        """Removing an entity removes its relationships."""
+        kg = KnowledgeGraph("test")
+        kg.add_entities([make_entity("a", "A"), make_entity("b", "B")])
+        kg.add_relationship(Relationship(
+            id="r", source_id="a", target_id="b",
+            relationship_type=RelationshipType.USES
+        ))
+        self.assertTrue(kg.remove_entity("a"))
+        self.assertIsNone(kg.get_relationship("r"))
+        self.assertEqual(kg.get_entity_relationships("b"), [])
+
+    def test_version_increments(self):
+        """Every mutation bumps the version."""
+        kg = KnowledgeGraph("test")
+        version = kg.version
+        kg.add_entity(make_entity("a", "A"))
+        kg.update_entity("a", {"name": "AA"})
+        kg.remove_entity("a")
+        self.assertEqual(kg.version, version + 3)
+
+    def test_update_entity_type(self):
+        """Type index follows entity type changes."""
+        kg = KnowledgeGraph("test")
+        kg.add_entity(make_entity("a", "A"))
+        kg.update_entity("a", {"entity_type": EntityType.PERSON})
+        self.assertEqual(kg.get_entities_by_type(EntityType.CONCEPT), [])
+        self.assertEqual(len(kg.get_entities_by_type(EntityType.PERSON)), 1)
+
+
+def run_tests():
+    """Run all tests."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestSimilarity))
+    suite.addTests(loader.loadTestsFromTestCase(TestPropertyIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestCentrality))
+    suite.addTests(loader.loadTestsFromTestCase(TestCommunities))
+    suite.addTests(loader.loadTestsFromTestCase(TestSnapshot))
+    suite.addTests(loader.loadTestsFromTestCase(TestMutations))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
@@ -4,6 +4,8 @@ Unit tests for Search Integrator
 """
 
 import asyncio
+import os
+import tempfile
 import unittest
 from datetime import datetime
 
@@ -175,6 +177,94 @@ class TestResultCache(unittest.TestCase):
         cached = self.cache.get("query", "web")
         self.assertIsNone(cached)
 
+    
+    def _results(self, title="T1"):
+        return [SearchResult(id="", source=SearchSource.WEB, title=title,
+                             content="C" * 600, url=f"U-{title}")]
+    
+    def test_cache_lru_bound(self):
+        """Test least recently used entries are evicted beyond max_entries."""
+        cache = ResultCache(ttl_seconds=3600, max_entries=2)
+        cache.set("a", "web", self._results("a"))
+        cache.set("b", "web", self._results("b"))
+        cache.get("a", "web")
+        cache.set("c", "web", self._results("c"))
+        
+        self.assertIsNone(cache.get("b", "web"))
+        self.assertIsNotNone(cache.get("a", "web"))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+    
+    def test_purge_expired(self):
+        """Test the expiry sweep drops entries without a read."""
+        cache = ResultCache(ttl_seconds=0)
+        cache.set("a", "web", self._results())
+        cache.set("b", "web", self._results())
+        
+        self.assertEqual(cache.purge_expired(), 2)
+        self.assertEqual(cache.get_stats()['size'], 0)
+    
+    def test_cache_persistence(self):
+        """Test cached results survive a save/load round trip."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.json")
+            results = self._results()
+            self.cache.set("query", "web", results)
+            self.cache.save(path)
+            
+            restored = ResultCache(persist_path=path)
+            cached = restored.get("query", "web")
+            self.assertEqual(cached[0].to_dict(), results[0].to_dict())
+            self.assertEqual(len(cached[0].content), 600)
+    
+    def test_single_flight(self):
+        """Test concurrent identical fetches reach the upstream once."""
+        calls = []
+        
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return self._results()
+        
+        async def test():
+            results = await asyncio.gather(*[
+                self.cache.single_flight("query", "web", fetch) for _ in range(5)
+            ])
+            self.assertEqual(len(calls), 1)
+            self.assertTrue(all(r is results[0] for r in results))
+            self.assertEqual(self.cache.get_stats()['coalesced'], 4)
+
+        asyncio.run(test())
+
+    def test_single_flight_leader_cancelled(self):
+        """Test cancelling the first caller does not cancel coalesced waiters."""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return self._results()
+
+        async def test():
+            leader = asyncio.create_task(self.cache.single_flight("query", "web", fetch))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(self.cache.single_flight("query", "web", fetch))
+            await asyncio.sleep(0)
+            leader.cancel()
+            results = await waiter
+            self.assertTrue(leader.cancelled())
+            self.assertEqual(results[0].title, "T1")
+            self.assertEqual(len(calls), 1)
+
+        asyncio.run(test())
+
+    def test_params_in_key(self):
+        """Test requests with different options are cached separately."""
+        self.cache.set("query", "web", self._results("three"), {'max_results': 3})
+        self.assertIsNone(self.cache.get("query", "web", {'max_results': 10}))
+        self.assertIsNone(self.cache.get("query", "web"))
+        cached = self.cache.get("query", "web", {'max_results': 3})
+        self.assertEqual(cached[0].title, "three")
+
 
 class TestSearchIntegrator(unittest.TestCase):
     """Test SearchIntegrator class."""
@@ -222,7 +312,33 @@ class TestSearchIntegrator(unittest.TestCase):
             
             stats = self.integrator.get_stats()
             self.assertEqual(stats['cache_hits'], 1)
-        
+
+        asyncio.run(test())
+
+    def test_cache_keyed_by_max_results(self):
+        """Test a different max_results is not served another request's results."""
+        async def test():
+            few = await self.integrator.search_web("sized_query", max_results=2)
+            many = await self.integrator.search_web("sized_query", max_results=5)
+            self.assertEqual(len(few), 2)
+            self.assertEqual(len(many), 5)
+            self.assertEqual(self.integrator.get_stats()['cache_hits'], 0)
+
+        asyncio.run(test())
+
+    def test_cached_empty_result_is_hit(self):
+        """Test a cached empty result is served without calling upstream."""
+        async def test():
+            self.integrator.cache.set("empty", "web", [], {'max_results': 10})
+
+            async def fail(*args):
+                raise AssertionError("upstream called")
+            self.integrator._fetch_web = fail
+
+            results = await self.integrator.search_web("empty")
+            self.assertEqual(results, [])
+            self.assertEqual(self.integrator.get_stats()['cache_hits'], 1)
+
         asyncio.run(test())
     
     def test_rank_results(self):
@@ -60,6 +60,8 @@ from .device_manager import (
     DeviceManager,
     DeviceRegistrationRequest,
     DeviceHeartbeatRequest,
+    HeartbeatBatchRequest,
+    encode_heartbeat_batch,
     DeviceUpdateRequest,
     DeviceResponse,
     DeviceListResponse,
@@ -105,7 +107,10 @@ from .android_bridge import (
     TouchEvent,
     SwipeEvent,
     KeyEvent,
+    ScreenFrame,
     ADBCommandExecutor,
+    TileDiffer,
+    ScreenStream,
     AndroidBridge
 )
 
@@ -153,6 +158,8 @@ __all__ = [
     'DeviceManager',
     'DeviceRegistrationRequest',
     'DeviceHeartbeatRequest',
+    'HeartbeatBatchRequest',
+    'encode_heartbeat_batch',
     'DeviceUpdateRequest',
     'DeviceResponse',
     'DeviceListResponse',
@@ -192,7 +199,10 @@ __all__ = [
     'TouchEvent',
     'SwipeEvent',
     'KeyEvent',
+    'ScreenFrame',
     'ADBCommandExecutor',
+    'TileDiffer',
+    'ScreenStream',
     'AndroidBridge',
     
     # Failover Manager
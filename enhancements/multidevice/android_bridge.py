@@ -7,7 +7,7 @@ screen capture, device control, and app management.
 
 Features:
 - ADB command wrapper
-- Screen capture and streaming
+- Screen capture and streaming (adaptive, change-driven)
 - Touch/Key input control
 - App installation and management
 - Device information retrieval
@@ -26,6 +26,9 @@ import json
 import logging
 import tempfile
 import base64
+import struct
+import zlib
+from collections import defaultdict, deque
 from typing import Dict, List, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -187,6 +190,80 @@ class KeyEvent:
         return f"input keyevent {self.keycode}"
 
 
+@dataclass
+class ScreenFrame:
+    """Screen frame emitted by an adaptive screen stream"""
+    device_id: str
+    sequence: int
+    timestamp: float
+    width: int
+    height: int
+    bytes_per_pixel: int
+    pixels: bytes  # Raw pixel rows as returned by screencap (no header)
+    dirty_regions: List[Tuple[int, int, int, int]] = field(default_factory=list)  # (x, y, w, h)
+    is_keyframe: bool = False
+    
+    @property
+    def dirty_ratio(self) -> float:
+        """Fraction of the screen covered by dirty regions"""
+        total = self.width * self.height
+        if total == 0:
+            return 0.0
+        return sum(w * h for _, _, w, h in self.dirty_regions) / total
+    
+    def crop(self, region: Tuple[int, int, int, int]) -> bytes:
+        """Extract raw pixel rows of a region"""
+        x, y, w, h = region
+        stride = self.width * self.bytes_per_pixel
+        start = x * self.bytes_per_pixel
+        end = start + w * self.bytes_per_pixel
+        view = memoryview(self.pixels)
+        return b"".join(
+            view[row * stride + start:row * stride + end]
+            for row in range(y, y + h)
+        )
+    
+    def to_png(self) -> bytes:
+        """Encode the frame as PNG (RGBA_8888 frames only)"""
+        if self.bytes_per_pixel != 4:
+            raise ScreenCaptureError(
+                f"PNG encoding requires 4 bytes per pixel, got {self.bytes_per_pixel}"
+            )
+        stride = self.width * 4
+        view = memoryview(self.pixels)
+        raw = b"".join(
+            b"\x00" + view[row * stride:(row + 1) * stride]
+            for row in range(self.height)
+        )
+        
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return (
+                struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+            )
+        
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 1))
+            + chunk(b"IEND", b"")
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'device_id': self.device_id,
+            'sequence': self.sequence,
+            'timestamp': self.timestamp,
+            'width': self.width,
+            'height': self.height,
+            'bytes_per_pixel': self.bytes_per_pixel,
+            'dirty_regions': self.dirty_regions,
+            'dirty_ratio': self.dirty_ratio,
+            'is_keyframe': self.is_keyframe
+        }
+
+
 class ADBCommandExecutor:
     """Execute ADB commands"""
     
@@ -290,6 +367,200 @@ class ADBCommandExecutor:
             ["pull", remote_path, local_path],
             device_id
         )
+    
+    async def exec_out(
+        self,
+        command: str,
+        device_id: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> bytes:
+        """Execute command via exec-out and return raw stdout bytes"""
+        cmd = [self.adb_path]
+        
+        if device_id:
+            cmd.extend(["-s", device_id])
+        
+        cmd.extend(["exec-out", command])
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(),
+                timeout=timeout or self.default_timeout
+            )
+            
+            if proc.returncode != 0:
+                error_msg = stderr.decode('utf-8', errors='ignore')
+                if "not found" in error_msg.lower() or "offline" in error_msg.lower():
+                    raise DeviceNotFoundError(f"Device not available: {device_id}")
+                raise ADBError(f"ADB exec-out failed: {error_msg}")
+            
+            return stdout
+        
+        except asyncio.TimeoutError:
+            raise ADBError(f"ADB command timed out after {timeout or self.default_timeout}s")
+        except Exception as e:
+            if isinstance(e, ADBError):
+                raise
+            raise ADBError(f"ADB command error: {e}")
+
+
+class TileDiffer:
+    """
+    Cheap frame differencing over a tile grid
+    
+    Each tile is fingerprinted with CRC32 over its pixel rows (or every
+    ``row_stride``-th row when subsampling is acceptable), so a static
+    screen costs one pass of hashing and no copies. Tiles whose
+    fingerprint changed are merged into dirty rectangles.
+    """
+    
+    def __init__(self, tile_size: int = 64, row_stride: int = 1):
+        self.tile_size = tile_size
+        self.row_stride = max(1, row_stride)
+        self._previous: Optional[List[int]] = None
+        self._geometry: Optional[Tuple[int, int, int]] = None
+    
+    def reset(self) -> None:
+        """Forget the previous frame so the next one is a keyframe"""
+        self._previous = None
+        self._geometry = None
+    
+    def _fingerprint(self, pixels: bytes, width: int, height: int, bpp: int) -> List[int]:
+        tile = self.tile_size
+        cols = (width + tile - 1) // tile
+        rows = (height + tile - 1) // tile
+        stride = width * bpp
+        tile_bytes = tile * bpp
+        view = memoryview(pixels)
+        hashes = [0] * (cols * rows)
+        
+        for y in range(0, height, self.row_stride):
+            base = (y // tile) * cols
+            row_start = y * stride
+            for col in range(cols):
+                start = row_start + col * tile_bytes
+                end = min(start + tile_bytes, row_start + stride)
+                hashes[base + col] = zlib.crc32(view[start:end], hashes[base + col])
+        
+        return hashes
+    
+    def diff(
+        self,
+        pixels: bytes,
+        width: int,
+        height: int,
+        bpp: int
+    ) -> Tuple[bool, List[Tuple[int, int, int, int]]]:
+        """
+        Compare a frame with the previous one
+        
+        Returns:
+            Tuple of (is_keyframe, dirty regions as (x, y, w, h))
+        """
+        hashes = self._fingerprint(pixels, width, height, bpp)
+        geometry = (width, height, bpp)
+        previous = self._previous
+        self._previous = hashes
+        
+        if previous is None or self._geometry != geometry:
+            self._geometry = geometry
+            return True, [(0, 0, width, height)]
+        
+        tile = self.tile_size
+        cols = (width + tile - 1) // tile
+        regions: List[Tuple[int, int, int, int]] = []
+        
+        for index, (old, new) in enumerate(zip(previous, hashes)):
+            if old == new:
+                continue
+            row, col = divmod(index, cols)
+            x, y = col * tile, row * tile
+            w, h = min(tile, width - x), min(tile, height - y)
+            
+            # Extend the previous rectangle when dirty tiles are adjacent on a row
+            if regions:
+                px, py, pw, ph = regions[-1]
+                if py == y and px + pw == x:
+                    regions[-1] = (px, py, pw + w, ph)
+                    continue
+            regions.append((x, y, w, h))
+        
+        return False, regions
+
+
+class ScreenStream:
+    """
+    Bounded async iterator of screen frames
+    
+    Frames are buffered up to ``max_buffered``; when the consumer falls
+    behind the oldest frame is dropped so readers always see fresh state.
+    A dropped frame's dirty regions (and keyframe flag) are folded into
+    the next buffered frame, so consumers that repaint only dirty regions
+    still see every change. ``frames_emitted`` counts frames handed to
+    the consumer, ``frames_dropped`` those discarded before it read them.
+    """
+    
+    def __init__(self, device_id: str, max_buffered: int = 4):
+        self.device_id = device_id
+        self.max_buffered = max(1, max_buffered)
+        self._frames: deque = deque()
+        self._event = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+        
+        self.stats = {
+            'frames_captured': 0,
+            'frames_emitted': 0,
+            'frames_unchanged': 0,
+            'frames_dropped': 0,
+            'capture_errors': 0,
+            'current_interval': 0.0
+        }
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def publish(self, frame: ScreenFrame) -> None:
+        """Enqueue a frame, dropping the oldest one when full"""
+        if self._closed:
+            return
+        if len(self._frames) >= self.max_buffered:
+            dropped = self._frames.popleft()
+            self.stats['frames_dropped'] += 1
+            survivor = self._frames[0] if self._frames else frame
+            if dropped.is_keyframe:
+                survivor.is_keyframe = True
+                survivor.dirty_regions = [(0, 0, survivor.width, survivor.height)]
+            elif not survivor.is_keyframe:
+                survivor.dirty_regions = dropped.dirty_regions + survivor.dirty_regions
+        self._frames.append(frame)
+        self._event.set()
+    
+    def close(self) -> None:
+        """Stop the stream; pending frames can still be drained"""
+        self._closed = True
+        self._event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+    
+    def __aiter__(self) -> "ScreenStream":
+        return self
+    
+    async def __anext__(self) -> ScreenFrame:
+        while not self._frames:
+            if self._closed:
+                raise StopAsyncIteration
+            self._event.clear()
+            await self._event.wait()
+        self.stats['frames_emitted'] += 1
+        return self._frames.popleft()
 
 
 class AndroidBridge:
@@ -306,6 +577,7 @@ class AndroidBridge:
         self._logcat_callbacks: Dict[str, List[Callable]] = defaultdict(list)
         self._logcat_tasks: Dict[str, asyncio.Task] = {}
         self._screen_stream_tasks: Dict[str, asyncio.Task] = {}
+        self._screen_streams: Dict[str, ScreenStream] = {}
         
         logger.info("AndroidBridge initialized")
     
@@ -501,8 +773,137 @@ class AndroidBridge:
         self._screen_stream_tasks[device_id] = task
         logger.info(f"Started screen stream for {device_id}")
     
+    async def capture_screen_raw(self, device_id: str) -> Tuple[int, int, int, bytes]:
+        """
+        Capture uncompressed screen pixels via exec-out
+        
+        Returns:
+            Tuple of (width, height, bytes_per_pixel, pixel bytes)
+        """
+        try:
+            data = await self.adb.exec_out("screencap", device_id)
+        except ADBError as e:
+            raise ScreenCaptureError(f"Screen capture failed: {e}")
+        
+        if len(data) < 12:
+            raise ScreenCaptureError("Screen capture returned no data")
+        
+        width, height = struct.unpack_from("<II", data, 0)
+        if width == 0 or height == 0:
+            raise ScreenCaptureError("Screen capture returned empty frame")
+        
+        # Android 9+ appends a colorspace field to the 12 byte header
+        for header_size in (16, 12):
+            payload = len(data) - header_size
+            if payload > 0 and payload % (width * height) == 0:
+                bpp = payload // (width * height)
+                if bpp in (2, 3, 4):
+                    return width, height, bpp, data[header_size:]
+        
+        raise ScreenCaptureError(
+            f"Unexpected screencap size {len(data)} for {width}x{height}"
+        )
+    
+    async def open_screen_stream(
+        self,
+        device_id: str,
+        fps: int = 10,
+        min_fps: float = 0.5,
+        backoff_factor: float = 1.5,
+        tile_size: int = 64,
+        max_buffered: int = 4,
+        keyframe_interval: float = 30.0
+    ) -> ScreenStream:
+        """
+        Open an adaptive screen stream
+        
+        Only frames that differ from the previous capture are emitted,
+        together with their dirty regions. While the screen is static the
+        capture interval backs off towards ``1 / min_fps`` and snaps back to
+        ``1 / fps`` on the first change.
+        
+        Args:
+            device_id: Device ID
+            fps: Maximum frames per second
+            min_fps: Capture rate floor while the screen is static
+            backoff_factor: Interval multiplier per unchanged frame
+            tile_size: Tile edge in pixels for change detection
+            max_buffered: Frames buffered before dropping the oldest
+            keyframe_interval: Seconds between forced full frames
+            
+        Returns:
+            ScreenStream async iterator of ScreenFrame
+        """
+        await self.stop_screen_stream(device_id)
+        
+        min_interval = 1.0 / fps
+        max_interval = max(min_interval, 1.0 / min_fps)
+        stream = ScreenStream(device_id, max_buffered=max_buffered)
+        differ = TileDiffer(tile_size=tile_size)
+        
+        async def adaptive_loop():
+            interval = min_interval
+            sequence = 0
+            last_keyframe = 0.0
+            
+            while not stream.closed:
+                started = time.monotonic()
+                try:
+                    width, height, bpp, pixels = await self.capture_screen_raw(device_id)
+                    stream.stats['frames_captured'] += 1
+                    
+                    if started - last_keyframe >= keyframe_interval:
+                        differ.reset()
+                    is_keyframe, regions = differ.diff(pixels, width, height, bpp)
+                    
+                    if is_keyframe or regions:
+                        sequence += 1
+                        if is_keyframe:
+                            last_keyframe = started
+                        stream.publish(ScreenFrame(
+                            device_id=device_id,
+                            sequence=sequence,
+                            timestamp=time.time(),
+                            width=width,
+                            height=height,
+                            bytes_per_pixel=bpp,
+                            pixels=pixels,
+                            dirty_regions=regions,
+                            is_keyframe=is_keyframe
+                        ))
+                        interval = min_interval
+                    else:
+                        stream.stats['frames_unchanged'] += 1
+                        interval = min(interval * backoff_factor, max_interval)
+                
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    stream.stats['capture_errors'] += 1
+                    logger.error(f"Screen stream error: {e}")
+                    interval = max_interval
+                
+                stream.stats['current_interval'] = interval
+                elapsed = time.monotonic() - started
+                await asyncio.sleep(max(0.0, interval - elapsed))
+        
+        stream._task = asyncio.create_task(adaptive_loop())
+        self._screen_streams[device_id] = stream
+        logger.info(f"Opened adaptive screen stream for {device_id}")
+        return stream
+    
     async def stop_screen_stream(self, device_id: str) -> None:
         """Stop screen streaming"""
+        stream = self._screen_streams.pop(device_id, None)
+        if stream:
+            stream.close()
+            if stream._task:
+                try:
+                    await stream._task
+                except asyncio.CancelledError:
+                    pass
+            logger.info(f"Closed adaptive screen stream for {device_id}")
+        
         task = self._screen_stream_tasks.pop(device_id, None)
         if task:
             task.cancel()
@@ -889,6 +1290,9 @@ __all__ = [
     'TouchEvent',
     'SwipeEvent',
     'KeyEvent',
+    'ScreenFrame',
     'ADBCommandExecutor',
+    'TileDiffer',
+    'ScreenStream',
     'AndroidBridge'
 ]
@@ -7,8 +7,8 @@ and health tracking for the UFO Galaxy distributed system.
 
 Features:
 - Device registration and discovery (<3s response time)
-- Heartbeat monitoring (5s interval)
-- Device grouping and tagging
+- Heartbeat monitoring (5s interval, timer-wheel deadlines)
+- Device grouping and tagging (indexed by status/type/group/tag)
 - Device health tracking
 - Support for 500+ TPS
 - Cross-platform support (Linux, Android)
@@ -19,6 +19,7 @@ FastAPI Endpoints:
 - GET /devices - List all devices
 - GET /devices/{device_id} - Get device details
 - POST /devices/{device_id}/heartbeat - Device heartbeat
+- POST /devices/heartbeat/batch - Batched heartbeats (columnar encoding)
 - GET /devices/discover - Discover available devices
 - GET /devices/groups/{group} - Get devices by group
 - GET /devices/tags/{tag} - Get devices by tag
@@ -29,13 +30,15 @@ Port: 8056
 """
 
 import asyncio
+import math
 import time
 import uuid
 import logging
-from typing import Dict, List, Optional, Set, Any, Callable
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Set, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 import json
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Depends
@@ -117,6 +120,120 @@ class DeviceListResponse(BaseModel):
     offline_count: int
 
 
+class HeartbeatBatchRequest(BaseModel):
+    """
+    Batched device heartbeats in columnar form
+    
+    Row i of every column belongs to ``device_ids[i]``. Metric columns
+    hold one value per device (``None`` = no sample). With
+    ``encoding="delta"`` each column carries integers quantized to
+    ``precision`` decimals, stored as the difference from the previous
+    non-null value in the same column.
+    """
+    device_ids: List[str]
+    statuses: Optional[List[int]] = None  # Omitted = all ONLINE
+    metric_names: List[str] = Field(default_factory=list)
+    metrics: List[List[Optional[float]]] = Field(default_factory=list)
+    encoding: str = "plain"  # plain | delta
+    precision: int = 1
+    
+    def decode(self) -> List[Tuple[str, DeviceStatus, Dict[str, float]]]:
+        """
+        Decode into (device_id, status, metrics) rows
+        
+        Raises:
+            ValueError: If columns do not line up with device_ids
+        """
+        count = len(self.device_ids)
+        if self.statuses is not None and len(self.statuses) != count:
+            raise ValueError("statuses length does not match device_ids")
+        if len(self.metrics) != len(self.metric_names):
+            raise ValueError("metrics must have one column per metric name")
+        if self.encoding not in ("plain", "delta"):
+            raise ValueError(f"Unknown encoding: {self.encoding}")
+        
+        columns = []
+        for name, column in zip(self.metric_names, self.metrics):
+            if len(column) != count:
+                raise ValueError(f"Metric column {name} length does not match device_ids")
+            if self.encoding == "delta":
+                scale = 10 ** self.precision
+                decoded, running = [], 0
+                for value in column:
+                    if value is None:
+                        decoded.append(None)
+                    else:
+                        running += int(value)
+                        decoded.append(running / scale)
+                column = decoded
+            columns.append(column)
+        
+        rows = []
+        for i, device_id in enumerate(self.device_ids):
+            status = DeviceStatus(self.statuses[i]) if self.statuses is not None else DeviceStatus.ONLINE
+            metrics = {
+                name: column[i]
+                for name, column in zip(self.metric_names, columns)
+                if column[i] is not None
+            }
+            rows.append((device_id, status, metrics))
+        return rows
+
+
+def encode_heartbeat_batch(
+    heartbeats: List[DeviceHeartbeatRequest],
+    metric_names: Optional[List[str]] = None,
+    delta: bool = True,
+    precision: int = 1
+) -> Dict[str, Any]:
+    """
+    Encode heartbeats into a HeartbeatBatchRequest body
+    
+    Intended for gateways that proxy many devices and want one request
+    per interval instead of one per device.
+    
+    Args:
+        heartbeats: Individual heartbeat requests
+        metric_names: Metrics to include (default: all numeric metrics seen)
+        delta: Use delta encoding of quantized values
+        precision: Decimal places kept when delta encoding
+        
+    Returns:
+        JSON-serializable request body
+    """
+    if metric_names is None:
+        metric_names = sorted({
+            name for hb in heartbeats for name, value in hb.metrics.items()
+            if isinstance(value, (int, float))
+        })
+    
+    scale = 10 ** precision
+    columns = []
+    for name in metric_names:
+        column, previous = [], 0
+        for hb in heartbeats:
+            value = hb.metrics.get(name)
+            if value is None:
+                column.append(None)
+            elif delta:
+                quantized = round(value * scale)
+                column.append(quantized - previous)
+                previous = quantized
+            else:
+                column.append(value)
+        columns.append(column)
+    
+    statuses = [int(hb.status) for hb in heartbeats]
+    return {
+        'device_ids': [hb.device_id for hb in heartbeats],
+        'statuses': None if all(s == DeviceStatus.ONLINE for s in statuses) else statuses,
+        'metric_names': metric_names,
+        'metrics': columns,
+        'encoding': 'delta' if delta else 'plain',
+        'precision': precision
+    }
+
+
 class HealthMetrics(BaseModel):
     """Device health metrics"""
     device_id: str
@@ -140,24 +257,21 @@ class DeviceHealthRecord:
     device_id: str
     first_seen: float = field(default_factory=time.time)
     last_seen: float = field(default_factory=time.time)
-    heartbeat_times: List[float] = field(default_factory=list)
+    # Histories keep the last 100 samples
+    heartbeat_times: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
     missed_heartbeats: int = 0
     consecutive_failures: int = 0
     errors: List[Dict[str, Any]] = field(default_factory=list)
     health_score: float = 100.0
-    cpu_usage_history: List[float] = field(default_factory=list)
-    memory_usage_history: List[float] = field(default_factory=list)
-    network_latency_history: List[float] = field(default_factory=list)
+    cpu_usage_history: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
+    memory_usage_history: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
+    network_latency_history: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
     
     def update_heartbeat(self, metrics: Optional[Dict[str, Any]] = None) -> None:
         """Update device heartbeat"""
         current_time = time.time()
         self.heartbeat_times.append(current_time)
         
-        # Keep only last 100 heartbeats
-        if len(self.heartbeat_times) > 100:
-            self.heartbeat_times = self.heartbeat_times[-100:]
-        
         self.last_seen = current_time
         self.consecutive_failures = 0
         
@@ -165,13 +279,10 @@ class DeviceHealthRecord:
         if metrics:
             if 'cpu_usage' in metrics:
                 self.cpu_usage_history.append(metrics['cpu_usage'])
-                self.cpu_usage_history = self.cpu_usage_history[-100:]
             if 'memory_usage' in metrics:
                 self.memory_usage_history.append(metrics['memory_usage'])
-                self.memory_usage_history = self.memory_usage_history[-100:]
             if 'network_latency_ms' in metrics:
                 self.network_latency_history.append(metrics['network_latency_ms'])
-                self.network_latency_history = self.network_latency_history[-100:]
         
         self._calculate_health_score()
     
@@ -207,12 +318,12 @@ class DeviceHealthRecord:
         
         # Deduct for high resource usage
         if self.cpu_usage_history:
-            avg_cpu = sum(self.cpu_usage_history[-10:]) / min(len(self.cpu_usage_history), 10)
+            avg_cpu = sum(islice(reversed(self.cpu_usage_history), 10)) / min(len(self.cpu_usage_history), 10)
             if avg_cpu > 90:
                 score -= 10
         
         if self.memory_usage_history:
-            avg_mem = sum(self.memory_usage_history[-10:]) / min(len(self.memory_usage_history), 10)
+            avg_mem = sum(islice(reversed(self.memory_usage_history), 10)) / min(len(self.memory_usage_history), 10)
             if avg_mem > 90:
                 score -= 10
         
@@ -223,11 +334,8 @@ class DeviceHealthRecord:
         if len(self.heartbeat_times) < 2:
             return 5.0  # Default 5 seconds
         
-        intervals = [
-            self.heartbeat_times[i] - self.heartbeat_times[i-1]
-            for i in range(1, len(self.heartbeat_times))
-        ]
-        return sum(intervals) / len(intervals)
+        # Mean of consecutive intervals telescopes to (last - first) / (n - 1)
+        return (self.heartbeat_times[-1] - self.heartbeat_times[0]) / (len(self.heartbeat_times) - 1)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -247,6 +355,68 @@ class DeviceHealthRecord:
         }
 
 
+# ============================================================================
+# Heartbeat Deadline Timer Wheel
+# ============================================================================
+
+class TimerWheel:
+    """
+    Hashed timing wheel for per-device heartbeat deadlines
+    
+    Scheduling and cancelling are O(1); advancing touches only the slots
+    whose tick has passed, so the monitor never walks healthy devices.
+    Deadlines further out than one rotation carry a rounds counter.
+    """
+    
+    def __init__(self, tick: float = 1.0, slots: int = 64):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[Dict[str, int]] = [{} for _ in range(slots)]
+        self._location: Dict[str, int] = {}
+        self._current_tick = int(time.time() / tick)
+    
+    def __len__(self) -> int:
+        return len(self._location)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._location
+    
+    def schedule(self, key: str, deadline: float) -> None:
+        """Schedule (or reschedule) a key to expire at deadline"""
+        self.cancel(key)
+        target_tick = max(math.ceil(deadline / self.tick), self._current_tick + 1)
+        ticks_ahead = target_tick - self._current_tick
+        slot = target_tick % self.slots
+        self._wheel[slot][key] = (ticks_ahead - 1) // self.slots
+        self._location[key] = slot
+    
+    def cancel(self, key: str) -> None:
+        """Cancel a scheduled key"""
+        slot = self._location.pop(key, None)
+        if slot is not None:
+            self._wheel[slot].pop(key, None)
+    
+    def advance(self, now: float) -> List[str]:
+        """Advance to now and return expired keys"""
+        target_tick = int(now / self.tick)
+        expired = []
+        
+        while self._current_tick < target_tick:
+            self._current_tick += 1
+            bucket = self._wheel[self._current_tick % self.slots]
+            if not bucket:
+                continue
+            for key, rounds in list(bucket.items()):
+                if rounds == 0:
+                    del bucket[key]
+                    del self._location[key]
+                    expired.append(key)
+                else:
+                    bucket[key] = rounds - 1
+        
+        return expired
+
+
 # ============================================================================
 # Device Manager
 # ============================================================================
@@ -257,6 +427,13 @@ class DeviceManager:
     
     Manages device registration, discovery, heartbeat monitoring,
     and health tracking for distributed devices.
+    
+    Concurrency: ``_lock`` only guards registry membership and the
+    secondary indexes (register/unregister/group and tag changes).
+    Heartbeats take no lock: applying one never awaits, so it runs to
+    completion on the event loop and never waits on the registry.
+    Liveness is driven by a timer wheel holding one deadline per device;
+    only overdue devices are visited.
     """
     
     def __init__(
@@ -270,10 +447,23 @@ class DeviceManager:
         self.groups: Dict[str, Set[str]] = defaultdict(set)
         self.tags: Dict[str, Set[str]] = defaultdict(set)
         
+        # Secondary indexes
+        self._status_index: Dict[DeviceStatus, Set[str]] = defaultdict(set)
+        self._type_index: Dict[DeviceType, Set[str]] = defaultdict(set)
+        self._address_index: Dict[Tuple[str, int], str] = {}
+        
         self.heartbeat_interval = heartbeat_interval
         self.heartbeat_timeout = heartbeat_timeout
         self.discovery_timeout = discovery_timeout
         
+        # Deadline wheel: tick fine enough to resolve the degraded threshold,
+        # one rotation covering the offline timeout
+        tick = min(1.0, heartbeat_interval / 5)
+        self._deadlines = TimerWheel(
+            tick=tick,
+            slots=max(8, math.ceil(heartbeat_timeout / tick) + 1)
+        )
+        
         self._lock = asyncio.Lock()
         self._callbacks: Dict[str, List[Callable]] = {
             'device_registered': [],
@@ -321,12 +511,46 @@ class DeviceManager:
                 pass
         logger.info("DeviceManager stopped")
     
+    def _set_status(self, device: DeviceInfo, status: DeviceStatus) -> None:
+        """Change device status, keeping the status index in sync"""
+        if device.status != status:
+            self._status_index[device.status].discard(device.device_id)
+        device.status = status
+        self._status_index[status].add(device.device_id)
+    
+    def _index_device(self, device: DeviceInfo) -> None:
+        self._status_index[device.status].add(device.device_id)
+        self._type_index[device.device_type].add(device.device_id)
+        self._address_index[(device.ip_address, device.port)] = device.device_id
+        for group in device.groups:
+            self.groups[group].add(device.device_id)
+        for tag in device.tags:
+            self.tags[tag].add(device.device_id)
+    
+    def _unindex_device(self, device: DeviceInfo) -> None:
+        self._status_index[device.status].discard(device.device_id)
+        self._type_index[device.device_type].discard(device.device_id)
+        if self._address_index.get((device.ip_address, device.port)) == device.device_id:
+            del self._address_index[(device.ip_address, device.port)]
+        for group in device.groups:
+            self._discard_from(self.groups, group, device.device_id)
+        for tag in device.tags:
+            self._discard_from(self.tags, tag, device.device_id)
+    
+    @staticmethod
+    def _discard_from(index: Dict[str, Set[str]], key: str, device_id: str) -> None:
+        members = index.get(key)
+        if members is not None:
+            members.discard(device_id)
+            if not members:
+                del index[key]
+    
     async def _monitor_loop(self) -> None:
         """Monitor loop for device health checks"""
         while self._running:
             try:
                 await self._check_device_health()
-                await asyncio.sleep(self.heartbeat_interval)
+                await asyncio.sleep(self._deadlines.tick)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -334,31 +558,34 @@ class DeviceManager:
                 await asyncio.sleep(1)
     
     async def _check_device_health(self) -> None:
-        """Check device health status"""
+        """Check health of devices whose heartbeat deadline has passed"""
         current_time = time.time()
         offline_devices = []
         
-        async with self._lock:
-            for device_id, device in self.devices.items():
-                health = self.health_records.get(device_id)
-                if not health:
-                    continue
-                
-                time_since_last = current_time - health.last_seen
-                
-                if time_since_last > self.heartbeat_timeout:
-                    # Device is offline
-                    if device.status != DeviceStatus.OFFLINE:
-                        device.status = DeviceStatus.OFFLINE
-                        health.record_missed_heartbeat()
-                        offline_devices.append(device_id)
-                        logger.warning(f"Device {device_id} is offline")
-                elif time_since_last > self.heartbeat_interval * 2:
-                    # Device may be having issues
-                    if device.status == DeviceStatus.ONLINE:
-                        device.status = DeviceStatus.DEGRADED
-                        health.record_missed_heartbeat()
-                        logger.warning(f"Device {device_id} is degraded")
+        for device_id in self._deadlines.advance(current_time):
+            device = self.devices.get(device_id)
+            health = self.health_records.get(device_id)
+            if not device or not health:
+                continue
+            
+            time_since_last = current_time - health.last_seen
+            
+            if time_since_last > self.heartbeat_timeout:
+                # Device is offline; the next heartbeat reschedules it
+                if device.status != DeviceStatus.OFFLINE:
+                    self._set_status(device, DeviceStatus.OFFLINE)
+                    health.record_missed_heartbeat()
+                    offline_devices.append(device_id)
+                    logger.warning(f"Device {device_id} is offline")
+            elif time_since_last > self.heartbeat_interval * 2:
+                # Device may be having issues
+                if device.status == DeviceStatus.ONLINE:
+                    self._set_status(device, DeviceStatus.DEGRADED)
+                    health.record_missed_heartbeat()
+                    logger.warning(f"Device {device_id} is degraded")
+                self._deadlines.schedule(device_id, health.last_seen + self.heartbeat_timeout)
+            else:
+                self._deadlines.schedule(device_id, health.last_seen + self.heartbeat_interval * 2)
         
         # Notify callbacks
         for device_id in offline_devices:
@@ -384,12 +611,12 @@ class DeviceManager:
         
         async with self._lock:
             # Check if device with same IP:port exists
-            for existing_id, existing in self.devices.items():
-                if existing.ip_address == request.ip_address and existing.port == request.port:
-                    logger.warning(f"Device {existing_id} already registered at {request.ip_address}:{request.port}")
-                    # Update existing device
-                    device_id = existing_id
-                    break
+            existing_id = self._address_index.get((request.ip_address, request.port))
+            if existing_id is not None:
+                logger.warning(f"Device {existing_id} already registered at {request.ip_address}:{request.port}")
+                # Update existing device
+                device_id = existing_id
+                self._unindex_device(self.devices[existing_id])
             
             capabilities = DeviceCapabilities(**request.capabilities)
             
@@ -412,13 +639,12 @@ class DeviceManager:
             self.devices[device_id] = device
             
             # Create health record
-            self.health_records[device_id] = DeviceHealthRecord(device_id=device_id)
+            health = DeviceHealthRecord(device_id=device_id)
+            self.health_records[device_id] = health
             
-            # Update groups and tags
-            for group in request.groups:
-                self.groups[group].add(device_id)
-            for tag in request.tags:
-                self.tags[tag].add(device_id)
+            # Update status/type/group/tag indexes
+            self._index_device(device)
+            self._deadlines.schedule(device_id, health.last_seen + self.heartbeat_interval * 2)
             
             logger.info(f"Device registered: {device_id} ({request.device_name})")
         
@@ -440,13 +666,9 @@ class DeviceManager:
             if not device:
                 return False
             
-            # Remove from groups
-            for group in device.groups:
-                self.groups[group].discard(device_id)
-            
-            # Remove from tags
-            for tag in device.tags:
-                self.tags[tag].discard(device_id)
+            # Remove from status/type/group/tag indexes
+            self._unindex_device(device)
+            self._deadlines.cancel(device_id)
             
             # Remove health record
             self.health_records.pop(device_id, None)
@@ -471,32 +693,92 @@ class DeviceManager:
         """
         device_id = request.device_id
         
-        async with self._lock:
+        device = self.devices.get(device_id)
+        if not device:
+            raise HTTPException(status_code=404, detail=f"Device {device_id} not found")
+        self._apply_heartbeat(device, request.status, request.metrics)
+        
+        await self._notify('heartbeat_received', device_id, request.metrics)
+        
+        return {
+            'acknowledged': True,
+            'server_time': time.time(),
+            'next_heartbeat_interval': self.heartbeat_interval
+        }
+    
+    def _apply_heartbeat(
+        self,
+        device: DeviceInfo,
+        status: DeviceStatus,
+        metrics: Optional[Dict[str, Any]]
+    ) -> Optional[DeviceHealthRecord]:
+        """Apply one heartbeat to device state (synchronous, so no lock is needed)"""
+        # Update device status
+        self._set_status(device, status)
+        device.last_heartbeat = time.time()
+        
+        # Update health record and push the deadline out
+        health = self.health_records.get(device.device_id)
+        if health:
+            health.update_heartbeat(metrics)
+        self._deadlines.schedule(device.device_id, device.last_heartbeat + self.heartbeat_interval * 2)
+        return health
+    
+    async def process_heartbeat_batch(
+        self,
+        rows: List[Tuple[str, DeviceStatus, Dict[str, float]]],
+        min_health_score: float = 50.0
+    ) -> Dict[str, Any]:
+        """
+        Process many heartbeats in one pass
+        
+        All rows are applied without awaiting; callbacks run afterwards.
+        
+        Args:
+            rows: Decoded (device_id, status, metrics) rows
+            min_health_score: Devices below this score are reported
+            
+        Returns:
+            Summary with only the devices needing attention
+        """
+        attention = []
+        accepted = []
+        for device_id, status, metrics in rows:
             device = self.devices.get(device_id)
             if not device:
-                raise HTTPException(status_code=404, detail=f"Device {device_id} not found")
+                attention.append({'device_id': device_id, 'reason': 'unknown_device'})
+                continue
             
-            # Update device status
-            device.status = request.status
-            device.last_heartbeat = time.time()
+            health = self._apply_heartbeat(device, status, metrics)
+            accepted.append((device_id, metrics))
             
-            # Update health record
-            health = self.health_records.get(device_id)
-            if health:
-                health.update_heartbeat(request.metrics)
+            if status in (DeviceStatus.ERROR, DeviceStatus.DEGRADED):
+                attention.append({
+                    'device_id': device_id,
+                    'reason': 'status',
+                    'status': int(status)
+                })
+            elif health and health.health_score < min_health_score:
+                attention.append({
+                    'device_id': device_id,
+                    'reason': 'low_health',
+                    'health_score': health.health_score
+                })
         
-        await self._notify('heartbeat_received', device_id, request.metrics)
+        if self._callbacks['heartbeat_received']:
+            for device_id, metrics in accepted:
+                await self._notify('heartbeat_received', device_id, metrics)
         
         return {
-            'acknowledged': True,
+            'acknowledged': len(accepted),
+            'attention': attention,
             'server_time': time.time(),
             'next_heartbeat_interval': self.heartbeat_interval
         }
     
     async def get_device(self, device_id: str) -> Optional[DeviceInfo]:
         """Get device by ID"""
-        async with self._lock:
-            return self.devices.get(device_id)
+        return self.devices.get(device_id)
     
     async def get_all_devices(
         self,
@@ -504,16 +786,21 @@ class DeviceManager:
         device_type: Optional[DeviceType] = None
     ) -> List[DeviceInfo]:
         """Get all devices with optional filtering"""
-        async with self._lock:
-            devices = list(self.devices.values())
-            
-            if status is not None:
-                devices = [d for d in devices if d.status == status]
-            
-            if device_type is not None:
-                devices = [d for d in devices if d.device_type == device_type]
-            
-            return devices
+        if status is None and device_type is None:
+            return list(self.devices.values())
+        
+        candidates = [
+            index.get(key, set())
+            for index, key in ((self._status_index, status), (self._type_index, device_type))
+            if key is not None
+        ]
+        # Walk the smaller index and probe the other
+        candidates.sort(key=len)
+        smallest, others = candidates[0], candidates[1:]
+        return [
+            self.devices[device_id] for device_id in smallest
+            if all(device_id in other for other in others)
+        ]
     
     async def discover_devices(
         self,
@@ -591,15 +878,13 @@ class DeviceManager:
     
     async def get_devices_by_group(self, group: str) -> List[DeviceInfo]:
         """Get devices by group"""
-        async with self._lock:
-            device_ids = self.groups.get(group, set())
-            return [self.devices[did] for did in device_ids if did in self.devices]
+        device_ids = self.groups.get(group, ())
+        return [self.devices[did] for did in device_ids if did in self.devices]
     
     async def get_devices_by_tag(self, tag: str) -> List[DeviceInfo]:
         """Get devices by tag"""
-        async with self._lock:
-            device_ids = self.tags.get(tag, set())
-            return [self.devices[did] for did in device_ids if did in self.devices]
+        device_ids = self.tags.get(tag, ())
+        return [self.devices[did] for did in device_ids if did in self.devices]
     
     async def update_device(
         self,
@@ -619,14 +904,14 @@ class DeviceManager:
             if request.tags is not None:
                 # Update tags
                 for tag in device.tags:
-                    self.tags[tag].discard(device_id)
+                    self._discard_from(self.tags, tag, device_id)
                 device.tags = request.tags
                 for tag in request.tags:
                     self.tags[tag].add(device_id)
             if request.groups is not None:
                 # Update groups
                 for group in device.groups:
-                    self.groups[group].discard(device_id)
+                    self._discard_from(self.groups, group, device_id)
                 device.groups = request.groups
                 for group in request.groups:
                     self.groups[group].add(device_id)
@@ -637,45 +922,38 @@ class DeviceManager:
     
     async def get_device_health(self, device_id: str) -> Optional[Dict[str, Any]]:
         """Get device health metrics"""
-        async with self._lock:
-            health = self.health_records.get(device_id)
-            if health:
-                return health.to_dict()
-            return None
+        health = self.health_records.get(device_id)
+        if health:
+            return health.to_dict()
+        return None
     
     async def get_all_health_metrics(self) -> List[Dict[str, Any]]:
         """Get health metrics for all devices"""
-        async with self._lock:
-            return [h.to_dict() for h in self.health_records.values()]
+        return [h.to_dict() for h in self.health_records.values()]
     
     async def get_statistics(self) -> Dict[str, Any]:
         """Get device statistics"""
-        async with self._lock:
-            total = len(self.devices)
-            online = sum(1 for d in self.devices.values() if d.status == DeviceStatus.ONLINE)
-            offline = sum(1 for d in self.devices.values() if d.status == DeviceStatus.OFFLINE)
-            busy = sum(1 for d in self.devices.values() if d.status == DeviceStatus.BUSY)
-            error = sum(1 for d in self.devices.values() if d.status == DeviceStatus.ERROR)
-            
-            by_type = defaultdict(int)
-            for d in self.devices.values():
-                by_type[d.device_type.name] += 1
-            
-            avg_health = 0.0
-            if self.health_records:
-                avg_health = sum(h.health_score for h in self.health_records.values()) / len(self.health_records)
-            
-            return {
-                'total_devices': total,
-                'online': online,
-                'offline': offline,
-                'busy': busy,
-                'error': error,
-                'by_type': dict(by_type),
-                'average_health_score': round(avg_health, 2),
-                'group_count': len(self.groups),
-                'tag_count': len(self.tags)
-            }
+        by_type = {
+            device_type.name: len(ids)
+            for device_type, ids in self._type_index.items() if ids
+        }
+        
+        avg_health = 0.0
+        if self.health_records:
+            avg_health = sum(h.health_score for h in self.health_records.values()) / len(self.health_records)
+        
+        return {
+            'total_devices': len(self.devices),
+            'online': len(self._status_index.get(DeviceStatus.ONLINE, ())),
+            'offline': len(self._status_index.get(DeviceStatus.OFFLINE, ())),
+            'busy': len(self._status_index.get(DeviceStatus.BUSY, ())),
+            'error': len(self._status_index.get(DeviceStatus.ERROR, ())),
+            'by_type': by_type,
+            'average_health_score': round(avg_health, 2),
+            'group_count': len(self.groups),
+            'tag_count': len(self.tags),
+            'pending_deadlines': len(self._deadlines)
+        }
 
 
 # ============================================================================
@@ -814,6 +1092,18 @@ def create_app(device_manager: Optional[DeviceManager] = None) -> FastAPI:
             raise HTTPException(status_code=400, detail="Device ID mismatch")
         return await manager.process_heartbeat(request)
     
+    @app.post("/devices/heartbeat/batch")
+    async def device_heartbeat_batch(
+        request: HeartbeatBatchRequest,
+        min_health_score: float = 50.0
+    ):
+        """Process batched heartbeats; returns only devices needing attention"""
+        try:
+            rows = request.decode()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return await manager.process_heartbeat_batch(rows, min_health_score)
+    
     @app.get("/devices/discover")
     async def discover_devices(
         capability: Optional[str] = None,
@@ -898,6 +1188,7 @@ def create_app(device_manager: Optional[DeviceManager] = None) -> FastAPI:
                 "/devices",
                 "/devices/{device_id}",
                 "/devices/{device_id}/heartbeat",
+                "/devices/heartbeat/batch",
                 "/devices/discover",
                 "/devices/groups/{group}",
                 "/devices/tags/{tag}",
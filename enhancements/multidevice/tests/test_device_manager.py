@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the multi-device DeviceManager
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from fastapi.testclient import TestClient
+
+from enhancements.multidevice.device_manager import (
+    DeviceHeartbeatRequest,
+    DeviceManager,
+    DeviceRegistrationRequest,
+    HeartbeatBatchRequest,
+    TimerWheel,
+    create_app,
+    encode_heartbeat_batch,
+)
+from enhancements.multidevice.device_protocol import DeviceStatus, DeviceType
+
+
+def _registration(name, port=8055, groups=(), tags=()):
+    return DeviceRegistrationRequest(
+        device_type=DeviceType.LINUX_SERVER,
+        device_name=name,
+        ip_address="10.0.0.1",
+        port=port,
+        groups=list(groups),
+        tags=list(tags)
+    )
+
+
+class TestTimerWheel(unittest.TestCase):
+    """Test the heartbeat deadline wheel."""
+
+    def setUp(self):
+        self.wheel = TimerWheel(tick=1.0, slots=8)
+        self.now = self.wheel._current_tick * 1.0
+
+    def test_expires_at_deadline(self):
+        self.wheel.schedule("a", self.now + 3)
+        self.assertEqual(self.wheel.advance(self.now + 2), [])
+        self.assertEqual(self.wheel.advance(self.now + 3), ["a"])
+        self.assertNotIn("a", self.wheel)
+
+    def test_reschedule_replaces_deadline(self):
+        self.wheel.schedule("a", self.now + 2)
+        self.wheel.schedule("a", self.now + 5)
+        self.assertEqual(len(self.wheel), 1)
+        self.assertEqual(self.wheel.advance(self.now + 4), [])
+        self.assertEqual(self.wheel.advance(self.now + 5), ["a"])
+
+    def test_cancel(self):
+        self.wheel.schedule("a", self.now + 2)
+        self.wheel.cancel("a")
+        self.assertEqual(self.wheel.advance(self.now + 10), [])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_deadline_beyond_one_rotation(self):
+        # 8 slots: 20 ticks ahead needs two extra rotations
+        self.wheel.schedule("a", self.now + 20)
+        self.assertEqual(self.wheel.advance(self.now + 19), [])
+        self.assertEqual(self.wheel.advance(self.now + 20), ["a"])
+
+    def test_past_deadline_expires_next_tick(self):
+        self.wheel.schedule("a", self.now - 5)
+        self.assertEqual(self.wheel.advance(self.now + 1), ["a"])
+
+
+class TestDeviceLiveness(unittest.TestCase):
+    """Test heartbeat processing and deadline-driven liveness."""
+
+    def _manager(self):
+        # Degraded after 0.2s without a heartbeat, offline after 0.5s
+        return DeviceManager(heartbeat_interval=0.1, heartbeat_timeout=0.5)
+
+    def test_silent_device_degrades_then_goes_offline(self):
+        async def scenario():
+            manager = self._manager()
+            offline = []
+            manager.register_callback('device_offline', offline.append)
+            device = await manager.register_device(_registration("quiet"))
+            statuses = [device.status]
+            await asyncio.sleep(0.3)
+            await manager._check_device_health()
+            statuses.append(device.status)
+            await asyncio.sleep(0.3)
+            await manager._check_device_health()
+            statuses.append(device.status)
+            return statuses, offline, device.device_id, await manager.get_statistics()
+
+        statuses, offline, device_id, stats = asyncio.run(scenario())
+        self.assertEqual(statuses, [DeviceStatus.ONLINE, DeviceStatus.DEGRADED, DeviceStatus.OFFLINE])
+        self.assertEqual(offline, [device_id])
+        self.assertEqual(stats['offline'], 1)
+        self.assertEqual(stats['online'], 0)
+        self.assertEqual(stats['pending_deadlines'], 0)
+
+    def test_heartbeat_keeps_device_online(self):
+        async def scenario():
+            manager = self._manager()
+            device = await manager.register_device(_registration("chatty"))
+            for _ in range(4):
+                await asyncio.sleep(0.08)
+                await manager.process_heartbeat(DeviceHeartbeatRequest(device_id=device.device_id))
+                await manager._check_device_health()
+            return device.status, device.device_id in manager._deadlines
+
+        status, scheduled = asyncio.run(scenario())
+        self.assertEqual(status, DeviceStatus.ONLINE)
+        self.assertTrue(scheduled)
+
+    def test_heartbeat_brings_offline_device_back(self):
+        async def scenario():
+            manager = self._manager()
+            device = await manager.register_device(_registration("flaky"))
+            await asyncio.sleep(0.6)
+            await manager._check_device_health()
+            before = device.status
+            await manager.process_heartbeat(DeviceHeartbeatRequest(device_id=device.device_id))
+            return before, device.status, (await manager.get_statistics())['online']
+
+        before, after, online = asyncio.run(scenario())
+        self.assertEqual(before, DeviceStatus.OFFLINE)
+        self.assertEqual(after, DeviceStatus.ONLINE)
+        self.assertEqual(online, 1)
+
+    def test_unregister_cancels_deadline_and_indexes(self):
+        async def scenario():
+            manager = self._manager()
+            device = await manager.register_device(_registration("gone", groups=["lab"], tags=["gpu"]))
+            removed = await manager.unregister_device(device.device_id)
+            return (removed, len(manager._deadlines),
+                    await manager.get_devices_by_group("lab"), await manager.get_devices_by_tag("gpu"))
+
+        removed, deadlines, by_group, by_tag = asyncio.run(scenario())
+        self.assertTrue(removed)
+        self.assertEqual(deadlines, 0)
+        self.assertEqual(by_group, [])
+        self.assertEqual(by_tag, [])
+
+    def test_reregister_same_address_reindexes(self):
+        async def scenario():
+            manager = self._manager()
+            first = await manager.register_device(_registration("a", groups=["old"]))
+            second = await manager.register_device(_registration("a", groups=["new"]))
+            return (first.device_id, second.device_id, len(manager.devices),
+                    manager.groups.get("old"), manager.groups.get("new"))
+
+        first_id, second_id, count, old, new = asyncio.run(scenario())
+        self.assertEqual(first_id, second_id)
+        self.assertEqual(count, 1)
+        self.assertIsNone(old)
+        self.assertEqual(new, {second_id})
+
+
+class TestHeartbeatBatchEncoding(unittest.TestCase):
+    """Test the columnar heartbeat batch format."""
+
+    def _heartbeats(self):
+        return [
+            DeviceHeartbeatRequest(device_id="a", metrics={"cpu_usage": 12.3, "memory_usage": 40.0}),
+            DeviceHeartbeatRequest(device_id="b", metrics={"cpu_usage": 12.5}),
+            DeviceHeartbeatRequest(device_id="c", status=DeviceStatus.ERROR,
+                                   metrics={"cpu_usage": 99.9, "memory_usage": 41.2}),
+        ]
+
+    def test_delta_round_trip(self):
+        body = encode_heartbeat_batch(self._heartbeats())
+        self.assertEqual(body['encoding'], 'delta')
+        self.assertEqual(body['metric_names'], ['cpu_usage', 'memory_usage'])
+        self.assertEqual(body['metrics'][0], [123, 2, 874])
+        self.assertEqual(body['metrics'][1], [400, None, 12])
+        rows = HeartbeatBatchRequest(**body).decode()
+        self.assertEqual(rows, [
+            ("a", DeviceStatus.ONLINE, {"cpu_usage": 12.3, "memory_usage": 40.0}),
+            ("b", DeviceStatus.ONLINE, {"cpu_usage": 12.5}),
+            ("c", DeviceStatus.ERROR, {"cpu_usage": 99.9, "memory_usage": 41.2}),
+        ])
+
+    def test_plain_round_trip_and_default_statuses(self):
+        heartbeats = self._heartbeats()[:2]
+        body = encode_heartbeat_batch(heartbeats, delta=False)
+        self.assertIsNone(body['statuses'])
+        rows = HeartbeatBatchRequest(**body).decode()
+        self.assertEqual([(row[0], row[1]) for row in rows],
+                         [("a", DeviceStatus.ONLINE), ("b", DeviceStatus.ONLINE)])
+        self.assertEqual(rows[0][2], {"cpu_usage": 12.3, "memory_usage": 40.0})
+
+    def test_misaligned_columns_rejected(self):
+        for body in (
+            {'device_ids': ["a", "b"], 'statuses': [1]},
+            {'device_ids': ["a"], 'metric_names': ["cpu_usage"], 'metrics': []},
+            {'device_ids': ["a"], 'metric_names': ["cpu_usage"], 'metrics': [[1, 2]]},
+            {'device_ids': ["a"], 'encoding': "zstd"},
+        ):
+            with self.assertRaises(ValueError):
+                HeartbeatBatchRequest(**body).decode()
+
+
+class TestHeartbeatBatchEndpoint(unittest.TestCase):
+    """Test POST /devices/heartbeat/batch."""
+
+    def setUp(self):
+        self.manager = DeviceManager()
+        self.client = TestClient(create_app(self.manager))
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+        self.ids = [
+            self.client.post("/devices/register", json={
+                'device_type': int(DeviceType.LINUX_SERVER),
+                'device_name': name,
+                'ip_address': "10.0.0.1",
+                'port': port
+            }).json()['device_id']
+            for name, port in (("ok", 1), ("err", 2))
+        ]
+
+    def test_only_devices_needing_attention_reported(self):
+        ok, err = self.ids
+        body = encode_heartbeat_batch([
+            DeviceHeartbeatRequest(device_id=ok, metrics={"cpu_usage": 10.0}),
+            DeviceHeartbeatRequest(device_id=err, status=DeviceStatus.ERROR),
+            DeviceHeartbeatRequest(device_id="ghost"),
+        ])
+        response = self.client.post("/devices/heartbeat/batch", json=body)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result['acknowledged'], 2)
+        self.assertEqual(result['attention'], [
+            {'device_id': err, 'reason': 'status', 'status': int(DeviceStatus.ERROR)},
+            {'device_id': "ghost", 'reason': 'unknown_device'},
+        ])
+        self.assertEqual(self.manager.devices[err].status, DeviceStatus.ERROR)
+        self.assertEqual(list(self.manager.health_records[ok].cpu_usage_history), [10.0])
+
+    def test_low_health_threshold(self):
+        ok, _ = self.ids
+        self.manager.health_records[ok].missed_heartbeats = 10
+        body = encode_heartbeat_batch([DeviceHeartbeatRequest(device_id=ok)])
+        result = self.client.post("/devices/heartbeat/batch?min_health_score=80", json=body).json()
+        self.assertEqual(result['attention'], [
+            {'device_id': ok, 'reason': 'low_health', 'health_score': 70.0}
+        ])
+
+    def test_malformed_batch_is_bad_request(self):
+        response = self.client.post("/devices/heartbeat/batch", json={
+            'device_ids': self.ids, 'statuses': [1]
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
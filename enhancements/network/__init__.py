@@ -8,7 +8,12 @@ from .mesh_node_network import (
     Message,
     NodeType,
     NodeStatus,
-    MessageType
+    MessageType,
+    MeshTransport,
+    LocalTransport,
+    TCPTransport,
+    PeerSendQueue,
+    LinkStateRouter
 )
 
 __all__ = [
@@ -17,5 +22,10 @@ __all__ = [
     'Message',
     'NodeType',
     'NodeStatus',
-    'MessageType'
+    'MessageType',
+    'MeshTransport',
+    'LocalTransport',
+    'TCPTransport',
+    'PeerSendQueue',
+    'LinkStateRouter'
 ]
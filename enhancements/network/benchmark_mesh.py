@@ -0,0 +1,136 @@
+"""
+潮网式节点网络基准测试
+
+在进程内模拟 N 节点网状网络（LocalTransport），测量:
+- 多跳单播吞吐（messages/sec）与端到端延迟
+- 生成树广播的投递完整性与传输次数（对比 N-1 次单播）
+
+用法:
+    python -m enhancements.network.benchmark_mesh --nodes 100 --messages 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List
+
+from .mesh_node_network import (
+    LocalTransport,
+    MeshNodeNetwork,
+    MessageType,
+    NodeStatus,
+    NodeType
+)
+
+
+def build_mesh(node_count: int, degree: int, seed: int) -> List[MeshNodeNetwork]:
+    """构建环 + 随机弦的连通网状拓扑，每个节点拥有完整拓扑视图"""
+    rng = random.Random(seed)
+    hub: Dict[str, LocalTransport] = {}
+    ids = [f"node_{i:03d}" for i in range(node_count)]
+    
+    links = set()
+    for i in range(node_count):
+        links.add(tuple(sorted((ids[i], ids[(i + 1) % node_count]))))
+        for _ in range(max(0, degree - 2) // 2):
+            j = rng.randrange(node_count)
+            if j != i:
+                links.add(tuple(sorted((ids[i], ids[j]))))
+    
+    networks = []
+    for node_id in ids:
+        network = MeshNodeNetwork(
+            node_id, node_id, NodeType.SERVICE,
+            transport=LocalTransport(hub),
+            heartbeat_interval=0,
+            discovery_interval=0
+        )
+        neighbors = {b if a == node_id else a for a, b in links if node_id in (a, b)}
+        for other in ids:
+            if other != node_id:
+                network.register_node(
+                    other, other, NodeType.SERVICE, [], "local",
+                    connect=other in neighbors
+                )
+                network.update_node_status(other, NodeStatus.ONLINE)
+        for a, b in links:
+            network.connect_nodes(a, b)
+        networks.append(network)
+    
+    return networks
+
+
+async def run_benchmark(node_count: int, message_count: int, broadcast_count: int, degree: int, seed: int):
+    networks = build_mesh(node_count, degree, seed)
+    rng = random.Random(seed)
+    
+    received = {'count': 0, 'latencies': []}
+    expected = {'count': 0}
+    done = asyncio.Event()
+    
+    def on_message(message):
+        received['count'] += 1
+        received['latencies'].append(time.time() - message.sent_at)
+        if received['count'] >= expected['count']:
+            done.set()
+    
+    for network in networks:
+        network.register_message_handler(MessageType.COMMAND, on_message)
+        network.register_message_handler(MessageType.EVENT, on_message)
+        await network.start()
+    
+    # 单播
+    expected['count'] = message_count
+    started = time.perf_counter()
+    for _ in range(message_count):
+        source, target = rng.sample(networks, 2)
+        await source.send_message(target.node_id, MessageType.COMMAND, {'n': 1}, priority=rng.randint(1, 10))
+    await asyncio.wait_for(done.wait(), timeout=120)
+    unicast_elapsed = time.perf_counter() - started
+    unicast_latencies = sorted(received['latencies'])
+    transmitted_unicast = sum(n.stats['messages_transmitted'] for n in networks)
+    
+    # 广播
+    received['count'] = 0
+    received['latencies'] = []
+    expected['count'] = broadcast_count * (node_count - 1)
+    done.clear()
+    started = time.perf_counter()
+    for _ in range(broadcast_count):
+        await rng.choice(networks).broadcast_message(MessageType.EVENT, {'n': 1})
+    await asyncio.wait_for(done.wait(), timeout=120)
+    broadcast_elapsed = time.perf_counter() - started
+    transmitted_broadcast = sum(n.stats['messages_transmitted'] for n in networks) - transmitted_unicast
+    
+    for network in networks:
+        await network.stop()
+    
+    def percentile(values, q):
+        return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+    
+    print(f"节点数: {node_count}, 链路度数≈{degree}")
+    print(f"单播: {message_count} 条, {message_count / unicast_elapsed:,.0f} msg/s, "
+          f"平均跳数 {transmitted_unicast / message_count:.2f}, "
+          f"延迟 p50 {percentile(unicast_latencies, 0.5):.2f} ms / p95 {percentile(unicast_latencies, 0.95):.2f} ms")
+    print(f"广播: {broadcast_count} 次, 投递 {received['count']} 条, "
+          f"{received['count'] / broadcast_elapsed:,.0f} deliveries/s, "
+          f"每次广播传输 {transmitted_broadcast / broadcast_count:.1f} 次（N-1 = {node_count - 1}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MeshNodeNetwork 基准测试")
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--broadcasts", type=int, default=200)
+    parser.add_argument("--degree", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run_benchmark(args.nodes, args.messages, args.broadcasts, args.degree, args.seed))
+
+
+if __name__ == "__main__":
+    main()
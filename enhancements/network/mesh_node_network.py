@@ -1,16 +1,33 @@
 """
 潮网式节点互联架构 (Mesh Node Network)
 实现整个系统各节点（自身+其他节点）的网状互联
+
+消息投递:
+- 可插拔传输层（进程内 LocalTransport / TCPTransport）
+- 每个对端独立的优先级发送队列，批量发送
+- 广播沿生成树扇出，心跳/发现类广播在队列中合并
+- 消息历史为有界环形缓冲
+
+路由:
+- 链路状态路由，链路代价取自心跳往返时延（EWMA）
+- 链路变化时增量 Dijkstra 更新最短路径树与下一跳
+- 拓扑快照按版本缓存，供看板低成本轮询
 """
 
 import logging
 import asyncio
+import heapq
+import itertools
 import json
-from typing import Dict, List, Optional, Set, Any, Callable
-from dataclasses import dataclass, field
+import math
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Set, Any, Callable, Awaitable, Deque, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from datetime import datetime
-import hashlib
 
 logger = logging.getLogger(__name__)
 
@@ -67,12 +84,456 @@ class Message:
     payload: Dict[str, Any]
     timestamp: str
     priority: int = 5  # 1-10, 10 最高
+    hops: int = 0  # 已转发跳数
+    ttl: int = 16  # 最大跳数
+    last_hop: str = ""  # 上一跳节点 ID
+    sent_at: float = field(default_factory=time.time)  # 发送时刻（用于端到端延迟）
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'type': self.type.value,
+            'source': self.source,
+            'target': self.target,
+            'payload': self.payload,
+            'timestamp': self.timestamp,
+            'priority': self.priority,
+            'hops': self.hops,
+            'ttl': self.ttl,
+            'last_hop': self.last_hop,
+            'sent_at': self.sent_at
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Message':
+        return cls(
+            id=data['id'],
+            type=MessageType(data['type']),
+            source=data['source'],
+            target=data['target'],
+            payload=data.get('payload', {}),
+            timestamp=data.get('timestamp', ''),
+            priority=data.get('priority', 5),
+            hops=data.get('hops', 0),
+            ttl=data.get('ttl', 16),
+            last_hop=data.get('last_hop', ''),
+            sent_at=data.get('sent_at', time.time())
+        )
+
+
+BROADCAST = "broadcast"
+
+MessageReceiver = Callable[[Message], Awaitable[None]]
+
+
+class MeshTransport(ABC):
+    """传输层基类"""
+    
+    def __init__(self):
+        self.node_id: Optional[str] = None
+        self._receiver: Optional[MessageReceiver] = None
+    
+    async def start(self, node_id: str, receiver: MessageReceiver):
+        """
+        启动传输层
+        
+        Args:
+            node_id: 本节点 ID
+            receiver: 收到消息时的回调
+        """
+        self.node_id = node_id
+        self._receiver = receiver
+    
+    @abstractmethod
+    async def send(self, peer: NodeInfo, messages: List[Message]):
+        """向直连对端发送一批消息"""
+        pass
+    
+    async def close(self):
+        """关闭传输层"""
+        self._receiver = None
+
+
+class LocalTransport(MeshTransport):
+    """
+    进程内传输（asyncio 直接投递，用于单机部署与模拟）
+    
+    只有共用同一个 hub（节点 ID -> 传输）的传输之间可以互相投递；
+    不传 hub 时各自独立，不会与进程内其他网络串通。
+    """
+    
+    def __init__(self, hub: Optional[Dict[str, 'LocalTransport']] = None):
+        super().__init__()
+        self.hub = hub if hub is not None else {}
+    
+    async def start(self, node_id: str, receiver: MessageReceiver):
+        await super().start(node_id, receiver)
+        self.hub[node_id] = self
+    
+    async def send(self, peer: NodeInfo, messages: List[Message]):
+        remote = self.hub.get(peer.id)
+        if remote is None or remote._receiver is None:
+            raise ConnectionError(f"对端不可达: {peer.id}")
+        for message in messages:
+            await remote._receiver(message)
+    
+    async def close(self):
+        if self.hub.get(self.node_id) is self:
+            del self.hub[self.node_id]
+        await super().close()
+
+
+class TCPTransport(MeshTransport):
+    """TCP 传输（长度前缀 JSON 帧，每个对端复用一条连接）"""
+    
+    def __init__(self, host: str = "0.0.0.0", port: int = 0, connect_timeout: float = 5.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[str, asyncio.StreamWriter] = {}
+    
+    @property
+    def address(self) -> str:
+        return f"tcp://{self.host}:{self.port}"
+    
+    @staticmethod
+    def parse_address(address: str) -> Tuple[str, int]:
+        if address.startswith("tcp://"):
+            address = address[len("tcp://"):]
+        host, _, port = address.rpartition(":")
+        return host, int(port)
+    
+    async def start(self, node_id: str, receiver: MessageReceiver):
+        await super().start(node_id, receiver)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readexactly(4)
+                (length,) = struct.unpack(">I", header)
+                body = await reader.readexactly(length)
+                for data in json.loads(body):
+                    if self._receiver:
+                        await self._receiver(Message.from_dict(data))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"TCP 接收错误: {e}")
+        finally:
+            writer.close()
+    
+    async def _get_connection(self, peer: NodeInfo) -> asyncio.StreamWriter:
+        writer = self._connections.get(peer.id)
+        if writer is not None and not writer.is_closing():
+            return writer
+        
+        host, port = self.parse_address(peer.address)
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port),
+            timeout=self.connect_timeout
+        )
+        self._connections[peer.id] = writer
+        return writer
+    
+    async def send(self, peer: NodeInfo, messages: List[Message]):
+        writer = await self._get_connection(peer)
+        body = json.dumps([message.to_dict() for message in messages]).encode('utf-8')
+        try:
+            writer.write(struct.pack(">I", len(body)) + body)
+            await writer.drain()
+        except (ConnectionError, OSError):
+            self._connections.pop(peer.id, None)
+            writer.close()
+            raise
+    
+    async def close(self):
+        for writer in self._connections.values():
+            writer.close()
+        self._connections.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await super().close()
+
+
+class PeerSendQueue:
+    """
+    单个对端的发送队列
+    
+    按优先级（高优先）+ 入队顺序出队；带合并键的消息（如心跳）
+    在尚未发出时被新消息替换，而不是重复排队。
+    """
+    
+    def __init__(self, peer_id: str, max_pending: int = 10000):
+        self.peer_id = peer_id
+        self.max_pending = max_pending
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self._heap: List[list] = []
+        self._coalesce: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._pending = 0
+        self.dropped = 0
+        self.coalesced = 0
+    
+    def __len__(self) -> int:
+        return self._pending
+    
+    def push(self, message: Message, coalesce_key: Optional[str] = None) -> bool:
+        """入队，返回是否新增了待发消息"""
+        if coalesce_key is not None:
+            entry = self._coalesce.get(coalesce_key)
+            if entry is not None and entry[2] is not None:
+                entry[2] = None  # 作废旧消息
+                self._pending -= 1
+                self.coalesced += 1
+        
+        if self._pending >= self.max_pending:
+            self.dropped += 1
+            return False
+        
+        entry = [-message.priority, next(self._seq), message, coalesce_key]
+        heapq.heappush(self._heap, entry)
+        if coalesce_key is not None:
+            self._coalesce[coalesce_key] = entry
+        self._pending += 1
+        self.wakeup.set()
+        return True
+    
+    def pop_batch(self, max_batch: int) -> List[Message]:
+        """按优先级取出一批消息"""
+        batch = []
+        while self._heap and len(batch) < max_batch:
+            entry = heapq.heappop(self._heap)
+            message, coalesce_key = entry[2], entry[3]
+            if message is None:
+                continue
+            if coalesce_key is not None and self._coalesce.get(coalesce_key) is entry:
+                del self._coalesce[coalesce_key]
+            self._pending -= 1
+            batch.append(message)
+        return batch
+
+
+class LinkStateRouter:
+    """
+    链路状态路由
+    
+    维护带权邻接图和以本节点为根的最短路径树。链路新增或代价下降时
+    从受影响端点做局部松弛；树边代价上升或删除时只重置其下游子树，
+    从未受影响的边界节点重新播种 Dijkstra。节点上下线才做全量重算。
+    """
+    
+    MIN_COST = 1e-3
+    
+    def __init__(self, source: str, default_cost: float = 50.0):
+        self.source = source
+        self.default_cost = default_cost
+        self.adjacency: Dict[str, Dict[str, float]] = {source: {}}
+        self.disabled: Set[str] = set()
+        self.dist: Dict[str, float] = {source: 0.0}
+        self.parent: Dict[str, str] = {}
+        self.children: Dict[str, Set[str]] = {}
+        self.next_hops: Dict[str, str] = {}
+        self.stats = {'incremental_updates': 0, 'full_recomputes': 0}
+    
+    def cost(self, node_a: str, node_b: str) -> Optional[float]:
+        """链路代价（不存在返回 None）"""
+        return self.adjacency.get(node_a, {}).get(node_b)
+    
+    def distance(self, target: str) -> float:
+        """到目标的最短路径代价"""
+        return self.dist.get(target, math.inf)
+    
+    def set_link(self, node_a: str, node_b: str, cost: Optional[float] = None) -> bool:
+        """新增链路或更新代价，返回是否有变化"""
+        if node_a == node_b:
+            return False
+        cost = max(self.MIN_COST, self.default_cost if cost is None else cost)
+        old = self.cost(node_a, node_b)
+        if old == cost:
+            return False
+        
+        self.adjacency.setdefault(node_a, {})[node_b] = cost
+        self.adjacency.setdefault(node_b, {})[node_a] = cost
+        
+        if node_a in self.disabled or node_b in self.disabled:
+            return True
+        
+        if old is None or cost < old:
+            self._relax_link(node_a, node_b)
+        else:
+            self._repair_link(node_a, node_b)
+        return True
+    
+    def remove_link(self, node_a: str, node_b: str) -> bool:
+        """删除链路，返回是否存在"""
+        if self.cost(node_a, node_b) is None:
+            return False
+        del self.adjacency[node_a][node_b]
+        del self.adjacency[node_b][node_a]
+        if node_a not in self.disabled and node_b not in self.disabled:
+            self._repair_link(node_a, node_b)
+        return True
+    
+    def remove_node(self, node_id: str):
+        """删除节点及其全部链路"""
+        for neighbor in self.adjacency.pop(node_id, {}):
+            self.adjacency[neighbor].pop(node_id, None)
+        self.disabled.discard(node_id)
+        self.recompute()
+    
+    def set_node_enabled(self, node_id: str, enabled: bool):
+        """节点上下线（离线节点不参与路由）"""
+        if enabled == (node_id not in self.disabled):
+            return
+        if enabled:
+            self.disabled.discard(node_id)
+        else:
+            self.disabled.add(node_id)
+        self.recompute()
+    
+    def recompute(self):
+        """全量 Dijkstra"""
+        self.stats['full_recomputes'] += 1
+        self.dist = {self.source: 0.0}
+        self.parent = {}
+        self.children = {}
+        changed: Set[str] = set()
+        self._propagate([(0.0, self.source)], changed)
+        self.next_hops.clear()
+        self._refresh_next_hops(set(self.dist))
+    
+    def _set_parent(self, node: str, parent: str, distance: float, changed: Set[str]):
+        previous = self.parent.get(node)
+        if previous is not None:
+            self.children.get(previous, set()).discard(node)
+        self.parent[node] = parent
+        self.children.setdefault(parent, set()).add(node)
+        self.dist[node] = distance
+        changed.add(node)
+    
+    def _propagate(self, heap: List[Tuple[float, str]], changed: Set[str]):
+        """从堆中已松弛的节点继续 Dijkstra"""
+        heapq.heapify(heap)
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > self.dist.get(node, math.inf):
+                continue
+            for neighbor, cost in self.adjacency.get(node, {}).items():
+                if neighbor in self.disabled:
+                    continue
+                candidate = distance + cost
+                if candidate < self.dist.get(neighbor, math.inf):
+                    self._set_parent(neighbor, node, candidate, changed)
+                    heapq.heappush(heap, (candidate, neighbor))
+    
+    def _relax_link(self, node_a: str, node_b: str):
+        """链路新增/代价下降：只可能缩短经过该链路的路径"""
+        self.stats['incremental_updates'] += 1
+        changed: Set[str] = set()
+        heap = []
+        cost = self.adjacency[node_a][node_b]
+        for u, v in ((node_a, node_b), (node_b, node_a)):
+            if u in self.dist and self.dist[u] + cost < self.dist.get(v, math.inf):
+                self._set_parent(v, u, self.dist[u] + cost, changed)
+                heap.append((self.dist[v], v))
+        self._propagate(heap, changed)
+        self._refresh_next_hops(changed)
+    
+    def _repair_link(self, node_a: str, node_b: str):
+        """树边代价上升/删除：重算其下游子树"""
+        if self.parent.get(node_b) == node_a:
+            root = node_b
+        elif self.parent.get(node_a) == node_b:
+            root = node_a
+        else:
+            return  # 非树边变差不影响最短路径
+        
+        self.stats['incremental_updates'] += 1
+        affected = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            affected.add(node)
+            stack.extend(self.children.get(node, ()))
+        
+        for node in affected:
+            self.dist.pop(node, None)
+            parent = self.parent.pop(node, None)
+            if parent is not None and parent not in affected:
+                self.children[parent].discard(node)
+            self.children.pop(node, None)
+        
+        # 从未受影响的邻居重新播种
+        changed: Set[str] = set(affected)
+        heap = []
+        for node in affected:
+            if node in self.disabled:
+                continue
+            best, via = math.inf, None
+            for neighbor, cost in self.adjacency.get(node, {}).items():
+                if neighbor in affected or neighbor in self.disabled:
+                    continue
+                candidate = self.dist.get(neighbor, math.inf) + cost
+                if candidate < best:
+                    best, via = candidate, neighbor
+            if via is not None:
+                self._set_parent(node, via, best, changed)
+                heap.append((best, node))
+        
+        self._propagate(heap, changed)
+        self._refresh_next_hops(changed)
+    
+    def _refresh_next_hops(self, changed: Set[str]):
+        """更新变化节点及其子树的下一跳"""
+        pending = set()
+        stack = list(changed)
+        while stack:
+            node = stack.pop()
+            if node in pending:
+                continue
+            pending.add(node)
+            stack.extend(self.children.get(node, ()))
+        
+        # 按距离升序处理，保证父节点的下一跳已更新
+        for node in sorted(pending, key=lambda n: self.dist.get(n, math.inf)):
+            if node == self.source:
+                continue
+            parent = self.parent.get(node)
+            if parent is None:
+                self.next_hops.pop(node, None)
+            elif parent == self.source:
+                self.next_hops[node] = node
+            else:
+                self.next_hops[node] = self.next_hops[parent]
 
 
 class MeshNodeNetwork:
     """潮网式节点网络"""
     
-    def __init__(self, node_id: str, node_name: str, node_type: NodeType):
+    # 这些类型的广播只关心最新一条，待发时合并
+    COALESCED_TYPES = {MessageType.HEARTBEAT, MessageType.DISCOVERY}
+    
+    def __init__(
+        self,
+        node_id: str,
+        node_name: str,
+        node_type: NodeType,
+        transport: Optional[MeshTransport] = None,
+        history_size: int = 1000,
+        max_batch_size: int = 64,
+        heartbeat_interval: float = 30.0,
+        discovery_interval: float = 60.0,
+        default_link_cost: float = 50.0,
+        rtt_smoothing: float = 0.2,
+        cost_hysteresis: float = 0.1
+    ):
         """
         初始化潮网式节点网络
         
@@ -80,30 +541,77 @@ class MeshNodeNetwork:
             node_id: 节点 ID
             node_name: 节点名称
             node_type: 节点类型
+            transport: 传输层（默认使用独立 hub 的进程内传输；多个网络
+                互联时传入共用 hub 的 LocalTransport 或 TCPTransport）
+            history_size: 消息历史环形缓冲大小
+            max_batch_size: 每次向对端发送的最大消息数
+            heartbeat_interval: 心跳间隔（秒，<=0 关闭）
+            discovery_interval: 节点发现间隔（秒，<=0 关闭）
+            default_link_cost: 未测量链路的代价（毫秒）
+            rtt_smoothing: 往返时延 EWMA 系数
+            cost_hysteresis: 代价相对变化超过该比例才触发重新路由
         """
         self.node_id = node_id
         self.node_name = node_name
         self.node_type = node_type
+        self.transport = transport or LocalTransport()
+        self.max_batch_size = max_batch_size
+        self.heartbeat_interval = heartbeat_interval
+        self.discovery_interval = discovery_interval
         
         # 节点注册表
         self.nodes: Dict[str, NodeInfo] = {}
         
-        # 消息队列
-        self.message_queue: asyncio.Queue = asyncio.Queue()
+        # 入站消息队列（按优先级）
+        self.message_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._inbound_seq = itertools.count()
+        
+        # 每个直连对端的发送队列
+        self.peer_queues: Dict[str, PeerSendQueue] = {}
         
         # 消息处理器
         self.message_handlers: Dict[MessageType, List[Callable]] = {
             msg_type: [] for msg_type in MessageType
         }
         
-        # 路由表（节点 ID -> 下一跳节点 ID）
-        self.routing_table: Dict[str, str] = {}
+        # 链路状态路由；路由表（节点 ID -> 下一跳节点 ID）由其维护
+        self.router = LinkStateRouter(node_id, default_link_cost)
+        self.routing_table: Dict[str, str] = self.router.next_hops
+        self.rtt_smoothing = rtt_smoothing
+        self.cost_hysteresis = cost_hysteresis
+        self._rtt_estimates: Dict[str, float] = {}
+        
+        # 拓扑版本与缓存（生成树、拓扑快照、统计）
+        self._topology_version = 0
+        self._tree_cache: Dict[str, Tuple[int, Dict[str, str], Dict[str, List[str]]]] = {}
+        self._topology_snapshot: Optional[Dict] = None
+        self._statistics_snapshot: Optional[Tuple[int, Dict]] = None
+        
+        # 消息历史（环形缓冲）
+        self.message_history: Deque[Message] = deque(maxlen=history_size)
+        self._message_counter = itertools.count(1)
+        self._seen_broadcasts: 'OrderedDict[str, None]' = OrderedDict()
+        self._seen_limit = 4096
         
-        # 消息历史
-        self.message_history: List[Message] = []
+        # 投递统计
+        self.stats: Dict[str, int] = {
+            'messages_created': 0,
+            'broadcasts_sent': 0,
+            'messages_transmitted': 0,
+            'batches_transmitted': 0,
+            'messages_received': 0,
+            'messages_delivered': 0,
+            'messages_forwarded': 0,
+            'duplicates_dropped': 0,
+            'ttl_expired': 0,
+            'unroutable': 0,
+            'send_failures': 0
+        }
+        self._latencies: Deque[float] = deque(maxlen=1000)
         
         # 运行状态
         self.running = False
+        self._tasks: List[asyncio.Task] = []
         
         # 注册自己
         self._register_self()
@@ -131,7 +639,8 @@ class MeshNodeNetwork:
         node_type: NodeType,
         capabilities: List[str],
         address: str,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        connect: bool = True
     ):
         """
         注册节点
@@ -143,6 +652,7 @@ class MeshNodeNetwork:
             capabilities: 节点能力
             address: 节点地址
             metadata: 元数据
+            connect: 是否与本节点建立直连（否则仅记录到拓扑）
         """
         node_info = NodeInfo(
             id=node_id,
@@ -156,28 +666,71 @@ class MeshNodeNetwork:
         )
         
         self.nodes[node_id] = node_info
+        self._topology_changed()
         
         logger.info(f"注册节点: {node_id} ({name}), 类型: {node_type.value}")
         
         # 自动建立连接
-        self._establish_connection(node_id)
+        if connect:
+            self._establish_connection(node_id)
     
     def _establish_connection(self, node_id: str):
         """建立连接"""
         if node_id == self.node_id:
             return
         
-        # 添加到自己的连接列表
-        self.nodes[self.node_id].connections.add(node_id)
+        self.connect_nodes(self.node_id, node_id)
         
-        # 添加到对方的连接列表
-        if node_id in self.nodes:
-            self.nodes[node_id].connections.add(self.node_id)
+        logger.info(f"建立连接: {self.node_id} <-> {node_id}")
+    
+    def connect_nodes(self, node_a: str, node_b: str, cost: Optional[float] = None):
+        """
+        记录两个已知节点之间的链路（含非本节点的链路）
         
-        # 更新路由表（简化版本：直连）
-        self.routing_table[node_id] = node_id
+        Args:
+            node_a: 节点 A
+            node_b: 节点 B
+            cost: 链路代价（毫秒），None 时新链路取默认值、已有链路保持不变
+        """
+        if node_a == node_b or node_a not in self.nodes or node_b not in self.nodes:
+            return
+        is_new = node_b not in self.nodes[node_a].connections
+        self.nodes[node_a].connections.add(node_b)
+        self.nodes[node_b].connections.add(node_a)
         
-        logger.info(f"建立连接: {self.node_id} <-> {node_id}")
+        changed = is_new
+        if is_new or cost is not None:
+            changed = self.router.set_link(node_a, node_b, cost) or changed
+        if changed:
+            self._topology_changed()
+    
+    def update_link_cost(self, node_a: str, node_b: str, cost: float) -> bool:
+        """
+        更新已有链路的代价
+        
+        相对变化小于 cost_hysteresis（且绝对变化不足 1ms）时忽略，
+        避免时延抖动导致路由震荡。
+        
+        Returns:
+            是否触发了重新路由
+        """
+        current = self.router.cost(node_a, node_b)
+        if current is None:
+            return False
+        if abs(cost - current) <= max(current * self.cost_hysteresis, 1.0):
+            return False
+        self.connect_nodes(node_a, node_b, cost)
+        return True
+    
+    def _record_rtt(self, peer_id: str, rtt_ms: float):
+        """记录到直连对端的往返时延（EWMA）"""
+        previous = self._rtt_estimates.get(peer_id)
+        if previous is None:
+            estimate = rtt_ms
+        else:
+            estimate = previous + self.rtt_smoothing * (rtt_ms - previous)
+        self._rtt_estimates[peer_id] = estimate
+        self.update_link_cost(self.node_id, peer_id, estimate)
     
     def unregister_node(self, node_id: str):
         """注销节点"""
@@ -188,11 +741,17 @@ class MeshNodeNetwork:
                     self.nodes[other_node_id].connections.discard(node_id)
             
             # 移除路由
-            if node_id in self.routing_table:
-                del self.routing_table[node_id]
+            self.router.remove_node(node_id)
+            self._rtt_estimates.pop(node_id, None)
+            
+            # 停止发送队列
+            queue = self.peer_queues.pop(node_id, None)
+            if queue and queue.task:
+                queue.task.cancel()
             
             # 移除节点
             del self.nodes[node_id]
+            self._topology_changed()
             
             logger.info(f"注销节点: {node_id}")
     
@@ -214,10 +773,76 @@ class MeshNodeNetwork:
     def update_node_status(self, node_id: str, status: NodeStatus):
         """更新节点状态"""
         if node_id in self.nodes:
+            previous = self.nodes[node_id].status
             self.nodes[node_id].status = status
             self.nodes[node_id].last_seen = self._get_timestamp()
+            if previous != status:
+                if (previous == NodeStatus.OFFLINE) != (status == NodeStatus.OFFLINE):
+                    self.router.set_node_enabled(node_id, status != NodeStatus.OFFLINE)
+                self._topology_changed()
             logger.info(f"更新节点状态: {node_id} -> {status.value}")
     
+    def _topology_changed(self):
+        """拓扑变化，作废生成树缓存并推进快照版本"""
+        self._topology_version += 1
+        self._tree_cache.clear()
+    
+    @property
+    def topology_version(self) -> int:
+        """拓扑版本（节点、状态、链路或代价变化时递增）"""
+        return self._topology_version
+    
+    def _spanning_tree(self, root: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        """
+        以 root 为根的 BFS 生成树
+        
+        邻居按 ID 排序遍历，拓扑视图一致的节点会算出同一棵树。
+        
+        Returns:
+            (父节点映射, 子节点映射)
+        """
+        cached = self._tree_cache.get(root)
+        if cached and cached[0] == self._topology_version:
+            return cached[1], cached[2]
+        
+        parents: Dict[str, str] = {}
+        children: Dict[str, List[str]] = {}
+        visited = {root}
+        frontier = deque([root])
+        
+        while frontier:
+            current = frontier.popleft()
+            info = self.nodes.get(current)
+            if info is None:
+                continue
+            for neighbor in sorted(info.connections):
+                if neighbor in visited:
+                    continue
+                neighbor_info = self.nodes.get(neighbor)
+                if neighbor_info is None or neighbor_info.status == NodeStatus.OFFLINE:
+                    continue
+                visited.add(neighbor)
+                parents[neighbor] = current
+                children.setdefault(current, []).append(neighbor)
+                frontier.append(neighbor)
+        
+        self._tree_cache[root] = (self._topology_version, parents, children)
+        return parents, children
+    
+    def _next_hop(self, target: str) -> Optional[str]:
+        """查找到目标的下一跳（最短路径）"""
+        return self.routing_table.get(target)
+    
+    def _enqueue(self, peer_id: str, message: Message, coalesce_key: Optional[str] = None):
+        """放入对端发送队列"""
+        queue = self.peer_queues.get(peer_id)
+        if queue is None:
+            queue = PeerSendQueue(peer_id)
+            self.peer_queues[peer_id] = queue
+            if self.running:
+                queue.task = asyncio.create_task(self._peer_sender_loop(queue))
+        queue.push(message, coalesce_key)
+    
     async def send_message(
         self,
         target: str,
@@ -237,23 +862,14 @@ class MeshNodeNetwork:
         Returns:
             消息 ID
         """
-        message = Message(
-            id=self._generate_message_id(),
-            type=message_type,
-            source=self.node_id,
-            target=target,
-            payload=payload,
-            timestamp=self._get_timestamp(),
-            priority=priority
-        )
-        
-        # 添加到消息队列
-        await self.message_queue.put(message)
+        message = self._create_message(target, message_type, payload, priority)
         
-        # 记录历史
-        self.message_history.append(message)
+        if target == self.node_id:
+            await self.receive(message)
+        else:
+            self._route(message)
         
-        logger.info(f"发送消息: {self.node_id} -> {target}, 类型: {message_type.value}")
+        logger.debug(f"发送消息: {self.node_id} -> {target}, 类型: {message_type.value}")
         
         return message.id
     
@@ -261,19 +877,102 @@ class MeshNodeNetwork:
         self,
         message_type: MessageType,
         payload: Dict[str, Any],
-        priority: int = 5
-    ):
+        priority: int = 5,
+        coalesce: Optional[bool] = None
+    ) -> str:
         """
         广播消息
         
+        沿以本节点为根的生成树只向子节点发送一份，由下游节点继续扇出。
+        
         Args:
             message_type: 消息类型
             payload: 消息载荷
             priority: 优先级
+            coalesce: 是否合并待发的同类广播（默认心跳/发现类合并）
+            
+        Returns:
+            消息 ID
         """
-        for node_id in self.nodes.keys():
-            if node_id != self.node_id:
-                await self.send_message(node_id, message_type, payload, priority)
+        message = self._create_message(BROADCAST, message_type, payload, priority)
+        self._mark_seen(message.id)
+        self.stats['broadcasts_sent'] += 1
+        
+        if coalesce is None:
+            coalesce = message_type in self.COALESCED_TYPES
+        self._fan_out(message, coalesce)
+        
+        return message.id
+    
+    def _create_message(
+        self,
+        target: str,
+        message_type: MessageType,
+        payload: Dict[str, Any],
+        priority: int
+    ) -> Message:
+        message = Message(
+            id=self._generate_message_id(),
+            type=message_type,
+            source=self.node_id,
+            target=target,
+            payload=payload,
+            timestamp=self._get_timestamp(),
+            priority=priority,
+            last_hop=self.node_id
+        )
+        self.message_history.append(message)
+        self.stats['messages_created'] += 1
+        return message
+    
+    def _route(self, message: Message):
+        """按路由表发往下一跳"""
+        next_hop = self._next_hop(message.target)
+        if next_hop is None:
+            self.stats['unroutable'] += 1
+            logger.warning(f"无法转发消息: 未找到路由 {message.target}")
+            return
+        self._enqueue(next_hop, message)
+    
+    def _fan_out(self, message: Message, coalesce: bool = False):
+        """沿生成树把广播发给子节点"""
+        parents, children = self._spanning_tree(message.source)
+        
+        if message.source == self.node_id or self.node_id in parents:
+            targets = children.get(self.node_id, [])
+        else:
+            # 拓扑视图不一致，退化为向直连邻居泛洪（由去重兜底）
+            targets = [
+                peer for peer in self.nodes[self.node_id].connections
+                if peer not in (message.last_hop, message.source)
+            ]
+        
+        if not targets:
+            return
+        
+        outgoing = message if message.last_hop == self.node_id else replace(
+            message, hops=message.hops + 1, last_hop=self.node_id
+        )
+        coalesce_key = f"{message.type.value}:{message.source}" if coalesce else None
+        for peer_id in targets:
+            self._enqueue(peer_id, outgoing, coalesce_key)
+    
+    def _mark_seen(self, message_id: str) -> bool:
+        """记录广播 ID，返回是否首次出现"""
+        if message_id in self._seen_broadcasts:
+            return False
+        self._seen_broadcasts[message_id] = None
+        if len(self._seen_broadcasts) > self._seen_limit:
+            self._seen_broadcasts.popitem(last=False)
+        return True
+    
+    async def receive(self, message: Message):
+        """传输层入站回调"""
+        self.stats['messages_received'] += 1
+        if message.target == BROADCAST and not self._mark_seen(message.id):
+            self.stats['duplicates_dropped'] += 1
+            return
+        self.message_queue.put_nowait((-message.priority, next(self._inbound_seq), message))
     
     def register_message_handler(
         self,
@@ -295,49 +994,106 @@ class MeshNodeNetwork:
         self.running = True
         logger.info("启动潮网式节点网络")
         
+        await self.transport.start(self.node_id, self.receive)
+        
         # 启动消息处理循环
-        asyncio.create_task(self._message_processing_loop())
+        self._tasks.append(asyncio.create_task(self._message_processing_loop()))
+        
+        # 启动已有对端的发送循环
+        for queue in self.peer_queues.values():
+            if queue.task is None or queue.task.done():
+                queue.task = asyncio.create_task(self._peer_sender_loop(queue))
         
         # 启动心跳循环
-        asyncio.create_task(self._heartbeat_loop())
+        if self.heartbeat_interval > 0:
+            self._tasks.append(asyncio.create_task(self._heartbeat_loop()))
         
         # 启动节点发现循环
-        asyncio.create_task(self._discovery_loop())
+        if self.discovery_interval > 0:
+            self._tasks.append(asyncio.create_task(self._discovery_loop()))
     
     async def stop(self):
         """停止网络"""
         self.running = False
         logger.info("停止潮网式节点网络")
+        
+        tasks = self._tasks + [q.task for q in self.peer_queues.values() if q.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        for queue in self.peer_queues.values():
+            queue.task = None
+        
+        await self.transport.close()
+    
+    async def _peer_sender_loop(self, queue: PeerSendQueue):
+        """对端发送循环：按优先级批量发送"""
+        while self.running:
+            await queue.wakeup.wait()
+            queue.wakeup.clear()
+            
+            while len(queue):
+                batch = queue.pop_batch(self.max_batch_size)
+                peer = self.nodes.get(queue.peer_id)
+                if peer is None:
+                    self.stats['send_failures'] += len(batch)
+                    continue
+                try:
+                    await self.transport.send(peer, batch)
+                    self.stats['messages_transmitted'] += len(batch)
+                    self.stats['batches_transmitted'] += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats['send_failures'] += len(batch)
+                    logger.warning(f"发送到 {queue.peer_id} 失败: {e}")
     
     async def _message_processing_loop(self):
         """消息处理循环"""
         while self.running:
             try:
-                # 从队列获取消息（带超时）
-                try:
-                    message = await asyncio.wait_for(
-                        self.message_queue.get(),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    continue
+                _, _, message = await self.message_queue.get()
                 
                 # 处理消息
                 await self._process_message(message)
             
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"消息处理循环错误: {e}")
     
     async def _process_message(self, message: Message):
         """处理消息"""
-        logger.info(f"处理消息: {message.id}, 类型: {message.type.value}")
+        logger.debug(f"处理消息: {message.id}, 类型: {message.type.value}")
         
-        # 检查目标
-        if message.target != self.node_id and message.target != "broadcast":
+        if message.target == BROADCAST:
+            # 先继续扇出，再交给本地处理器
+            self._fan_out(message)
+        elif message.target != self.node_id:
             # 需要转发
             await self._forward_message(message)
             return
         
+        self.stats['messages_delivered'] += 1
+        self._latencies.append(time.time() - message.sent_at)
+        
+        if message.type == MessageType.HEARTBEAT and message.hops == 0:
+            # 直连邻居的心跳：回送时间戳用于测量往返时延
+            self._enqueue(message.source, self._create_message(
+                message.source,
+                MessageType.RESPONSE,
+                {'heartbeat_ack': message.id, 'echo_sent_at': message.sent_at},
+                priority=10
+            ))
+        elif message.type == MessageType.RESPONSE and 'heartbeat_ack' in message.payload:
+            if message.hops == 0:
+                rtt = time.time() - message.payload['echo_sent_at']
+                self._record_rtt(message.source, rtt * 1000)
+            return
+        elif message.type == MessageType.DISCOVERY:
+            self._learn_topology(message)
+        
         # 调用处理器
         handlers = self.message_handlers.get(message.type, [])
         for handler in handlers:
@@ -348,18 +1104,30 @@ class MeshNodeNetwork:
             except Exception as e:
                 logger.error(f"消息处理器错误: {e}")
     
+    def _learn_topology(self, message: Message):
+        """从发现消息中学习对端的链路及代价"""
+        source = self.nodes.get(message.source)
+        if source is None:
+            return
+        links = message.payload.get('links', {})
+        for peer_id in message.payload.get('connections', []):
+            if peer_id not in self.nodes or peer_id == self.node_id:
+                continue
+            cost = links.get(peer_id)
+            if peer_id not in source.connections:
+                self.connect_nodes(message.source, peer_id, cost)
+            elif cost is not None:
+                self.update_link_cost(message.source, peer_id, cost)
+    
     async def _forward_message(self, message: Message):
         """转发消息"""
-        # 查找路由
-        next_hop = self.routing_table.get(message.target)
-        
-        if next_hop:
-            logger.info(f"转发消息: {message.id} -> {next_hop}")
-            # 这里应该实际发送到下一跳节点
-            # 简化版本：直接添加到队列
-            await self.message_queue.put(message)
-        else:
-            logger.warning(f"无法转发消息: 未找到路由 {message.target}")
+        if message.hops + 1 >= message.ttl:
+            self.stats['ttl_expired'] += 1
+            logger.warning(f"丢弃消息: {message.id} 超过最大跳数")
+            return
+        
+        self.stats['messages_forwarded'] += 1
+        self._route(replace(message, hops=message.hops + 1, last_hop=self.node_id))
     
     async def _heartbeat_loop(self):
         """心跳循环"""
@@ -374,9 +1142,10 @@ class MeshNodeNetwork:
                     }
                 )
                 
-                # 等待 30 秒
-                await asyncio.sleep(30)
+                await asyncio.sleep(self.heartbeat_interval)
             
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"心跳循环错误: {e}")
     
@@ -391,30 +1160,51 @@ class MeshNodeNetwork:
                         'node_id': self.node_id,
                         'node_name': self.node_name,
                         'node_type': self.node_type.value,
-                        'capabilities': self.nodes[self.node_id].capabilities
+                        'capabilities': self.nodes[self.node_id].capabilities,
+                        'connections': sorted(self.nodes[self.node_id].connections),
+                        'links': dict(self.router.adjacency.get(self.node_id, {}))
                     }
                 )
                 
-                # 等待 60 秒
-                await asyncio.sleep(60)
+                await asyncio.sleep(self.discovery_interval)
             
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"节点发现循环错误: {e}")
     
     def _generate_message_id(self) -> str:
         """生成消息 ID"""
-        data = f"{self.node_id}_{self._get_timestamp()}_{len(self.message_history)}"
-        return hashlib.md5(data.encode()).hexdigest()[:16]
+        return f"{self.node_id}-{next(self._message_counter)}"
     
     def _get_timestamp(self) -> str:
         """获取时间戳"""
         return datetime.now().isoformat()
     
-    def get_network_topology(self) -> Dict:
-        """获取网络拓扑"""
+    def get_network_topology(self, since_version: Optional[int] = None) -> Dict:
+        """
+        获取网络拓扑快照
+        
+        快照按拓扑版本缓存，调用方不应修改返回值。
+        
+        Args:
+            since_version: 调用方已持有的版本；未变化时只返回版本号
+        """
+        version = self._topology_version
+        if since_version is not None and since_version == version:
+            return {'version': version, 'changed': False}
+        
+        if self._topology_snapshot is None or self._topology_snapshot['version'] != version:
+            self._topology_snapshot = self._build_topology_snapshot(version)
+        return self._topology_snapshot
+    
+    def _build_topology_snapshot(self, version: int) -> Dict:
         topology = {
+            'version': version,
+            'changed': True,
             'nodes': [],
-            'edges': []
+            'edges': [],
+            'routes': {}
         }
         
         for node in self.nodes.values():
@@ -428,23 +1218,59 @@ class MeshNodeNetwork:
             for connected_node_id in node.connections:
                 topology['edges'].append({
                     'source': node.id,
-                    'target': connected_node_id
+                    'target': connected_node_id,
+                    'cost': self.router.cost(node.id, connected_node_id)
                 })
         
+        for target, next_hop in self.routing_table.items():
+            topology['routes'][target] = {
+                'next_hop': next_hop,
+                'cost': self.router.distance(target)
+            }
+        
         return topology
     
     def get_network_statistics(self) -> Dict:
         """获取网络统计"""
+        version = self._topology_version
+        if self._statistics_snapshot is None or self._statistics_snapshot[0] != version:
+            by_status = {status: 0 for status in NodeStatus}
+            by_type = {node_type.value: 0 for node_type in NodeType}
+            connections = 0
+            for node in self.nodes.values():
+                by_status[node.status] += 1
+                by_type[node.type.value] += 1
+                connections += len(node.connections)
+            self._statistics_snapshot = (version, {
+                'total_nodes': len(self.nodes),
+                'online_nodes': by_status[NodeStatus.ONLINE],
+                'offline_nodes': by_status[NodeStatus.OFFLINE],
+                'total_connections': connections // 2,
+                'nodes_by_type': by_type,
+                'topology_version': version
+            })
+        
         return {
-            'total_nodes': len(self.nodes),
-            'online_nodes': sum(1 for n in self.nodes.values() if n.status == NodeStatus.ONLINE),
-            'offline_nodes': sum(1 for n in self.nodes.values() if n.status == NodeStatus.OFFLINE),
-            'total_connections': sum(len(n.connections) for n in self.nodes.values()) // 2,
-            'total_messages': len(self.message_history),
-            'nodes_by_type': {
-                node_type.value: len(self.get_nodes_by_type(node_type))
-                for node_type in NodeType
-            }
+            **self._statistics_snapshot[1],
+            'total_messages': self.stats['messages_created'],
+            'routing': dict(self.router.stats),
+            'delivery': self.get_delivery_statistics()
+        }
+    
+    def get_delivery_statistics(self) -> Dict:
+        """获取消息投递统计"""
+        latencies = sorted(self._latencies)
+        return {
+            **self.stats,
+            'pending_outbound': sum(len(q) for q in self.peer_queues.values()),
+            'pending_inbound': self.message_queue.qsize(),
+            'coalesced': sum(q.coalesced for q in self.peer_queues.values()),
+            'queue_dropped': sum(q.dropped for q in self.peer_queues.values()),
+            'avg_latency_ms': (sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+            'p95_latency_ms': (
+                latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+                if latencies else 0.0
+            )
         }
     
     def export_network_state(self, file_path: str):
@@ -468,6 +1294,7 @@ class MeshNodeNetwork:
                 for node_id, node in self.nodes.items()
             },
             'routing_table': self.routing_table,
+            'links': self.router.adjacency,
             'timestamp': self._get_timestamp()
         }
         
@@ -499,7 +1326,14 @@ class MeshNodeNetwork:
                     NodeStatus(node_data['status'])
                 )
         
-        # 恢复路由表
-        self.routing_table.update(state['routing_table'])
+        # 恢复链路（路由表由链路状态重新计算，不直接恢复）
+        links = state.get('links', {})
+        for node_data in state['nodes'].values():
+            for peer_id in node_data['connections']:
+                self.connect_nodes(
+                    node_data['id'],
+                    peer_id,
+                    links.get(node_data['id'], {}).get(peer_id)
+                )
         
         logger.info(f"导入网络状态: {file_path}")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Unit tests for MeshNodeNetwork transports and delivery
+"""
+
+import asyncio
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from enhancements.network.mesh_node_network import (
+    LinkStateRouter,
+    LocalTransport,
+    MeshNodeNetwork,
+    MeshTransport,
+    Message,
+    MessageType,
+    NodeStatus,
+    NodeType,
+    PeerSendQueue,
+)
+
+
+def _network(node_id, hub, **kwargs):
+    kwargs.setdefault("heartbeat_interval", 0)
+    kwargs.setdefault("discovery_interval", 0)
+    return MeshNodeNetwork(node_id, node_id, NodeType.SERVICE, transport=LocalTransport(hub), **kwargs)
+
+
+def _message(message_id, priority):
+    return Message(
+        id=message_id, type=MessageType.EVENT, source="a", target="b",
+        payload={}, timestamp="", priority=priority
+    )
+
+
+async def _wait_for(predicate, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.005)
+    return True
+
+
+class TestTransport(unittest.TestCase):
+    """Test the pluggable transports."""
+
+    def test_send_is_abstract(self):
+        class Incomplete(MeshTransport):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_default_hubs_are_isolated(self):
+        self.assertIsNot(LocalTransport().hub, LocalTransport().hub)
+
+    def test_delivery_over_shared_hub(self):
+        async def scenario():
+            hub = {}
+            a, b = _network("a", hub), _network("b", hub)
+            a.register_node("b", "b", NodeType.SERVICE, [], "local")
+            b.register_node("a", "a", NodeType.SERVICE, [], "local")
+            received = []
+            b.register_message_handler(MessageType.COMMAND, lambda m: received.append(m.payload))
+            await a.start()
+            await b.start()
+            await a.send_message("b", MessageType.COMMAND, {"n": 1})
+            await _wait_for(lambda: received)
+            await a.stop()
+            await b.stop()
+            return received, hub
+
+        received, hub = asyncio.run(scenario())
+        self.assertEqual(received, [{"n": 1}])
+        self.assertEqual(hub, {})
+
+    def test_networks_without_shared_hub_cannot_reach_each_other(self):
+        async def scenario():
+            a = MeshNodeNetwork("a", "a", NodeType.SERVICE, heartbeat_interval=0, discovery_interval=0)
+            b = MeshNodeNetwork("b", "b", NodeType.SERVICE, heartbeat_interval=0, discovery_interval=0)
+            a.register_node("b", "b", NodeType.SERVICE, [], "local")
+            await a.start()
+            await b.start()
+            await a.send_message("b", MessageType.COMMAND, {})
+            await _wait_for(lambda: a.stats["send_failures"])
+            await a.stop()
+            await b.stop()
+            return a.stats, b.stats
+
+        a_stats, b_stats = asyncio.run(scenario())
+        self.assertEqual(a_stats["send_failures"], 1)
+        self.assertEqual(b_stats["messages_received"], 0)
+
+
+class TestPriorityDelivery(unittest.TestCase):
+    """Test per-peer priority queues."""
+
+    def test_queue_pops_by_priority_then_fifo(self):
+        async def scenario():
+            queue = PeerSendQueue("b")
+            for message_id, priority in (("low", 1), ("mid1", 5), ("high", 10), ("mid2", 5)):
+                queue.push(_message(message_id, priority))
+            return [m.id for m in queue.pop_batch(10)], len(queue)
+
+        order, pending = asyncio.run(scenario())
+        self.assertEqual(order, ["high", "mid1", "mid2", "low"])
+        self.assertEqual(pending, 0)
+
+    def test_coalesced_message_replaced(self):
+        async def scenario():
+            queue = PeerSendQueue("b")
+            queue.push(_message("hb1", 5), coalesce_key="heartbeat:a")
+            queue.push(_message("other", 5))
+            queue.push(_message("hb2", 5), coalesce_key="heartbeat:a")
+            return [m.id for m in queue.pop_batch(10)], queue.coalesced
+
+        order, coalesced = asyncio.run(scenario())
+        self.assertEqual(order, ["other", "hb2"])
+        self.assertEqual(coalesced, 1)
+
+    def test_queued_messages_delivered_in_priority_order(self):
+        async def scenario():
+            hub = {}
+            a, b = _network("a", hub), _network("b", hub)
+            a.register_node("b", "b", NodeType.SERVICE, [], "local")
+            b.register_node("a", "a", NodeType.SERVICE, [], "local")
+            received = []
+            b.register_message_handler(MessageType.COMMAND, lambda m: received.append(m.payload["n"]))
+            # 网络启动前入队，启动后同一批按优先级发出
+            for n, priority in ((1, 1), (2, 9), (3, 5), (4, 9)):
+                await a.send_message("b", MessageType.COMMAND, {"n": n}, priority=priority)
+            await b.start()
+            await a.start()
+            await _wait_for(lambda: len(received) == 4)
+            await a.stop()
+            await b.stop()
+            return received, a.stats["batches_transmitted"]
+
+        received, batches = asyncio.run(scenario())
+        self.assertEqual(received, [2, 4, 3, 1])
+        self.assertEqual(batches, 1)
+
+
+class TestLinkStateRouter(unittest.TestCase):
+    """Test incremental shortest-path maintenance."""
+
+    def _line(self):
+        # a -1- b -1- c, plus a direct a-c link costing 5
+        router = LinkStateRouter("a")
+        router.set_link("a", "b", 1)
+        router.set_link("b", "c", 1)
+        router.set_link("a", "c", 5)
+        return router
+
+    def _assert_matches_full_recompute(self, router):
+        reference = LinkStateRouter(router.source, router.default_cost)
+        reference.adjacency = {node: dict(links) for node, links in router.adjacency.items()}
+        reference.disabled = set(router.disabled)
+        reference.recompute()
+        self.assertEqual(set(router.dist), set(reference.dist))
+        for node, distance in reference.dist.items():
+            self.assertAlmostEqual(router.dist[node], distance)
+        self.assertEqual(router.next_hops, reference.next_hops)
+
+    def test_shortest_path_next_hop(self):
+        router = self._line()
+        self.assertEqual(router.next_hops, {"b": "b", "c": "b"})
+        self.assertEqual(router.distance("c"), 2)
+
+    def test_cost_increase_reroutes(self):
+        router = self._line()
+        router.set_link("a", "b", 10)
+        self.assertEqual(router.next_hops, {"b": "c", "c": "c"})
+        self.assertEqual(router.distance("b"), 6)
+        self.assertEqual(router.stats["full_recomputes"], 0)
+
+    def test_link_removal_and_partition(self):
+        router = self._line()
+        router.remove_link("b", "c")
+        self.assertEqual(router.next_hops, {"b": "b", "c": "c"})
+        router.remove_link("a", "c")
+        self.assertEqual(router.next_hops, {"b": "b"})
+        self.assertEqual(router.distance("c"), float("inf"))
+
+    def test_disabled_node_not_used_for_transit(self):
+        router = self._line()
+        router.set_node_enabled("b", False)
+        self.assertEqual(router.next_hops, {"c": "c"})
+        router.set_node_enabled("b", True)
+        self.assertEqual(router.next_hops, {"b": "b", "c": "b"})
+
+    def test_random_updates_match_full_recompute(self):
+        rng = random.Random(7)
+        nodes = [f"n{i}" for i in range(12)]
+        router = LinkStateRouter(nodes[0])
+        for _ in range(300):
+            a, b = rng.sample(nodes, 2)
+            op = rng.random()
+            if op < 0.6:
+                router.set_link(a, b, rng.uniform(1, 100))
+            elif op < 0.9:
+                router.remove_link(a, b)
+            elif a != router.source:
+                router.set_node_enabled(a, a in router.disabled)
+            self._assert_matches_full_recompute(router)
+        self.assertGreater(router.stats["incremental_updates"], 0)
+
+
+class TestMeshRouting(unittest.TestCase):
+    """Test routing decisions of MeshNodeNetwork."""
+
+    def test_link_cost_hysteresis(self):
+        network = _network("a", {}, cost_hysteresis=0.1)
+        network.register_node("b", "b", NodeType.SERVICE, [], "local")
+        network.update_link_cost("a", "b", 100)
+        version = network.topology_version
+        self.assertFalse(network.update_link_cost("a", "b", 105))
+        self.assertTrue(network.update_link_cost("a", "b", 150))
+        self.assertEqual(network.router.cost("a", "b"), 150)
+        self.assertEqual(network.topology_version, version + 1)
+
+    def test_topology_snapshot_versioned(self):
+        network = _network("a", {})
+        network.register_node("b", "b", NodeType.SERVICE, [], "local")
+        snapshot = network.get_network_topology()
+        self.assertEqual(network.get_network_topology(since_version=snapshot["version"]),
+                         {"version": snapshot["version"], "changed": False})
+        self.assertEqual(snapshot["routes"]["b"]["next_hop"], "b")
+        network.update_node_status("b", NodeStatus.OFFLINE)
+        self.assertTrue(network.get_network_topology(since_version=snapshot["version"])["changed"])
+
+    def test_multi_hop_delivery_follows_cheapest_path(self):
+        async def scenario():
+            hub = {}
+            names = ("a", "b", "c")
+            networks = {name: _network(name, hub) for name in names}
+            for network in networks.values():
+                for other in names:
+                    if other != network.node_id:
+                        network.register_node(other, other, NodeType.SERVICE, [], "local", connect=False)
+                # b relays cheaply; the direct a-c link is expensive
+                network.connect_nodes("a", "b", 1)
+                network.connect_nodes("b", "c", 1)
+                network.connect_nodes("a", "c", 50)
+            received = []
+            networks["c"].register_message_handler(MessageType.COMMAND, received.append)
+            for network in networks.values():
+                await network.start()
+            await networks["a"].send_message("c", MessageType.COMMAND, {"n": 1})
+            await _wait_for(lambda: received)
+            for network in networks.values():
+                await network.stop()
+            return received, networks["b"].stats
+
+        received, relay_stats = asyncio.run(scenario())
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].hops, 1)
+        self.assertEqual(received[0].last_hop, "b")
+        self.assertEqual(relay_stats["messages_forwarded"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
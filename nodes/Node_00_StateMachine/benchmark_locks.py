@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Lock Contention Benchmark
+
+Many clients compete for a few resources. Each client runs a number of
+short critical sections. The baseline is the previous MemoryStore (one
+store-wide asyncio.Lock, ISO-string expiry), where clients poll
+/lock/acquire with a fixed retry interval. The new store queues waiters
+FIFO and hands the lock over on release.
+
+The benchmark reports throughput, acquire latency percentiles and the
+spread of per-client completion times (fairness). It also times an
+uncontended acquire/release and a stale-lock reaper pass with 100k held
+locks.
+
+Usage:
+    python benchmark_locks.py --clients 50 200 --resources 4 --rounds 20
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import MemoryStore  # noqa: E402
+
+
+class LegacyMemoryStore:
+    """Baseline: the previous lock implementation."""
+
+    def __init__(self):
+        self.locks: Dict[str, Dict] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire_lock(self, resource_id: str, node_id: str, timeout_seconds: int) -> Optional[str]:
+        async with self._lock:
+            now = datetime.now()
+            if resource_id in self.locks:
+                expires_at = datetime.fromisoformat(self.locks[resource_id]["expires_at"])
+                if expires_at > now:
+                    return None
+            token = str(uuid.uuid4())
+            self.locks[resource_id] = {
+                "token": token,
+                "node_id": node_id,
+                "expires_at": (now + timedelta(seconds=timeout_seconds)).isoformat(),
+                "acquired_at": now.isoformat()
+            }
+            return token
+
+    async def release_lock(self, resource_id: str, token: str) -> bool:
+        async with self._lock:
+            if resource_id not in self.locks or self.locks[resource_id]["token"] != token:
+                return False
+            del self.locks[resource_id]
+            return True
+
+    async def reap_stale(self, max_age: float) -> List[Dict]:
+        """The old StaleLockReaper scan: parse every lock's acquired_at."""
+        now = datetime.now()
+        reaped = []
+        async with self._lock:
+            for resource_id, lock in list(self.locks.items()):
+                age = (now - datetime.fromisoformat(lock["acquired_at"])).total_seconds()
+                if age > max_age:
+                    reaped.append(resource_id)
+                    del self.locks[resource_id]
+        return reaped
+
+
+async def legacy_client(store, client, resources, rounds, hold, poll, latencies):
+    for n in range(rounds):
+        resource = resources[(client + n) % len(resources)]
+        start = time.perf_counter()
+        while True:
+            token = await store.acquire_lock(resource, f"c{client}", 30)
+            if token:
+                break
+            await asyncio.sleep(poll)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(hold)
+        await store.release_lock(resource, token)
+    return time.perf_counter()
+
+
+async def fifo_client(store, client, resources, rounds, hold, poll, latencies):
+    for n in range(rounds):
+        resource = resources[(client + n) % len(resources)]
+        start = time.perf_counter()
+        lease = await store.acquire_lock(resource, f"c{client}", 30, wait_seconds=300)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(hold)
+        await store.release_lock(resource, lease["token"])
+    return time.perf_counter()
+
+
+async def contention(store, client_fn, clients, resources, rounds, hold, poll):
+    names = [f"resource_{i}" for i in range(resources)]
+    latencies: List[float] = []
+    start = time.perf_counter()
+    finished = await asyncio.gather(*[
+        client_fn(store, c, names, rounds, hold, poll, latencies) for c in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    completion = [f - start for f in finished]
+    return {
+        "throughput": clients * rounds / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "spread": statistics.pstdev(completion) / statistics.mean(completion),
+    }
+
+
+async def bulk(store_cls, locks: int, ops: int):
+    store = store_cls()
+    for i in range(locks):
+        await store.acquire_lock(f"held_{i}", "bulk", 300)
+    start = time.perf_counter()
+    for i in range(ops):
+        lease = await store.acquire_lock(f"free_{i}", "bulk", 30)
+        token = lease if isinstance(lease, str) else lease["token"]
+        await store.release_lock(f"free_{i}", token)
+    op_us = (time.perf_counter() - start) * 1e6 / ops
+    start = time.perf_counter()
+    await store.reap_stale(300)
+    reap_ms = (time.perf_counter() - start) * 1000
+    return op_us, reap_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lock contention benchmark")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--resources", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20, help="critical sections per client")
+    parser.add_argument("--hold", type=float, default=0.001, help="seconds inside the critical section")
+    parser.add_argument("--poll", type=float, default=0.01, help="baseline retry interval")
+    parser.add_argument("--locks", type=int, default=100_000, help="held locks for the bulk test")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"{'clients':>8}{'store':>8}{'acq/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'spread':>9}")
+    for clients in args.clients:
+        for name, store_cls, client_fn in (("poll", LegacyMemoryStore, legacy_client),
+                                           ("fifo", MemoryStore, fifo_client)):
+            result = asyncio.run(contention(
+                store_cls(), client_fn, clients, args.resources, args.rounds, args.hold, args.poll
+            ))
+            print(f"{clients:>8}{name:>8}{result['throughput']:>10.0f}{result['p50_ms']:>10.1f}"
+                  f"{result['p99_ms']:>10.1f}{result['spread']:>9.2f}")
+
+    print(f"\n{args.locks} held locks   {'acquire+release µs':>20}{'reaper pass ms':>16}")
+    for name, store_cls in (("legacy", LegacyMemoryStore), ("heap", MemoryStore)):
+        op_us, reap_ms = asyncio.run(bulk(store_cls, args.locks, 10_000))
+        print(f"{name:<20}{op_us:>20.1f}{reap_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
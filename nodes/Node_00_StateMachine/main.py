@@ -9,8 +9,11 @@ All global state MUST sync through this node.
 import os
 import json
 import asyncio
+import heapq
 import logging
+import time
 import uuid
+from collections import deque
 from typing import Dict, Optional, List, Any
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
@@ -53,10 +56,12 @@ class LockRequest(BaseModel):
     resource_id: str = Field(..., description="ID of the resource to lock")
     timeout_seconds: int = Field(default=30, ge=1, le=300)
     reason: str = Field(default="", description="Reason for lock")
+    wait_seconds: float = Field(default=0, ge=0, le=300, description="Queue for a busy lock up to this long")
 
 class LockResponse(BaseModel):
     success: bool
     token: Optional[str] = None
+    fencing_token: Optional[int] = None
     message: str
     expires_at: Optional[str] = None
 
@@ -64,6 +69,20 @@ class ReleaseRequest(BaseModel):
     node_id: str
     resource_id: str
     token: str
+    fencing_token: Optional[int] = None
+
+class RenewRequest(BaseModel):
+    node_id: str
+    resource_id: str
+    token: str
+    timeout_seconds: int = Field(default=30, ge=1, le=300)
+
+class BatchLockRequest(BaseModel):
+    requests: List[LockRequest]
+    atomic: bool = Field(default=False, description="Grant all locks or none")
+
+class BatchReleaseRequest(BaseModel):
+    requests: List[ReleaseRequest]
 
 class NodeRegistration(BaseModel):
     node_id: str
@@ -83,105 +102,321 @@ class NodeStatus(BaseModel):
 # In-Memory Store
 # =============================================================================
 
+class Lease:
+    """A granted lock. Expiry is tracked on the monotonic clock."""
+
+    __slots__ = ("resource_id", "token", "fencing_token", "node_id",
+                 "acquired_at", "acquired_mono", "expires_mono")
+
+    def __init__(self, resource_id: str, node_id: str, fencing_token: int,
+                 timeout_seconds: float, now: float):
+        self.resource_id = resource_id
+        self.token = str(uuid.uuid4())
+        self.fencing_token = fencing_token
+        self.node_id = node_id
+        self.acquired_at = datetime.now()
+        self.acquired_mono = now
+        self.expires_mono = now + timeout_seconds
+
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        remaining = self.expires_mono - (time.monotonic() if now is None else now)
+        return {
+            "token": self.token,
+            "fencing_token": self.fencing_token,
+            "node_id": self.node_id,
+            "expires_at": (datetime.now() + timedelta(seconds=remaining)).isoformat(),
+            "acquired_at": self.acquired_at.isoformat()
+        }
+
+
 class MemoryStore:
-    """Thread-safe in-memory store for locks and state."""
-    
+    """
+    In-memory store for locks, the node registry and state.
+
+    Locks, nodes and state are independent structures. Every operation
+    runs without awaiting, so it is atomic on the event loop and no
+    store-wide mutex is needed.
+
+    Lock expiry lives in a min-heap keyed by monotonic time, and a single
+    loop timer fires at the earliest expiry. Every grant gets a strictly
+    increasing fencing token. Renewing a lease keeps its fencing token, so
+    a resource can reject writes from a holder whose lease has passed to
+    someone else. Callers may wait for a busy lock. Waiters are queued
+    FIFO per resource, and the lock is handed directly to the next waiter
+    on release or expiry.
+    """
+
     def __init__(self):
-        self.locks: Dict[str, Dict] = {}
+        self.locks: Dict[str, Lease] = {}
         self.nodes: Dict[str, Dict] = {}
         self.state: Dict[str, Any] = {}
-        self._lock = asyncio.Lock()
-    
-    async def acquire_lock(self, resource_id: str, node_id: str, timeout_seconds: int) -> Optional[str]:
-        """Acquire a lock on a resource."""
-        async with self._lock:
-            now = datetime.now()
-            
-            # Check existing lock
-            if resource_id in self.locks:
-                existing = self.locks[resource_id]
-                expires_at = datetime.fromisoformat(existing["expires_at"])
-                
-                if expires_at > now:
-                    # Lock still valid
-                    return None
-            
-            # Create new lock
-            token = str(uuid.uuid4())
-            expires_at = now + timedelta(seconds=timeout_seconds)
-            
-            self.locks[resource_id] = {
-                "token": token,
-                "node_id": node_id,
-                "expires_at": expires_at.isoformat(),
-                "acquired_at": now.isoformat()
-            }
-            
-            return token
-    
-    async def release_lock(self, resource_id: str, token: str) -> bool:
+        self._fencing = 0
+        # (expires_mono, fencing_token, resource_id); entries that no longer
+        # match the current lease are skipped when popped
+        self._expiry_heap: List[tuple] = []
+        # (acquired_mono, fencing_token, resource_id) for the stale lock reaper
+        self._age_heap: List[tuple] = []
+        self._waiters: Dict[str, deque] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self.stats = {
+            "acquired": 0, "contended": 0, "handed_off": 0,
+            "wait_timeouts": 0, "expired": 0, "reaped": 0, "renewed": 0
+        }
+
+    # -- locks ----------------------------------------------------------------
+
+    async def acquire_lock(self, resource_id: str, node_id: str, timeout_seconds: float,
+                           wait_seconds: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        Acquire a lock on a resource.
+
+        Returns the lease (token, fencing_token, expires_at, ...) or None.
+        With wait_seconds > 0 a busy lock queues the caller behind earlier
+        waiters instead of failing.
+        """
+        now = time.monotonic()
+        lease = self._try_acquire(resource_id, node_id, timeout_seconds, now)
+        if lease is not None:
+            return lease.to_dict(now)
+        self.stats["contended"] += 1
+        if wait_seconds <= 0:
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(resource_id, deque()).append((future, node_id, timeout_seconds))
+        try:
+            lease = await asyncio.wait_for(asyncio.shield(future), wait_seconds)
+        except asyncio.TimeoutError:
+            # The lock may have been handed over while the timeout was unwinding
+            if future.done() and not future.cancelled():
+                return future.result().to_dict()
+            future.cancel()
+            self.stats["wait_timeouts"] += 1
+            return None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                granted = future.result()
+                self._release(resource_id, granted.token, None, time.monotonic())
+            future.cancel()
+            raise
+        return lease.to_dict()
+
+    async def acquire_many(self, requests: List[tuple], atomic: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """
+        Acquire several locks without waiting.
+
+        requests holds (resource_id, node_id, timeout_seconds) tuples. With
+        atomic=True either every lock is granted or none is.
+        """
+        now = time.monotonic()
+        if atomic:
+            resources = [r[0] for r in requests]
+            if len(set(resources)) != len(resources) or not all(self._is_free(r, now) for r in resources):
+                self.stats["contended"] += 1
+                return [None] * len(requests)
+        results = []
+        for resource_id, node_id, timeout_seconds in requests:
+            lease = self._try_acquire(resource_id, node_id, timeout_seconds, now)
+            if lease is None:
+                self.stats["contended"] += 1
+            results.append(lease.to_dict(now) if lease is not None else None)
+        return results
+
+    async def renew_lock(self, resource_id: str, token: str, timeout_seconds: float) -> Optional[Dict[str, Any]]:
+        """Extend a live lease. The fencing token is unchanged."""
+        now = time.monotonic()
+        self._expire(now)
+        lease = self.locks.get(resource_id)
+        if lease is None or lease.token != token:
+            return None
+        lease.expires_mono = now + timeout_seconds
+        self._push_expiry(lease)
+        self.stats["renewed"] += 1
+        return lease.to_dict(now)
+
+    async def release_lock(self, resource_id: str, token: str, fencing_token: Optional[int] = None) -> bool:
         """Release a lock."""
-        async with self._lock:
-            if resource_id not in self.locks:
-                return False
-            
-            if self.locks[resource_id]["token"] != token:
-                return False
-            
-            del self.locks[resource_id]
-            return True
-    
+        return self._release(resource_id, token, fencing_token, time.monotonic())
+
+    async def release_many(self, requests: List[tuple]) -> List[bool]:
+        """Release several locks; requests holds (resource_id, token) tuples."""
+        now = time.monotonic()
+        return [self._release(resource_id, token, None, now) for resource_id, token in requests]
+
+    async def check_fencing(self, resource_id: str, fencing_token: int) -> bool:
+        """True if fencing_token belongs to the current, unexpired holder."""
+        self._expire(time.monotonic())
+        lease = self.locks.get(resource_id)
+        return lease is not None and lease.fencing_token == fencing_token
+
     async def get_locks(self) -> Dict[str, Dict]:
         """Get all active locks."""
-        async with self._lock:
-            now = datetime.now()
-            active = {}
-            
-            for resource_id, lock in list(self.locks.items()):
-                expires_at = datetime.fromisoformat(lock["expires_at"])
-                if expires_at > now:
-                    active[resource_id] = lock
-                else:
-                    del self.locks[resource_id]
-            
-            return active
-    
+        now = time.monotonic()
+        self._expire(now)
+        return {resource_id: lease.to_dict(now) for resource_id, lease in self.locks.items()}
+
+    async def reap_stale(self, max_age: float) -> List[Dict[str, Any]]:
+        """Forcibly release locks held for longer than max_age seconds (renewals included)."""
+        now = time.monotonic()
+        reaped = []
+        heap = self._age_heap
+        while heap and heap[0][0] <= now - max_age:
+            acquired_mono, fencing_token, resource_id = heapq.heappop(heap)
+            lease = self.locks.get(resource_id)
+            if lease is None or lease.fencing_token != fencing_token:
+                continue
+            reaped.append({
+                "resource_id": resource_id,
+                "node_id": lease.node_id,
+                "acquired_at": lease.acquired_at.isoformat(),
+                "age_seconds": now - acquired_mono,
+                "token": lease.token,
+                "fencing_token": fencing_token
+            })
+            del self.locks[resource_id]
+            self.stats["reaped"] += 1
+            self._handoff(resource_id, now)
+        return reaped
+
+    def _is_free(self, resource_id: str, now: float) -> bool:
+        self._expire(now)
+        self._prune_waiters(resource_id)
+        return resource_id not in self.locks and resource_id not in self._waiters
+
+    def _try_acquire(self, resource_id: str, node_id: str, timeout_seconds: float,
+                     now: float) -> Optional[Lease]:
+        # Queued waiters go first; a newcomer never barges past them
+        if not self._is_free(resource_id, now):
+            return None
+        return self._grant(resource_id, node_id, timeout_seconds, now)
+
+    def _grant(self, resource_id: str, node_id: str, timeout_seconds: float, now: float) -> Lease:
+        self._fencing += 1
+        lease = Lease(resource_id, node_id, self._fencing, timeout_seconds, now)
+        self.locks[resource_id] = lease
+        heapq.heappush(self._age_heap, (now, lease.fencing_token, resource_id))
+        self._push_expiry(lease)
+        self.stats["acquired"] += 1
+        return lease
+
+    def _release(self, resource_id: str, token: str, fencing_token: Optional[int], now: float) -> bool:
+        lease = self.locks.get(resource_id)
+        if lease is None or lease.token != token:
+            return False
+        if fencing_token is not None and lease.fencing_token != fencing_token:
+            return False
+        del self.locks[resource_id]
+        self._handoff(resource_id, now)
+        return True
+
+    def _handoff(self, resource_id: str, now: float):
+        """Grant a just-freed lock to the first live waiter."""
+        self._prune_waiters(resource_id)
+        queue = self._waiters.get(resource_id)
+        if not queue:
+            return
+        future, node_id, timeout_seconds = queue.popleft()
+        if not queue:
+            del self._waiters[resource_id]
+        future.set_result(self._grant(resource_id, node_id, timeout_seconds, now))
+        self.stats["handed_off"] += 1
+
+    def _prune_waiters(self, resource_id: str):
+        queue = self._waiters.get(resource_id)
+        if queue is None:
+            return
+        while queue and queue[0][0].done():
+            queue.popleft()
+        if not queue:
+            del self._waiters[resource_id]
+
+    def _push_expiry(self, lease: Lease):
+        heap = self._expiry_heap
+        heapq.heappush(heap, (lease.expires_mono, lease.fencing_token, lease.resource_id))
+        # Renewals and releases leave stale entries behind; rebuild when they dominate
+        if len(heap) > 2 * len(self.locks) + 64:
+            self._expiry_heap = [e for e in heap if self._is_current(e)]
+            heapq.heapify(self._expiry_heap)
+            self._age_heap = [e for e in self._age_heap if self._holds(e)]
+            heapq.heapify(self._age_heap)
+        self._schedule_expiry()
+
+    def _is_current(self, entry: tuple) -> bool:
+        lease = self.locks.get(entry[2])
+        return lease is not None and lease.fencing_token == entry[1] and lease.expires_mono == entry[0]
+
+    def _holds(self, entry: tuple) -> bool:
+        lease = self.locks.get(entry[2])
+        return lease is not None and lease.fencing_token == entry[1]
+
+    def _expire(self, now: float):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                del self.locks[entry[2]]
+                self.stats["expired"] += 1
+                self._handoff(entry[2], now)
+
+    def _schedule_expiry(self):
+        """Keep one loop timer armed for the earliest expiry, so waiters are served on time."""
+        if not self._expiry_heap:
+            return
+        when = self._expiry_heap[0][0]
+        if self._timer is not None and self._timer_at <= when:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = when
+        self._timer = loop.call_later(max(0.0, when - time.monotonic()), self._on_expiry_timer)
+
+    def _on_expiry_timer(self):
+        self._timer = None
+        self._timer_at = None
+        self._expire(time.monotonic())
+        self._schedule_expiry()
+
+    # -- nodes ----------------------------------------------------------------
+
     async def register_node(self, registration: NodeRegistration):
         """Register a node."""
-        async with self._lock:
-            self.nodes[registration.node_id] = {
-                "node_id": registration.node_id,
-                "node_name": registration.node_name,
-                "layer": registration.layer,
-                "ip_address": registration.ip_address,
-                "capabilities": registration.capabilities,
-                "status": "online",
-                "last_heartbeat": datetime.now().isoformat()
-            }
+        self.nodes[registration.node_id] = {
+            "node_id": registration.node_id,
+            "node_name": registration.node_name,
+            "layer": registration.layer,
+            "ip_address": registration.ip_address,
+            "capabilities": registration.capabilities,
+            "status": "online",
+            "last_heartbeat": datetime.now().isoformat()
+        }
     
     async def get_nodes(self) -> Dict[str, Dict]:
         """Get all registered nodes."""
-        async with self._lock:
-            return dict(self.nodes)
+        return dict(self.nodes)
     
     async def heartbeat(self, node_id: str) -> bool:
         """Update node heartbeat."""
-        async with self._lock:
-            if node_id in self.nodes:
-                self.nodes[node_id]["last_heartbeat"] = datetime.now().isoformat()
-                self.nodes[node_id]["status"] = "online"
-                return True
+        node = self.nodes.get(node_id)
+        if node is None:
             return False
+        node["last_heartbeat"] = datetime.now().isoformat()
+        node["status"] = "online"
+        return True
+
+    # -- state ----------------------------------------------------------------
     
     async def set_state(self, key: str, value: Any):
         """Set a state value."""
-        async with self._lock:
-            self.state[key] = value
+        self.state[key] = value
     
     async def get_state(self, key: str) -> Any:
         """Get a state value."""
-        async with self._lock:
-            return self.state.get(key)
+        return self.state.get(key)
 
 # =============================================================================
 # FastAPI Application
@@ -260,35 +495,61 @@ async def health_check():
         "store_type": "redis" if redis_client else "memory"
     }
 
+def _lock_response(lease: Optional[Dict[str, Any]], request: LockRequest) -> LockResponse:
+    if lease:
+        logger.info(f"Lock acquired: {request.resource_id} by {request.node_id}")
+        return LockResponse(
+            success=True,
+            token=lease["token"],
+            fencing_token=lease["fencing_token"],
+            message="Lock acquired",
+            expires_at=lease["expires_at"]
+        )
+    logger.warning(f"Lock denied: {request.resource_id} for {request.node_id}")
+    return LockResponse(
+        success=False,
+        message="Resource is locked by another node"
+    )
+
 @app.post("/lock/acquire", response_model=LockResponse)
 async def acquire_lock(request: LockRequest):
-    """Acquire a lock on a resource."""
-    token = await store.acquire_lock(
+    """Acquire a lock on a resource, optionally waiting in FIFO order."""
+    lease = await store.acquire_lock(
         resource_id=request.resource_id,
         node_id=request.node_id,
-        timeout_seconds=request.timeout_seconds
+        timeout_seconds=request.timeout_seconds,
+        wait_seconds=request.wait_seconds
     )
-    
-    if token:
-        expires_at = datetime.now() + timedelta(seconds=request.timeout_seconds)
-        logger.info(f"Lock acquired: {request.resource_id} by {request.node_id}")
+    return _lock_response(lease, request)
+
+@app.post("/lock/acquire_batch")
+async def acquire_lock_batch(request: BatchLockRequest):
+    """Acquire several locks in one call (no waiting)."""
+    leases = await store.acquire_many(
+        [(r.resource_id, r.node_id, r.timeout_seconds) for r in request.requests],
+        atomic=request.atomic
+    )
+    results = [_lock_response(lease, r) for lease, r in zip(leases, request.requests)]
+    return {"success": all(r.success for r in results), "results": results}
+
+@app.post("/lock/renew", response_model=LockResponse)
+async def renew_lock(request: RenewRequest):
+    """Extend a held lock; the fencing token stays the same."""
+    lease = await store.renew_lock(request.resource_id, request.token, request.timeout_seconds)
+    if lease:
         return LockResponse(
             success=True,
-            token=token,
-            message="Lock acquired",
-            expires_at=expires_at.isoformat()
-        )
-    else:
-        logger.warning(f"Lock denied: {request.resource_id} for {request.node_id}")
-        return LockResponse(
-            success=False,
-            message="Resource is locked by another node"
+            token=lease["token"],
+            fencing_token=lease["fencing_token"],
+            message="Lock renewed",
+            expires_at=lease["expires_at"]
         )
+    return LockResponse(success=False, message="Lock expired or token invalid")
 
 @app.post("/lock/release", response_model=LockResponse)
 async def release_lock(request: ReleaseRequest):
     """Release a lock."""
-    success = await store.release_lock(request.resource_id, request.token)
+    success = await store.release_lock(request.resource_id, request.token, request.fencing_token)
     
     if success:
         logger.info(f"Lock released: {request.resource_id}")
@@ -296,11 +557,22 @@ async def release_lock(request: ReleaseRequest):
     else:
         return LockResponse(success=False, message="Invalid lock or token")
 
+@app.post("/lock/release_batch")
+async def release_lock_batch(request: BatchReleaseRequest):
+    """Release several locks in one call."""
+    released = await store.release_many([(r.resource_id, r.token) for r in request.requests])
+    return {"success": all(released), "released": released}
+
+@app.get("/lock/{resource_id}/fencing/{fencing_token}")
+async def check_fencing(resource_id: str, fencing_token: int):
+    """Check whether a fencing token still belongs to the current holder."""
+    return {"valid": await store.check_fencing(resource_id, fencing_token)}
+
 @app.get("/locks")
 async def get_locks():
     """Get all active locks."""
     locks = await store.get_locks()
-    return {"locks": locks, "count": len(locks)}
+    return {"locks": locks, "count": len(locks), "stats": store.stats}
 
 @app.post("/node/register")
 async def register_node(registration: NodeRegistration):
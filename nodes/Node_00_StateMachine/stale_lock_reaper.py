@@ -3,16 +3,15 @@ Stale Lock Reaper for Node 00: State Machine
 过期锁清理器 - 防止系统死锁
 
 功能：
-1. 每 60 秒扫描一次所有锁
-2. 如果锁持有时间超过 300 秒（5 分钟），自动删除
+1. 每 60 秒检查一次（MemoryStore.reap_stale，按获取时间的最小堆，不遍历全部锁）
+2. 如果锁持有时间超过 300 秒（5 分钟），自动删除并把锁交给下一个等待者
 3. 记录清理日志到 Node 65
 4. 支持 Redis 和内存存储两种模式
 """
 
 import asyncio
 import logging
-import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 import httpx
 
@@ -23,7 +22,7 @@ class StaleLockReaper:
     
     def __init__(
         self,
-        store,  # MemoryStore 实例
+        store,  # MemoryStore 实例（需提供 reap_stale）
         scan_interval: int = 60,  # 扫描间隔（秒）
         max_lock_age: int = 300,  # 最大锁持有时间（秒）
         audit_log_url: Optional[str] = "http://localhost:8065/log"
@@ -71,39 +70,16 @@ class StaleLockReaper:
                 await asyncio.sleep(self.scan_interval)
     
     async def _scan_and_reap(self):
-        """扫描并清理过期锁"""
+        """清理过期锁：store 按获取时间维护最小堆，只会访问超龄的锁"""
         self.stats["total_scans"] += 1
         self.stats["last_scan_time"] = datetime.now().isoformat()
         
-        now = datetime.now()
-        stale_locks: List[Dict] = []
-        
-        # 扫描所有锁
-        async with self.store._lock:
-            for resource_id, lock in list(self.store.locks.items()):
-                try:
-                    acquired_at = datetime.fromisoformat(lock["acquired_at"])
-                    age_seconds = (now - acquired_at).total_seconds()
-                    
-                    # 检查是否过期
-                    if age_seconds > self.max_lock_age:
-                        stale_locks.append({
-                            "resource_id": resource_id,
-                            "node_id": lock["node_id"],
-                            "acquired_at": lock["acquired_at"],
-                            "age_seconds": age_seconds,
-                            "token": lock["token"]
-                        })
-                        
-                        # 删除过期锁
-                        del self.store.locks[resource_id]
-                        logger.warning(
-                            f"Reaped stale lock: resource={resource_id}, "
-                            f"node={lock['node_id']}, age={age_seconds:.1f}s"
-                        )
-                        
-                except Exception as e:
-                    logger.error(f"Error processing lock {resource_id}: {e}")
+        stale_locks: List[Dict] = await self.store.reap_stale(self.max_lock_age)
+        for lock in stale_locks:
+            logger.warning(
+                f"Reaped stale lock: resource={lock['resource_id']}, "
+                f"node={lock['node_id']}, age={lock['age_seconds']:.1f}s"
+            )
         
         # 更新统计
         if stale_locks:
@@ -224,40 +200,24 @@ def integrate_reaper(app, store):
 # =============================================================================
 
 if __name__ == "__main__":
-    import sys
-    
-    # 模拟 MemoryStore
-    class MockStore:
-        def __init__(self):
-            self.locks = {}
-            self._lock = asyncio.Lock()
+    from main import MemoryStore
     
     async def test_reaper():
         """测试 Reaper"""
-        store = MockStore()
+        store = MemoryStore()
         
-        # 添加一些测试锁
-        now = datetime.now()
-        store.locks["test_lock_1"] = {
-            "node_id": "Node_33_ADB",
-            "token": "test-token-1",
-            "acquired_at": (now - timedelta(seconds=400)).isoformat(),
-            "expires_at": (now + timedelta(seconds=100)).isoformat()
-        }
-        store.locks["test_lock_2"] = {
-            "node_id": "Node_50_Transformer",
-            "token": "test-token-2",
-            "acquired_at": (now - timedelta(seconds=100)).isoformat(),
-            "expires_at": (now + timedelta(seconds=200)).isoformat()
-        }
+        # 添加一些测试锁：test_lock_1 持有超过 max_lock_age，test_lock_2 在此之后获取
+        await store.acquire_lock("test_lock_1", "Node_33_ADB", timeout_seconds=300)
+        await asyncio.sleep(2)
+        await store.acquire_lock("test_lock_2", "Node_50_Transformer", timeout_seconds=300)
         
         print(f"Initial locks: {len(store.locks)}")
         
         # 创建 Reaper
         reaper = StaleLockReaper(
             store=store,
-            scan_interval=5,
-            max_lock_age=300,
+            scan_interval=1,
+            max_lock_age=2,
             audit_log_url=None  # 测试时不发送审计日志
         )
         
@@ -265,7 +225,7 @@ if __name__ == "__main__":
         await reaper.start()
         
         # 等待一次扫描
-        await asyncio.sleep(6)
+        await asyncio.sleep(1.5)
         
         print(f"Locks after scan: {len(store.locks)}")
         print(f"Stats: {reaper.get_stats()}")
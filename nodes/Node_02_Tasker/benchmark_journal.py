@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tasker Journal Benchmark
+
+Times TaskManager.create_task with the append-only journal against the
+full-snapshot rewrite it replaces (every enqueue re-serializes the whole
+task set), and measures recovery time from snapshot + journal segments.
+
+Journal enqueues are timed both sequentially (each awaits its own commit)
+and in concurrent bursts (commits are grouped). The rewrite baseline is
+O(total tasks) per enqueue, so it is sampled with a few enqueues on top
+of a pre-filled task set.
+
+Usage:
+    python benchmark_journal.py --tasks 1000 10000 100000 [--fsync]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("TASKER_JOURNAL_DIR", tempfile.mkdtemp(prefix="tasker_bench_"))
+os.environ.setdefault("TASKER_PERSIST_FILE", os.path.join(os.environ["TASKER_JOURNAL_DIR"], "legacy.json"))
+
+from main import Task, TaskManager, TaskStatus  # noqa: E402
+
+
+class SnapshotJournal:
+    """Baseline: rewrite every task as one JSON document on each change."""
+
+    def __init__(self, manager: TaskManager, path: str):
+        self.manager = manager
+        self.path = path
+
+    def _rewrite(self) -> asyncio.Future:
+        with open(self.path, 'w') as f:
+            json.dump({"tasks": [t.model_dump() for t in self.manager.tasks.values()]}, f, default=str)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    def record_create(self, task: Task) -> asyncio.Future:
+        return self._rewrite()
+
+    record_update = record_create
+
+    def record_delete(self, task_id: str) -> asyncio.Future:
+        return self._rewrite()
+
+
+def params(i: int):
+    return {"message": f"task {i}", "target": f"device_{i % 32}"}
+
+
+async def journal_enqueue(directory: str, tasks: int, burst: int, fsync: bool):
+    manager = TaskManager(directory)
+    manager.journal.fsync = fsync
+
+    half = tasks // 2
+    start = time.perf_counter()
+    for i in range(half):
+        await manager.create_task(f"t{i}", "example", params(i))
+    sequential = half / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(half, tasks, burst):
+        await asyncio.gather(*[
+            manager.create_task(f"t{i}", "example", params(i))
+            for i in range(offset, min(offset + burst, tasks))
+        ])
+    concurrent = (tasks - half) / (time.perf_counter() - start)
+
+    # A completion transition for every tenth task, as a running queue would write
+    for task in list(manager.tasks.values())[::10]:
+        task.status = TaskStatus.COMPLETED
+        manager.journal.record_update(task)
+    await manager.journal.flush()
+    commits = manager.journal.stats["commits"]
+    manager.journal.close()
+    return sequential, concurrent, commits
+
+
+async def snapshot_enqueue(directory: str, tasks: int, samples: int):
+    manager = TaskManager(os.path.join(directory, "baseline"))
+    manager.journal.close()
+    manager.journal = SnapshotJournal(manager, os.path.join(directory, "tasker_tasks.json"))
+    now = datetime.now()
+    for i in range(tasks):
+        task = Task(id=str(uuid.uuid4()), name=f"t{i}", command="example", params=params(i), created_at=now)
+        manager.tasks[task.id] = task
+
+    start = time.perf_counter()
+    for i in range(samples):
+        await manager.create_task(f"s{i}", "example", params(i))
+    return samples / (time.perf_counter() - start)
+
+
+def recover(directory: str):
+    start = time.perf_counter()
+    manager = TaskManager(directory)
+    elapsed = time.perf_counter() - start
+    if manager.journal._compactor is not None:
+        manager.journal._compactor.join()
+    manager.journal.close()
+    return elapsed, len(manager.tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tasker journal benchmark")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--burst", type=int, default=100, help="concurrent enqueues per burst")
+    parser.add_argument("--samples", type=int, default=20, help="baseline enqueues to time")
+    parser.add_argument("--fsync", action="store_true", help="fsync every group commit")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8}{'rewrite/s':>12}{'journal seq/s':>15}{'journal burst/s':>17}"
+          f"{'commits':>9}{'recover s':>11}{'recover (compacted) s':>23}")
+    for tasks in args.tasks:
+        root = tempfile.mkdtemp(prefix="tasker_bench_")
+        try:
+            directory = os.path.join(root, "journal")
+            baseline = asyncio.run(snapshot_enqueue(root, tasks, args.samples))
+            sequential, concurrent, commits = asyncio.run(
+                journal_enqueue(directory, tasks, args.burst, args.fsync)
+            )
+            recovery, loaded = recover(directory)
+            compacted, loaded_again = recover(directory)
+            assert loaded == loaded_again == tasks, (loaded, loaded_again, tasks)
+            print(f"{tasks:>8}{baseline:>12.0f}{sequential:>15.0f}{concurrent:>17.0f}"
+                  f"{commits:>9}{recovery:>11.2f}{compacted:>23.2f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    shutil.rmtree(os.environ["TASKER_JOURNAL_DIR"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,29 @@
 Node 02: Tasker - 任务调度器
 =============================
 提供任务队列管理、定时任务、任务状态跟踪功能
+
+持久化采用追加写日志（TaskJournal）：每次状态变化只追加一行，
+多个并发写入合并为一次 write/fsync（group commit）；日志段写满后轮转，
+由后台线程把快照和已封存的段合并成新快照。启动时回放快照 + 日志段。
+
+执行采用固定数量的工作协程：入队时通过条件变量唤醒，按命令限制并发，
+同步处理器放到线程池（或进程池）执行；失败重试进入延迟堆，按指数退避再入队。
 """
 import os
+import glob
 import json
 import asyncio
+import functools
+import threading
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Callable
 from enum import Enum
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 import heapq
 
 app = FastAPI(title="Node 02 - Tasker", version="2.0.0")
@@ -47,49 +59,306 @@ class Task(BaseModel):
     retry_count: int = 0
     max_retries: int = 3
 
+# 回放时整批校验，比逐个 Task(**data) 快
+_TASK_LIST = TypeAdapter(List[Task])
+
+# 状态变化时写入日志的字段（其余字段创建后不变）
+TRANSITION_FIELDS = ("status", "started_at", "completed_at", "result", "error", "retry_count")
+
+
+def replay_journal(directory: str, upto_segment: Optional[int] = None) -> tuple:
+    """
+    回放快照和日志段，返回 (快照覆盖到的段号, 已回放的最大段号, {task_id: 任务字段})
+
+    结果按任务创建顺序排列。upto_segment 限定只回放不超过该段号的日志（压缩时使用）。
+    文件末尾写了一半的行（崩溃时）会被忽略。
+    """
+    states: Dict[str, Dict[str, Any]] = {}
+    base = 0
+    snapshot_path = os.path.join(directory, "snapshot.jsonl")
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r') as f:
+            base = json.loads(f.readline())["segment"]
+            for line in f:
+                data = json.loads(line)
+                states[data["id"]] = data
+
+    last = base
+    for segment, path in _journal_segments(directory):
+        if segment <= base or (upto_segment is not None and segment > upto_segment):
+            continue
+        last = segment
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                op = entry["op"]
+                if op == "create":
+                    states[entry["task"]["id"]] = entry["task"]
+                elif op == "update":
+                    state = states.get(entry["id"])
+                    if state is not None:
+                        state.update(entry["fields"])
+                elif op == "delete":
+                    states.pop(entry["id"], None)
+    return base, last, states
+
+
+def _journal_segments(directory: str) -> List[tuple]:
+    segments = []
+    for path in glob.glob(os.path.join(directory, "journal-*.log")):
+        try:
+            segments.append((int(os.path.basename(path)[8:-4]), path))
+        except ValueError:
+            continue
+    return sorted(segments)
+
+
+class TaskJournal:
+    """
+    任务状态追加写日志
+
+    record_*() 只把一行放进缓冲区并返回一个 future；写入协程醒来后把缓冲区中
+    所有行一次写出（可选 fsync），再统一完成这些 future。调用方 await future
+    即可确认落盘，并发的写入自然合并成一次 I/O。
+
+    每个日志段写满 segment_size 行后轮转，后台线程把旧快照与已封存的段回放
+    合并为新快照并删除这些段，不占用事件循环。
+    """
+
+    def __init__(self, directory: str, fsync: bool = False, segment_size: int = 50000):
+        self.directory = directory
+        self.fsync = fsync
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+
+        self._buffer: List[str] = []
+        self._waiters: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._file = None
+        self._segment = 0
+        self._segment_lines = 0
+        self._compactor: Optional[threading.Thread] = None
+        self.stats = {"records": 0, "commits": 0, "compactions": 0}
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """回放已有日志，并打开一个新的日志段用于后续写入；旧的段在后台合并进快照"""
+        base, last, states = replay_journal(self.directory)
+        segments = _journal_segments(self.directory)
+        self._segment = max([last] + [s for s, _ in segments])
+        sealed = self._segment
+        self._open_segment()
+        if any(segment > base for segment, _ in segments):
+            self._start_compaction(sealed)
+        return states
+
+    def write_snapshot(self, states: List[Dict[str, Any]]):
+        """用给定的任务集合直接建立快照（迁移旧的 JSON 持久化文件时使用）"""
+        if self._compactor is not None:
+            self._compactor.join()
+        self._write_snapshot(self._segment - 1, states)
+
+    def record_create(self, task: "Task") -> asyncio.Future:
+        return self._append({"op": "create", "task": task.model_dump()})
+
+    def record_update(self, task: "Task") -> asyncio.Future:
+        data = task.model_dump(include=set(TRANSITION_FIELDS))
+        return self._append({"op": "update", "id": task.id, "fields": data})
+
+    def record_delete(self, task_id: str) -> asyncio.Future:
+        return self._append({"op": "delete", "id": task_id})
+
+    def _append(self, entry: Dict[str, Any]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if self._writer is None or self._writer.done() or self._writer.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._writer = loop.create_task(self._write_loop())
+        self._buffer.append(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+        future = loop.create_future()
+        self._waiters.append(future)
+        self._wakeup.set()
+        return future
+
+    async def _write_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._buffer:
+                continue
+            batch, self._buffer = self._buffer, []
+            waiters, self._waiters = self._waiters, []
+            try:
+                self._file.write("".join(batch))
+                self._file.flush()
+                if self.fsync:
+                    await asyncio.to_thread(os.fsync, self._file.fileno())
+                error = None
+            except Exception as e:
+                error = e
+                print(f"Failed to write task journal: {e}")
+            for future in waiters:
+                if not future.done():
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+            self.stats["records"] += len(batch)
+            self.stats["commits"] += 1
+            self._segment_lines += len(batch)
+            if self._segment_lines >= self.segment_size:
+                self._rotate()
+
+    async def flush(self):
+        """等待缓冲区中已有的记录全部写出"""
+        if self._waiters:
+            await asyncio.gather(*self._waiters, return_exceptions=True)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.cancel()
+        if self._buffer and self._file is not None:
+            self._file.write("".join(self._buffer))
+            self._buffer = []
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def _open_segment(self):
+        self._segment += 1
+        self._segment_lines = 0
+        path = os.path.join(self.directory, f"journal-{self._segment:06d}.log")
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _rotate(self):
+        """封存当前段，开新段；若没有进行中的压缩则在后台合并封存的段"""
+        self._file.close()
+        sealed = self._segment
+        self._open_segment()
+        if self._compactor is None or not self._compactor.is_alive():
+            self._start_compaction(sealed)
+
+    def _start_compaction(self, upto_segment: int):
+        self._compactor = threading.Thread(
+            target=self.compact, args=(upto_segment,), name="tasker-journal-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    def compact(self, upto_segment: int):
+        """把快照和不超过 upto_segment 的日志段合并为新快照，然后删除这些段"""
+        try:
+            started = time.perf_counter()
+            _, last, states = replay_journal(self.directory, upto_segment)
+            self._write_snapshot(last, states.values())
+            for segment, path in _journal_segments(self.directory):
+                if segment <= last:
+                    os.remove(path)
+            self.stats["compactions"] += 1
+            self.stats["last_compaction_seconds"] = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            print(f"Failed to compact task journal: {e}")
+
+    def _write_snapshot(self, segment: int, states):
+        path = os.path.join(self.directory, "snapshot.jsonl")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"segment": segment}) + "\n")
+            for state in states:
+                f.write(json.dumps(state, separators=(",", ":"), default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
 class TaskManager:
-    def __init__(self):
+    def __init__(self, journal_dir: Optional[str] = None, num_workers: Optional[int] = None):
         self.tasks: Dict[str, Task] = {}
         self.task_queue: List[tuple] = []  # (priority, created_at, task_id)
         self.running_tasks: Dict[str, asyncio.Task] = {}
         self.scheduled_tasks: Dict[str, asyncio.Task] = {}
         self.task_handlers: Dict[str, Callable] = {}
         self._lock = asyncio.Lock()
+        # 入队/释放并发名额时唤醒工作协程，与 _lock 共用同一把锁
+        self._ready = asyncio.Condition(self._lock)
+
+        # 工作池
+        self.num_workers = num_workers or int(os.getenv("TASKER_WORKERS", "8"))
+        self._workers: List[asyncio.Task] = []
+        self.command_limits: Dict[str, int] = {}
+        self.handler_executors: Dict[str, str] = {}  # command -> "thread" / "process"
+        self._running_by_command: Dict[str, int] = {}
+        self._blocked: Dict[str, List[tuple]] = {}  # 达到并发上限的命令暂存的队列项
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # 重试延迟堆：(可执行时间 monotonic, 队列项)
+        self._delayed: List[tuple] = []
+        self.retry_base_delay = float(os.getenv("TASKER_RETRY_BASE_DELAY", "1.0"))
+        self.retry_max_delay = float(os.getenv("TASKER_RETRY_MAX_DELAY", "60.0"))
+        self.journal = TaskJournal(
+            journal_dir or os.getenv("TASKER_JOURNAL_DIR", "/tmp/tasker_journal"),
+            fsync=os.getenv("TASKER_JOURNAL_FSYNC", "0") == "1",
+            segment_size=int(os.getenv("TASKER_JOURNAL_SEGMENT_SIZE", "50000"))
+        )
         self._load_persisted_tasks()
 
     def _load_persisted_tasks(self):
-        """加载持久化的任务"""
+        """回放任务日志；日志为空时迁移旧版 TASKER_PERSIST_FILE"""
+        try:
+            states = self.journal.load()
+        except Exception as e:
+            print(f"Failed to load task journal: {e}")
+            return
+
         persist_file = os.getenv("TASKER_PERSIST_FILE", "/tmp/tasker_tasks.json")
-        if os.path.exists(persist_file):
+        if not states and os.path.exists(persist_file):
             try:
                 with open(persist_file, 'r') as f:
-                    data = json.load(f)
-                    for task_data in data.get("tasks", []):
-                        task = Task(**task_data)
-                        self.tasks[task.id] = task
-                        if task.status == TaskStatus.PENDING:
-                            heapq.heappush(self.task_queue, (task.priority, task.created_at, task.id))
+                    legacy = json.load(f).get("tasks", [])
+                states = {t.id: t.model_dump() for t in (Task(**d) for d in legacy)}
+                self.journal.write_snapshot(list(states.values()))
             except Exception as e:
-                print(f"Failed to load persisted tasks: {e}")
-
-    async def _persist_tasks(self):
-        """持久化任务"""
-        persist_file = os.getenv("TASKER_PERSIST_FILE", "/tmp/tasker_tasks.json")
-        try:
-            with open(persist_file, 'w') as f:
-                json.dump({"tasks": [t.dict() for t in self.tasks.values()]}, f, default=str)
-        except Exception as e:
-            print(f"Failed to persist tasks: {e}")
+                print(f"Failed to migrate persisted tasks: {e}")
 
-    def register_handler(self, command: str, handler: Callable):
-        """注册任务处理器"""
+        for task in _TASK_LIST.validate_python(list(states.values())):
+            # 崩溃时仍在运行的任务重新排队
+            if task.status == TaskStatus.RUNNING:
+                task.status = TaskStatus.PENDING
+            self.tasks[task.id] = task
+            if task.status == TaskStatus.PENDING:
+                self.task_queue.append((task.priority, task.created_at, task.id))
+        heapq.heapify(self.task_queue)
+
+    def register_handler(self, command: str, handler: Callable,
+                         max_concurrency: Optional[int] = None,
+                         executor: str = "thread"):
+        """
+        注册任务处理器
+
+        Args:
+            max_concurrency: 该命令同时执行的任务数上限，None 表示只受工作协程数限制
+            executor: 同步处理器的执行位置，"thread" 为线程池，"process" 为进程池
+                （CPU 密集型；处理器和参数必须可 pickle）。协程处理器始终在事件循环上执行
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor}")
         self.task_handlers[command] = handler
+        self.handler_executors[command] = executor
+        if max_concurrency is None:
+            self.command_limits.pop(command, None)
+        else:
+            self.command_limits[command] = max_concurrency
 
     async def create_task(self, name: str, command: str, params: Dict = None, 
                          priority: TaskPriority = TaskPriority.NORMAL,
                          scheduled_at: Optional[datetime] = None) -> Task:
         """创建新任务"""
-        async with self._lock:
+        async with self._ready:
             task = Task(
                 id=str(uuid.uuid4()),
                 name=name,
@@ -108,18 +377,22 @@ class TaskManager:
             else:
                 # 立即执行
                 heapq.heappush(self.task_queue, (priority, task.created_at, task.id))
+                self._ready.notify()
 
-            await self._persist_tasks()
-            return task
+            committed = self.journal.record_create(task)
+        # 在锁外等待落盘，并发创建的任务合并为一次写入
+        await committed
+        return task
 
     async def _run_scheduled(self, task_id: str, delay: float):
         """运行定时任务"""
         await asyncio.sleep(delay)
-        async with self._lock:
+        async with self._ready:
             if task_id in self.tasks:
                 task = self.tasks[task_id]
                 heapq.heappush(self.task_queue, (task.priority, task.created_at, task.id))
                 del self.scheduled_tasks[task_id]
+                self._ready.notify()
 
     async def execute_task(self, task_id: str) -> Any:
         """执行任务"""
@@ -129,43 +402,158 @@ class TaskManager:
 
         task.status = TaskStatus.RUNNING
         task.started_at = datetime.now()
+        # RUNNING 只是中间状态，不等落盘再执行；写入失败由回调报告
+        self.journal.record_update(task).add_done_callback(
+            functools.partial(self._report_unawaited_record, task.id)
+        )
 
         handler = self.task_handlers.get(task.command)
         if not handler:
             task.status = TaskStatus.FAILED
             task.error = f"No handler registered for command: {task.command}"
             task.completed_at = datetime.now()
+            await self.journal.record_update(task)
             return task
 
         try:
-            if asyncio.iscoroutinefunction(handler):
-                result = await handler(**task.params)
-            else:
-                result = handler(**task.params)
+            result = await self._invoke(task.command, handler, task.params)
             task.result = result
             task.status = TaskStatus.COMPLETED
         except Exception as e:
             task.retry_count += 1
             if task.retry_count < task.max_retries:
                 task.status = TaskStatus.PENDING
-                heapq.heappush(self.task_queue, (task.priority, datetime.now(), task.id))
+                await self._schedule_retry(task)
             else:
                 task.status = TaskStatus.FAILED
                 task.error = str(e)
 
         task.completed_at = datetime.now()
-        await self._persist_tasks()
+        await self.journal.record_update(task)
         return task
 
-    async def process_queue(self):
-        """处理任务队列"""
+    @staticmethod
+    def _report_unawaited_record(task_id: str, committed: asyncio.Future):
+        if not committed.cancelled() and committed.exception() is not None:
+            print(f"Task {task_id} state not journaled: {committed.exception()}")
+
+    async def _invoke(self, command: str, handler: Callable, params: Dict[str, Any]) -> Any:
+        """协程处理器直接 await；同步处理器放到线程池或进程池，避免阻塞事件循环"""
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(**params)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(handler, **params)
+        if self.handler_executors.get(command) == "process":
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=int(os.getenv("TASKER_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+                )
+            return await loop.run_in_executor(self._process_pool, call)
+        return await loop.run_in_executor(None, call)
+
+    def retry_delay(self, retry_count: int) -> float:
+        """第 retry_count 次重试前的等待秒数（指数退避）"""
+        return min(self.retry_base_delay * (2 ** (retry_count - 1)), self.retry_max_delay)
+
+    async def _schedule_retry(self, task: Task):
+        ready_at = time.monotonic() + self.retry_delay(task.retry_count)
+        async with self._ready:
+            heapq.heappush(self._delayed, (ready_at, (task.priority, datetime.now(), task.id)))
+            # 唤醒一个工作协程，让它按新的最早到期时间重新计算等待时长
+            self._ready.notify()
+
+    def _next_runnable(self) -> Optional[str]:
+        """
+        取出下一个可执行的任务（调用方持有 _lock）
+
+        先把到期的重试移回主队列；已取消/删除的队列项直接丢弃；
+        所属命令已达并发上限的队列项暂存到 _blocked，名额释放时再放回。
+        """
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            heapq.heappush(self.task_queue, heapq.heappop(self._delayed)[1])
+
+        while self.task_queue:
+            entry = heapq.heappop(self.task_queue)
+            task = self.tasks.get(entry[2])
+            if task is None or task.status != TaskStatus.PENDING:
+                continue
+            limit = self.command_limits.get(task.command)
+            running = self._running_by_command.get(task.command, 0)
+            if limit is not None and running >= limit:
+                heapq.heappush(self._blocked.setdefault(task.command, []), entry)
+                continue
+            self._running_by_command[task.command] = running + 1
+            # 先标记为运行中，防止同一任务的重复队列项（重试/手动重试）被再次取出
+            task.status = TaskStatus.RUNNING
+            return task.id
+        return None
+
+    def _release(self, command: str):
+        """释放命令的并发名额（调用方持有 _lock）"""
+        running = self._running_by_command.get(command, 0) - 1
+        if running > 0:
+            self._running_by_command[command] = running
+        else:
+            self._running_by_command.pop(command, None)
+        blocked = self._blocked.get(command)
+        # 跳过暂存期间已取消/删除的队列项，否则名额释放后没有项被放回，后续项永远等待
+        while blocked:
+            entry = heapq.heappop(blocked)
+            task = self.tasks.get(entry[2])
+            if task is not None and task.status == TaskStatus.PENDING:
+                heapq.heappush(self.task_queue, entry)
+                self._ready.notify()
+                break
+        if blocked is not None and not blocked:
+            del self._blocked[command]
+
+    async def _worker(self):
         while True:
-            async with self._lock:
-                if self.task_queue:
-                    _, _, task_id = heapq.heappop(self.task_queue)
-                    if task_id in self.tasks and self.tasks[task_id].status == TaskStatus.PENDING:
-                        asyncio.create_task(self.execute_task(task_id))
-            await asyncio.sleep(0.1)
+            async with self._ready:
+                while True:
+                    task_id = self._next_runnable()
+                    if task_id is not None:
+                        break
+                    timeout = self._delayed[0][0] - time.monotonic() if self._delayed else None
+                    try:
+                        await asyncio.wait_for(self._ready.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            task = self.tasks[task_id]
+            command = task.command
+            self.running_tasks[task_id] = asyncio.current_task()
+            try:
+                await self.execute_task(task_id)
+            except Exception as e:
+                print(f"Task {task_id} crashed: {e}")
+            finally:
+                self.running_tasks.pop(task_id, None)
+                async with self._ready:
+                    self._release(command)
+
+    def start_workers(self):
+        """启动工作协程（幂等）"""
+        self._workers = [w for w in self._workers if not w.done()]
+        for _ in range(self.num_workers - len(self._workers)):
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def stop_workers(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    async def process_queue(self):
+        """处理任务队列：启动工作池并一直运行到被取消"""
+        self.start_workers()
+        try:
+            await asyncio.gather(*self._workers)
+        finally:
+            await self.stop_workers()
 
     def get_task(self, task_id: str) -> Optional[Task]:
         return self.tasks.get(task_id)
@@ -187,9 +575,13 @@ class TaskManager:
                     if task_id in self.scheduled_tasks:
                         self.scheduled_tasks[task_id].cancel()
                         del self.scheduled_tasks[task_id]
-                    await self._persist_tasks()
-                    return True
-        return False
+                    committed = self.journal.record_update(task)
+                else:
+                    return False
+            else:
+                return False
+        await committed
+        return True
 
     async def retry_task(self, task_id: str) -> Optional[Task]:
         async with self._lock:
@@ -200,9 +592,25 @@ class TaskManager:
                     task.retry_count = 0
                     task.error = None
                     heapq.heappush(self.task_queue, (task.priority, datetime.now(), task.id))
-                    await self._persist_tasks()
-                    return task
-        return None
+                    self._ready.notify()
+                    committed = self.journal.record_update(task)
+                else:
+                    return None
+            else:
+                return None
+        await committed
+        return task
+
+    async def delete_task(self, task_id: str) -> bool:
+        if task_id not in self.tasks:
+            return False
+        await self.cancel_task(task_id)
+        async with self._lock:
+            if self.tasks.pop(task_id, None) is None:
+                return False
+            committed = self.journal.record_delete(task_id)
+        await committed
+        return True
 
 # 全局任务管理器
 task_manager = TaskManager()
@@ -225,6 +633,8 @@ async def health():
         "pending_tasks": len([t for t in task_manager.tasks.values() if t.status == TaskStatus.PENDING]),
         "running_tasks": len([t for t in task_manager.tasks.values() if t.status == TaskStatus.RUNNING]),
         "total_tasks": len(task_manager.tasks),
+        "workers": len(task_manager._workers),
+        "delayed_retries": len(task_manager._delayed),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -279,10 +689,7 @@ async def retry_task(task_id: str):
 @app.delete("/tasks/{task_id}")
 async def delete_task(task_id: str):
     """删除任务"""
-    if task_id in task_manager.tasks:
-        await task_manager.cancel_task(task_id)
-        del task_manager.tasks[task_id]
-        await task_manager._persist_tasks()
+    if await task_manager.delete_task(task_id):
         return {"success": True}
     raise HTTPException(status_code=404, detail="Task not found")
 
@@ -296,6 +703,13 @@ async def startup():
     """启动后台任务处理"""
     asyncio.create_task(task_manager.process_queue())
 
+@app.on_event("shutdown")
+async def shutdown():
+    """写出未提交的日志"""
+    await task_manager.stop_workers()
+    await task_manager.journal.flush()
+    task_manager.journal.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8002)
@@ -0,0 +1,159 @@
+"""
+Node_02 Tasker 单元测试
+
+测试内容：
+1. 命令并发上限
+2. 暂存（blocked）期间取消任务后，后续任务仍能执行
+3. 未等待的 RUNNING 日志写入失败时被报告
+"""
+
+import asyncio
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import TaskManager, TaskStatus
+
+
+class TestCommandConcurrency(unittest.TestCase):
+    """按命令限制并发的工作池"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _run(self, coro):
+        return asyncio.run(coro)
+
+    async def _wait_status(self, manager, task_id, status, timeout=2.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while manager.tasks[task_id].status != status:
+            if asyncio.get_running_loop().time() > deadline:
+                break
+            await asyncio.sleep(0.01)
+        return manager.tasks[task_id].status
+
+    def test_limit_respected(self):
+        async def scenario():
+            manager = TaskManager(journal_dir=self.tmpdir.name, num_workers=4)
+            active = 0
+            peak = 0
+
+            async def slow():
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+            manager.register_handler("slow", slow, max_concurrency=2)
+            tasks = [await manager.create_task(f"t{i}", "slow") for i in range(6)]
+            manager.start_workers()
+            for t in tasks:
+                await self._wait_status(manager, t.id, TaskStatus.COMPLETED)
+            await manager.stop_workers()
+            manager.journal.close()
+            return peak, [manager.tasks[t.id].status for t in tasks]
+
+        peak, statuses = self._run(scenario())
+        self.assertLessEqual(peak, 2)
+        self.assertTrue(all(s == TaskStatus.COMPLETED for s in statuses))
+
+    def test_cancel_while_blocked(self):
+        """b 在暂存时被取消，c 仍要在 a 完成后执行"""
+        async def scenario():
+            manager = TaskManager(journal_dir=self.tmpdir.name, num_workers=2)
+            release = asyncio.Event()
+
+            async def slow(name=""):
+                if name == "a":
+                    await release.wait()
+                return name
+
+            manager.register_handler("slow", slow, max_concurrency=1)
+            a = await manager.create_task("a", "slow", {"name": "a"})
+            manager.start_workers()
+            await self._wait_status(manager, a.id, TaskStatus.RUNNING)
+            b = await manager.create_task("b", "slow", {"name": "b"})
+            c = await manager.create_task("c", "slow", {"name": "c"})
+            # 让工作协程把 b、c 暂存到 _blocked
+            for _ in range(5):
+                await asyncio.sleep(0)
+            await manager.cancel_task(b.id)
+            release.set()
+            await self._wait_status(manager, c.id, TaskStatus.COMPLETED)
+            await manager.stop_workers()
+            manager.journal.close()
+            return ({name: manager.tasks[t.id].status for name, t in (("a", a), ("b", b), ("c", c))},
+                    dict(manager._blocked))
+
+        statuses, blocked = self._run(scenario())
+        self.assertEqual(statuses, {
+            "a": TaskStatus.COMPLETED,
+            "b": TaskStatus.CANCELLED,
+            "c": TaskStatus.COMPLETED,
+        })
+        self.assertEqual(blocked, {})
+
+
+class FlakyFile:
+    """第一次写入失败，之后转发给真实文件"""
+
+    def __init__(self, file):
+        self.file = file
+        self.failed = False
+
+    def write(self, data):
+        if not self.failed:
+            self.failed = True
+            raise OSError("disk full")
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+class TestJournalFailures(unittest.TestCase):
+    """日志写入失败"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_running_record_failure_reported(self):
+        async def scenario():
+            loop_errors = []
+            asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: loop_errors.append(ctx))
+            manager = TaskManager(journal_dir=self.tmpdir.name, num_workers=1)
+
+            async def ok():
+                # 让 RUNNING 记录单独成批写出
+                await manager.journal.flush()
+                return "done"
+
+            manager.register_handler("ok", ok)
+            task = await manager.create_task("t", "ok")
+            manager.journal._file = FlakyFile(manager.journal._file)
+            await manager.execute_task(task.id)
+            await manager.journal.flush()
+            gc.collect()
+            await asyncio.sleep(0)
+            manager.journal.close()
+            return manager.tasks[task.id].status, loop_errors
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status, loop_errors = asyncio.run(scenario())
+        self.assertEqual(status, TaskStatus.COMPLETED)
+        self.assertIn("state not journaled: disk full", output.getvalue())
+        self.assertEqual(loop_errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
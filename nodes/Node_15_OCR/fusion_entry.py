@@ -164,6 +164,7 @@ class FusionNode:
                         result = await self.vision_pipeline.understand(
                             image_base64=img_b64, mode="full",
                             task_context=params.get("task_context", ""),
+                            device_id=params.get("device_id"),
                         )
                         return {"success": result.success, "data": result.to_dict()}
                     else:
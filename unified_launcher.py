@@ -23,9 +23,12 @@ import signal
 import asyncio
 import logging
 import argparse
+import threading
 import subprocess
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Deque, Dict, List, Optional, Any, Tuple
+from urllib.parse import urlsplit
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from datetime import datetime
@@ -159,6 +162,7 @@ class SystemConfig:
     enable_web_ui: bool = True
     enable_device_api: bool = True
     minimal_mode: bool = False
+    use_zygote: bool = True         # 节点从预热进程 fork，而不是各自冷启动解释器
     
     @classmethod
     def load_from_env(cls) -> 'SystemConfig':
@@ -254,6 +258,18 @@ class ServiceInfo:
     process: Optional[subprocess.Popen] = None
     start_time: Optional[datetime] = None
     error: Optional[str] = None
+    health_url: Optional[str] = None
+    logs: Deque[str] = field(default_factory=deque)
+    spawned_at: Optional[float] = None      # time.monotonic()
+    ready_at: Optional[float] = None
+    launch_mode: str = ""                   # exec / zygote
+
+    @property
+    def startup_seconds(self) -> Optional[float]:
+        """从进程创建到就绪的耗时"""
+        if self.spawned_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.spawned_at
 
 
 class ServiceManager:
@@ -263,17 +279,54 @@ class ServiceManager:
         self.config = config
         self.services: Dict[str, ServiceInfo] = {}
         self.state = SystemState.INITIALIZING
+        self.log_buffer_lines = int(os.environ.get("SERVICE_LOG_LINES", "500"))
+        # 没有健康检查地址的服务，进程存活这么久即视为就绪
+        self.ready_grace = float(os.environ.get("SERVICE_READY_GRACE", "1.0"))
+        self.startup_timeline: Dict[str, Any] = {}
+        self.zygote = None
         
-    def register_service(self, name: str, service_type: ServiceType, port: Optional[int] = None):
+    def register_service(self, name: str, service_type: ServiceType, port: Optional[int] = None,
+                         health_url: Optional[str] = None):
         """注册服务"""
         self.services[name] = ServiceInfo(
             name=name,
             service_type=service_type,
-            port=port
+            port=port,
+            health_url=health_url,
+            logs=deque(maxlen=self.log_buffer_lines)
         )
         
-    async def start_service(self, name: str, command: List[str], cwd: Optional[Path] = None) -> bool:
-        """启动服务"""
+    async def start_zygote(self) -> bool:
+        """启动节点预热进程（core/node_zygote.py），不可用时返回 False，节点改为冷启动"""
+        if self.zygote is not None and self.zygote.alive:
+            return True
+        try:
+            from core.node_zygote import SUPPORTED, ZygoteClient
+        except ImportError as e:
+            logger.warning(f"节点预热进程不可用: {e}")
+            return False
+        if not SUPPORTED:
+            logger.info("当前平台不支持 fork，节点使用冷启动")
+            return False
+
+        preload = os.environ.get("NODE_ZYGOTE_PRELOAD")
+        client = ZygoteClient(env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+                              **({"modules": preload.split(",")} if preload else {}))
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, client.start):
+            return False
+        self.zygote = client
+        return True
+
+    async def start_service(self, name: str, command: List[str], cwd: Optional[Path] = None,
+                            script: Optional[Path] = None) -> bool:
+        """
+        启动服务进程
+
+        script 为 Python 脚本且预热进程在运行时，从预热进程 fork；否则执行 command。
+        进程创建后状态为 starting，由 wait_until_ready 探测就绪。
+        stdout/stderr 由后台线程持续读入环形缓冲区，避免管道写满阻塞子进程。
+        """
         if name not in self.services:
             logger.error(f"服务未注册: {name}")
             return False
@@ -281,20 +334,39 @@ class ServiceManager:
         service = self.services[name]
         
         try:
-            process = subprocess.Popen(
-                command,
-                cwd=str(cwd) if cwd else str(PROJECT_ROOT),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
-            )
+            process = None
+            if script is not None and self.zygote is not None and self.zygote.alive:
+                loop = asyncio.get_running_loop()
+                try:
+                    process = await loop.run_in_executor(
+                        None, lambda: self.zygote.spawn(str(script), cwd=str(cwd) if cwd else None)
+                    )
+                    service.launch_mode = "zygote"
+                except RuntimeError as e:
+                    logger.warning(f"预热进程 fork 失败，{name} 改为冷启动: {e}")
+            if process is None:
+                process = subprocess.Popen(
+                    command,
+                    cwd=str(cwd) if cwd else str(PROJECT_ROOT),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+                )
+                service.launch_mode = "exec"
             
             service.process = process
-            service.status = "running"
+            service.status = "starting"
             service.start_time = datetime.now()
+            service.spawned_at = time.monotonic()
+            service.ready_at = None
             service.error = None
+            for stream, label in ((process.stdout, "out"), (process.stderr, "err")):
+                threading.Thread(
+                    target=self._drain, args=(service, stream, label),
+                    name=f"log-{name}-{label}", daemon=True
+                ).start()
             
-            logger.info(f"服务已启动: {name}")
+            logger.info(f"服务进程已创建: {name} (pid {process.pid})")
             return True
             
         except Exception as e:
@@ -302,6 +374,88 @@ class ServiceManager:
             service.error = str(e)
             logger.error(f"启动服务失败 {name}: {e}")
             return False
+
+    @staticmethod
+    def _drain(service: ServiceInfo, stream, label: str):
+        """把子进程输出逐行读入服务的日志缓冲区，直到管道关闭"""
+        try:
+            for line in iter(stream.readline, b""):
+                service.logs.append(f"[{label}] {line.decode(errors='replace').rstrip()}")
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+
+    async def wait_until_ready(self, name: str, timeout: float = 30.0) -> bool:
+        """
+        等待服务就绪
+
+        有 health_url 时轮询该地址，任何非 5xx 的 HTTP 响应都说明服务已在监听；
+        否则进程存活 ready_grace 秒即视为就绪。进程提前退出或超时返回 False。
+        """
+        service = self.services.get(name)
+        if service is None or service.process is None:
+            return False
+
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            returncode = service.process.poll()
+            if returncode is not None:
+                last = service.logs[-1] if service.logs else ""
+                service.status = "error"
+                service.error = f"进程在就绪前退出 (code {returncode}) {last}".strip()
+                logger.error(f"服务 {name} 启动失败: {service.error}")
+                return False
+
+            if service.health_url:
+                ready = await self._probe(service.health_url)
+            else:
+                ready = time.monotonic() - service.spawned_at >= self.ready_grace
+            if ready:
+                service.ready_at = time.monotonic()
+                service.status = "running"
+                logger.info(f"服务已就绪: {name} ({service.startup_seconds:.2f}s)")
+                return True
+
+            if time.monotonic() >= deadline:
+                service.status = "error"
+                service.error = f"就绪探测超时 ({timeout:.0f}s)"
+                logger.error(f"服务 {name} {service.error}")
+                return False
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, 0.5)
+
+    @staticmethod
+    async def _probe(url: str, timeout: float = 1.0) -> bool:
+        """发送一次 HTTP GET，服务返回任何非 5xx 状态即视为就绪"""
+        parts = urlsplit(url)
+        host = parts.hostname or "127.0.0.1"
+        if host in ("0.0.0.0", "localhost"):
+            host = "127.0.0.1"
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, parts.port or 80), timeout
+            )
+            writer.write(
+                f"GET {parts.path or '/'} HTTP/1.0\r\nHost: {parts.netloc}\r\n\r\n".encode()
+            )
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+            code = int(status_line.split()[1])
+            return 100 <= code < 500
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            return False
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def get_logs(self, name: str, limit: int = 100) -> List[str]:
+        """获取服务最近的输出"""
+        service = self.services.get(name)
+        if service is None:
+            return []
+        return list(service.logs)[-limit:]
             
     def stop_service(self, name: str) -> bool:
         """停止服务"""
@@ -325,6 +479,9 @@ class ServiceManager:
         """停止所有服务"""
         for name in list(self.services.keys()):
             self.stop_service(name)
+        if self.zygote is not None:
+            self.zygote.stop()
+            self.zygote = None
             
     def get_status(self) -> Dict[str, Any]:
         """获取所有服务状态"""
@@ -334,11 +491,49 @@ class ServiceManager:
                 "status": service.status,
                 "port": service.port,
                 "uptime": (datetime.now() - service.start_time).total_seconds() if service.start_time else 0,
+                "startup_seconds": service.startup_seconds,
+                "launch_mode": service.launch_mode or None,
                 "error": service.error
             }
             for name, service in self.services.items()
         }
 
+    def get_launcher_status(self) -> Dict[str, Any]:
+        """
+        进程启动统计：按启动方式汇总平均启动耗时和内存
+
+        shared_kb 为与其他进程共享的驻留内存，saved_kb = rss - pss 为因共享
+        （fork 自预热进程的写时复制页）而少占的内存。内存数据仅 Linux 可用。
+        """
+        try:
+            from core.node_zygote import process_memory
+        except ImportError:
+            process_memory = None
+
+        modes: Dict[str, Dict[str, Any]] = {}
+        for service in self.services.values():
+            if not service.launch_mode or service.process is None or service.process.poll() is not None:
+                continue
+            mode = modes.setdefault(service.launch_mode, {
+                "processes": 0, "startup_seconds": [], "rss_kb": 0, "pss_kb": 0, "shared_kb": 0, "saved_kb": 0,
+            })
+            mode["processes"] += 1
+            if service.startup_seconds is not None:
+                mode["startup_seconds"].append(service.startup_seconds)
+            memory = process_memory(service.process.pid) if process_memory else None
+            if memory:
+                for key in ("rss_kb", "pss_kb", "shared_kb"):
+                    mode[key] += memory[key]
+                mode["saved_kb"] += memory["rss_kb"] - memory["pss_kb"]
+        for mode in modes.values():
+            samples = mode.pop("startup_seconds")
+            mode["mean_startup_seconds"] = round(sum(samples) / len(samples), 3) if samples else None
+
+        return {
+            "zygote": self.zygote.get_stats() if self.zygote is not None else None,
+            "modes": modes,
+        }
+
 
 # ============================================================================
 # 核心服务启动器
@@ -375,16 +570,18 @@ class CoreServiceLauncher:
         self.service_manager.register_service(
             "device_status_api",
             ServiceType.API,
-            port=self.config.device_api_port
+            port=self.config.device_api_port,
+            health_url=f"http://127.0.0.1:{self.config.device_api_port}/"
         )
         
         # 作为子进程启动
-        return await self.service_manager.start_service(
+        started = await self.service_manager.start_service(
             "device_status_api",
             [sys.executable, "-m", "uvicorn", "core.device_status_api:app", 
              "--host", "0.0.0.0", "--port", str(self.config.device_api_port),
              "--log-level", "warning"]
         )
+        return started and await self.service_manager.wait_until_ready("device_status_api")
         
     async def start_microsoft_ufo_integration(self) -> bool:
         """启动微软 UFO 集成"""
@@ -434,13 +631,24 @@ class CoreServiceLauncher:
 # ============================================================================
 
 class NodeSystemLauncher:
-    """节点系统启动器"""
+    """
+    节点系统启动器
+
+    按依赖关系分阶段并行启动节点：依赖来自 node_dependencies.json 中各节点的
+    depends_on（以及 config/topology.json 节点条目中可选的 depends_on），
+    每个节点在其全部依赖就绪后立即启动。配置了 port 的节点通过 /health
+    探测就绪，其余节点进程存活一段时间即视为就绪。
+    """
     
     def __init__(self, service_manager: ServiceManager, config: SystemConfig):
         self.service_manager = service_manager
         self.config = config
         self.nodes_dir = PROJECT_ROOT / "nodes"
         self.node_configs = self._load_node_configs()
+        self.topology = self._load_topology()
+        self.ready_timeout = float(os.environ.get("NODE_READY_TIMEOUT", "30"))
+        # 同时处于启动中的节点上限，0 表示不限制
+        self.max_parallel = int(os.environ.get("NODE_START_CONCURRENCY", "0"))
         
     def _load_node_configs(self) -> Dict[str, Any]:
         """加载节点配置"""
@@ -449,6 +657,19 @@ class NodeSystemLauncher:
             with open(config_file, 'r') as f:
                 return json.load(f)
         return {}
+
+    def _load_topology(self) -> Dict[str, Dict[str, Any]]:
+        """加载拓扑配置，按节点目录名（如 Node_00_StateMachine）索引"""
+        topology_file = PROJECT_ROOT / "config" / "topology.json"
+        if not topology_file.exists():
+            return {}
+        try:
+            with open(topology_file, 'r') as f:
+                nodes = json.load(f).get("nodes", [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"拓扑配置加载失败: {e}")
+            return {}
+        return {f"{n['id']}_{n['name']}": n for n in nodes if "id" in n and "name" in n}
         
     def get_core_nodes(self) -> List[str]:
         """获取核心节点列表"""
@@ -466,38 +687,228 @@ class NodeSystemLauncher:
             d.name for d in self.nodes_dir.iterdir()
             if d.is_dir() and (d / "main.py").exists()
         ])
+
+    def _resolve_node(self, ref: str) -> Optional[str]:
+        """把依赖引用（目录名或拓扑 ID，如 Node_00）解析为节点目录名"""
+        if (self.nodes_dir / ref / "main.py").exists():
+            return ref
+        matches = [name for name, node in self.topology.items() if node.get("id") == ref]
+        if len(matches) == 1 and (self.nodes_dir / matches[0] / "main.py").exists():
+            return matches[0]
+        return None
+
+    def get_dependencies(self, node_name: str) -> List[str]:
+        """获取节点的直接依赖（节点目录名）"""
+        refs = list(self.node_configs.get(node_name, {}).get("depends_on", []))
+        refs += self.topology.get(node_name, {}).get("depends_on", [])
+        deps = []
+        for ref in refs:
+            dep = self._resolve_node(ref)
+            if dep is None:
+                logger.warning(f"节点 {node_name} 的依赖 {ref} 不存在，已忽略")
+            elif dep != node_name and dep not in deps:
+                deps.append(dep)
+        return deps
+
+    def get_health_url(self, node_name: str) -> Optional[str]:
+        """
+        节点的就绪探测地址：node_dependencies.json 的 health_url/port
+
+        只探测已核实监听端口的节点。拓扑中的 api_url 与部分节点实际监听的
+        端口不一致，有些节点也不是 HTTP 服务，因此不作为探测依据；没有
+        端口的节点改用进程存活检查。
+        """
+        config = self.node_configs.get(node_name, {})
+        if config.get("health_url"):
+            return config["health_url"]
+        if config.get("port"):
+            return f"http://127.0.0.1:{config['port']}/health"
+        return None
+
+    def plan_startup(self, nodes: List[str]) -> Tuple[List[List[str]], Dict[str, List[str]], List[str]]:
+        """
+        构建启动计划
+
+        自动补全被选节点的传递依赖，按拓扑排序分层。
+
+        Returns:
+            (各层节点, 每个节点的依赖, 处于依赖环中无法启动的节点)
+        """
+        deps: Dict[str, List[str]] = {}
+        pending = list(nodes)
+        while pending:
+            node = pending.pop()
+            if node in deps:
+                continue
+            deps[node] = self.get_dependencies(node)
+            pending.extend(d for d in deps[node] if d not in deps)
+
+        order = {node: i for i, node in enumerate(nodes)}
+        remaining = {node: len(d) for node, d in deps.items()}
+        dependents: Dict[str, List[str]] = {node: [] for node in deps}
+        for node, node_deps in deps.items():
+            for dep in node_deps:
+                dependents[dep].append(node)
+
+        levels = []
+        current = [node for node, count in remaining.items() if count == 0]
+        while current:
+            current.sort(key=lambda n: (order.get(n, len(order)), n))
+            levels.append(current)
+            following = []
+            for node in current:
+                for dependent in dependents[node]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        following.append(dependent)
+            current = following
+
+        planned = {node for level in levels for node in level}
+        cyclic = sorted(node for node in deps if node not in planned)
+        return levels, deps, cyclic
         
     async def start_node(self, node_name: str) -> bool:
-        """启动单个节点"""
+        """启动单个节点并等待就绪"""
         node_dir = self.nodes_dir / node_name
         main_py = node_dir / "main.py"
         
         if not main_py.exists():
             return False
             
-        self.service_manager.register_service(node_name, ServiceType.NODE)
+        self.service_manager.register_service(
+            node_name, ServiceType.NODE, health_url=self.get_health_url(node_name)
+        )
         
-        return await self.service_manager.start_service(
+        fork = self.node_configs.get(node_name, {}).get("zygote", True)
+        started = await self.service_manager.start_service(
             node_name,
             [sys.executable, str(main_py)],
-            cwd=node_dir
+            cwd=node_dir,
+            script=main_py if fork else None
         )
+        return started and await self.service_manager.wait_until_ready(node_name, self.ready_timeout)
         
     async def start_nodes(self, nodes: List[str], parallel: bool = True) -> Dict[str, bool]:
-        """启动多个节点"""
-        results = {}
-        
+        """
+        按依赖关系启动多个节点
+
+        parallel 为 True 时每个节点在依赖就绪后立即启动；否则按计划顺序逐个启动。
+        依赖启动失败的节点不会启动，状态记为 blocked。
+        """
+        levels, deps, cyclic = self.plan_startup(nodes)
+        results: Dict[str, bool] = {}
+        started_at = time.monotonic()
+        if self.config.use_zygote:
+            await self.service_manager.start_zygote()
+
+        for node in cyclic:
+            self._mark_blocked(node, "依赖成环")
+            results[node] = False
+        if cyclic:
+            logger.error(f"节点依赖成环，无法启动: {', '.join(cyclic)}")
+
+        def blocked_by(node: str) -> List[str]:
+            return [d for d in deps[node] if not results.get(d)]
+
         if parallel:
-            tasks = [self.start_node(node) for node in nodes]
-            results_list = await asyncio.gather(*tasks, return_exceptions=True)
-            for node, result in zip(nodes, results_list):
-                results[node] = result is True
+            limit = asyncio.Semaphore(self.max_parallel) if self.max_parallel > 0 else None
+            tasks: Dict[str, asyncio.Task] = {}
+
+            async def launch(node: str) -> bool:
+                if deps[node]:
+                    await asyncio.gather(*(tasks[d] for d in deps[node]), return_exceptions=True)
+                failed = blocked_by(node)
+                if failed:
+                    self._mark_blocked(node, f"依赖未就绪: {', '.join(failed)}")
+                    results[node] = False
+                    return False
+                try:
+                    if limit is None:
+                        results[node] = await self.start_node(node)
+                    else:
+                        async with limit:
+                            results[node] = await self.start_node(node)
+                except Exception as e:
+                    logger.error(f"启动节点失败 {node}: {e}")
+                    results[node] = False
+                return results[node]
+
+            for level in levels:
+                for node in level:
+                    tasks[node] = asyncio.create_task(launch(node))
+            await asyncio.gather(*tasks.values())
         else:
-            for node in nodes:
-                results[node] = await self.start_node(node)
-                await asyncio.sleep(0.05)
-                
-        return results
+            for level in levels:
+                for node in level:
+                    failed = blocked_by(node)
+                    if failed:
+                        self._mark_blocked(node, f"依赖未就绪: {', '.join(failed)}")
+                        results[node] = False
+                    else:
+                        results[node] = await self.start_node(node)
+
+        self._record_timeline(levels, deps, started_at)
+        return {node: results.get(node, False) for node in [*nodes, *(n for n in deps if n not in nodes)]}
+
+    def _mark_blocked(self, node_name: str, reason: str):
+        self.service_manager.register_service(node_name, ServiceType.NODE)
+        service = self.service_manager.services[node_name]
+        service.status = "blocked"
+        service.error = reason
+
+    def _record_timeline(self, levels: List[List[str]], deps: Dict[str, List[str]], started_at: float):
+        """汇总每个节点的创建/就绪时刻（相对启动开始），并找出关键路径"""
+        services = self.service_manager.services
+        entries = []
+        for index, level in enumerate(levels):
+            for node in level:
+                service = services.get(node)
+                spawned = service.spawned_at if service else None
+                ready = service.ready_at if service else None
+                entries.append({
+                    "node": node,
+                    "level": index,
+                    "status": service.status if service else "unknown",
+                    "spawn": round(spawned - started_at, 3) if spawned is not None else None,
+                    "ready": round(ready - started_at, 3) if ready is not None else None,
+                    "latency": round(service.startup_seconds, 3) if service and service.startup_seconds is not None else None,
+                })
+
+        # 关键路径：从最后就绪的节点沿最晚就绪的依赖回溯
+        ready_at = {e["node"]: e["ready"] for e in entries if e["ready"] is not None}
+        critical_path = []
+        node = max(ready_at, key=ready_at.get) if ready_at else None
+        while node is not None:
+            critical_path.append(node)
+            ready_deps = [d for d in deps.get(node, []) if d in ready_at]
+            node = max(ready_deps, key=ready_at.get) if ready_deps else None
+
+        self.service_manager.startup_timeline = {
+            "total_seconds": round(time.monotonic() - started_at, 3),
+            "levels": len(levels),
+            "critical_path": critical_path[::-1],
+            "nodes": entries,
+        }
+
+    def print_timeline(self):
+        """打印启动时间线"""
+        timeline = self.service_manager.startup_timeline
+        if not timeline.get("nodes"):
+            return
+
+        def fmt(value: Optional[float]) -> str:
+            return f"{value:>9.2f}" if value is not None else f"{'-':>9}"
+
+        print(f"  {'层':<4}{'节点':<36}{'创建 s':>9}{'就绪 s':>9}{'耗时 s':>9}  状态")
+        for entry in timeline["nodes"]:
+            print(f"  {entry['level']:<4}{entry['node']:<36}{fmt(entry['spawn'])}{fmt(entry['ready'])}"
+                  f"{fmt(entry['latency'])}  {entry['status']}")
+        print_status(f"节点启动总耗时 {timeline['total_seconds']:.2f}s，共 {timeline['levels']} 层", "info")
+        if timeline["critical_path"]:
+            print_status(f"关键路径: {' → '.join(timeline['critical_path'])}", "info")
+        for mode, stats in self.service_manager.get_launcher_status()["modes"].items():
+            print_status(f"{mode}: {stats['processes']} 个进程，平均启动 {stats['mean_startup_seconds']}s，"
+                         f"共享内存节省 {stats['saved_kb'] / 1024:.1f} MB", "info")
         
     async def start_all(self, minimal: bool = False) -> Dict[str, bool]:
         """启动所有节点"""
@@ -704,12 +1115,26 @@ class UnifiedWebUI:
                     "version": "2.0",
                     "state": self.service_manager.state.name,
                     "services": self.service_manager.get_status(),
+                    "launcher": self.service_manager.get_launcher_status(),
                     "config": self.config.get_status_dict()
                 })
                 
             @self.app.get("/api/services")
             async def services():
                 return JSONResponse(self.service_manager.get_status())
+
+            @self.app.get("/api/services/{name}/logs")
+            async def service_logs(name: str, limit: int = 100):
+                if name not in self.service_manager.services:
+                    return JSONResponse({"error": f"服务不存在: {name}"}, status_code=404)
+                return JSONResponse({"name": name, "lines": self.service_manager.get_logs(name, limit)})
+
+            @self.app.get("/api/startup")
+            async def startup():
+                return JSONResponse({
+                    **self.service_manager.startup_timeline,
+                    "launcher": self.service_manager.get_launcher_status()
+                })
             
             @self.app.get("/api/health")
             async def health():
@@ -1109,8 +1534,9 @@ class UFOGalaxyUnified:
                 self.service_manager.state = SystemState.STARTING_NODES
                 results = await self.node_launcher.start_all(minimal=self.config.minimal_mode)
                 success = sum(1 for v in results.values() if v)
-                print_status(f"节点: {success}/{len(results)} 已启动", 
+                print_status(f"节点: {success}/{len(results)} 已就绪", 
                             "success" if success > 0 else "warning")
+                self.node_launcher.print_timeline()
                 return results
             tasks.append(start_nodes())
 
@@ -1208,6 +1634,7 @@ def main():
     parser.add_argument("--no-ui", action="store_true", help="不启动 Web UI")
     parser.add_argument("--no-l4", action="store_true", help="不启动 L4 增强模块")
     parser.add_argument("--no-nodes", action="store_true", help="不启动节点系统")
+    parser.add_argument("--no-zygote", action="store_true", help="节点各自冷启动，不从预热进程 fork")
     parser.add_argument("--status", action="store_true", help="查看系统状态")
     parser.add_argument("--port", "-p", type=int, default=8080, help="Web UI 端口")
     
@@ -1221,6 +1648,7 @@ def main():
     galaxy.config.enable_web_ui = not args.no_ui
     galaxy.config.enable_l4 = not args.no_l4
     galaxy.config.enable_nodes = not args.no_nodes
+    galaxy.config.use_zygote = not args.no_zygote
     galaxy.config.web_ui_port = args.port
     
     # 查看状态